@@ -0,0 +1,93 @@
+import argparse
+import random
+import time
+from collections import defaultdict
+
+import h3
+import immutables
+
+from nrel.hive.dispatcher.instruction_generator import assignment_ops
+from nrel.hive.resources.mock_lobster import mock_request_from_geoids, mock_vehicle_from_geoid
+
+# this example script compares the dense assignment used by HIVE's original Dispatcher
+# (a python loop over every vehicle/request pair followed by the Hungarian algorithm)
+# with the vectorized, spatially-sparse assignment, using synthetic vehicles and requests
+# scattered around downtown Denver. with --candidates, the sparse assignment is also run on the
+# nearest vehicles of each request only. it can be called from the command line via
+# `$ python benchmark_assignment.py --vehicles 2000 --requests 500 --radius 5 --candidates 10`
+
+parser = argparse.ArgumentParser(description="assignment benchmark")
+parser.add_argument("--vehicles", type=int, default=1000, help="number of idle vehicles")
+parser.add_argument("--requests", type=int, default=500, help="number of open requests")
+parser.add_argument("--radius", type=float, default=5.0, help="max assignment radius in km")
+parser.add_argument("--spread", type=float, default=0.2, help="lat/lon spread in degrees")
+parser.add_argument("--search-res", type=int, default=7, help="h3 search resolution")
+parser.add_argument(
+    "--candidates", type=int, default=0, help="nearest vehicles considered per request"
+)
+parser.add_argument("--skip-dense", action="store_true", help="only run the sparse assignment")
+
+
+def random_geoid(spread: float) -> str:
+    lat = 39.75 + random.uniform(-spread, spread)
+    lon = -104.98 + random.uniform(-spread, spread)
+    return h3.geo_to_h3(lat, lon, 15)
+
+
+def search_collection(entities, search_res: int) -> immutables.Map:
+    collection = defaultdict(set)
+    for e in entities:
+        collection[h3.h3_to_parent(e.geoid, search_res)].add(e.id)
+    return immutables.Map({k: frozenset(v) for k, v in collection.items()})
+
+
+def run_benchmark(args):
+    random.seed(0)
+    vehicles = tuple(
+        mock_vehicle_from_geoid(vehicle_id=f"v{i}", geoid=random_geoid(args.spread))
+        for i in range(args.vehicles)
+    )
+    requests = tuple(
+        mock_request_from_geoids(request_id=f"r{i}", origin=random_geoid(args.spread))
+        for i in range(args.requests)
+    )
+    v_search = search_collection(vehicles, args.search_res)
+    r_search = search_collection(requests, args.search_res)
+
+    print(f"{len(vehicles)} vehicles, {len(requests)} requests, radius {args.radius} km")
+
+    start = time.perf_counter()
+    sparse = assignment_ops.find_sparse_assignment(
+        vehicles, requests, v_search, r_search, args.search_res, args.radius
+    )
+    sparse_time = time.perf_counter() - start
+    print(f"sparse: {sparse_time:.3f}s, {len(sparse.solution)} assignments")
+
+    if args.candidates > 0:
+        start = time.perf_counter()
+        nearest = assignment_ops.find_sparse_assignment(
+            vehicles,
+            requests,
+            v_search,
+            r_search,
+            args.search_res,
+            args.radius,
+            max_candidates=args.candidates,
+        )
+        nearest_time = time.perf_counter() - start
+        print(
+            f"sparse, {args.candidates} candidates: {nearest_time:.3f}s, "
+            f"{len(nearest.solution)} assignments, "
+            f"cost {nearest.solution_cost:.1f}km vs {sparse.solution_cost:.1f}km"
+        )
+
+    if not args.skip_dense:
+        start = time.perf_counter()
+        dense = assignment_ops.find_assignment(vehicles, requests, assignment_ops.h3_distance_cost)
+        dense_time = time.perf_counter() - start
+        print(f"dense:  {dense_time:.3f}s, {len(dense.solution)} assignments")
+        print(f"speedup: {dense_time / sparse_time:.1f}x")
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
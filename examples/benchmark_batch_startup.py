@@ -0,0 +1,72 @@
+import argparse
+import logging
+import tempfile
+import time
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Dict, Optional
+
+from pkg_resources import resource_filename
+
+from nrel.hive.initialization.load import load_config, load_simulation
+from nrel.hive.initialization.shared_inputs import prepare_shared_inputs
+
+# this example script times the startup of the scenario processes of a hive-batch run, with
+# each process parsing its own inputs against loading the road network and requests shared by
+# the batch. it reports the load time and, on linux, the private (unshared) memory of each
+# process. it can be called from the command line via
+# `$ python benchmark_batch_startup.py --scenarios 8 --processes 4`
+
+parser = argparse.ArgumentParser(description="hive-batch startup benchmark")
+parser.add_argument("--scenarios", type=int, default=8, help="scenarios in the batch")
+parser.add_argument("--processes", type=int, default=4, help="processes running the batch")
+
+
+def private_memory_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return None
+    kb = sum(int(fields[k].split()[0]) for k in ("Private_Clean", "Private_Dirty"))
+    return kb / 1024
+
+
+def load_scenario(input_overrides: Dict[str, str]):
+    logging.disable(logging.CRITICAL)
+    scenario = resource_filename("nrel.hive.resources.scenarios.manhattan", "manhattan.yaml")
+    start = time.perf_counter()
+    config = load_config(scenario).suppress_logging()
+    if input_overrides:
+        config = config._replace(input_config=config.input_config._replace(**input_overrides))
+    load_simulation(config)
+    return time.perf_counter() - start, private_memory_mb()
+
+
+def time_batch(name: str, overrides, processes: int):
+    with Pool(processes) as p:
+        results = p.map(load_scenario, overrides)
+    load_time = sum(t for t, _ in results) / len(results)
+    memory = [m for _, m in results if m is not None]
+    print(f"{name}:")
+    print(f"  load per scenario:   {load_time:.3f}s")
+    if memory:
+        print(f"  private memory mean: {sum(memory) / len(memory):.1f}MB")
+
+
+def run_benchmark(args):
+    time_batch("parsed by each process", [{}] * args.scenarios, args.processes)
+
+    scenario = resource_filename("nrel.hive.resources.scenarios.manhattan", "manhattan.yaml")
+    config = load_config(scenario).suppress_logging()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        overrides = prepare_shared_inputs(
+            [config] * args.scenarios, ("road_network", "requests"), Path(tmp)
+        )
+        print(f"prepare shared inputs: {time.perf_counter() - start:.3f}s")
+        time_batch("shared", overrides, args.processes)
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
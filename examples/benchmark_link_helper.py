@@ -0,0 +1,84 @@
+import argparse
+import json
+import math
+import time
+from pathlib import Path
+
+import networkx as nx
+from pkg_resources import resource_filename
+
+from nrel.hive.model.roadnetwork.osm.csr_road_graph import CSRRoadGraph
+from nrel.hive.model.roadnetwork.osm.osm_road_network_link_helper import OSMRoadNetworkLinkHelper
+
+# this example script times building the OSMRoadNetworkLinkHelper, the Link table and spatial
+# index of an OSMRoadNetwork, from a networkx graph and from a CSR road graph, on the road networks bundled with HIVE and on a synthetic grid
+# road network. it can be called from the command line via
+# `$ python benchmark_link_helper.py --grid-edges 500000`
+
+NETWORKS = {
+    "denver": (
+        "nrel.hive.resources.scenarios.denver_downtown.road_network",
+        "downtown_denver_network.json",
+    ),
+    "manhattan": ("nrel.hive.resources.scenarios.manhattan.road_network", "manhattan_network.json"),
+}
+
+parser = argparse.ArgumentParser(description="link helper build benchmark")
+parser.add_argument("--grid-edges", type=int, default=500000, help="edges in the synthetic grid")
+parser.add_argument("--sim-h3-resolution", type=int, default=15, help="h3 resolution of links")
+
+
+def grid_graph(edges: int, spacing_m: float = 100.0) -> nx.MultiDiGraph:
+    """
+    a square grid of two-way streets around downtown Denver with about the requested edge count
+    """
+    side = max(2, round(math.sqrt(edges / 4)))
+    d_lat = spacing_m / 111_320
+    d_lon = spacing_m / (111_320 * math.cos(math.radians(39.75)))
+    graph = nx.MultiDiGraph()
+    for row in range(side):
+        for col in range(side):
+            graph.add_node(row * side + col, y=39.75 + row * d_lat, x=-104.98 + col * d_lon)
+    for row in range(side):
+        for col in range(side):
+            node = row * side + col
+            neighbors = ([node + 1] if col + 1 < side else []) + (
+                [node + side] if row + 1 < side else []
+            )
+            for neighbor in neighbors:
+                graph.add_edge(node, neighbor, length=spacing_m, speed_kmph=40.0)
+                graph.add_edge(neighbor, node, length=spacing_m, speed_kmph=40.0)
+    return graph
+
+
+def time_build(name: str, graph: nx.MultiDiGraph, sim_h3_resolution: int):
+    start = time.perf_counter()
+    error, _ = OSMRoadNetworkLinkHelper.build(graph, sim_h3_resolution)
+    build_time = time.perf_counter() - start
+    if error:
+        raise error
+
+    road_graph = CSRRoadGraph.from_networkx(graph)
+    start = time.perf_counter()
+    error, _ = OSMRoadNetworkLinkHelper.from_road_graph(road_graph, sim_h3_resolution)
+    csr_build_time = time.perf_counter() - start
+    if error:
+        raise error
+
+    print(
+        f"{name}: {graph.number_of_edges()} edges, link helper build {build_time:.3f}s "
+        f"(from CSR road graph {csr_build_time:.3f}s)"
+    )
+
+
+def run_benchmark(args):
+    for name, (package, file) in NETWORKS.items():
+        with Path(resource_filename(package, file)).open() as f:
+            graph = nx.node_link_graph(json.load(f))
+        time_build(name, graph, args.sim_h3_resolution)
+
+    time_build("synthetic grid", grid_graph(args.grid_edges), args.sim_h3_resolution)
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
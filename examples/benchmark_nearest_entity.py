@@ -0,0 +1,101 @@
+import argparse
+import random
+import time
+from collections import defaultdict
+from math import ceil
+from typing import NamedTuple
+
+import h3
+import immutables
+
+from nrel.hive.util.h3_ops import H3Ops
+
+# this example script times H3Ops.nearest_entity, the ring search used to find stations and bases,
+# against the original search, which rescanned the inner rings at each search depth and scanned
+# every entity for each cell it searched. the entities near the search origins are kept fixed
+# while more entities are added far away, so the lookup time of the ring search should not grow
+# with the total entity count. it can be called from the command line via
+# `$ python benchmark_nearest_entity.py --nearby 50 --totals 100 1000 10000 --lookups 500`
+
+parser = argparse.ArgumentParser(description="nearest entity benchmark")
+parser.add_argument("--nearby", type=int, default=50, help="entities near the search origins")
+parser.add_argument(
+    "--totals", type=int, nargs="+", default=[100, 1000, 10000], help="total entity counts"
+)
+parser.add_argument("--lookups", type=int, default=500, help="lookups timed per total")
+parser.add_argument("--n", type=int, default=5, help="candidates for the k-nearest lookups")
+parser.add_argument("--search-res", type=int, default=7, help="h3 search resolution")
+
+
+class Point(NamedTuple):
+    id: str
+    geoid: str
+
+
+def random_geoid(lat: float, lon: float, spread: float) -> str:
+    return h3.geo_to_h3(
+        lat + random.uniform(-spread, spread), lon + random.uniform(-spread, spread), 15
+    )
+
+
+def original_nearest_entity(geoid, entities, entity_search, search_res, distance_function):
+    # the search before the ring search, kept here for comparison
+    max_k = ceil(10 / (h3.edge_length(search_res, unit="km") * 2))
+    search_geoid = h3.h3_to_parent(geoid, search_res)
+    for k in range(max_k + 1):
+        best_dist_km, best_entity = 1000000.0, None
+        for cell in h3.k_ring(search_geoid, k):
+            ids = entity_search.get(cell)
+            if ids is None:
+                continue
+            for entity in (e for e in entities if e.id in ids):
+                dist_km = distance_function(entity)
+                if dist_km < best_dist_km:
+                    best_dist_km, best_entity = dist_km, entity
+        if best_entity is not None:
+            return best_entity
+    return None
+
+
+def run_benchmark(args):
+    random.seed(0)
+    nearby = [Point(f"near_{i}", random_geoid(39.75, -104.98, 0.1)) for i in range(args.nearby)]
+    origins = [random_geoid(39.75, -104.98, 0.1) for _ in range(args.lookups)]
+
+    for total in args.totals:
+        # the rest of the entities are placed in another city, outside of the search radius
+        far = [
+            Point(f"far_{i}", random_geoid(40.7, -74.0, 0.5)) for i in range(total - args.nearby)
+        ]
+        entities = immutables.Map({e.id: e for e in nearby + far})
+        collection = defaultdict(set)
+        for e in entities.values():
+            collection[h3.h3_to_parent(e.geoid, args.search_res)].add(e.id)
+        entity_search = immutables.Map({k: frozenset(v) for k, v in collection.items()})
+        entity_tuple = tuple(entities.values())
+
+        def _time(fn) -> float:
+            start = time.perf_counter()
+            for origin in origins:
+                fn(origin, lambda e: H3Ops.great_circle_distance(origin, e.geoid))
+            return (time.perf_counter() - start) / len(origins) * 1000
+
+        original_ms = _time(
+            lambda o, d: original_nearest_entity(o, entity_tuple, entity_search, args.search_res, d)
+        )
+        ring_ms = _time(
+            lambda o, d: H3Ops.nearest_entity(o, entities, entity_search, args.search_res, d)
+        )
+        k_nearest_ms = _time(
+            lambda o, d: H3Ops.nearest_entities(
+                o, entities, entity_search, args.search_res, d, args.n
+            )
+        )
+        print(f"{total} entities:")
+        print(f"  original search:    {original_ms:.3f}ms per lookup")
+        print(f"  ring search:        {ring_ms:.3f}ms per lookup")
+        print(f"  ring search, n={args.n}:  {k_nearest_ms:.3f}ms per lookup")
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
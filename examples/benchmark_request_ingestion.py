@@ -0,0 +1,66 @@
+import argparse
+import logging
+import time
+from pathlib import Path
+
+from pkg_resources import resource_filename
+
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
+from nrel.hive.model.sim_time import SimTime
+from nrel.hive.resources.mock_lobster import mock_config, mock_env, mock_sim
+from nrel.hive.state.simulation_state.update.update_requests_from_file import (
+    UpdateRequestsFromFile,
+)
+
+# this example script compares adding requests to the simulation row by row, as lazy file
+# reading does, with the columnar path that adds each time step's requests as a batch, using
+# the manhattan road network and requests bundled with HIVE. it can be called from the command
+# line via
+# `$ python benchmark_request_ingestion.py --steps 60`
+
+parser = argparse.ArgumentParser(description="request ingestion benchmark")
+parser.add_argument("--steps", type=int, default=60, help="number of time steps to ingest")
+parser.add_argument("--timestep", type=int, default=60, help="time step duration in seconds")
+
+
+def time_ingestion(name: str, lazy_file_reading: bool, road_network, args) -> int:
+    requests_file = resource_filename(
+        "nrel.hive.resources.scenarios.manhattan.requests", "nyc_20k.csv"
+    )
+    rate_structure_file = resource_filename(
+        "nrel.hive.resources.scenarios.denver_downtown.service_prices", "rate_structure.csv"
+    )
+    env = mock_env(mock_config(), fleet_ids=frozenset())
+
+    start = time.perf_counter()
+    fn = UpdateRequestsFromFile.build(
+        requests_file, rate_structure_file, lazy_file_reading=lazy_file_reading
+    )
+    load_time = time.perf_counter() - start
+
+    added = 0
+    start = time.perf_counter()
+    for step in range(1, args.steps + 1):
+        # start from an empty sim each step so both paths do the same work
+        sim = mock_sim(sim_time=step * args.timestep, road_network=road_network)
+        sim, _ = fn.update(sim, env)
+        added += len(sim.requests)
+    update_time = time.perf_counter() - start
+
+    print(f"{name}: load {load_time:.3f}s, {args.steps} steps {update_time:.3f}s, {added} added")
+    return added
+
+
+def run_benchmark(args):
+    logging.disable(logging.WARNING)
+    road_network_file = resource_filename(
+        "nrel.hive.resources.scenarios.manhattan.road_network", "manhattan_network.json"
+    )
+    road_network = OSMRoadNetwork.from_file(road_network_file=Path(road_network_file))
+
+    time_ingestion("row by row", True, road_network, args)
+    time_ingestion("columnar", False, road_network, args)
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,57 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from pkg_resources import resource_filename
+
+from nrel.hive.app.compile_road_network import compile_road_network
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
+
+# this example script times loading the road networks bundled with HIVE from node-link json
+# against loading the compiled road network, which memory maps the road graph arrays and reads
+# the link table and spatial index instead of rebuilding them. it can be called from the
+# command line via `$ python benchmark_road_network_loading.py --repeats 3`
+
+NETWORKS = {
+    "denver": (
+        "nrel.hive.resources.scenarios.denver_downtown.road_network",
+        "downtown_denver_network.json",
+    ),
+    "manhattan": ("nrel.hive.resources.scenarios.manhattan.road_network", "manhattan_network.json"),
+}
+
+parser = argparse.ArgumentParser(description="road network loading benchmark")
+parser.add_argument("--repeats", type=int, default=3, help="loads to average over")
+
+
+def time_loads(load, repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        load()
+    return (time.perf_counter() - start) / repeats
+
+
+def run_benchmark(args):
+    for name, (package, file) in NETWORKS.items():
+        network_file = Path(resource_filename(package, file))
+        with tempfile.TemporaryDirectory() as tmp:
+            compiled_dir = Path(tmp) / f"{network_file.stem}.compiled"
+
+            start = time.perf_counter()
+            compile_road_network(network_file, compiled_dir=compiled_dir)
+            compile_time = time.perf_counter() - start
+
+            json_time = time_loads(lambda: OSMRoadNetwork.from_file(network_file), args.repeats)
+            compiled_time = time_loads(
+                lambda: OSMRoadNetwork.from_compiled(compiled_dir), args.repeats
+            )
+
+        print(f"{name}:")
+        print(f"  compile:       {compile_time:.3f}s")
+        print(f"  load json:     {json_time:.3f}s")
+        print(f"  load compiled: {compiled_time:.3f}s ({json_time / compiled_time:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
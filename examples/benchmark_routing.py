@@ -0,0 +1,122 @@
+import argparse
+import json
+import random
+import time
+
+import h3
+import networkx as nx
+from pathlib import Path
+
+from pkg_resources import resource_filename
+
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
+from nrel.hive.model.roadnetwork.osm.osm_routing import LandmarkIndex, OSMRoutingEngine
+
+# this example script times OSMRoadNetwork routing on the road networks bundled with HIVE,
+# comparing networkx bidirectional Dijkstra with Dijkstra on the CSR road graph, with and
+# without the landmark search bound, and the LRU route cache on a workload of repeated origin/destination pairs, as seen when many vehicles are
+# dispatched between the same few hotspots, and the batched distance matrix against pairwise
+# distance queries. it can be called from the command line via
+# `$ python benchmark_routing.py --queries 1000 --landmarks 16`
+
+NETWORKS = {
+    "denver": (
+        "nrel.hive.resources.scenarios.denver_downtown.road_network",
+        "downtown_denver_network.json",
+    ),
+    "manhattan": ("nrel.hive.resources.scenarios.manhattan.road_network", "manhattan_network.json"),
+}
+
+parser = argparse.ArgumentParser(description="routing benchmark")
+parser.add_argument("--queries", type=int, default=500, help="number of route queries")
+parser.add_argument("--landmarks", type=int, default=16, help="number of routing landmarks")
+parser.add_argument(
+    "--hotspots", type=int, default=10, help="distinct nodes in the repeated workload"
+)
+parser.add_argument("--cache-size", type=int, default=10000, help="LRU route cache size")
+parser.add_argument("--matrix-size", type=int, default=20, help="origins/destinations in matrix")
+
+
+def time_queries(engine: OSMRoutingEngine, pairs) -> float:
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        engine.node_path(origin, destination)
+    return time.perf_counter() - start
+
+
+def time_networkx_queries(graph: nx.MultiDiGraph, pairs) -> float:
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        nx.shortest_path(graph, origin, destination, weight="travel_time")
+    return time.perf_counter() - start
+
+
+def run_benchmark(args):
+    for name, (package, file) in NETWORKS.items():
+        network_file = Path(resource_filename(package, file))
+        network = OSMRoadNetwork.from_file(network_file)
+        road_graph = network.road_graph
+        with network_file.open() as f:
+            graph = nx.node_link_graph(json.load(f))
+        nodes = [road_graph.node_id(i) for i in range(road_graph.node_count)]
+        random.seed(0)
+        unique_pairs = [(random.choice(nodes), random.choice(nodes)) for _ in range(args.queries)]
+        hotspots = random.sample(nodes, min(args.hotspots, len(nodes)))
+        repeated_pairs = [
+            (random.choice(hotspots), random.choice(hotspots)) for _ in range(args.queries)
+        ]
+
+        start = time.perf_counter()
+        landmarks = LandmarkIndex.build(road_graph, args.landmarks)
+        landmark_build_time = time.perf_counter() - start
+
+        print(f"{name}: {road_graph.node_count} nodes, {road_graph.edge_count} edges")
+        print(f"  landmark index build ({args.landmarks} landmarks): {landmark_build_time:.3f}s")
+
+        networkx_time = time_networkx_queries(graph, unique_pairs)
+        dijkstra_time = time_queries(OSMRoutingEngine(road_graph, cache_size=0), unique_pairs)
+        bounded_time = time_queries(OSMRoutingEngine(road_graph, 0, landmarks), unique_pairs)
+        print(
+            f"  unique pairs, networkx:          {networkx_time / args.queries * 1000:.3f} ms/route"
+        )
+        print(
+            f"  unique pairs, csr dijkstra:      {dijkstra_time / args.queries * 1000:.3f} ms/route"
+        )
+        print(
+            f"  unique pairs, landmark bounded:  {bounded_time / args.queries * 1000:.3f} ms/route"
+        )
+
+        uncached_time = time_queries(OSMRoutingEngine(road_graph, cache_size=0), repeated_pairs)
+        cached_engine = OSMRoutingEngine(road_graph, args.cache_size, landmarks)
+        cached_time = time_queries(cached_engine, repeated_pairs)
+        hit_rate = cached_engine.hits / args.queries
+        print(
+            f"  repeated pairs, uncached:        {uncached_time / args.queries * 1000:.3f} ms/route"
+        )
+        print(
+            f"  repeated pairs, cached:          {cached_time / args.queries * 1000:.3f} ms/route "
+            f"({hit_rate:.0%} hit rate)"
+        )
+
+        geoids = [
+            h3.geo_to_h3(road_graph.node_lat[i], road_graph.node_lon[i], network.sim_h3_resolution)
+            for i in random.sample(range(road_graph.node_count), 2 * args.matrix_size)
+        ]
+        origins, destinations = geoids[: args.matrix_size], geoids[args.matrix_size :]
+        start = time.perf_counter()
+        network.distance_matrix_km(origins, destinations)
+        matrix_time = time.perf_counter() - start
+        network.routing_engine.clear_cache()
+        start = time.perf_counter()
+        for o in origins:
+            for d in destinations:
+                network.distance_by_geoid_km(o, d)
+        pairwise_time = time.perf_counter() - start
+        print(
+            f"  {args.matrix_size}x{args.matrix_size} distance matrix: {matrix_time:.3f}s "
+            f"(pairwise distance_by_geoid_km: {pairwise_time:.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    run_benchmark(parser.parse_args())
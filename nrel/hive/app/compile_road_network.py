@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+import networkx as nx
+
+from nrel.hive.model.roadnetwork.osm.compiled_road_network import compiled_road_network_dir
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
+from nrel.hive.util.typealiases import H3Resolution
+from nrel.hive.util.units import Kmph
+
+parser = argparse.ArgumentParser(
+    description="compile a road network into a binary cache that hive loads at startup"
+)
+parser.add_argument("road_network_file", help="the node-link json road network file to compile")
+parser.add_argument(
+    "--sim-h3-resolution",
+    dest="sim_h3_resolution",
+    type=int,
+    default=15,
+    help="the sim.sim_h3_resolution of the scenarios that will use this road network",
+)
+parser.add_argument(
+    "--default-speed-kmph",
+    dest="default_speed_kmph",
+    type=float,
+    default=40.0,
+    help="the network.default_speed_kmph of the scenarios that will use this road network",
+)
+parser.add_argument(
+    "--output",
+    dest="output",
+    default=None,
+    help="the compiled road network directory; defaults to {file stem}.compiled next to the file",
+)
+
+log = logging.getLogger("hive")
+
+
+def compile_road_network(
+    road_network_file: Union[str, Path],
+    sim_h3_resolution: H3Resolution = 15,
+    default_speed_kmph: Kmph = 40.0,
+    compiled_dir: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    compiles a node-link json road network. when written to the default location, the
+    compiled road network is used by OSMRoadNetwork.from_file in place of the json file for as
+    long as the json file and the simulation's road network settings stay the same.
+
+    :param road_network_file: the node-link json road network file
+    :param sim_h3_resolution: the h3 resolution of the simulation
+    :param default_speed_kmph: the speed given to links without speed information
+    :param compiled_dir: where to write the compiled road network, if not the default location
+    :return: the compiled road network directory
+    """
+    source = Path(road_network_file)
+    if source.suffix != ".json":
+        raise TypeError(f"can only compile node-link json road networks, found {source}")
+    output = Path(compiled_dir) if compiled_dir is not None else compiled_road_network_dir(source)
+
+    with source.open("r") as f:
+        graph = nx.node_link_graph(json.load(f))
+    network = OSMRoadNetwork(graph, sim_h3_resolution, default_speed_kmph)
+    network.to_compiled(output, source)
+    return output
+
+
+def run() -> int:
+    """
+    entry point for compiling a road network
+    :return: 0 if success, 1 if error
+    """
+    args = parser.parse_args()
+
+    start = time.time()
+    output = compile_road_network(
+        args.road_network_file, args.sim_h3_resolution, args.default_speed_kmph, args.output
+    )
+    log.info(f"compiled {args.road_network_file} to {output} in {round(time.time() - start, 2)}s")
+
+    return 0
+
+
+if __name__ == "__main__":
+    run()
@@ -8,8 +8,10 @@ from nrel.hive.dispatcher.instruction_generator.instruction_generator import Ins
 from nrel.hive.initialization.initialize_simulation import InitFunction
 from nrel.hive.initialization.load import load_simulation, load_config
 from nrel.hive.model.sim_time import SimTime
+from nrel.hive.reporting import profiling
 from nrel.hive.reporting.handler.vehicle_charge_events_handler import VehicleChargeEventsHandler
 from nrel.hive.runner import RunnerPayload
+from nrel.hive.runner.checkpoint import restore_checkpoint
 
 T = TypeVar("T", bound=InstructionGenerator)
 
@@ -19,10 +21,12 @@ def load_scenario(
     custom_instruction_generators: Optional[Tuple[T, ...]] = None,
     custom_init_functions: Optional[Iterable[InitFunction]] = None,
     output_suffix: Optional[str] = None,
+    checkpoint_file: Optional[Path] = None,
 ) -> RunnerPayload:
     """
     load a HIVE scenario from file and return the initial simulation state
     :param scenario_file: the HIVE scenario file to read
+    :param checkpoint_file: a checkpoint to resume the scenario from, if any
     :return: the initial simulation state payload
     :raises: Error when issues with files
     """
@@ -32,6 +36,9 @@ def load_scenario(
     # add a specialized Reporter handler that catches vehicle charge events
     initial_payload.e.reporter.add_handler(VehicleChargeEventsHandler())
 
+    if checkpoint_file is not None:
+        initial_payload = restore_checkpoint(initial_payload, checkpoint_file)
+
     return initial_payload
 
 
@@ -60,14 +67,19 @@ def crank(
 
     def run_step(rp0: RunnerPayload, i: int):
         # regular step
-        rp1 = rp0.u.apply_update(rp0)
-        if flush_events:
-            rp1.e.reporter.flush(rp1)
+        with profiling.use_profiler(rp0.e.reporter.profiler):
+            rp1 = rp0.u.apply_update(rp0)
+            if flush_events:
+                rp1.e.reporter.flush(rp1)
+            profiling.end_step(rp1.s.sim_time)
 
         return rp1
 
     initial = runner_payload
     next_state = ft.reduce(run_step, steps, initial)
+    if flush_events:
+        # handlers may still be running when reporting asynchronously
+        next_state.e.reporter.drain()
     result = CrankResult(next_state, next_state.s.sim_time)
     return result
 
@@ -79,6 +91,6 @@ def close(runner_payload: RunnerPayload):
     as it will close file handlers.
     :param runner_payload: the final HIVE state to commit to logging
     """
-    runner_payload.e.reporter.close(runner_payload)
+    runner_payload.e.close(runner_payload)
     if runner_payload.e.config.global_config.write_outputs:
         runner_payload.e.config.to_yaml()
@@ -4,7 +4,7 @@ import argparse
 import logging
 import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Iterable, Optional, Tuple, TypeVar, Union
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple, TypeVar, Union
 
 import pkg_resources
 import yaml
@@ -12,7 +12,9 @@ import yaml
 from nrel.hive.dispatcher.instruction_generator.instruction_generator import InstructionGenerator
 from nrel.hive.initialization.initialize_simulation import InitFunction
 from nrel.hive.initialization.load import load_simulation, load_config
+from nrel.hive.runner.checkpoint import restore_checkpoint
 from nrel.hive.runner.local_simulation_runner import LocalSimulationRunner
+from nrel.hive.runner.runner_payload import RunnerPayload
 
 if TYPE_CHECKING:
     pass
@@ -22,6 +24,12 @@ parser.add_argument(
     "scenario_file",
     help='which scenario file to run (try "denver_downtown.yaml" or "manhattan.yaml")',
 )
+parser.add_argument(
+    "--checkpoint",
+    dest="checkpoint",
+    default=None,
+    help="a checkpoint file to resume the scenario from",
+)
 parser.add_argument(
     "--defaults",
     dest="defaults",
@@ -38,6 +46,8 @@ def run_sim(
     scenario_file: Union[Path, str],
     custom_instruction_generators: Optional[Tuple[T, ...]] = None,
     custom_init_functions: Optional[Iterable[InitFunction]] = None,
+    input_overrides: Optional[Dict[str, str]] = None,
+    checkpoint_file: Optional[Union[Path, str]] = None,
 ):
     """
     runs a single sim and writes outputs
@@ -45,18 +55,53 @@ def run_sim(
     :param scenario_file: the scenario file to run
     :param custom_instruction_generators: a set of user defined instruction generators to override the defaults
     :param custom_init_functions: a set of user defined initialization functions to override the defaults
+    :param input_overrides: input files to load in place of the scenario's, such as the shared inputs of a batch
+    :param checkpoint_file: a checkpoint to resume the scenario from, if any
 
     :return: 0 for success
     """
+    run_scenario(
+        scenario_file,
+        custom_instruction_generators,
+        custom_init_functions,
+        input_overrides,
+        checkpoint_file,
+    )
+    return 0
+
+
+def run_scenario(
+    scenario_file: Union[Path, str],
+    custom_instruction_generators: Optional[Tuple[T, ...]] = None,
+    custom_init_functions: Optional[Iterable[InitFunction]] = None,
+    input_overrides: Optional[Dict[str, str]] = None,
+    checkpoint_file: Optional[Union[Path, str]] = None,
+) -> RunnerPayload:
+    """
+    runs a single sim and writes outputs, as run_sim does
+
+    :param scenario_file: the scenario file to run
+    :param custom_instruction_generators: a set of user defined instruction generators to override the defaults
+    :param custom_init_functions: a set of user defined initialization functions to override the defaults
+    :param input_overrides: input files to load in place of the scenario's, such as the shared inputs of a batch
+    :param checkpoint_file: a checkpoint to resume the scenario from, if any
+
+    :return: the final state of the sim
+    """
     _welcome_to_hive()
 
     config = load_config(scenario_file)
+    if input_overrides:
+        config = config._replace(input_config=config.input_config._replace(**input_overrides))
 
     initial_payload = load_simulation(
         config,
         custom_instruction_generators=custom_instruction_generators,
         custom_init_functions=custom_init_functions,
     )
+    if checkpoint_file is not None:
+        log.info(f"resuming from checkpoint {checkpoint_file}")
+        initial_payload = restore_checkpoint(initial_payload, checkpoint_file)
 
     log.info(
         f"running {initial_payload.e.config.sim.sim_name} for time {initial_payload.e.config.sim.start_time} "
@@ -68,12 +113,12 @@ def run_sim(
 
     log.info(f"done! time elapsed: {round(end - start, 2)} seconds")
 
-    sim_result.e.reporter.close(sim_result)
+    sim_result.e.close(sim_result)
 
     if initial_payload.e.config.global_config.write_outputs:
         initial_payload.e.config.to_yaml()
 
-    return 0
+    return sim_result
 
 
 def run(
@@ -96,7 +141,12 @@ def run(
     if args.defaults:
         print_defaults()
 
-    return run_sim(args.scenario_file, custom_instruction_generators, custom_init_functions)
+    return run_sim(
+        args.scenario_file,
+        custom_instruction_generators,
+        custom_init_functions,
+        checkpoint_file=args.checkpoint,
+    )
 
 
 def _welcome_to_hive():
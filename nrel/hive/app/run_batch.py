@@ -1,16 +1,26 @@
 from __future__ import annotations
 
 import argparse
+import json
 import logging
+import multiprocessing
+import multiprocessing.connection
 import os
+import tempfile
+import time
 import traceback
-from multiprocessing import Pool
+from collections import Counter, deque
+from multiprocessing.connection import Connection
 from pathlib import Path
-from typing import TYPE_CHECKING, NamedTuple, List
+from typing import TYPE_CHECKING, Callable, Dict, NamedTuple, List, Optional, Sequence, Tuple, Union
 
 import yaml
 
-from nrel.hive.app.run import run_sim
+from nrel.hive.app.run import run_scenario
+from nrel.hive.config import HiveConfig
+from nrel.hive.config.global_config import GlobalConfig
+from nrel.hive.initialization.load import load_config
+from nrel.hive.initialization.shared_inputs import SHARED_INPUTS, prepare_shared_inputs
 from nrel.hive.util import fs
 
 if TYPE_CHECKING:
@@ -23,7 +33,21 @@ log = logging.getLogger("hive")
 
 
 class BatchConfig(NamedTuple):
+    """
+    :param scenario_files: the scenarios to run
+    :param shared_inputs: the inputs to load once for the batch, from "road_network" and
+                          "requests", which each scenario then memory maps
+    :param shared_directory: where to write the shared inputs, or None to use a temporary
+                             directory that is removed when the batch finishes. no temporary
+                             directory is made for a batch without shared inputs
+    :param manifest_file: the manifest of completed scenarios, or None to write it next to the
+                          batch config file
+    """
+
     scenario_files: List[Path]
+    shared_inputs: Tuple[str, ...] = ()
+    shared_directory: Optional[Path] = None
+    manifest_file: Optional[Path] = None
 
     @classmethod
     def from_dict(cls, d: dict) -> BatchConfig:
@@ -32,20 +56,114 @@ class BatchConfig(NamedTuple):
 
         scenario_files = [fs.find_scenario(f) for f in d["scenario_files"]]
 
-        return BatchConfig(scenario_files)
+        shared_inputs = tuple(d.get("shared_inputs") or ())
+        for name in shared_inputs:
+            if name not in SHARED_INPUTS:
+                raise ValueError(f"shared_inputs must be in {SHARED_INPUTS}, found {name}")
+        shared_directory = Path(d["shared_directory"]) if d.get("shared_directory") else None
+        manifest_file = Path(d["manifest_file"]) if d.get("manifest_file") else None
+
+        return BatchConfig(scenario_files, shared_inputs, shared_directory, manifest_file)
 
 
 class SimArgs(NamedTuple):
     scenario_file: Path
+    input_overrides: Optional[Dict[str, str]] = None
+
 
+# the values of local_parallelism and local_parallelism_timeout_sec shipped in .hive.yaml before
+# hive-batch read them, when they did nothing. hive-batch now runs one scenario at a time and
+# stops each scenario after 60 seconds with these values, which is rarely what was intended.
+PREVIOUS_DEFAULT_PARALLELISM = 1
+PREVIOUS_DEFAULT_TIMEOUT_SEC = 60
 
-def safe_sim(sim_args: SimArgs) -> int:
+COMPLETED = "completed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+
+class ScenarioResult(NamedTuple):
+    """
+    the outcome of running a scenario of a batch
+
+    :param scenario_file: the scenario file
+    :param status: one of "completed", "failed" or "timeout"
+    :param output_directory: the scenario output directory, if the scenario completed
+    :param sim_steps: the number of time steps simulated, if the scenario completed
+    :param elapsed_sec: the time spent running the scenario
+    """
+
+    scenario_file: str
+    status: str
+    output_directory: Optional[str] = None
+    sim_steps: int = 0
+    elapsed_sec: float = 0.0
+
+
+class BatchManifest:
+    """
+    records the result of each scenario of a batch in a json file, rewritten as each scenario
+    finishes, so that running the batch again skips the scenarios that already completed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.results: Dict[str, ScenarioResult] = {}
+        if path.is_file():
+            with path.open("r") as f:
+                self.results = {k: ScenarioResult(**v) for k, v in json.load(f).items()}
+
+    def is_completed(self, scenario_file: Union[str, Path]) -> bool:
+        """
+        tests if a scenario completed in a previous run and its outputs are still there
+
+        :param scenario_file: the scenario file
+        :return: True if the scenario can be skipped
+        """
+        result = self.results.get(str(scenario_file))
+        return (
+            result is not None
+            and result.status == COMPLETED
+            and result.output_directory is not None
+            and Path(result.output_directory).is_dir()
+        )
+
+    def record(self, result: ScenarioResult):
+        """
+        adds the result of a scenario and rewrites the manifest file
+
+        :param result: the scenario result
+        """
+        self.results[result.scenario_file] = result
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp.open("w") as f:
+            json.dump({k: v._asdict() for k, v in self.results.items()}, f, indent=2)
+        tmp.replace(self.path)
+
+
+class _RunningScenario(NamedTuple):
+    sim_args: SimArgs
+    process: multiprocessing.Process
+    receiver: Connection
+    start: float
+
+
+def _run_in_process(sim_args: SimArgs, sender: Connection):
+    """
+    runs a scenario and, if it succeeds, sends its output directory and number of time steps
+    """
     try:
-        return run_sim(sim_args.scenario_file)
+        sim_result = run_scenario(sim_args.scenario_file, input_overrides=sim_args.input_overrides)
+        config = sim_result.e.config
+        sim_steps = int(
+            (sim_result.s.sim_time - config.sim.start_time) / config.sim.timestep_duration_seconds
+        )
+        sender.send((str(config.scenario_output_directory.absolute()), sim_steps))
     except Exception:
         log.error(f"{sim_args.scenario_file} failed, see traceback:")
         log.error(traceback.format_exc())
-        return -1
+    finally:
+        sender.close()
 
 
 def run() -> int:
@@ -68,25 +186,205 @@ def run() -> int:
         d = yaml.safe_load(stream)
         config = BatchConfig.from_dict(d)
 
-    sim_args = [SimArgs(f) for f in config.scenario_files]
+    global_config = fs.global_hive_config_search()
+    warn_on_previous_defaults(global_config)
+    workers = global_config.local_parallelism
+    if workers < 1:
+        workers = os.cpu_count() or 1
+    timeout_sec = global_config.local_parallelism_timeout_sec
+    manifest = BatchManifest(config.manifest_file or config_file.with_suffix(".manifest.json"))
+
+    if config.shared_inputs and config.shared_directory is None:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run_batch(config, Path(tmp), manifest, workers, timeout_sec)
+    else:
+        results = run_batch(config, config.shared_directory, manifest, workers, timeout_sec)
+
+    return 0 if all(r.status == COMPLETED for r in results) else 1
 
-    # check to make sure we don't exceed system CPU
-    os_cpu = os.cpu_count()
 
-    if os_cpu is None:
-        max_cpu = 1
-    else:
-        max_cpu = os_cpu
+def warn_on_previous_defaults(global_config: GlobalConfig):
+    """
+    warns when the batch settings of a global config still hold the values shipped before
+    hive-batch read them
 
-    if len(config.scenario_files) > max_cpu:
-        cpu = max_cpu
+    :param global_config: the global config
+    """
+    if global_config.local_parallelism == PREVIOUS_DEFAULT_PARALLELISM:
+        log.warning(
+            f"local_parallelism is {PREVIOUS_DEFAULT_PARALLELISM} in "
+            f"{global_config.global_settings_file_path}, the value shipped before hive-batch "
+            f"read it, so scenarios will run one at a time; set it to 0 to run one per CPU"
+        )
+    if global_config.local_parallelism_timeout_sec == PREVIOUS_DEFAULT_TIMEOUT_SEC:
+        log.warning(
+            f"local_parallelism_timeout_sec is {PREVIOUS_DEFAULT_TIMEOUT_SEC} in "
+            f"{global_config.global_settings_file_path}, the value shipped before hive-batch "
+            f"read it, so scenarios will be stopped after {PREVIOUS_DEFAULT_TIMEOUT_SEC} "
+            f"seconds; set it to 0 for no limit"
+        )
+
+
+def run_batch(
+    config: BatchConfig,
+    shared_directory: Optional[Path],
+    manifest: BatchManifest,
+    workers: int,
+    timeout_sec: Optional[float] = None,
+) -> List[ScenarioResult]:
+    """
+    runs the scenarios of a batch that the manifest does not list as completed, after loading
+    any shared inputs. scenarios expected to run longest are started first.
+
+    :param config: the batch config
+    :param shared_directory: where to write the shared inputs, if the batch has any
+    :param manifest: the manifest of this batch, updated as each scenario finishes
+    :param workers: the number of scenarios to run at once
+    :param timeout_sec: the time a scenario may run before it is stopped, or None for no limit
+    :return: the result of each scenario that was run
+    """
+    scenario_files = []
+    for scenario_file in config.scenario_files:
+        if manifest.is_completed(scenario_file):
+            log.info(f"skipping {scenario_file}, completed in a previous run")
+        else:
+            scenario_files.append(scenario_file)
+    if len(scenario_files) == 0:
+        return []
+
+    scenario_configs = [load_config(f) for f in scenario_files]
+    if config.shared_inputs:
+        if shared_directory is None:
+            raise ValueError("a batch with shared inputs needs a directory to write them to")
+        overrides = prepare_shared_inputs(scenario_configs, config.shared_inputs, shared_directory)
+        sim_args = [SimArgs(f, o) for f, o in zip(scenario_files, overrides)]
     else:
-        cpu = len(config.scenario_files)
+        sim_args = [SimArgs(f) for f in scenario_files]
+
+    costs = [expected_cost(c) for c in scenario_configs]
+    order = sorted(range(len(sim_args)), key=lambda i: costs[i], reverse=True)
+
+    return run_scenarios([sim_args[i] for i in order], workers, manifest, timeout_sec)
 
-    with Pool(cpu) as p:
-        results = p.map(safe_sim, sim_args)
 
-    return 0
+def run_scenarios(
+    sim_args: Sequence[SimArgs],
+    workers: int,
+    manifest: BatchManifest,
+    timeout_sec: Optional[float] = None,
+    target: Callable[[SimArgs, Connection], None] = _run_in_process,
+) -> List[ScenarioResult]:
+    """
+    runs each scenario in its own process, starting the next scenario in order as soon as one
+    of the workers is free, so that a slow scenario only holds up its own worker. a scenario
+    that runs longer than the timeout is stopped.
+
+    :param sim_args: the scenarios, in the order to start them
+    :param workers: the number of scenarios to run at once
+    :param manifest: the batch manifest, updated as each scenario finishes
+    :param timeout_sec: the time a scenario may run before it is stopped, or None for no limit
+    :param target: runs a scenario and sends its output directory and time steps on success
+    :return: the result of each scenario, in the order they finished
+    """
+    timeout_sec = timeout_sec if timeout_sec else None
+    workers = max(1, min(workers, len(sim_args)))
+    pending = deque(sim_args)
+    running: Dict[int, _RunningScenario] = {}
+    results: List[ScenarioResult] = []
+    batch_start = time.perf_counter()
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                args = pending.popleft()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=target, args=(args, sender))
+                process.start()
+                sender.close()
+                running[process.sentinel] = _RunningScenario(
+                    args, process, receiver, time.perf_counter()
+                )
+
+            wait_sec = None
+            if timeout_sec is not None:
+                next_timeout = min(r.start + timeout_sec for r in running.values())
+                wait_sec = max(0.0, next_timeout - time.perf_counter())
+            multiprocessing.connection.wait(list(running.keys()), timeout=wait_sec)
+
+            now = time.perf_counter()
+            for sentinel, scenario in list(running.items()):
+                elapsed = now - scenario.start
+                if not scenario.process.is_alive():
+                    scenario.process.join()
+                    outputs = _receive(scenario.receiver)
+                    if outputs is not None:
+                        output_directory, sim_steps = outputs
+                        result = ScenarioResult(
+                            str(scenario.sim_args.scenario_file),
+                            COMPLETED,
+                            output_directory,
+                            sim_steps,
+                            elapsed,
+                        )
+                    else:
+                        result = ScenarioResult(
+                            str(scenario.sim_args.scenario_file), FAILED, elapsed_sec=elapsed
+                        )
+                elif timeout_sec is not None and elapsed >= timeout_sec:
+                    scenario.process.terminate()
+                    scenario.process.join()
+                    result = ScenarioResult(
+                        str(scenario.sim_args.scenario_file), TIMEOUT, elapsed_sec=elapsed
+                    )
+                else:
+                    continue
+                scenario.receiver.close()
+                del running[sentinel]
+                manifest.record(result)
+                results.append(result)
+                log.info(
+                    f"[{len(results)}/{len(sim_args)}] {result.scenario_file} {result.status} "
+                    f"after {round(result.elapsed_sec, 2)} seconds"
+                )
+    finally:
+        for scenario in running.values():
+            scenario.process.terminate()
+            scenario.process.join()
+
+    elapsed = time.perf_counter() - batch_start
+    sim_steps = sum(r.sim_steps for r in results)
+    statuses = Counter(r.status for r in results)
+    log.info(
+        f"batch finished in {round(elapsed, 2)} seconds: {statuses[COMPLETED]} completed, "
+        f"{statuses[FAILED]} failed, {statuses[TIMEOUT]} timed out; {sim_steps} time steps at "
+        f"{round(sim_steps / elapsed, 2) if elapsed > 0 else 0} steps per second across "
+        f"{workers} workers"
+    )
+    return results
+
+
+def _receive(receiver: Connection) -> Optional[Tuple[str, int]]:
+    """
+    reads what a finished scenario process sent, or None if it ended without sending anything
+    """
+    try:
+        return receiver.recv() if receiver.poll() else None
+    except EOFError:
+        return None
+
+
+def expected_cost(config: HiveConfig) -> int:
+    """
+    estimates the relative cost of running a scenario as its number of time steps times its
+    number of vehicles
+
+    :param config: the scenario config
+    :return: the expected cost
+    """
+    sim = config.sim
+    steps = max(0, int((sim.end_time - sim.start_time) / sim.timestep_duration_seconds))
+    with open(config.input_config.vehicles_file, "r") as f:
+        vehicles = max(0, sum(1 for _ in f) - 1)
+    return steps * max(1, vehicles)
 
 
 def _welcome_to_hive():
@@ -15,9 +15,15 @@ class DispatcherConfig(NamedTuple):
     base_charging_range_km_threshold: Kilometers
     ideal_fastcharge_soc_limit: Ratio
     max_search_radius_km: Kilometers
+    max_assignment_radius_km: Kilometers
+    max_assignment_candidates: int
+    partition_assignment: bool
+    assignment_workers: int
     charging_search_type: ChargingSearchType
+    charging_search_candidates: int
 
     human_driver_off_shift_charge_target: Ratio
+    human_driver_reposition_radius_km: Kilometers
 
     idle_time_out_seconds: Seconds
 
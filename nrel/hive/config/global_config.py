@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import NamedTuple, Tuple, Dict, Set
 
 from nrel.hive.config.config_builder import ConfigBuilder
+from nrel.hive.reporting.log_writer import LOG_FORMATS
 from nrel.hive.reporting.reporter import ReportType
 
 
@@ -25,6 +26,13 @@ class GlobalConfig(NamedTuple):
     lazy_file_reading: bool
     wkt_x_y_ordering: bool
     verbose: bool
+    log_profile: bool = False
+    log_format: str = "json"
+    log_buffer_size: int = 10000
+    log_state_interval: int = 1
+    log_async: bool = False
+    log_queue_size: int = 8
+    checkpoint_interval: int = 0
 
     @classmethod
     def default_config(cls) -> Dict:
@@ -76,6 +84,14 @@ class GlobalConfig(NamedTuple):
             else set()
         )
 
+        log_format = d.get("log_format", "json")
+        if log_format not in LOG_FORMATS:
+            raise ValueError(f"log_format {log_format} not supported, must be one of {LOG_FORMATS}")
+        if d.get("log_state_interval", 1) < 1:
+            raise ValueError("log_state_interval must be at least 1")
+        if d.get("checkpoint_interval", 0) < 0:
+            raise ValueError("checkpoint_interval must not be negative")
+
         # store the .hive.yaml file path used
         d["global_settings_file_path"] = global_settings_file_path
         return GlobalConfig(**d)
@@ -94,4 +110,6 @@ class GlobalConfig(NamedTuple):
             or self.log_instructions
             or self.log_time_step_stats
             or self.log_fleet_time_step_stats
+            or self.log_profile
+            or self.checkpoint_interval > 0
         )
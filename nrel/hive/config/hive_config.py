@@ -165,6 +165,7 @@ class HiveConfig(NamedTuple):
             log_instructions=False,
             log_time_step_stats=False,
             log_fleet_time_step_stats=False,
+            log_profile=False,
         )
         return self._replace(global_config=updated_gconfig)
 
@@ -8,6 +8,8 @@ from nrel.hive.config.config_builder import ConfigBuilder
 class Network(NamedTuple):
     network_type: str
     default_speed_kmph: float
+    route_cache_size: int = 10000
+    routing_landmarks: int = 0
 
     @classmethod
     def default_config(cls) -> Dict:
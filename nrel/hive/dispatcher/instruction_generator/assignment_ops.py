@@ -2,17 +2,24 @@ from __future__ import annotations
 
 import functools as ft
 import logging
-from typing import Dict, Tuple, Callable, NamedTuple, Optional, TYPE_CHECKING
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, FrozenSet, List, Tuple, Callable, NamedTuple, Optional, TYPE_CHECKING
 
 import h3
+import immutables
 import numpy as np
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse import bmat, csr_matrix, hstack, identity
+from scipy.sparse.csgraph import connected_components, min_weight_full_bipartite_matching
+from scipy.spatial import cKDTree
 
 from nrel.hive.model.roadnetwork.route import (
     route_distance_km,
     route_travel_time_seconds,
 )
 from nrel.hive.model.station.station import Station
+from nrel.hive.reporting import profiling
 from nrel.hive.model.vehicle.mechatronics.powercurve import powercurve_ops
 from nrel.hive.model.vehicle.vehicle import Vehicle
 from nrel.hive.runner import Environment
@@ -23,24 +30,37 @@ from nrel.hive.util.h3_ops import H3Ops
 from nrel.hive.util.tuple_ops import TupleOps
 
 if TYPE_CHECKING:
-    from nrel.hive.util.units import Ratio, Seconds
+    from nrel.hive.util.units import Kilometers, Ratio, Seconds
     from nrel.hive.util.typealiases import *
-    from nrel.hive.model.entity import EntityABC
+    from nrel.hive.model.entity import Entity, EntityABC
 
 
 log = logging.getLogger(__name__)
 
 MAX_DIST = 999999999.0
+SPARSE_COST_EPSILON = 1e-6
 
 
 class AssignmentSolution(NamedTuple):
     """
     each call of find_assignment produces an AssignmentSolution which has any
     assignments (a pair of two ids), along with the total cost of this assignment.
+    find_sparse_assignment also describes the size of the problem it solved and its timing.
+
+    :param solution: the assigned (assignee, target) id pairs
+    :param solution_cost: the total cost of the assigned pairs
+    :param pairs: the number of assignee/target pairs given a cost
+    :param partitions: the number of independent sub-problems solved
+    :param cost_matrix_seconds: wall time spent building the cost matrix
+    :param solve_seconds: wall time spent solving the assignment
     """
 
     solution: Tuple[Tuple[EntityId, EntityId], ...] = ()
     solution_cost: float = 0.0
+    pairs: int = 0
+    partitions: int = 0
+    cost_matrix_seconds: float = 0.0
+    solve_seconds: float = 0.0
 
     def add(self, pair: Tuple[EntityId, EntityId], cost: float) -> AssignmentSolution:
         return self._replace(
@@ -84,6 +104,7 @@ def find_assignment(
 
         # apply the Kuhn-Munkres algorithm
         rows, cols = linear_sum_assignment(table)
+        profiling.count("assignments_solved")
 
         # interpret the row/column assignments back to EntityIds and compute the total cost of this assignment
         def _add_to_solution(assignment_solution: AssignmentSolution, i: int) -> AssignmentSolution:
@@ -96,6 +117,429 @@ def find_assignment(
         return solution
 
 
+def find_sparse_assignment(
+    assignees: Tuple[Entity, ...],
+    targets: Tuple[Entity, ...],
+    assignee_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+    target_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+    sim_h3_search_resolution: int,
+    max_distance_km: Kilometers,
+    partition: bool = False,
+    executor: Optional[Executor] = None,
+    max_candidates: int = 0,
+) -> AssignmentSolution:
+    """
+    solves the assignment problem using the great circle distance between entities as the cost.
+    pairs further apart than max_distance_km are never built, which keeps the cost matrix sparse
+    so that it can be handed to a sparse bipartite matching solver. unlike find_assignment, an
+    assignee may be left unassigned if no target exists within range.
+
+    when partition is True, groups of entities which share no pair within range are solved as
+    independent sub-problems, which produces the same assignment as solving them together.
+
+    when max_candidates is positive, only the max_candidates nearest assignees of each target
+    are considered (see nearest_sparse_cost_matrix).
+
+    :param assignees: entities we are assigning to. assumed to have an id and geoid field.
+    :param targets: the different entities that each assignee can be assigned to. assumed to have an id and geoid field.
+    :param assignee_search: the search-level location collection for the assignee entity type
+    :param target_search: the search-level location collection for the target entity type
+    :param sim_h3_search_resolution: the h3 resolution of the search collections
+    :param max_distance_km: pairs further apart than this distance are not considered
+    :param partition: solve each independent group of entities separately
+    :param executor: optional executor used to solve the partitioned sub-problems in parallel
+    :param max_candidates: the number of nearest assignees considered for each target; 0 considers
+                           every assignee within range
+    :return: a collection of pairs of (AssigneeId, TargetId) indicating the solution, along with
+             it's cost, the size of the problem and the time spent solving it
+    """
+    if len(assignees) == 0 or len(targets) == 0:
+        return AssignmentSolution()
+
+    start = time.perf_counter()
+    if max_candidates > 0:
+        table = nearest_sparse_cost_matrix(assignees, targets, max_distance_km, max_candidates)
+    else:
+        table = sparse_distance_cost_matrix(
+            assignees,
+            targets,
+            assignee_search,
+            target_search,
+            sim_h3_search_resolution,
+            max_distance_km,
+        )
+    cost_matrix_done = time.perf_counter()
+    if partition:
+        partitions = partition_sparse_table(table)
+        rows, cols = solve_partitioned_assignment(partitions, executor)
+        n_partitions = len(partitions)
+    else:
+        rows, cols = solve_sparse_assignment(table)
+        n_partitions = 1 if table.nnz > 0 else 0
+    solve_done = time.perf_counter()
+
+    solution = sparse_assignment_solution(assignees, targets, table, rows, cols)
+    return solution._replace(
+        pairs=table.nnz,
+        partitions=n_partitions,
+        cost_matrix_seconds=cost_matrix_done - start,
+        solve_seconds=solve_done - cost_matrix_done,
+    )
+
+
+def sparse_assignment_solution(
+    assignees: Tuple[Entity, ...],
+    targets: Tuple[Entity, ...],
+    table: csr_matrix,
+    rows: np.ndarray,
+    cols: np.ndarray,
+) -> AssignmentSolution:
+    """
+    interprets the row/column assignments of a sparse cost table back to EntityIds
+
+    :param assignees: the row entities of the table
+    :param targets: the column entities of the table
+    :param table: the sparse cost table built by sparse_distance_cost_matrix
+    :param rows: the assigned row indices
+    :param cols: the assigned column indices
+    :return: the assignment solution along with its cost
+    """
+    if len(rows) == 0:
+        return AssignmentSolution()
+
+    pairs = tuple((assignees[i].id, targets[j].id) for i, j in zip(rows, cols))
+    costs = np.asarray(table[rows, cols]).ravel() - SPARSE_COST_EPSILON
+    return AssignmentSolution(solution=pairs, solution_cost=float(costs.sum()))
+
+
+def sparse_distance_cost_matrix(
+    assignees: Tuple[Entity, ...],
+    targets: Tuple[Entity, ...],
+    assignee_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+    target_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+    sim_h3_search_resolution: int,
+    max_distance_km: Kilometers,
+) -> csr_matrix:
+    """
+    builds a sparse (len(assignees) x len(targets)) table of great circle distances, only storing
+    pairs which are within max_distance_km of each other.
+
+    entities are first grouped by their search cell. any pair of search cells whose centroids are
+    too far apart to contain a pair of entities within range is discarded before any entity-level
+    pairs are built. all geoids are converted to lat/lon only once and all distances are computed
+    with numpy.
+
+    :param assignees: the row entities
+    :param targets: the column entities
+    :param assignee_search: the search-level location collection for the assignee entity type
+    :param target_search: the search-level location collection for the target entity type
+    :param sim_h3_search_resolution: the h3 resolution of the search collections
+    :param max_distance_km: pairs further apart than this distance are not stored
+    :return: a sparse cost table in kilometers. stored values are always positive, as sparse
+             solvers treat a missing entry as an invalid pair
+    """
+    n, m = len(assignees), len(targets)
+    if n == 0 or m == 0:
+        return csr_matrix((n, m), dtype=np.float64)
+
+    a_cells, a_cell_idx = _group_by_search_cell(
+        assignees, assignee_search, sim_h3_search_resolution
+    )
+    t_cells, t_cell_idx = _group_by_search_cell(targets, target_search, sim_h3_search_resolution)
+
+    # two entities in cells with centroids d apart can be no closer than d minus two cell radii
+    cell_padding_km = 2 * h3.edge_length(sim_h3_search_resolution, unit="km")
+    cell_distances = H3Ops.great_circle_distance_array(
+        H3Ops.geoids_to_lat_lon_array(a_cells)[:, None],
+        H3Ops.geoids_to_lat_lon_array(t_cells)[None, :],
+    )
+    a_cell_pairs, t_cell_pairs = np.nonzero(cell_distances <= max_distance_km + cell_padding_km)
+
+    rows, cols = _expand_cell_pairs(a_cell_idx, t_cell_idx, a_cell_pairs, t_cell_pairs)
+
+    a_coords = H3Ops.geoids_to_lat_lon_array(e.geoid for e in assignees)
+    t_coords = H3Ops.geoids_to_lat_lon_array(e.geoid for e in targets)
+    distances = H3Ops.great_circle_distance_array(a_coords[rows], t_coords[cols])
+    in_range = distances <= max_distance_km
+
+    # offset by a small epsilon so that co-located pairs are still stored in the sparse table
+    costs = distances[in_range] + SPARSE_COST_EPSILON
+    return csr_matrix((costs, (rows[in_range], cols[in_range])), shape=(n, m))
+
+
+def nearest_sparse_cost_matrix(
+    assignees: Tuple[Entity, ...],
+    targets: Tuple[Entity, ...],
+    max_distance_km: Kilometers,
+    max_candidates: int,
+) -> csr_matrix:
+    """
+    builds a sparse (len(assignees) x len(targets)) table of great circle distances, only storing
+    the max_candidates nearest assignees of each target that are within max_distance_km of it.
+
+    the assignees are placed in a cKDTree of points on the earth's surface, which is queried once
+    for all targets. the straight line distance between two such points grows with their great
+    circle distance, so the nearest points of the tree are the nearest assignees. only the pairs
+    found are given a cost, so building the table is O(len(targets) * max_candidates) rather than
+    growing with the number of pairs within range.
+
+    :param assignees: the row entities
+    :param targets: the column entities
+    :param max_distance_km: pairs further apart than this distance are not stored
+    :param max_candidates: the number of nearest assignees stored for each target
+    :return: a sparse cost table in kilometers, with the same costs as sparse_distance_cost_matrix
+             for the pairs it stores
+    """
+    n, m = len(assignees), len(targets)
+    if n == 0 or m == 0 or max_candidates < 1:
+        return csr_matrix((n, m), dtype=np.float64)
+
+    a_coords = H3Ops.geoids_to_lat_lon_array(e.geoid for e in assignees)
+    t_coords = H3Ops.geoids_to_lat_lon_array(e.geoid for e in targets)
+
+    # the chord length of a great circle distance, padded so that pairs at exactly
+    # max_distance_km are found; the great circle distances are then checked below
+    earth_radius_km = 6371
+    half_angle = min(max_distance_km / (2 * earth_radius_km), np.pi / 2)
+    max_chord_km = 2 * earth_radius_km * np.sin(half_angle) * (1 + 1e-9)
+
+    k = min(max_candidates, n)
+    tree = cKDTree(_to_earth_points(a_coords, earth_radius_km))
+    _, nearest = tree.query(
+        _to_earth_points(t_coords, earth_radius_km), k=k, distance_upper_bound=max_chord_km
+    )
+    nearest = nearest.reshape(m, k)
+
+    # targets with fewer than k assignees in range are padded with the index n
+    found = nearest < n
+    rows = nearest[found]
+    cols = np.repeat(np.arange(m), k).reshape(m, k)[found]
+    distances = H3Ops.great_circle_distance_array(a_coords[rows], t_coords[cols])
+    in_range = distances <= max_distance_km
+
+    # offset by a small epsilon so that co-located pairs are still stored in the sparse table
+    costs = distances[in_range] + SPARSE_COST_EPSILON
+    return csr_matrix((costs, (rows[in_range], cols[in_range])), shape=(n, m))
+
+
+def solve_sparse_assignment(table: csr_matrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    finds the minimum cost, maximum cardinality matching of a sparse cost table.
+
+    min_weight_full_bipartite_matching requires that a full matching exists, so each row
+    is given a private "unassigned" column with a cost large enough that leaving a row
+    unassigned is only chosen when no assignment of that row is possible.
+
+    :param table: sparse cost table, with missing entries denoting invalid pairs
+    :return: the row and column indices of the assigned pairs
+    """
+    n, m = table.shape
+    if n == 0 or m == 0 or table.nnz == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    unassigned_cost = (float(table.data.max()) + 1.0) * (min(n, m) + 1)
+    augmented = hstack([table, identity(n, format="csr") * unassigned_cost], format="csr")
+    rows, cols = min_weight_full_bipartite_matching(augmented)
+    profiling.count("assignments_solved")
+
+    assigned = cols < m
+    return rows[assigned], cols[assigned]
+
+
+class AssignmentPartition(NamedTuple):
+    """
+    an independent sub-problem of a sparse assignment table
+
+    :param rows: the row indices of the full table found in this partition
+    :param cols: the column indices of the full table found in this partition
+    :param table: the sub-table of costs between these rows and columns
+    """
+
+    rows: np.ndarray
+    cols: np.ndarray
+    table: csr_matrix
+
+
+def partition_sparse_table(table: csr_matrix) -> Tuple[AssignmentPartition, ...]:
+    """
+    splits a sparse cost table into the connected components of its bipartite graph. no pair
+    exists between rows and columns of different components, so the assignment of each
+    component can be solved independently. components without both a row and a column
+    cannot produce an assignment and are dropped.
+
+    :param table: sparse cost table, with missing entries denoting invalid pairs
+    :return: the independent sub-problems, largest first
+    """
+    n, m = table.shape
+    if n == 0 or m == 0 or table.nnz == 0:
+        return ()
+
+    adjacency = bmat([[None, table], [table.T, None]], format="csr")
+    _, labels = connected_components(adjacency, directed=False)
+    row_labels, col_labels = labels[:n], labels[n:]
+
+    row_order = np.argsort(row_labels, kind="stable")
+    col_order = np.argsort(col_labels, kind="stable")
+    row_splits = np.searchsorted(row_labels[row_order], np.arange(labels.max() + 2))
+    col_splits = np.searchsorted(col_labels[col_order], np.arange(labels.max() + 2))
+
+    partitions = []
+    for label in range(labels.max() + 1):
+        rows = row_order[row_splits[label] : row_splits[label + 1]]
+        cols = col_order[col_splits[label] : col_splits[label + 1]]
+        if len(rows) > 0 and len(cols) > 0:
+            partitions.append(AssignmentPartition(rows, cols, table[rows][:, cols]))
+
+    return tuple(sorted(partitions, key=lambda p: p.table.nnz, reverse=True))
+
+
+def solve_partitioned_assignment(
+    partitions: Tuple[AssignmentPartition, ...],
+    executor: Optional[Executor] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    solves each partition of a sparse assignment table and combines the results
+
+    :param partitions: the independent sub-problems, as built by partition_sparse_table
+    :param executor: optional executor used to solve the sub-problems in parallel
+    :return: the row and column indices of the assigned pairs in the full table
+    """
+    if len(partitions) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    tables = [p.table for p in partitions]
+    if executor is not None and len(partitions) > 1:
+        results = list(executor.map(solve_sparse_assignment, tables))
+        # partitions solved in worker processes are not seen by this process's profiler
+        profiling.count("assignments_solved", len(tables))
+    else:
+        results = [solve_sparse_assignment(t) for t in tables]
+
+    rows = np.concatenate([p.rows[r] for p, (r, _) in zip(partitions, results)])
+    cols = np.concatenate([p.cols[c] for p, (_, c) in zip(partitions, results)])
+    return rows, cols
+
+
+class AssignmentPool:
+    """
+    the process pool that a simulation solves partitioned assignments with. it is created on
+    first use and kept for the remainder of the run so that workers are not re-spawned at each
+    time step, and shut down when the simulation is closed.
+    """
+
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._workers = 0
+
+    def executor(self, workers: int) -> ProcessPoolExecutor:
+        """
+        the process pool, created if it does not yet have this number of workers
+
+        :param workers: the number of worker processes
+        :return: the process pool
+        """
+        if self._executor is None or self._workers != workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+            self._workers = workers
+        return self._executor
+
+    def close(self):
+        """
+        shuts down the worker processes, if any were started
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _to_earth_points(lat_lon: np.ndarray, earth_radius_km: float) -> np.ndarray:
+    """
+    converts lat/lon pairs to points on a sphere the size of the earth, in kilometers
+
+    :param lat_lon: array of lat/lon pairs in decimal degrees, with shape (n, 2)
+    :param earth_radius_km: the radius of the sphere
+    :return: array of x/y/z points with shape (n, 3)
+    """
+    lat, lon = np.radians(lat_lon[:, 0]), np.radians(lat_lon[:, 1])
+    return earth_radius_km * np.column_stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat))
+    )
+
+
+def _group_by_search_cell(
+    entities: Tuple[Entity, ...],
+    entity_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+    sim_h3_search_resolution: int,
+) -> Tuple[Tuple[GeoId, ...], np.ndarray]:
+    """
+    assigns each entity to the index of its search cell, reading the existing search collection
+    and only falling back to h3 for entities which are not found there
+
+    :param entities: the entities to group
+    :param entity_search: the search-level location collection for this entity type
+    :param sim_h3_search_resolution: the h3 resolution of the search collection
+    :return: the distinct search cells, along with the cell index of each entity
+    """
+    entity_index = {e.id: i for i, e in enumerate(entities)}
+    cell_idx = np.full(len(entities), -1, dtype=np.int64)
+    cells: List[GeoId] = []
+    for cell, entity_ids in entity_search.items():
+        members = [entity_index[e_id] for e_id in entity_ids if e_id in entity_index]
+        if members:
+            cell_idx[members] = len(cells)
+            cells.append(cell)
+
+    cell_lookup = {cell: i for i, cell in enumerate(cells)}
+    for i in np.flatnonzero(cell_idx < 0):
+        cell = h3.h3_to_parent(entities[i].geoid, sim_h3_search_resolution)
+        if cell not in cell_lookup:
+            cell_lookup[cell] = len(cells)
+            cells.append(cell)
+        cell_idx[i] = cell_lookup[cell]
+
+    return tuple(cells), cell_idx
+
+
+def _expand_cell_pairs(
+    a_cell_idx: np.ndarray,
+    b_cell_idx: np.ndarray,
+    a_cell_pairs: np.ndarray,
+    b_cell_pairs: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    expands pairs of cells into every pair of entities found in those cells
+
+    :param a_cell_idx: the cell index of each "a" entity
+    :param b_cell_idx: the cell index of each "b" entity
+    :param a_cell_pairs: the "a" cell of each cell pair
+    :param b_cell_pairs: the "b" cell of each cell pair
+    :return: the "a" and "b" entity indices of each entity pair
+    """
+    a_order = np.argsort(a_cell_idx, kind="stable")
+    b_order = np.argsort(b_cell_idx, kind="stable")
+    a_counts = np.bincount(a_cell_idx)
+    b_counts = np.bincount(b_cell_idx)
+    a_starts = np.concatenate(([0], np.cumsum(a_counts)[:-1]))
+    b_starts = np.concatenate(([0], np.cumsum(b_counts)[:-1]))
+
+    pair_a_counts = a_counts[a_cell_pairs]
+    pair_b_counts = b_counts[b_cell_pairs]
+    sizes = pair_a_counts * pair_b_counts
+    total = int(sizes.sum())
+    if total == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.int64)
+
+    # position of each entity pair within the block of its cell pair
+    pair = np.repeat(np.arange(len(sizes)), sizes)
+    offset = np.arange(total) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    b_width = pair_b_counts[pair]
+
+    a_entities = a_order[a_starts[a_cell_pairs][pair] + offset // b_width]
+    b_entities = b_order[b_starts[b_cell_pairs][pair] + offset % b_width]
+    return a_entities, b_entities
+
+
 def h3_distance_cost(a: EntityABC, b: EntityABC) -> float:
     """
     cost function based on the h3_distance between two entities
@@ -266,18 +710,9 @@ def shortest_time_to_charge_ranking(
         # return a signal that demotes this Station alternative to the bottom of the ranking
         return None
     else:
-
-        def _veh_at_station(v: Vehicle) -> bool:
-            return (
-                isinstance(v.vehicle_state, ChargingStation)
-                and v.vehicle_state.station_id == station.id
-            )
-
-        def _veh_enqueued(v: Vehicle) -> bool:
-            return (
-                isinstance(v.vehicle_state, ChargeQueueing)
-                and v.vehicle_state.station_id == station.id
-            )
+        charge_time_tables = (
+            env.index_cache.charge_time_tables if env.index_cache is not None else None
+        )
 
         def _time_to_full_by_charger_id(c: ChargerId):
             def _time_to_full(v: Vehicle) -> Seconds:
@@ -286,13 +721,14 @@ def shortest_time_to_charge_ranking(
                 if not _mech or not _charger:
                     return 0
                 else:
-                    time_est = powercurve_ops.time_to_full(
+                    time_est = powercurve_ops.time_to_full_lookup(
                         v,
                         _mech,
                         _charger,
                         target_soc,
                         sim.sim_timestep_duration_seconds,
                         min_delta_energy_change=env.config.sim.min_delta_energy_change,
+                        charge_time_tables=charge_time_tables,
                     )
                     return time_est
 
@@ -366,11 +802,10 @@ def shortest_time_to_charge_ranking(
                     )
 
         # collect all vehicles that are either charging or enqueued at this station
-        vehicles_at_station = sim.get_vehicles(filter_function=_veh_at_station)
-        vehicles_enqueued = sim.get_vehicles(
-            filter_function=_veh_enqueued,
-            sort=True,
-            sort_key=_sort_enqueue_time,
+        # from the station occupancy index, which avoids a scan over the whole fleet
+        vehicles_at_station = sim.get_charging_vehicles(station.id)
+        vehicles_enqueued = tuple(
+            sorted(sim.get_queueing_vehicles(station.id), key=_sort_enqueue_time)
         )
 
         estimates: Dict[ChargerId, int] = {}
@@ -383,13 +818,14 @@ def shortest_time_to_charge_ranking(
                 continue
 
             # compute the charge time for the vehicle we are ranking
-            this_vehicle_charge_time = powercurve_ops.time_to_full(
+            this_vehicle_charge_time = powercurve_ops.time_to_full_lookup(
                 vehicle,
                 vehicle_mechatronics,
                 charger,
                 target_soc,
                 sim.sim_timestep_duration_seconds,
                 min_delta_energy_change=env.config.sim.min_delta_energy_change,
+                charge_time_tables=charge_time_tables,
             )
 
             def _using_charger(charging_vehicle: Vehicle) -> bool:
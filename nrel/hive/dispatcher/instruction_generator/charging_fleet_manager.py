@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import Tuple, TYPE_CHECKING
+from typing import Dict, Tuple, TYPE_CHECKING
 
 from nrel.hive.reporting import instruction_generator_event_ops
 from nrel.hive.state.vehicle_state.idle import Idle
@@ -14,11 +14,13 @@ if TYPE_CHECKING:
     from nrel.hive.runner.environment import Environment
     from nrel.hive.dispatcher.instruction.instruction import Instruction
     from nrel.hive.config.dispatcher_config import DispatcherConfig
+    from nrel.hive.util.typealiases import VehicleId
 
 from nrel.hive.dispatcher.instruction_generator.instruction_generator import InstructionGenerator
 from nrel.hive.dispatcher.instruction_generator.instruction_generator_ops import (
-    instruct_vehicles_to_dispatch_to_station,
-    get_nearest_valid_station_distance,
+    ChargingCandidate,
+    assign_vehicles_to_chargers,
+    rank_charging_candidates,
 )
 
 log = logging.getLogger(__name__)
@@ -28,6 +30,8 @@ log = logging.getLogger(__name__)
 class ChargingFleetManager(InstructionGenerator):
     """
     A manager that instructs vehicles to charge if they fall below an SOC threshold.
+    The vehicles that need to charge are assigned to station chargers together, choosing among
+    the best ranked stations of each vehicle (see assign_vehicles_to_chargers).
     """
 
     config: DispatcherConfig
@@ -46,7 +50,10 @@ class ChargingFleetManager(InstructionGenerator):
         :return: the updated ChargingFleetManager along with instructions
         """
 
-        # find vehicles that fall below the sum of the threshold distance and nearest valid station distance
+        # find vehicles that fall below the sum of the threshold distance and nearest valid station distance.
+        # the stations ranked for each vehicle are kept for the assignment of vehicles to chargers
+
+        candidates: Dict[VehicleId, Tuple[ChargingCandidate, ...]] = {}
 
         def charge_candidate(v: Vehicle) -> bool:
             proper_state = isinstance(v.vehicle_state, Idle) or isinstance(
@@ -65,18 +72,27 @@ class ChargingFleetManager(InstructionGenerator):
                 # don't even check station distance if vehicle range is over soft threshold
                 return False
 
-            nearest_station_distance = get_nearest_valid_station_distance(
+            ranked = rank_charging_candidates(
+                n=self.config.charging_search_candidates,
                 max_search_radius_km=self.config.max_search_radius_km,
                 vehicle=v,
-                geoid=v.geoid,
                 simulation_state=simulation_state,
                 environment=environment,
                 target_soc=environment.config.dispatcher.ideal_fastcharge_soc_limit,
                 charging_search_type=environment.config.dispatcher.charging_search_type,
             )
+            if ranked:
+                nearest_station = simulation_state.stations[ranked[0].station_id]
+                nearest_station_distance = simulation_state.road_network.distance_by_geoid_km(
+                    origin=v.geoid, destination=nearest_station.geoid
+                )
+            else:
+                nearest_station_distance = 99999999999999
             is_charge_candidate = (
                 environment.config.dispatcher.charging_range_km_threshold + nearest_station_distance
             ) >= range_remaining_km
+            if is_charge_candidate:
+                candidates[v.id] = ranked
             return is_charge_candidate
 
         low_soc_vehicles = simulation_state.get_vehicles(
@@ -90,14 +106,6 @@ class ChargingFleetManager(InstructionGenerator):
             )
             environment.reporter.file_report(report)
 
-        charge_instructions = instruct_vehicles_to_dispatch_to_station(
-            n=len(low_soc_vehicles),
-            max_search_radius_km=self.config.max_search_radius_km,
-            vehicles=low_soc_vehicles,
-            simulation_state=simulation_state,
-            environment=environment,
-            target_soc=environment.config.dispatcher.ideal_fastcharge_soc_limit,
-            charging_search_type=environment.config.dispatcher.charging_search_type,
-        )
+        charge_instructions = assign_vehicles_to_chargers(candidates, simulation_state)
 
         return self, charge_instructions
@@ -2,8 +2,8 @@ from __future__ import annotations
 
 import functools as ft
 import logging
-from dataclasses import dataclass
-from typing import Tuple, TYPE_CHECKING, Optional
+from dataclasses import dataclass, replace
+from typing import NamedTuple, Tuple, TYPE_CHECKING, Optional
 
 from nrel.hive.dispatcher.instruction_generator import assignment_ops
 from nrel.hive.state.vehicle_state.charging_base import ChargingBase
@@ -23,13 +23,40 @@ from nrel.hive.dispatcher.instruction.instructions import DispatchTripInstructio
 log = logging.getLogger(__name__)
 
 
+class DispatchStats(NamedTuple):
+    """
+    timing and size of the assignment solved for one fleet at one time step
+
+    :param membership_id: the fleet this assignment was solved for, or None without fleets
+    :param vehicles: the number of vehicles available for dispatch
+    :param requests: the number of unassigned requests
+    :param pairs: the number of vehicle/request pairs given a cost
+    :param partitions: the number of independent sub-problems solved
+    :param assignments: the number of vehicle/request pairs assigned
+    :param cost_matrix_seconds: wall time spent building the cost matrix
+    :param solve_seconds: wall time spent solving the assignment
+    """
+
+    membership_id: Optional[MembershipId]
+    vehicles: int
+    requests: int
+    pairs: int
+    partitions: int
+    assignments: int
+    cost_matrix_seconds: float
+    solve_seconds: float
+
+
 @dataclass(frozen=True)
 class Dispatcher(InstructionGenerator):
     """
     A managers algorithm that assigns vehicles greedily to most expensive request.
+
+    the timing of each fleet's assignment from the most recent time step is kept in step_stats.
     """
 
     config: DispatcherConfig
+    step_stats: Tuple[DispatchStats, ...] = ()
 
     def generate_instructions(
         self,
@@ -47,10 +74,20 @@ class Dispatcher(InstructionGenerator):
             environment.config.dispatcher.base_charging_range_km_threshold
         )
 
+        executor = (
+            environment.assignment_pool.executor(self.config.assignment_workers)
+            if self.config.partition_assignment
+            and self.config.assignment_workers > 1
+            and environment.assignment_pool is not None
+            else None
+        )
+
         def _solve_assignment(
-            inst_acc: Tuple[DispatchTripInstruction, ...],
+            acc: Tuple[Tuple[DispatchTripInstruction, ...], Tuple[DispatchStats, ...]],
             membership_id: Optional[MembershipId],
-        ) -> Tuple[DispatchTripInstruction, ...]:
+        ) -> Tuple[Tuple[DispatchTripInstruction, ...], Tuple[DispatchStats, ...]]:
+            inst_acc, stats_acc = acc
+
             def _is_valid_for_dispatch(vehicle: Vehicle) -> bool:
                 vehicle_state_str = vehicle.vehicle_state.__class__.__name__.lower()
                 if vehicle_state_str not in environment.config.dispatcher.valid_dispatch_states:
@@ -103,11 +140,29 @@ class Dispatcher(InstructionGenerator):
             )
 
             # select assignment of vehicles to requests
-            solution = assignment_ops.find_assignment(
+            solution = assignment_ops.find_sparse_assignment(
                 available_vehicles,
                 unassigned_requests,
-                assignment_ops.h3_distance_cost,
+                simulation_state.v_search,
+                simulation_state.r_search,
+                simulation_state.sim_h3_search_resolution,
+                self.config.max_assignment_radius_km,
+                partition=self.config.partition_assignment,
+                executor=executor,
+                max_candidates=self.config.max_assignment_candidates,
             )
+            stats = DispatchStats(
+                membership_id=membership_id,
+                vehicles=len(available_vehicles),
+                requests=len(unassigned_requests),
+                pairs=solution.pairs,
+                partitions=solution.partitions,
+                assignments=len(solution.solution),
+                cost_matrix_seconds=solution.cost_matrix_seconds,
+                solve_seconds=solution.solve_seconds,
+            )
+            log.debug(f"dispatcher assignment at time {simulation_state.sim_time}: {stats}")
+
             instructions = ft.reduce(
                 lambda acc, pair: (
                     *acc,
@@ -117,19 +172,19 @@ class Dispatcher(InstructionGenerator):
                 inst_acc,
             )
 
-            return instructions
+            return instructions, (*stats_acc, stats)
 
         if len(environment.fleet_ids) > 0:
             fleet_ids = environment.fleet_ids
         else:
             fleet_ids = frozenset([None])
 
-        initial_instructions: Tuple[DispatchTripInstruction, ...] = tuple()
+        initial: Tuple[Tuple[DispatchTripInstruction, ...], Tuple[DispatchStats, ...]] = ((), ())
 
-        all_instructions = ft.reduce(
+        all_instructions, step_stats = ft.reduce(
             _solve_assignment,
             fleet_ids,
-            initial_instructions,
+            initial,
         )
 
-        return self, all_instructions
+        return replace(self, step_stats=step_stats), all_instructions
@@ -2,14 +2,19 @@ from __future__ import annotations
 
 import functools as ft
 import random
-from typing import List, Callable, NamedTuple
+from typing import Dict, List, Callable, NamedTuple, Optional
 
 import immutables
+from scipy.sparse import csr_matrix
 
 from nrel.hive.dispatcher.instruction.instructions import *
 from nrel.hive.dispatcher.instruction_generator import assignment_ops
 from nrel.hive.dispatcher.instruction_generator.charging_search_type import ChargingSearchType
+from nrel.hive.dispatcher.instruction_generator.station_compatibility import (
+    station_compatibility_index,
+)
 from nrel.hive.model.station.station import Station
+from nrel.hive.reporting import profiling
 from nrel.hive.util.dict_ops import DictOps
 from nrel.hive.util.h3_ops import H3Ops
 from nrel.hive.util.units import Kilometers
@@ -24,7 +29,7 @@ if TYPE_CHECKING:
     from nrel.hive.dispatcher.instruction_generator.instruction_generator import (
         InstructionGenerator,
     )
-    from nrel.hive.util.typealiases import GeoId
+    from nrel.hive.util.typealiases import ChargerId, GeoId, StationId
     from nrel.hive.util.units import Ratio
 
 i_map: immutables.Map[VehicleId, List[Instruction]] = immutables.Map()
@@ -50,10 +55,11 @@ class InstructionGenerationResult(NamedTuple):
         :param environment: the simulation environment
         :return: the updated accumulator
         """
-        (
-            updated_gen,
-            new_instructions,
-        ) = instruction_generator.generate_instructions(simulation_state, environment)
+        with profiling.profile(f"instruction_generator.{instruction_generator.name}"):
+            (
+                updated_gen,
+                new_instructions,
+            ) = instruction_generator.generate_instructions(simulation_state, environment)
 
         updated_instruction_stack = ft.reduce(
             lambda acc, i: DictOps.add_to_stack_dict(acc, i.vehicle_id, i),
@@ -125,7 +131,8 @@ def generate_instructions(
     )
 
     # give drivers a chance to add instructions
-    driver_result = result.add_driver_instructions(simulation_state, environment)
+    with profiling.profile("instruction_generator.drivers"):
+        driver_result = result.add_driver_instructions(simulation_state, environment)
 
     return driver_result
 
@@ -133,7 +140,8 @@ def generate_instructions(
 def valid_station_for_vehicle(vehicle: Vehicle, env: Environment) -> Callable[[Station], bool]:
     """
     only allows vehicles to use stations where the membership is correct
-    and the fuel type is correct
+    and the fuel type is correct. charging searches find the same stations for every vehicle
+    at once through station_compatibility_index.
     :param vehicle: the vehicle
     :param env: simulation environment
     :return: valid station function
@@ -158,6 +166,90 @@ def valid_station_for_vehicle(vehicle: Vehicle, env: Environment) -> Callable[[S
     return _inner
 
 
+class ChargingCandidate(NamedTuple):
+    """
+    a station where a vehicle could charge, with the best charger for the vehicle there
+
+    :param station_id: the station
+    :param charger_id: the best ranked charger at the station for this vehicle
+    :param rank: the rank of the charger by the charging search type, lower is better
+    """
+
+    station_id: StationId
+    charger_id: ChargerId
+    rank: float
+
+
+def rank_charging_candidates(
+    n: int,
+    max_search_radius_km: float,
+    vehicle: Vehicle,
+    simulation_state: SimulationState,
+    environment: Environment,
+    target_soc: Ratio,
+    charging_search_type: ChargingSearchType,
+    geoid: Optional[GeoId] = None,
+) -> Tuple[ChargingCandidate, ...]:
+    """
+    ranks the stations near a vehicle where it can charge. each station is ranked once, and the
+    ranking also gives the best charger at the station, so the search result is used as is.
+
+    :param n: how many of the best ranked stations to return
+    :param max_search_radius_km: the max kilometers to search for a station
+    :param vehicle: the vehicle to find stations for
+    :param simulation_state: the simulation state
+    :param environment: the simulation environment
+    :param target_soc: when ranking alternatives, use this target SoC value
+    :param charging_search_type: the type of search to conduct
+    :param geoid: the origin of the search, if not the vehicle location
+    :return: up to n charging candidates, best ranked first
+    """
+    candidates = station_compatibility_index(simulation_state, environment).candidates_for_vehicle(
+        vehicle
+    )
+    if len(candidates.chargers) == 0:
+        return ()
+
+    def _rank(station: Station) -> Optional[Tuple[Optional[ChargerId], float]]:
+        if charging_search_type == ChargingSearchType.NEAREST_SHORTEST_QUEUE:
+            # use the simple weighted euclidean distance ranking
+            return assignment_ops.nearest_shortest_queue_ranking(
+                vehicle, station, environment, assignment_ops.MAX_DIST
+            )
+        else:  # charging_search_type == ChargingSearchType.SHORTEST_TIME_TO_CHARGE:
+            # use the search-based metric which considers travel, queueing, and charging time
+            return assignment_ops.shortest_time_to_charge_ranking(
+                sim=simulation_state,
+                env=environment,
+                vehicle=vehicle,
+                station=station,
+                target_soc=target_soc,
+            )
+
+    ranked: Dict[StationId, ChargingCandidate] = {}
+
+    def _distance(station: Station) -> float:
+        result = _rank(station)
+        if result is None:
+            return assignment_ops.MAX_DIST
+        charger_id, rank = result
+        if charger_id is None:
+            return assignment_ops.MAX_DIST
+        ranked[station.id] = ChargingCandidate(station.id, charger_id, rank)
+        return rank
+
+    nearest_stations = H3Ops.nearest_entities(
+        geoid=vehicle.geoid if geoid is None else geoid,
+        entities=simulation_state.stations,
+        entity_search=candidates.search,
+        sim_h3_search_resolution=simulation_state.sim_h3_search_resolution,
+        distance_function=_distance,
+        n=n,
+        max_search_distance_km=max_search_radius_km,
+    )
+    return tuple(ranked[s.id] for s in nearest_stations if s.id in ranked)
+
+
 def instruct_vehicles_to_dispatch_to_station(
     n: int,
     max_search_radius_km: float,
@@ -186,88 +278,115 @@ def instruct_vehicles_to_dispatch_to_station(
         if len(instructions) >= n:
             break
 
-        valid_stations = simulation_state.get_stations(
-            filter_function=lambda s: s.membership.grant_access_to_membership(veh.membership)
-        )
-        if len(valid_stations) == 0:
-            break
-
-        if charging_search_type == ChargingSearchType.NEAREST_SHORTEST_QUEUE:
-            # use the simple weighted euclidean distance ranking
-
-            distance_fn = assignment_ops.nearest_shortest_queue_distance(veh, environment)
-
-        else:  # charging_search_type == ChargingSearchType.SHORTEST_TIME_TO_CHARGE:
-            # use the search-based metric which considers travel, queueing, and charging time
-
-            distance_fn = assignment_ops.shortest_time_to_charge_distance(
-                vehicle=veh,
-                sim=simulation_state,
-                env=environment,
-                target_soc=target_soc,
-            )
-
-        nearest_station = H3Ops.nearest_entity(
-            geoid=veh.geoid,
-            entities=valid_stations,
-            entity_search=simulation_state.s_search,
-            sim_h3_search_resolution=simulation_state.sim_h3_search_resolution,
-            max_search_distance_km=max_search_radius_km,
-            is_valid=valid_station_for_vehicle(veh, environment),
-            distance_function=distance_fn,
+        best = rank_charging_candidates(
+            n=1,
+            max_search_radius_km=max_search_radius_km,
+            vehicle=veh,
+            simulation_state=simulation_state,
+            environment=environment,
+            target_soc=target_soc,
+            charging_search_type=charging_search_type,
         )
-        if nearest_station is not None:
-            if not isinstance(nearest_station, Station):
-                log.error(
-                    "got wrong type back from nearest entity search; "
-                    f"expected station but got: {type(nearest_station)}"
-                )
-                continue
-            # get the best charger id for this station. re-computes distance ranking one last time
-            # this could be removed if our nearest entity search also returned the best charger id
-            # these both could return "None" but that shouldn't be possible if we found a nearest station
-            if charging_search_type == ChargingSearchType.NEAREST_SHORTEST_QUEUE:
-                queue_result = assignment_ops.nearest_shortest_queue_ranking(
-                    veh, nearest_station, environment
-                )
-                if queue_result is None:
-                    continue
-                else:
-                    (
-                        best_charger_id,
-                        best_charger_rank,
-                    ) = queue_result
-
-            else:  # charging_search_type == ChargingSearchType.SHORTEST_TIME_TO_CHARGE:
-                time_result = assignment_ops.shortest_time_to_charge_ranking(
-                    vehicle=veh,
-                    station=nearest_station,
-                    sim=simulation_state,
-                    env=environment,
-                    target_soc=target_soc,
-                )
-                if time_result is None:
-                    continue
-                else:
-                    (
-                        best_charger_id,
-                        best_charger_rank,
-                    ) = time_result
-
-            if best_charger_id is None:
-                continue
-
+        if best:
+            candidate = best[0]
             instruction = DispatchStationInstruction(
                 vehicle_id=veh.id,
-                station_id=nearest_station.id,
-                charger_id=best_charger_id,
+                station_id=candidate.station_id,
+                charger_id=candidate.charger_id,
             )
-
             instructions = instructions + (instruction,)
 
     return instructions
 
 
+def assign_vehicles_to_chargers(
+    candidates: Dict[VehicleId, Tuple[ChargingCandidate, ...]],
+    simulation_state: SimulationState,
+    queue_cap: int = 2,
+) -> Tuple[Instruction, ...]:
+    """
+    assigns vehicles to charge at one of their charging candidates in a single minimum cost
+    assignment, so that vehicles searching in the same time step see each other. each charger
+    type at a station offers a slot per free charger plus up to queue_cap queue slots. the queue
+    slots cost more, as each vehicle already sent there would queue ahead, in the way that
+    queued vehicles raise the nearest_shortest_queue rank of a charger. a vehicle is therefore
+    sent to its next best candidate when that is cheaper than queueing behind other vehicles.
+    vehicles left without a slot queue at their best ranked candidate, as they do when each
+    vehicle has a single candidate, in which case no assignment is solved.
+
+    :param candidates: the ranked charging candidates of each vehicle
+    :param simulation_state: the simulation state
+    :param queue_cap: the queue slots offered at each charger type beyond its free chargers
+    :return: an instruction for each vehicle with at least one candidate
+    """
+    vehicle_ids = tuple(v_id for v_id, cs in candidates.items() if cs)
+    if len(vehicle_ids) == 0:
+        return ()
+
+    def _instruction(
+        vehicle_id: VehicleId, station_id: StationId, charger_id: ChargerId
+    ) -> Instruction:
+        return DispatchStationInstruction(
+            vehicle_id=vehicle_id, station_id=station_id, charger_id=charger_id
+        )
+
+    if all(len(candidates[v_id]) == 1 for v_id in vehicle_ids):
+        return tuple(
+            _instruction(v_id, candidates[v_id][0].station_id, candidates[v_id][0].charger_id)
+            for v_id in vehicle_ids
+        )
+
+    # the vehicles that could use each charger type at a station
+    demand: Dict[Tuple[StationId, ChargerId], int] = {}
+    for vehicle_id in vehicle_ids:
+        for c in candidates[vehicle_id]:
+            key = (c.station_id, c.charger_id)
+            demand[key] = demand.get(key, 0) + 1
+
+    # one column per slot at each charger type, in order of the slots. the free chargers and
+    # at most queue_cap queue slots are offered, so the table grows with the vehicles and
+    # their candidates, not with the square of the vehicles competing for one charger type
+    slots: List[Tuple[StationId, ChargerId]] = []
+    first_slot: Dict[Tuple[StationId, ChargerId], int] = {}
+    slot_count: Dict[Tuple[StationId, ChargerId], int] = {}
+    slot_factors: List[float] = []
+    for key, count in demand.items():
+        station_id, charger_id = key
+        station = simulation_state.stations[station_id]
+        total = station.get_total_chargers(charger_id) or 1
+        available = station.get_available_chargers(charger_id)
+        first_slot[key] = len(slots)
+        slot_count[key] = min(count, available + queue_cap)
+        for j in range(slot_count[key]):
+            planned_queue = max(0, j - available + 1)
+            slots.append(key)
+            slot_factors.append(1.0 + planned_queue / total)
+
+    rows, cols, costs = [], [], []
+    for i, vehicle_id in enumerate(vehicle_ids):
+        for c in candidates[vehicle_id]:
+            key = (c.station_id, c.charger_id)
+            first = first_slot[key]
+            for j in range(first, first + slot_count[key]):
+                rows.append(i)
+                cols.append(j)
+                # offset so that a rank of zero is still stored in the sparse table
+                costs.append((c.rank + assignment_ops.SPARSE_COST_EPSILON) * slot_factors[j])
+
+    table = csr_matrix((costs, (rows, cols)), shape=(len(vehicle_ids), len(slots)))
+    assigned_rows, assigned_cols = assignment_ops.solve_sparse_assignment(table)
+
+    instructions: List[Instruction] = [
+        _instruction(vehicle_ids[i], *slots[j]) for i, j in zip(assigned_rows, assigned_cols)
+    ]
+    assigned = set(assigned_rows.tolist())
+    for i, vehicle_id in enumerate(vehicle_ids):
+        if i not in assigned:
+            best = candidates[vehicle_id][0]
+            instructions.append(_instruction(vehicle_id, best.station_id, best.charger_id))
+    return tuple(instructions)
+
+
 def get_nearest_valid_station_distance(
     max_search_radius_km: float,
     vehicle: Vehicle,
@@ -289,39 +408,18 @@ def get_nearest_valid_station_distance(
     :param charging_search_type: the type of search to conduct
     :return: the distance in km to the nearest valid station
     """
-
-    valid_stations = simulation_state.get_stations(
-        filter_function=lambda s: s.membership.grant_access_to_membership(vehicle.membership)
-    )
-    if len(valid_stations) == 0:
-        return 99999999999999
-
-    if charging_search_type == ChargingSearchType.NEAREST_SHORTEST_QUEUE:
-        # use the simple weighted euclidean distance ranking
-
-        distance_fn = assignment_ops.nearest_shortest_queue_distance(vehicle, environment)
-
-    else:  # charging_search_type == ChargingSearchType.SHORTEST_TIME_TO_CHARGE:
-        # use the search-based metric which considers travel, queueing, and charging time
-
-        distance_fn = assignment_ops.shortest_time_to_charge_distance(
-            vehicle=vehicle,
-            sim=simulation_state,
-            env=environment,
-            target_soc=target_soc,
-        )
-
-    nearest_station = H3Ops.nearest_entity(
+    best = rank_charging_candidates(
+        n=1,
+        max_search_radius_km=max_search_radius_km,
+        vehicle=vehicle,
+        simulation_state=simulation_state,
+        environment=environment,
+        target_soc=target_soc,
+        charging_search_type=charging_search_type,
         geoid=geoid,
-        entities=simulation_state.stations.values(),
-        entity_search=simulation_state.s_search,
-        sim_h3_search_resolution=simulation_state.sim_h3_search_resolution,
-        max_search_distance_km=max_search_radius_km,
-        is_valid=valid_station_for_vehicle(vehicle, environment),
-        distance_function=distance_fn,
     )
-
-    if nearest_station:
+    if best:
+        nearest_station = simulation_state.stations[best[0].station_id]
         return simulation_state.road_network.distance_by_geoid_km(
             origin=geoid, destination=nearest_station.geoid
         )
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, FrozenSet, NamedTuple, Optional, Set, Tuple
+
+import h3
+import immutables
+
+from nrel.hive.model.membership import Membership
+from nrel.hive.util.typealiases import ChargerId, GeoId, MechatronicsId, StationId
+
+if TYPE_CHECKING:
+    from nrel.hive.model.station.station import StationAccess
+    from nrel.hive.model.vehicle.vehicle import Vehicle
+    from nrel.hive.runner.environment import Environment
+    from nrel.hive.state.simulation_state.simulation_state import SimulationState
+
+log = logging.getLogger(__name__)
+
+
+class StationCandidates(NamedTuple):
+    """
+    the stations where a vehicle can charge, which are the stations its membership has access
+    to that have a charger its mechatronics can use
+
+    :param chargers: the usable charger types at each of the stations
+    :param search: the stations by search hex, for use as the entity_search of a ring search
+    """
+
+    chargers: immutables.Map[StationId, FrozenSet[ChargerId]] = immutables.Map()
+    search: immutables.Map[GeoId, FrozenSet[StationId]] = immutables.Map()
+
+
+class StationCompatibilityIndex:
+    """
+    the station candidates of each (membership, mechatronics id) pair, built from the station
+    access collection of a simulation state. a scenario has few such pairs, so the candidates of
+    each are built the first time a vehicle asks for them and shared by all vehicles with the
+    same membership and mechatronics. see station_compatibility_index.
+    """
+
+    def __init__(
+        self,
+        s_access: immutables.Map[StationId, StationAccess],
+        env: Environment,
+        sim_h3_search_resolution: int,
+    ):
+        self.s_access = s_access
+        self.chargers = env.chargers
+        self.mechatronics = env.mechatronics
+        self.sim_h3_search_resolution = sim_h3_search_resolution
+        self._candidates: Dict[Tuple[Membership, MechatronicsId], StationCandidates] = {}
+
+    def candidates(
+        self, membership: Membership, mechatronics_id: MechatronicsId
+    ) -> StationCandidates:
+        """
+        the stations where vehicles with this membership and mechatronics can charge
+
+        :param membership: the vehicle membership
+        :param mechatronics_id: the vehicle mechatronics id
+        :return: the station candidates, which are empty if the mechatronics is not found
+        """
+        key = (membership, mechatronics_id)
+        candidates = self._candidates.get(key)
+        if candidates is None:
+            candidates = self._build_candidates(membership, mechatronics_id)
+            self._candidates[key] = candidates
+        return candidates
+
+    def candidates_for_vehicle(self, vehicle: Vehicle) -> StationCandidates:
+        """
+        the stations where a vehicle can charge
+
+        :param vehicle: the vehicle
+        :return: the station candidates of the vehicle
+        """
+        return self.candidates(vehicle.membership, vehicle.mechatronics_id)
+
+    def _build_candidates(
+        self, membership: Membership, mechatronics_id: MechatronicsId
+    ) -> StationCandidates:
+        mechatronics = self.mechatronics.get(mechatronics_id)
+        if mechatronics is None:
+            log.error(f"mechatronics {mechatronics_id} not found in environment")
+            return StationCandidates()
+
+        valid_chargers = frozenset(
+            charger_id
+            for charger_id, charger in self.chargers.items()
+            if mechatronics.valid_charger(charger)
+        )
+        chargers: Dict[StationId, FrozenSet[ChargerId]] = {}
+        search: Dict[GeoId, Set[StationId]] = defaultdict(set)
+        for station_id, access in self.s_access.items():
+            if not access.membership.grant_access_to_membership(membership):
+                continue
+            usable_chargers = access.charger_ids.intersection(valid_chargers)
+            if usable_chargers:
+                chargers[station_id] = usable_chargers
+                search_hex = h3.h3_to_parent(access.geoid, self.sim_h3_search_resolution)
+                search[search_hex].add(station_id)
+
+        return StationCandidates(
+            chargers=immutables.Map(chargers),
+            search=immutables.Map({k: frozenset(v) for k, v in search.items()}),
+        )
+
+
+def station_compatibility_index(
+    sim: SimulationState, env: Environment
+) -> StationCompatibilityIndex:
+    """
+    the station compatibility index of a simulation state. the index cached on the environment
+    is reused until stations are added, removed or have their membership or chargers changed, so
+    it is built once at the first charging search and kept while charger states change from step
+    to step.
+
+    :param sim: the simulation state
+    :param env: the simulation environment, which caches the index
+    :return: the station compatibility index
+    """
+    cache = env.index_cache
+    index = cache.station_compatibility_index if cache is not None else None
+    if (
+        index is None
+        or index.s_access is not sim.s_access
+        or index.chargers is not env.chargers
+        or index.mechatronics is not env.mechatronics
+        or index.sim_h3_search_resolution != sim.sim_h3_search_resolution
+    ):
+        index = StationCompatibilityIndex(sim.s_access, env, sim.sim_h3_search_resolution)
+        if cache is not None:
+            cache.station_compatibility_index = index
+    return index
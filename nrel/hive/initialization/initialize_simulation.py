@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING, Callable, Iterable, Optional, Tuple, Dict
 import immutables
 
 from nrel.hive.config import HiveConfig
+from nrel.hive.dispatcher.instruction_generator.assignment_ops import AssignmentPool
 from nrel.hive.initialization.initialize_ops import (
     process_fleet_file,
     read_fleet_ids_from_file,
@@ -21,13 +22,15 @@ from nrel.hive.model.station.station import Station
 from nrel.hive.model.vehicle.mechatronics import build_mechatronics_table
 from nrel.hive.model.vehicle.schedules import build_schedules_table
 from nrel.hive.model.vehicle.vehicle import Vehicle
+from nrel.hive.reporting.async_reporter import AsyncReporter
 from nrel.hive.reporting.handler.eventful_handler import EventfulHandler
 from nrel.hive.reporting.handler.instruction_handler import InstructionHandler
+from nrel.hive.reporting.handler.profile_handler import ProfileHandler
 from nrel.hive.reporting.handler.stateful_handler import StatefulHandler
 from nrel.hive.reporting.handler.stats_handler import StatsHandler
 from nrel.hive.reporting.handler.time_step_stats_handler import TimeStepStatsHandler
 from nrel.hive.reporting.reporter import Reporter
-from nrel.hive.runner.environment import Environment
+from nrel.hive.runner.environment import Environment, IndexCache
 from nrel.hive.state.simulation_state import simulation_state_ops
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.util.dict_ops import DictOps
@@ -78,7 +81,9 @@ def initialize(
         sim_h3_search_resolution=config.sim.sim_h3_search_resolution,
     )
 
-    environment = Environment(config=config)
+    environment = Environment(
+        config=config, assignment_pool=AssignmentPool(), index_cache=IndexCache()
+    )
 
     for init_function in init_functions:
         sim, environment = init_function(config, sim, environment)
@@ -185,7 +190,11 @@ def initialize_environment_reporting(
     :return: a SimulationState and Environment with reporting added
     """
     # configure reporting
-    reporter = Reporter()
+    reporter = (
+        AsyncReporter(config.global_config.log_queue_size)
+        if config.global_config.log_async
+        else Reporter()
+    )
     if config.global_config.log_events:
         reporter.add_handler(
             EventfulHandler(config.global_config, config.scenario_output_directory)
@@ -204,6 +213,14 @@ def initialize_environment_reporting(
         reporter.add_handler(
             TimeStepStatsHandler(config, config.scenario_output_directory, environment.fleet_ids)
         )
+    if config.global_config.log_profile:
+        reporter.add_handler(
+            ProfileHandler(
+                config.scenario_output_directory,
+                log_format=config.global_config.log_format,
+                log_buffer_size=config.global_config.log_buffer_size,
+            )
+        )
 
     environment = environment.set_reporter(reporter)
 
@@ -249,6 +266,8 @@ def osm_init_function(
             sim_h3_resolution=config.sim.sim_h3_resolution,
             road_network_file=config.input_config.road_network_file,
             default_speed_kmph=config.network.default_speed_kmph,
+            route_cache_size=config.network.route_cache_size,
+            routing_landmarks=config.network.routing_landmarks,
         )
     elif config.input_config.geofence_file:
         try:
@@ -264,6 +283,8 @@ def osm_init_function(
         road_network = OSMRoadNetwork.from_polygon(
             sim_h3_resolution=config.sim.sim_h3_resolution,
             default_speed_kmph=config.network.default_speed_kmph,
+            route_cache_size=config.network.route_cache_size,
+            routing_landmarks=config.network.routing_landmarks,
             polygon=polygon_union,
             cache_dir=cache_dir,
         )
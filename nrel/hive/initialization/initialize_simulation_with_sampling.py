@@ -9,6 +9,7 @@ from typing import Tuple, Dict, Optional, Callable
 import immutables
 
 from nrel.hive.config import HiveConfig
+from nrel.hive.dispatcher.instruction_generator.assignment_ops import AssignmentPool
 from nrel.hive.initialization.sample_vehicles import (
     sample_vehicles,
     build_default_location_sampling_fn,
@@ -22,7 +23,7 @@ from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
 from nrel.hive.model.station.station import Station
 from nrel.hive.model.vehicle.mechatronics import build_mechatronics_table
 from nrel.hive.model.vehicle.schedules import build_schedules_table, ScheduleId, ScheduleFunction
-from nrel.hive.runner.environment import Environment
+from nrel.hive.runner.environment import Environment, IndexCache
 from nrel.hive.state.simulation_state import simulation_state_ops
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.util import DictOps, Ratio
@@ -72,6 +73,8 @@ def initialize_simulation_with_sampling(
             sim_h3_resolution=config.sim.sim_h3_resolution,
             road_network_file=Path(config.input_config.road_network_file),
             default_speed_kmph=config.network.default_speed_kmph,
+            route_cache_size=config.network.route_cache_size,
+            routing_landmarks=config.network.routing_landmarks,
         )
         sim_initial = SimulationState(
             road_network=osm_road_network,
@@ -107,6 +110,8 @@ def initialize_simulation_with_sampling(
         ),
         chargers=build_chargers_table(config.input_config.chargers_file),
         schedules=schedules,
+        assignment_pool=AssignmentPool(),
+        index_cache=IndexCache(),
     )
 
     # populate simulation with static entities
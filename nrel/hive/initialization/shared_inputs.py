@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from nrel.hive.config import HiveConfig
+from nrel.hive.model.request.request_table import RequestTable
+from nrel.hive.model.roadnetwork.osm.compiled_road_network import (
+    compiled_road_network_is_fresh,
+)
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork import OSMRoadNetwork
+
+log = logging.getLogger(__name__)
+
+SHARED_INPUTS = ("road_network", "requests")
+
+# written to a shared RequestTable directory once its arrays are complete
+REQUESTS_SOURCE_FILE = "source.json"
+
+
+def prepare_shared_inputs(
+    configs: Sequence[HiveConfig], shared_inputs: Iterable[str], directory: Path
+) -> List[Dict[str, str]]:
+    """
+    loads the inputs that a batch of scenarios have in common once, writing each to a
+    directory of arrays that the scenario processes memory map instead of parsing the input
+    again. a road network is written as a compiled road network, and a requests file as a
+    RequestTable directory. inputs already prepared in the directory are reused.
+
+    :param configs: the configs of the scenarios in the batch
+    :param shared_inputs: the inputs to share, from SHARED_INPUTS
+    :param directory: where to write the shared inputs
+    :return: for each scenario, the Input fields to replace with the shared inputs
+    :raises: ValueError if an input cannot be shared
+    """
+    shared = set(shared_inputs)
+    for name in shared:
+        if name not in SHARED_INPUTS:
+            raise ValueError(f"cannot share input {name}, must be one of {SHARED_INPUTS}")
+
+    directory = directory.absolute()
+    road_networks: Dict[Tuple[str, int, float, int], Path] = {}
+    requests: Dict[str, Path] = {}
+    overrides = []
+    for config in configs:
+        scenario_overrides = {}
+        road_network_file = _shared_road_network_file(config)
+        if "road_network" in shared and road_network_file is not None:
+            road_network_key = (
+                str(road_network_file.absolute()),
+                config.sim.sim_h3_resolution,
+                config.network.default_speed_kmph,
+                config.network.routing_landmarks,
+            )
+            if road_network_key not in road_networks:
+                road_networks[road_network_key] = _prepare_road_network(
+                    config, road_network_file, directory / "road_network"
+                )
+            scenario_overrides["road_network_file"] = str(road_networks[road_network_key])
+        if "requests" in shared:
+            if config.global_config.lazy_file_reading:
+                log.warning(
+                    f"requests of {config.sim.sim_name} are read lazily and will not be shared"
+                )
+            else:
+                requests_file = Path(config.input_config.requests_file)
+                requests_key = str(requests_file.absolute())
+                if requests_key not in requests:
+                    requests[requests_key] = _prepare_requests(
+                        requests_file, directory / "requests"
+                    )
+                scenario_overrides["requests_file"] = str(requests[requests_key])
+        overrides.append(scenario_overrides)
+
+    return overrides
+
+
+def _shared_road_network_file(config: HiveConfig) -> Optional[Path]:
+    """
+    only node-link json road networks are parsed at startup; other road networks are either
+    already memory mapped or not read from a file
+    """
+    file = config.input_config.road_network_file
+    if config.network.network_type == "osm_network" and file is not None and file.endswith(".json"):
+        return Path(file)
+    return None
+
+
+def _prepare_road_network(config: HiveConfig, source: Path, directory: Path) -> Path:
+    res = config.sim.sim_h3_resolution
+    speed = config.network.default_speed_kmph
+    compiled_dir = directory / f"{source.stem}_{_digest(source, res, speed)}.compiled"
+    if compiled_road_network_is_fresh(compiled_dir, source, res, speed):
+        log.info(f"reusing shared road network {compiled_dir}")
+    else:
+        log.info(f"compiling shared road network {source} to {compiled_dir}")
+        network = OSMRoadNetwork.from_file(source, res, speed)
+        network.to_compiled(compiled_dir, source)
+    if config.network.routing_landmarks > 0:
+        # builds and persists the landmark index next to the compiled road network
+        OSMRoadNetwork.from_file(
+            compiled_dir, res, speed, routing_landmarks=config.network.routing_landmarks
+        )
+    return compiled_dir
+
+
+def _prepare_requests(source: Path, directory: Path) -> Path:
+    table_dir = directory / f"{source.stem}_{_digest(source)}"
+    if _requests_are_fresh(table_dir, source):
+        # scenarios of an earlier batch may still have these arrays memory mapped
+        log.info(f"reusing shared requests {table_dir}")
+        return table_dir
+    log.info(f"writing shared requests {source} to {table_dir}")
+    (table_dir / REQUESTS_SOURCE_FILE).unlink(missing_ok=True)
+    RequestTable.from_file(source).to_directory(table_dir)
+    with (table_dir / REQUESTS_SOURCE_FILE).open("w") as f:
+        json.dump(_source_stamp(source), f, indent=2)
+    return table_dir
+
+
+def _requests_are_fresh(table_dir: Path, source: Path) -> bool:
+    """
+    a shared RequestTable is fresh if it was written from the requests file as it is now
+    """
+    try:
+        with (table_dir / REQUESTS_SOURCE_FILE).open("r") as f:
+            return json.load(f) == _source_stamp(source)
+    except (OSError, ValueError):
+        return False
+
+
+def _source_stamp(source: Path) -> Dict[str, int]:
+    stat = source.stat()
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def _digest(source: Path, *settings) -> str:
+    """
+    names a shared input by its source file and the settings it was prepared with
+    """
+    text = "|".join(str(s) for s in (source.absolute(), *settings))
+    return hashlib.md5(text.encode("utf-8")).hexdigest()[:10]
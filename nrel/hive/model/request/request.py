@@ -88,6 +88,45 @@ class Request(Entity):
             raise ValueError(
                 f"request {request_id} destination cannot be positioned on the road network"
             )
+        return cls.build_at_positions(
+            request_id=request_id,
+            origin_position=origin_position,
+            destination_position=destination_position,
+            departure_time=departure_time,
+            passengers=passengers,
+            allows_pooling=allows_pooling,
+            fleet_id=fleet_id,
+            value=value,
+        )
+
+    @classmethod
+    def build_at_positions(
+        cls,
+        request_id: RequestId,
+        origin_position: EntityPosition,
+        destination_position: EntityPosition,
+        departure_time: SimTime,
+        passengers: int,
+        allows_pooling: bool,
+        fleet_id: Optional[MembershipId] = None,
+        value: Currency = 0,
+    ) -> Request:
+        """
+        builds a Request whose origin and destination have already been positioned on the
+        road network, such as by a batched RoadNetwork.positions_from_geoids lookup
+
+        :param request_id: the request id
+        :param origin_position: the origin on the road network
+        :param destination_position: the destination on the road network
+        :param departure_time: the time of departure
+        :param passengers: the number of passengers
+        :param allows_pooling: whether the request can be pooled
+        :param fleet_id: the fleet the request belongs to, if any
+        :param value: the value of the request
+        :return: the Request
+        """
+        assert departure_time >= 0
+        assert passengers > 0
         if fleet_id:
             membership = Membership.single_membership(fleet_id)
         else:
@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Union
+
+import numpy as np
+import pandas as pd
+
+from nrel.hive.model.sim_time import SimTime
+from nrel.hive.util.exception import TimeParseError
+
+log = logging.getLogger(__name__)
+
+REQUIRED_COLUMNS = (
+    "request_id",
+    "o_lat",
+    "o_lon",
+    "d_lat",
+    "d_lon",
+    "departure_time",
+    "passengers",
+)
+
+# columns whose text is used as-is, matching what a csv.DictReader row would hold
+TEXT_COLUMNS = ("request_id", "fleet_id", "allows_pooling", "departure_time")
+
+# columns of a RequestTable that hold python objects rather than numbers
+_OBJECT_COLUMNS = ("request_id", "fleet_id")
+
+
+class RequestTable(NamedTuple):
+    """
+    the rows of a requests file held as columns and sorted by departure time, so that the
+    requests departing in a time step can be sliced off and built as a batch.
+
+    :param request_id: the id of each request
+    :param o_lat: the origin latitude of each request
+    :param o_lon: the origin longitude of each request
+    :param d_lat: the destination latitude of each request
+    :param d_lon: the destination longitude of each request
+    :param departure_time: the departure time of each request, in epoch seconds
+    :param passengers: the number of passengers of each request
+    :param allows_pooling: whether each request can be pooled
+    :param fleet_id: the fleet of each request, or None for requests without a fleet
+    """
+
+    request_id: np.ndarray
+    o_lat: np.ndarray
+    o_lon: np.ndarray
+    d_lat: np.ndarray
+    d_lon: np.ndarray
+    departure_time: np.ndarray
+    passengers: np.ndarray
+    allows_pooling: np.ndarray
+    fleet_id: np.ndarray
+
+    @property
+    def row_count(self) -> int:
+        return len(self.request_id)
+
+    @classmethod
+    def from_file(cls, file: Union[str, Path]) -> RequestTable:
+        """
+        reads a requests file in csv or parquet format, or a table written by to_directory.
+        reading parquet requires pyarrow.
+
+        :param file: the requests file, or a directory written by to_directory
+        :return: the requests as a table
+        :raises: IOError if the file is missing a required column
+        """
+        path = Path(file)
+        if path.is_dir():
+            return cls.from_directory(path)
+        elif path.suffix == ".parquet":
+            df = pd.read_parquet(path)
+        else:
+            dtypes = {column: str for column in TEXT_COLUMNS}
+            df = pd.read_csv(path, dtype=dtypes, encoding="utf-8-sig")
+        return cls.from_dataframe(df)
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> RequestTable:
+        """
+        builds a table from a DataFrame of requests. rows with invalid values are logged and
+        dropped, as they are when requests are read row by row.
+
+        :param df: the requests, with the columns of a requests file
+        :return: the requests as a table, sorted by departure time
+        :raises: IOError if the DataFrame is missing a required column
+        """
+        for column in REQUIRED_COLUMNS:
+            if column not in df.columns:
+                raise IOError(f"cannot load requests without a '{column}' column")
+
+        request_id = df["request_id"].astype(str).to_numpy(dtype=object)
+        coordinates = {
+            column: pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+            for column in ("o_lat", "o_lon", "d_lat", "d_lon")
+        }
+        passengers = pd.to_numeric(df["passengers"], errors="coerce").to_numpy(dtype=np.float64)
+        departure_time = _parse_departure_times(df["departure_time"])
+
+        if "allows_pooling" in df.columns:
+            allows_pooling = np.array(
+                [bool(v) if not pd.isna(v) else False for v in df["allows_pooling"]], dtype=bool
+            )
+        else:
+            allows_pooling = np.zeros(len(df), dtype=bool)
+        if "fleet_id" in df.columns:
+            fleet_id = np.array(
+                [str(v) if not pd.isna(v) and v != "" else None for v in df["fleet_id"]],
+                dtype=object,
+            )
+        else:
+            fleet_id = np.full(len(df), None, dtype=object)
+
+        valid = (
+            np.isfinite(departure_time)
+            & np.isfinite(passengers)
+            & (passengers > 0)
+            & (passengers == np.floor(passengers))
+        )
+        for values in coordinates.values():
+            valid &= np.isfinite(values)
+        for i in np.flatnonzero(~valid):
+            log.error(f"unable to parse request {request_id[i]} due to invalid value(s)")
+
+        table = RequestTable(
+            request_id=request_id,
+            o_lat=coordinates["o_lat"],
+            o_lon=coordinates["o_lon"],
+            d_lat=coordinates["d_lat"],
+            d_lon=coordinates["d_lon"],
+            departure_time=np.where(valid, departure_time, 0).astype(np.int64),
+            passengers=np.where(valid, passengers, 0).astype(np.int64),
+            allows_pooling=allows_pooling,
+            fleet_id=fleet_id,
+        )
+        order = np.flatnonzero(valid)
+        order = order[np.argsort(table.departure_time[order], kind="stable")]
+        return table.take(order)
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> RequestTable:
+        """
+        loads a table written by to_directory. the numeric columns are memory mapped so that
+        processes loading the same table share its pages, while the text columns are read
+        into memory.
+
+        :param directory: the directory holding the column arrays
+        :return: the requests as a table
+        """
+        path = Path(directory)
+        columns = {
+            column: np.load(path / f"{column}.npy", mmap_mode="r")
+            for column in cls._fields
+            if column not in _OBJECT_COLUMNS
+        }
+        columns["request_id"] = np.load(path / "request_id.npy").astype(object)
+        columns["fleet_id"] = np.array(
+            [v if v != "" else None for v in np.load(path / "fleet_id.npy").tolist()], dtype=object
+        )
+        return RequestTable(**columns)
+
+    def to_directory(self, directory: Union[str, Path]):
+        """
+        writes each column as an array that from_directory can load. text columns are
+        written as fixed width text, with None written as an empty string.
+
+        :param directory: the directory to write, created if it does not exist
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for column, values in self._asdict().items():
+            if column in _OBJECT_COLUMNS:
+                values = np.array(["" if v is None else v for v in values], dtype=str)
+            np.save(path / f"{column}.npy", values)
+
+    def take(self, rows: Union[np.ndarray, slice]) -> RequestTable:
+        """
+        selects rows of this table
+
+        :param rows: the row indices, or a slice
+        :return: a table of the selected rows
+        """
+        return RequestTable(*(column[rows] for column in self))
+
+
+class RequestTableStepper:
+    """
+    steps through a RequestTable in departure time order, the columnar counterpart of a
+    DictReaderStepper over a requests file.
+    """
+
+    def __init__(self, table: RequestTable):
+        self.table = table
+        self.next_row = 0
+
+    def read_until(self, sim_time: SimTime) -> RequestTable:
+        """
+        reads the rows that have not been read yet and depart before a time
+
+        :param sim_time: the time to read up to, exclusive
+        :return: a table of the rows, which may be empty
+        """
+        stop = int(np.searchsorted(self.table.departure_time, sim_time, side="left"))
+        rows = self.table.take(slice(self.next_row, max(stop, self.next_row)))
+        self.next_row = max(stop, self.next_row)
+        return rows
+
+    def resume(self, checkpointed: Any) -> RequestTableStepper:
+        """
+        continues reading this table from the row where a checkpointed stepper stopped. the
+        table itself is not taken from the checkpoint, as it may be a shared one.
+
+        :param checkpointed: the stepper restored from a checkpoint
+        :return: a stepper over this table at the checkpointed row
+        :raises: ValueError if the checkpointed stepper does not read a table
+        """
+        if not isinstance(checkpointed, RequestTableStepper):
+            raise ValueError(f"cannot resume a table reader from a {type(checkpointed).__name__}")
+        stepper = RequestTableStepper(self.table)
+        stepper.next_row = checkpointed.next_row
+        return stepper
+
+
+def _parse_departure_times(column: pd.Series) -> np.ndarray:
+    """
+    parses departure times into epoch seconds. text is parsed by SimTime.build once per
+    distinct value; NaN marks the values that could not be parsed.
+    """
+    if pd.api.types.is_datetime64_any_dtype(column):
+        seconds = column.dt.tz_localize(None) if column.dt.tz is not None else column
+        return (seconds - pd.Timestamp(0)).dt.total_seconds().to_numpy(dtype=np.float64)
+    elif pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+
+    parsed: Dict[object, float] = {}
+    for value in column.unique():
+        try:
+            parsed[value] = float(SimTime.build(value))
+        except TimeParseError:
+            parsed[value] = np.nan
+    return column.map(parsed).to_numpy(dtype=np.float64)
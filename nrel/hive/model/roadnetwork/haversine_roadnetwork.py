@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Optional, Sequence
+
+import numpy as np
 
 import nrel.hive.model.roadnetwork.haversine_link_id_ops as h_ops
 from nrel.hive.model.entity_position import EntityPosition
@@ -10,9 +12,10 @@ from nrel.hive.model.roadnetwork.linktraversal import LinkTraversal
 from nrel.hive.model.roadnetwork.roadnetwork import RoadNetwork
 from nrel.hive.model.roadnetwork.route import Route, empty_route
 from nrel.hive.model.sim_time import SimTime
+from nrel.hive.reporting import profiling
 from nrel.hive.util.h3_ops import H3Ops
 from nrel.hive.util.typealiases import GeoId, LinkId, H3Resolution
-from nrel.hive.util.units import Kilometers
+from nrel.hive.util.units import Kilometers, HOURS_TO_SECONDS
 
 
 class HaversineRoadNetwork(RoadNetwork):
@@ -46,6 +49,7 @@ class HaversineRoadNetwork(RoadNetwork):
         if origin == destination:
             return empty_route()
 
+        profiling.count("routes_computed")
         link_id = h_ops.geoids_to_link_id(origin.geoid, destination.geoid)
         link_dist_km = self.distance_by_geoid_km(origin.geoid, destination.geoid)
         link = LinkTraversal(
@@ -63,6 +67,45 @@ class HaversineRoadNetwork(RoadNetwork):
     def distance_by_geoid_km(self, origin: GeoId, destination: GeoId) -> Kilometers:
         return H3Ops.great_circle_distance(origin, destination)
 
+    def route_matrix(self, origins: Sequence[GeoId], destinations: Sequence[GeoId]) -> np.ndarray:
+        """
+        travel times between every origin and destination at the network average speed
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: travel times in seconds, shape (origins, destinations)
+        """
+        distance_km = self.distance_matrix_km(origins, destinations)
+        return distance_km / self._AVG_SPEED_KMPH * HOURS_TO_SECONDS
+
+    def distance_matrix_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        great circle distances between every origin and destination, vectorized
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: distances in kilometers, shape (origins, destinations)
+        """
+        o = H3Ops.geoids_to_lat_lon_array(origins)
+        d = H3Ops.geoids_to_lat_lon_array(destinations)
+        return H3Ops.great_circle_distance_array(o[:, None, :], d[None, :, :])
+
+    def distance_pairs_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        great circle distances from each origin to the destination at the same index, vectorized
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids, the same length as origins
+        :return: distances in kilometers, shape (origins,)
+        """
+        o = H3Ops.geoids_to_lat_lon_array(origins)
+        d = H3Ops.geoids_to_lat_lon_array(destinations)
+        return H3Ops.great_circle_distance_array(o, d)
+
     def link_from_link_id(self, link_id: LinkId) -> Optional[Link]:
         src, dst = h_ops.link_id_to_geodis(link_id)
         dist = self.distance_by_geoid_km(src, dst)
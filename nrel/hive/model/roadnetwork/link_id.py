@@ -6,7 +6,7 @@ from nrel.hive.util.typealiases import LinkId
 NodeId = Any
 
 
-def create_link_id(src: int, dst: int) -> LinkId:
+def create_link_id(src: NodeId, dst: NodeId) -> LinkId:
     """
     creates a LinkId from its source and destination node ids
     :param src: the source node id
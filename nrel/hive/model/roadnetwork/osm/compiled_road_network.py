@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+import logging
+from pathlib import Path
+from typing import NamedTuple, Optional, Union
+
+from nrel.hive.util.typealiases import H3Resolution
+from nrel.hive.util.units import Kmph
+
+log = logging.getLogger(__name__)
+
+# bump when the layout of a compiled road network changes, so stale caches are ignored
+COMPILED_FORMAT_VERSION = 3
+
+MANIFEST_FILE = "manifest.json"
+
+
+class CompiledRoadNetworkManifest(NamedTuple):
+    """
+    describes a compiled road network directory: the settings it was compiled with and the
+    source file it was compiled from.
+
+    :param format_version: the compiled road network format version
+    :param sim_h3_resolution: the h3 resolution of the compiled link geoids
+    :param default_speed_kmph: the speed given to links without speed information
+    :param source_file: the road network file that was compiled, if any
+    :param source_size: the size in bytes of the source file when it was compiled
+    :param source_mtime_ns: the modification time of the source file when it was compiled
+    """
+
+    format_version: int
+    sim_h3_resolution: H3Resolution
+    default_speed_kmph: Kmph
+    source_file: Optional[str] = None
+    source_size: Optional[int] = None
+    source_mtime_ns: Optional[int] = None
+
+    @classmethod
+    def build(
+        cls,
+        sim_h3_resolution: H3Resolution,
+        default_speed_kmph: Kmph,
+        source_file: Optional[Union[str, Path]] = None,
+    ) -> CompiledRoadNetworkManifest:
+        if source_file is None:
+            return CompiledRoadNetworkManifest(
+                COMPILED_FORMAT_VERSION, sim_h3_resolution, default_speed_kmph
+            )
+        source = Path(source_file)
+        stat = source.stat()
+        return CompiledRoadNetworkManifest(
+            COMPILED_FORMAT_VERSION,
+            sim_h3_resolution,
+            default_speed_kmph,
+            str(source.absolute()),
+            stat.st_size,
+            stat.st_mtime_ns,
+        )
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> CompiledRoadNetworkManifest:
+        with (Path(directory) / MANIFEST_FILE).open("r") as f:
+            return CompiledRoadNetworkManifest(**json.load(f))
+
+    def to_directory(self, directory: Union[str, Path]):
+        with (Path(directory) / MANIFEST_FILE).open("w") as f:
+            json.dump(self._asdict(), f, indent=2)
+
+
+def compiled_road_network_dir(road_network_file: Union[str, Path]) -> Path:
+    """
+    a road network is compiled to a directory next to the road network file it was built from
+
+    :param road_network_file: the road network file
+    :return: the path to the compiled road network directory
+    """
+    path = Path(road_network_file)
+    return path.with_name(f"{path.stem}.compiled")
+
+
+def is_compiled_road_network(directory: Union[str, Path]) -> bool:
+    """
+    tests if a directory holds a compiled road network
+
+    :param directory: the directory to test
+    :return: True if it contains a compiled road network manifest
+    """
+    return (Path(directory) / MANIFEST_FILE).is_file()
+
+
+def compiled_road_network_is_fresh(
+    directory: Union[str, Path],
+    road_network_file: Union[str, Path],
+    sim_h3_resolution: H3Resolution,
+    default_speed_kmph: Kmph,
+) -> bool:
+    """
+    tests if a compiled road network can stand in for its road network file: it must have
+    been compiled from the file as it is now, with the same settings and format version.
+
+    :param directory: the compiled road network directory
+    :param road_network_file: the road network file it was compiled from
+    :param sim_h3_resolution: the h3 resolution of the simulation
+    :param default_speed_kmph: the speed given to links without speed information
+    :return: True if the compiled road network is up to date
+    """
+    if not is_compiled_road_network(directory):
+        return False
+    try:
+        manifest = CompiledRoadNetworkManifest.from_directory(directory)
+    except (OSError, TypeError, ValueError) as e:
+        log.warning(f"unable to read compiled road network manifest in {directory}: {e}")
+        return False
+    expected = CompiledRoadNetworkManifest.build(
+        sim_h3_resolution, default_speed_kmph, road_network_file
+    )
+    return manifest._replace(source_file=None) == expected._replace(source_file=None)
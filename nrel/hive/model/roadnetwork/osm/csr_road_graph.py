@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Literal, NamedTuple, Optional, Tuple, Union
+
+import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from nrel.hive.model.roadnetwork.osm.osm_roadnetwork_ops import safe_get_node_coordinates
+from nrel.hive.util.units import Kmph
+
+# osm node ids are integers, while generated graphs may use tuples of integers
+NodeId = Union[int, Tuple[int, ...]]
+
+ROUTING_WEIGHT = "travel_time"
+
+
+class CSRRoadGraph(NamedTuple):
+    """
+    a road network stored as flat NumPy arrays in compressed sparse row (CSR) form. the edges
+    leaving node i are found at positions indptr[i]:indptr[i+1] of the edge arrays, and each
+    pair of nodes has at most one edge. a graph written with to_directory can be memory mapped
+    by from_directory so that processes sharing a road network also share its pages.
+
+    :param node_ids: the node ids in ascending order, shape (nodes,), or (nodes, k) for tuple ids
+    :param node_lat: the latitude of each node
+    :param node_lon: the longitude of each node
+    :param indptr: the CSR row pointer, shape (nodes + 1,)
+    :param indices: the destination node index of each edge, shape (edges,)
+    :param length: the length of each edge, in meters
+    :param speed_kmph: the speed of each edge
+    :param travel_time: the routing weight of each edge, in seconds
+    """
+
+    node_ids: np.ndarray
+    node_lat: np.ndarray
+    node_lon: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    length: np.ndarray
+    speed_kmph: np.ndarray
+    travel_time: np.ndarray
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_lat)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_networkx(cls, graph: nx.MultiDiGraph, default_speed_kmph: Kmph = 40.0) -> CSRRoadGraph:
+        """
+        packs a networkx road network into CSR arrays. like the Links of an OSMRoadNetwork,
+        the length and speed of a node pair come from the edge with key 0, while the travel
+        time routing weight is the fastest of any parallel edges.
+
+        :param graph: the road network graph, with node coordinates and edge lengths
+        :param default_speed_kmph: the speed of edges without speed information
+        :return: the CSR road graph
+        """
+        nodes = list(graph.nodes())
+        tuple_ids = len(nodes) > 0 and isinstance(nodes[0], tuple)
+        node_ids = np.array(nodes, dtype=np.int64)
+        order = np.lexsort(node_ids.T[::-1]) if tuple_ids else np.argsort(node_ids, kind="stable")
+        node_ids = node_ids[order]
+        node_index = {nodes[i]: row for row, i in enumerate(order)}
+
+        coordinates = np.zeros((len(nodes), 2), dtype=np.float64)
+        for node_id, data in graph.nodes(data=True):
+            error, coordinate = safe_get_node_coordinates(data, node_id)
+            if error:
+                raise error
+            coordinates[node_index[node_id]] = coordinate
+
+        edge_count = graph.number_of_edges()
+        src = np.zeros(edge_count, dtype=np.int64)
+        dst = np.zeros(edge_count, dtype=np.int64)
+        key_rank = np.zeros(edge_count, dtype=np.int8)
+        length = np.zeros(edge_count, dtype=np.float64)
+        speed = np.zeros(edge_count, dtype=np.float64)
+        travel_time = np.zeros(edge_count, dtype=np.float64)
+        for i, (u, v, k, data) in enumerate(graph.edges(keys=True, data=True)):
+            src[i] = node_index[u]
+            dst[i] = node_index[v]
+            key_rank[i] = 0 if k == 0 else 1
+            length[i] = data["length"]
+            speed[i] = data.get("speed_kmph", default_speed_kmph)
+            travel_time[i] = data.get(ROUTING_WEIGHT, 1)
+
+        # sort by node pair so that parallel edges are adjacent, with the key 0 edge first
+        order = np.lexsort((key_rank, dst, src))
+        src, dst = src[order], dst[order]
+        first = np.ones(edge_count, dtype=bool)
+        first[1:] = (src[1:] != src[:-1]) | (dst[1:] != dst[:-1])
+        pair_starts = np.flatnonzero(first)
+        fastest = (
+            np.minimum.reduceat(travel_time[order], pair_starts) if edge_count > 0 else travel_time
+        )
+
+        indptr = np.zeros(len(nodes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src[first], minlength=len(nodes)), out=indptr[1:])
+        return CSRRoadGraph(
+            node_ids=node_ids,
+            node_lat=coordinates[:, 0].copy(),
+            node_lon=coordinates[:, 1].copy(),
+            indptr=indptr,
+            indices=dst[first],
+            length=length[order][first],
+            speed_kmph=speed[order][first],
+            travel_time=fastest,
+        )
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path], mmap: bool = True) -> CSRRoadGraph:
+        """
+        loads a road graph written by to_directory
+
+        :param directory: the directory holding the road graph arrays
+        :param mmap: memory map the arrays read-only instead of reading them into memory
+        :return: the CSR road graph
+        """
+        path = Path(directory)
+        mode: Optional[Literal["r"]] = "r" if mmap else None
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode=mode) for name in cls._fields}
+        return CSRRoadGraph(**arrays)
+
+    def to_directory(self, directory: Union[str, Path]):
+        """
+        writes each array of this road graph to {directory}/{name}.npy
+
+        :param directory: the directory to write, created if it does not exist
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        for name, array in zip(self._fields, self):
+            np.save(path / f"{name}.npy", np.ascontiguousarray(array))
+
+    def to_networkx(self) -> nx.MultiDiGraph:
+        """
+        unpacks this road graph into a networkx graph with one edge per node pair
+
+        :return: a networkx graph with node coordinates and edge lengths, speeds and travel times
+        """
+        graph = nx.MultiDiGraph()
+        nodes = [self.node_id(i) for i in range(self.node_count)]
+        graph.add_nodes_from(
+            (n, {"y": float(lat), "x": float(lon)})
+            for n, lat, lon in zip(nodes, self.node_lat, self.node_lon)
+        )
+        graph.add_edges_from(
+            (
+                nodes[u],
+                nodes[v],
+                0,
+                {"length": float(l), "speed_kmph": float(s), ROUTING_WEIGHT: float(t)},
+            )
+            for u, v, l, s, t in zip(
+                self.edge_sources(), self.indices, self.length, self.speed_kmph, self.travel_time
+            )
+        )
+        return graph
+
+    def node_id(self, index: int) -> NodeId:
+        """
+        the id of the node at an array index
+
+        :param index: the node index
+        :return: the node id
+        """
+        node_id = self.node_ids[index]
+        return tuple(int(n) for n in node_id) if self.node_ids.ndim > 1 else int(node_id)
+
+    def node_index(self, node_id: NodeId) -> Optional[int]:
+        """
+        the array index of a node id, found by binary search over the sorted node ids
+
+        :param node_id: the node id
+        :return: the node index, or None if the node is not in this graph
+        """
+        if self.node_ids.ndim == 1:
+            if isinstance(node_id, tuple):
+                return None
+            keys, key = self.node_ids, node_id
+        else:
+            if not isinstance(node_id, tuple):
+                return None
+            keys = _structured_rows(self.node_ids)
+            try:
+                key = np.array([node_id], dtype=keys.dtype)[0]
+            except (TypeError, ValueError):
+                return None
+        index = int(np.searchsorted(keys, key))
+        if index < self.node_count and keys[index] == key:
+            return index
+        return None
+
+    def edge_sources(self) -> np.ndarray:
+        """
+        the source node index of each edge, the row counterpart of indices
+
+        :return: the source node indices, shape (edges,)
+        """
+        return np.repeat(np.arange(self.node_count), np.diff(self.indptr))
+
+    def travel_time_matrix(self) -> csr_matrix:
+        """
+        the edge travel times as a scipy sparse matrix for the scipy.sparse.csgraph searches
+
+        :return: a square csr matrix of travel times, in seconds
+        """
+        return self.edge_matrix(self.travel_time)
+
+    def edge_matrix(self, values: np.ndarray) -> csr_matrix:
+        """
+        wraps per-edge values in a sparse matrix with the sparsity of this graph
+
+        :param values: a value for each edge
+        :return: a square csr matrix of the edge values
+        """
+        n = self.node_count
+        return csr_matrix((values, self.indices, self.indptr), shape=(n, n))
+
+
+def _structured_rows(node_ids: np.ndarray) -> np.ndarray:
+    """
+    tuple node ids are stored as the rows of a 2d array, sorted lexicographically. viewing each
+    row as one structured value lets them be binary searched like integer node ids.
+    """
+    dtype = np.dtype([(f"f{i}", node_ids.dtype) for i in range(node_ids.shape[1])])
+    return np.ascontiguousarray(node_ids).view(dtype).ravel()
@@ -1,19 +1,24 @@
 from __future__ import annotations
 
-import functools as ft
-from typing import Tuple, Optional, NamedTuple
+from pathlib import Path
+from typing import List, Tuple, Optional, NamedTuple, Sequence, Union
 
 import h3
 import immutables
+import numpy as np
 from networkx import MultiDiGraph
 from scipy.spatial import cKDTree
 
 from nrel.hive.model.roadnetwork.link import Link
 from nrel.hive.model.roadnetwork.link_id import create_link_id
+from nrel.hive.model.roadnetwork.osm.csr_road_graph import CSRRoadGraph
 from nrel.hive.model.roadnetwork.osm.osm_roadnetwork_ops import safe_get_node_coordinates
 from nrel.hive.util.typealiases import GeoId, LinkId
 from nrel.hive.util.units import M_TO_KM, Kmph
 
+# how far along each link its spatial index centroid is placed
+LINK_CENTROID_FRACTION = 0.49
+
 
 class OSMRoadNetworkLinkHelper(NamedTuple):
     """
@@ -56,6 +61,63 @@ class OSMRoadNetworkLinkHelper(NamedTuple):
         except Exception as e:
             return e, None
 
+    def links_by_geoids(self, geoids: Sequence[GeoId]) -> List[Optional[Link]]:
+        """
+        finds the nearest Link to each of a batch of geoids with a single CKDTree query
+
+        :param geoids: the geoids to query
+        :return: the nearest link to each GeoId, or None where the lookup failed
+        """
+        if len(geoids) == 0:
+            return []
+        query = np.array([h3.h3_to_geo(geoid) for geoid in geoids], dtype=np.float64)
+        _, indices = self.links_spatial_lookup.query(query)
+        return [
+            self.links.get(self.links_linkid_lookup[i]) if 0 <= i < self.link_count else None
+            for i in indices.tolist()
+        ]
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> OSMRoadNetworkLinkHelper:
+        """
+        loads a link helper written by to_directory, rebuilding the spatial index from the
+        saved link centroids
+
+        :param directory: the directory holding the link arrays
+        :return: the link helper
+        """
+        path = Path(directory)
+        link_ids = np.load(path / "link_ids.npy").tolist()
+        links = map(
+            Link,
+            link_ids,
+            np.load(path / "link_start.npy").tolist(),
+            np.load(path / "link_end.npy").tolist(),
+            np.load(path / "link_distance_km.npy").tolist(),
+            np.load(path / "link_speed_kmph.npy").tolist(),
+        )
+        tree = cKDTree(np.load(path / "links_centroids.npy"))
+        return OSMRoadNetworkLinkHelper(
+            immutables.Map(zip(link_ids, links)), tree, tuple(link_ids), len(link_ids)
+        )
+
+    def to_directory(self, directory: Union[str, Path]):
+        """
+        writes the links, in spatial index order, as arrays alongside the link centroids the
+        spatial index is built from
+
+        :param directory: the directory to write, created if it does not exist
+        """
+        path = Path(directory)
+        path.mkdir(parents=True, exist_ok=True)
+        links = [self.links[link_id] for link_id in self.links_linkid_lookup]
+        np.save(path / "link_ids.npy", np.array(self.links_linkid_lookup, dtype=str))
+        np.save(path / "link_start.npy", np.array([l.start for l in links], dtype=str))
+        np.save(path / "link_end.npy", np.array([l.end for l in links], dtype=str))
+        np.save(path / "link_distance_km.npy", np.array([l.distance_km for l in links]))
+        np.save(path / "link_speed_kmph.npy", np.array([l.speed_kmph for l in links]))
+        np.save(path / "links_centroids.npy", np.asarray(self.links_spatial_lookup.data))
+
     @classmethod
     def build(
         cls,
@@ -70,148 +132,133 @@ class OSMRoadNetworkLinkHelper(NamedTuple):
         :param default_speed_kmph: default link speed for unlabeled links
         :return: either an error, or, the lookup table
         """
-
-        class Accumulator(NamedTuple):
-            """
-            builds data structures used to provide lookup features in the road network
-
-            :param lookup: each Link by it's LinkId
-            :param link_ids: link ids which share a common array index to the link_centroids
-            :param link_centroids: link centroids (lat,lon) which share a common array index to the link_ids
-            """
-
-            lookup: immutables.Map[LinkId, Link] = immutables.Map()
-            link_ids: Tuple[LinkId, ...] = ()
-            link_centroids: Tuple[Tuple[float, float], ...] = ()
-
-            def add_link(self, link: Link) -> Tuple[Optional[Exception], Optional[Accumulator]]:
-                """
-                adding a link to this accumulator creates an entry in the data structures used to
-                run spatial queries over the graph edge space
-                :param link: the link to add
-                :return: an error or updated accumulator
-                """
-                try:
-                    h3_line = h3.h3_line(link.start, link.end)
-
-                    # we want to look up edges by their midpoint. that said, two edges will share the same
-                    # endpoints, one for each direction. since these two edges would share the same midpoint,
-                    # we aim here to make both centroids _just barely_ different by subtracting the midpoint index by 1.
-                    midpoint_h3_line_index = round(len(h3_line) / 2)
-                    src_oriented_midpoint_index = (
-                        midpoint_h3_line_index - 1
-                        if midpoint_h3_line_index > 0
-                        else midpoint_h3_line_index
-                    )
-                    midpoint_hex = (
-                        h3_line[src_oriented_midpoint_index]
-                        if src_oriented_midpoint_index
-                        else link.start
-                    )
-                    link_centroid_lat, link_centroid_lon = h3.h3_to_geo(midpoint_hex)
-                    updated_acc = self._replace(
-                        lookup=self.lookup.set(link.link_id, link),
-                        link_ids=self.link_ids + (link.link_id,),
-                        link_centroids=self.link_centroids
-                        + ((link_centroid_lat, link_centroid_lon),),
+        try:
+            # each node is located once, and shared by the links that touch it
+            node_coordinates = {}
+            node_geoids = {}
+            for node_id, node in graph.nodes(data=True):
+                coord_err, coord = safe_get_node_coordinates(node, node_id)
+                if coord_err or coord is None:
+                    response = Exception(
+                        f"failure getting node coordinates while building OSMRoadNetworkLinkHelper"
                     )
-                    return None, updated_acc
-                except Exception as e:
-                    return e, None
-
-        # inner loop function that attaches a LinkId -> Link pair to a Map
-        def create_link_entry(
-            acc: Tuple[Optional[Exception], Optional[Accumulator]],
-            link_tuple: Tuple[int, int, int],
-        ) -> Tuple[Optional[Exception], Optional[Accumulator]]:
-            acc_error, accumulator = acc
-            if acc_error:
-                return acc
-            elif accumulator is None:
-                return acc
-            else:
-                try:
-                    src, dst, _ = link_tuple
-                    link_id = create_link_id(src, dst)
-                    src_node = graph.nodes[src]
-                    dst_node = graph.nodes[dst]
-                    src_coord_err, src_coord = safe_get_node_coordinates(src_node, src)
-                    dst_coord_err, dst_coord = safe_get_node_coordinates(dst_node, dst)
-                    if src_coord_err:
-                        response = Exception(
-                            f"failure getting node coordinates while building OSMRoadNetworkLinkHelper"
-                        )
-                        response.__cause__ = src_coord_err
-                        return response, None
-                    elif dst_coord_err:
-                        response = Exception(
-                            f"failure getting node coordinates while building OSMRoadNetworkLinkHelper"
-                        )
-                        response.__cause__ = dst_coord_err
-                        return response, None
-                    elif src_coord is None:
-                        response = Exception(
-                            f"failure getting node coordinates while building OSMRoadNetworkLinkHelper"
-                        )
-                        return response, None
-                    elif dst_coord is None:
-                        response = Exception(
-                            f"failure getting node coordinates while building OSMRoadNetworkLinkHelper"
-                        )
-                        return response, None
-                    else:
-                        src_lat, src_lon = src_coord
-                        dst_lat, dst_lon = dst_coord
-                        src_geoid = h3.geo_to_h3(src_lat, src_lon, resolution=sim_h3_resolution)
-                        dst_geoid = h3.geo_to_h3(dst_lat, dst_lon, resolution=sim_h3_resolution)
-                        data = graph.get_edge_data(
-                            src, dst, 0, None
-                        )  # data index "0" as this uses networkx's multigraph implementation
-                        speed = (
-                            data.get("speed_kmph", default_speed_kmph)
-                            if data
-                            else default_speed_kmph
-                        )
-                        distance_miles = data.get("length") if data else None
-                        if distance_miles is None:
-                            err = ValueError("Link must have distance")
-                            return err, None
-
-                        distance = distance_miles * M_TO_KM
-                        link = Link.build(link_id, src_geoid, dst_geoid, speed, distance)
-                        (
-                            add_link_error,
-                            updated_accumulator,
-                        ) = accumulator.add_link(link)
-                        if add_link_error:
-                            response = Exception(
-                                f"failure adding link while building OSMRoadNetworkLinkHelper"
-                            )
-                            response.__cause__ = add_link_error
-                            return response, None
-                        else:
-                            return None, updated_accumulator
-                except Exception as e:
-                    return e, None
-
-        # process each link, building the collection of Links by LinkId, and
-        # the collections which will be used to build a spatial index over the edge centroids
-        initial: Tuple[Optional[Exception], Optional[Accumulator]] = (None, Accumulator())
-        error, accumulator = ft.reduce(create_link_entry, graph.edges, initial)
-        if error:
+                    response.__cause__ = coord_err
+                    return response, None
+                lat, lon = coord
+                node_coordinates[node_id] = coord
+                node_geoids[node_id] = h3.geo_to_h3(lat, lon, resolution=sim_h3_resolution)
+
+            link_ids = []
+            links = []
+            src_coords = []
+            dst_coords = []
+            for src, dst, key, data in graph.edges(keys=True, data=True):
+                if key != 0:
+                    # data index "0" as this uses networkx's multigraph implementation
+                    data = graph.get_edge_data(src, dst, 0) or {}
+                distance_meters = data.get("length")
+                if distance_meters is None:
+                    response = Exception(f"failure building OSMRoadNetworkLinkHelper")
+                    response.__cause__ = ValueError("Link must have distance")
+                    return response, None
+                speed = data.get("speed_kmph", default_speed_kmph)
+                link_id = create_link_id(src, dst)
+                link = Link.build(
+                    link_id, node_geoids[src], node_geoids[dst], speed, distance_meters * M_TO_KM
+                )
+                link_ids.append(link_id)
+                links.append(link)
+                src_coords.append(node_coordinates[src])
+                dst_coords.append(node_coordinates[dst])
+        except Exception as e:
             response = Exception(f"failure building OSMRoadNetworkLinkHelper")
-            response.__cause__ = error
+            response.__cause__ = e
             return response, None
-        elif accumulator is None:
+
+        return None, cls._from_links(link_ids, links, src_coords, dst_coords)
+
+    @classmethod
+    def from_road_graph(
+        cls, road_graph: CSRRoadGraph, sim_h3_resolution: int
+    ) -> Tuple[Optional[Exception], Optional[OSMRoadNetworkLinkHelper]]:
+        """
+        builds the table of Links by LinkId from the edges of a CSR road graph
+        :param road_graph: the input graph
+        :param sim_h3_resolution: h3 resolution for entities in sim
+        :return: either an error, or, the lookup table
+        """
+        try:
+            node_ids = [road_graph.node_id(i) for i in range(road_graph.node_count)]
+            node_lat = np.asarray(road_graph.node_lat)
+            node_lon = np.asarray(road_graph.node_lon)
+            node_geoids = [
+                h3.geo_to_h3(lat, lon, resolution=sim_h3_resolution)
+                for lat, lon in zip(node_lat.tolist(), node_lon.tolist())
+            ]
+            src = road_graph.edge_sources()
+            dst = np.asarray(road_graph.indices)
+            src_list, dst_list = src.tolist(), dst.tolist()
+            link_ids = [
+                create_link_id(node_ids[s], node_ids[d]) for s, d in zip(src_list, dst_list)
+            ]
+            links = [
+                Link.build(link_id, node_geoids[s], node_geoids[d], speed, distance)
+                for link_id, s, d, speed, distance in zip(
+                    link_ids,
+                    src_list,
+                    dst_list,
+                    np.asarray(road_graph.speed_kmph).tolist(),
+                    (np.asarray(road_graph.length) * M_TO_KM).tolist(),
+                )
+            ]
+        except Exception as e:
             response = Exception(f"failure building OSMRoadNetworkLinkHelper")
+            response.__cause__ = e
             return response, None
-        else:
-            # construct the spatial index
-            tree = cKDTree(accumulator.link_centroids)
-            osm_road_network_links = OSMRoadNetworkLinkHelper(
-                accumulator.lookup,
-                tree,
-                accumulator.link_ids,
-                len(accumulator.link_ids),
-            )
-            return None, osm_road_network_links
+
+        src_coords = np.column_stack((node_lat[src], node_lon[src]))
+        dst_coords = np.column_stack((node_lat[dst], node_lon[dst]))
+        return None, cls._from_links(link_ids, links, src_coords, dst_coords)
+
+    @classmethod
+    def _from_links(
+        cls,
+        link_ids: List[LinkId],
+        links: List[Link],
+        src_coords: Union[np.ndarray, List[Tuple[float, float]]],
+        dst_coords: Union[np.ndarray, List[Tuple[float, float]]],
+    ) -> OSMRoadNetworkLinkHelper:
+        """
+        indexes links by LinkId, and spatially by their centroid
+        :param link_ids: the id of each link
+        :param links: each link
+        :param src_coords: the (lat, lon) of the start of each link
+        :param dst_coords: the (lat, lon) of the end of each link
+        :return: the lookup table
+        """
+        links_by_id: immutables.Map[LinkId, Link] = immutables.Map(zip(link_ids, links))
+
+        centroids = link_centroids(
+            np.asarray(src_coords, dtype=np.float64).reshape(-1, 2),
+            np.asarray(dst_coords, dtype=np.float64).reshape(-1, 2),
+        )
+        return OSMRoadNetworkLinkHelper(
+            links_by_id,
+            cKDTree(centroids),
+            tuple(link_ids),
+            len(link_ids),
+        )
+
+
+def link_centroids(src_coords: np.ndarray, dst_coords: np.ndarray) -> np.ndarray:
+    """
+    we want to look up edges by their midpoint. that said, two edges will share the same
+    endpoints, one for each direction. since these two edges would share the same midpoint,
+    we aim here to make both centroids _just barely_ different by placing each one slightly
+    toward its source.
+
+    :param src_coords: the (lat, lon) of the start of each link, shape (links, 2)
+    :param dst_coords: the (lat, lon) of the end of each link, shape (links, 2)
+    :return: the (lat, lon) centroid of each link, shape (links, 2)
+    """
+    return src_coords + (dst_coords - src_coords) * LINK_CENTROID_FRACTION
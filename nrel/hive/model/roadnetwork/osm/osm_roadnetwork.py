@@ -3,26 +3,44 @@ from __future__ import annotations
 import json
 import logging
 from pathlib import Path
-from typing import Optional, Union
+from typing import Callable, Dict, List, Optional, Sequence, Union
 
 import networkx as nx
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 
 from nrel.hive.model.entity_position import EntityPosition
 from nrel.hive.model.roadnetwork.link import Link
-from nrel.hive.model.roadnetwork.link_id import extract_node_ids
+from nrel.hive.model.roadnetwork.link_id import create_link_id, extract_node_ids
+from nrel.hive.model.roadnetwork.osm.compiled_road_network import (
+    COMPILED_FORMAT_VERSION,
+    CompiledRoadNetworkManifest,
+    compiled_road_network_dir,
+    compiled_road_network_is_fresh,
+    is_compiled_road_network,
+)
+from nrel.hive.model.roadnetwork.osm.csr_road_graph import CSRRoadGraph
 from nrel.hive.model.roadnetwork.osm.osm_builders import osm_graph_from_polygon
 from nrel.hive.model.roadnetwork.osm.osm_road_network_link_helper import OSMRoadNetworkLinkHelper
 from nrel.hive.model.roadnetwork.osm.osm_roadnetwork_ops import (
     route_from_nx_path,
     resolve_route_src_dst_positions,
 )
-from nrel.hive.model.roadnetwork.roadnetwork import RoadNetwork
+from nrel.hive.model.roadnetwork.osm.osm_routing import (
+    LandmarkIndex,
+    OSMRoutingEngine,
+    accumulate_along_tree,
+    load_or_build_landmarks,
+)
+from nrel.hive.model.roadnetwork.roadnetwork import RoadNetwork, position_on_link
 from nrel.hive.model.roadnetwork.route import (
     Route,
     route_distance_km,
     empty_route,
 )
 from nrel.hive.model.sim_time import SimTime
+from nrel.hive.reporting import profiling
 from nrel.hive.util import LinkId
 from nrel.hive.util.typealiases import GeoId, H3Resolution
 from nrel.hive.util.units import Kmph, Kilometers
@@ -32,20 +50,58 @@ log = logging.getLogger(__name__)
 
 class OSMRoadNetwork(RoadNetwork):
     """
-    Implements an open street maps road network utilizing the osmnx and networkx libraries
+    Implements an open street maps road network. the graph is held as a CSRRoadGraph of
+    NumPy arrays, which can be memory mapped from a road graph directory; networkx is only
+    used while reading and validating node-link json networks.
 
     """
 
     def __init__(
         self,
-        graph: nx.MultiDiGraph,
+        graph: Union[nx.MultiDiGraph, CSRRoadGraph],
         sim_h3_resolution: H3Resolution = 15,
         default_speed_kmph: Kmph = 40.0,
+        route_cache_size: int = 10000,
+        landmarks: Optional[LandmarkIndex] = None,
+        link_helper: Optional[OSMRoadNetworkLinkHelper] = None,
     ):
         self.sim_h3_resolution = sim_h3_resolution
+        self.default_speed_kmph = default_speed_kmph
+
+        if isinstance(graph, CSRRoadGraph):
+            road_graph = graph
+            n_components, _ = connected_components(
+                road_graph.travel_time_matrix(), directed=True, connection="strong"
+            )
+            if n_components > 1:
+                raise RuntimeError("Only strongly connected graphs are allowed.")
+        else:
+            self._validate_graph(graph, default_speed_kmph)
+            road_graph = CSRRoadGraph.from_networkx(graph, default_speed_kmph)
 
-        # validate network
+        # build tables on the network edges for spatial lookup and LinkId lookup
+        if link_helper is None:
+            if isinstance(graph, CSRRoadGraph):
+                link_helper_error, link_helper = OSMRoadNetworkLinkHelper.from_road_graph(
+                    road_graph, sim_h3_resolution
+                )
+            else:
+                link_helper_error, link_helper = OSMRoadNetworkLinkHelper.build(
+                    graph, sim_h3_resolution, default_speed_kmph
+                )
+            if link_helper_error:
+                raise link_helper_error
+        if link_helper is None:
+            raise Exception("Was not able to build link helper")
+        else:
+            # finish constructing OSMRoadNetwork instance
+            self.road_graph = road_graph
+            self.link_helper = link_helper
+            self.routing_engine = OSMRoutingEngine(road_graph, route_cache_size, landmarks)
+            self._edge_costs: Dict[str, csr_matrix] = {}
 
+    @staticmethod
+    def _validate_graph(graph: nx.MultiDiGraph, default_speed_kmph: Kmph):
         #   road network must be strongly connected
         if not nx.is_strongly_connected(graph):
             raise RuntimeError("Only strongly connected graphs are allowed.")
@@ -80,18 +136,13 @@ class OSMRoadNetwork(RoadNetwork):
                 f"hive will automatically set these to {default_speed_kmph} kmph."
             )
 
-        # build tables on the network edges for spatial lookup and LinkId lookup
-        link_helper_error, link_helper = OSMRoadNetworkLinkHelper.build(
-            graph, sim_h3_resolution, default_speed_kmph
-        )
-        if link_helper_error:
-            raise link_helper_error
-        elif link_helper is None:
-            raise Exception("Was not able to build link helper")
-        else:
-            # finish constructing OSMRoadNetwork instance
-            self.graph = graph
-            self.link_helper = link_helper
+    @property
+    def graph(self) -> nx.MultiDiGraph:
+        """
+        a networkx copy of the road graph. it is rebuilt on each access and only carries
+        node coordinates and edge lengths, speeds and travel times.
+        """
+        return self.road_graph.to_networkx()
 
     @classmethod
     def from_polygon(
@@ -100,6 +151,8 @@ class OSMRoadNetwork(RoadNetwork):
         sim_h3_resolution: H3Resolution = 15,
         default_speed_kmph: Kmph = 40.0,
         cache_dir=Path.home(),
+        route_cache_size: int = 10000,
+        routing_landmarks: int = 0,
     ) -> OSMRoadNetwork:
         """
         Build an OSMRoadNetwork from a shapely polygon
@@ -107,9 +160,15 @@ class OSMRoadNetwork(RoadNetwork):
         :param polygon: The polygon to build the road network from
         :param sim_h3_resolution: The h3 resolution of the simulation
         :param default_speed_kmph: The network will fill in missing speed values with this
+        :param route_cache_size: the number of shortest paths to keep in the route cache
+        :param routing_landmarks: the number of routing landmarks to build, or 0 to disable
         """
         graph = osm_graph_from_polygon(polygon, cache_dir)
-        return OSMRoadNetwork(graph, sim_h3_resolution, default_speed_kmph)
+        network = OSMRoadNetwork(graph, sim_h3_resolution, default_speed_kmph, route_cache_size)
+        if routing_landmarks > 0:
+            landmarks = LandmarkIndex.build(network.road_graph, routing_landmarks)
+            network.routing_engine.landmarks = landmarks
+        return network
 
     @classmethod
     def from_file(
@@ -117,26 +176,115 @@ class OSMRoadNetwork(RoadNetwork):
         road_network_file: Union[Path, str],
         sim_h3_resolution: H3Resolution = 15,
         default_speed_kmph: Kmph = 40.0,
+        route_cache_size: int = 10000,
+        routing_landmarks: int = 0,
     ) -> OSMRoadNetwork:
         """
-        Build an OSMRoadNetwork from file
+        Build an OSMRoadNetwork from file. the file may be a node-link json network, a compiled
+        road network directory, or a road graph directory written by CSRRoadGraph.to_directory.
+        a json network is read from its compiled road network (see the hive-compile-network
+        command) instead when that is fresh. when routing landmarks are requested, the landmark index is read
+        from (or written to) a .landmarks.npz file next to the road network file.
+
+        :param road_network_file: the road network file or directory
+        :param sim_h3_resolution: The h3 resolution of the simulation
+        :param default_speed_kmph: The network will fill in missing speed values with this
+        :param route_cache_size: the number of shortest paths to keep in the route cache
+        :param routing_landmarks: the number of routing landmarks to use, or 0 to disable
         """
         road_network_path = Path(road_network_file)
+        compiled_dir = compiled_road_network_dir(road_network_path)
         # read in the network file
-        if road_network_path.suffix == ".json":
-            with road_network_path.open("r") as f:
-                graph = nx.node_link_graph(json.load(f))
-            return OSMRoadNetwork(graph, sim_h3_resolution, default_speed_kmph)
-        else:
+        if is_compiled_road_network(road_network_path):
+            network = OSMRoadNetwork.from_compiled(road_network_path, route_cache_size)
+            if network.sim_h3_resolution != sim_h3_resolution:
+                raise ValueError(
+                    f"road network {road_network_path} was compiled for h3 resolution "
+                    f"{network.sim_h3_resolution}, but the simulation uses {sim_h3_resolution}"
+                )
+        elif road_network_path.is_dir():
+            road_graph = CSRRoadGraph.from_directory(road_network_path)
+            network = OSMRoadNetwork(
+                road_graph, sim_h3_resolution, default_speed_kmph, route_cache_size
+            )
+        elif road_network_path.suffix != ".json":
             raise TypeError(
                 f"road network file of type {road_network_path.suffix} not supported by OSMRoadNetwork."
             )
+        elif compiled_road_network_is_fresh(
+            compiled_dir, road_network_path, sim_h3_resolution, default_speed_kmph
+        ):
+            log.info(f"loading compiled road network {compiled_dir}")
+            network = OSMRoadNetwork.from_compiled(compiled_dir, route_cache_size)
+        else:
+            with road_network_path.open("r") as f:
+                graph = nx.node_link_graph(json.load(f))
+            network = OSMRoadNetwork(graph, sim_h3_resolution, default_speed_kmph, route_cache_size)
+
+        if routing_landmarks > 0:
+            landmarks = load_or_build_landmarks(
+                network.road_graph, road_network_path, routing_landmarks
+            )
+            network.routing_engine.landmarks = landmarks
+        return network
+
+    @classmethod
+    def from_compiled(
+        cls, compiled_dir: Union[Path, str], route_cache_size: int = 10000
+    ) -> OSMRoadNetwork:
+        """
+        Loads a road network written by to_compiled. the road graph arrays are memory mapped,
+        and the link table and spatial index are read as-is instead of being rebuilt.
+
+        :param compiled_dir: the compiled road network directory
+        :param route_cache_size: the number of shortest paths to keep in the route cache
+        :return: the road network, at the h3 resolution it was compiled for
+        """
+        manifest = CompiledRoadNetworkManifest.from_directory(compiled_dir)
+        if manifest.format_version != COMPILED_FORMAT_VERSION:
+            raise ValueError(
+                f"compiled road network {compiled_dir} has format version {manifest.format_version} "
+                f"but this version of hive reads version {COMPILED_FORMAT_VERSION}; please recompile it"
+            )
+        return OSMRoadNetwork(
+            CSRRoadGraph.from_directory(compiled_dir),
+            manifest.sim_h3_resolution,
+            manifest.default_speed_kmph,
+            route_cache_size,
+            link_helper=OSMRoadNetworkLinkHelper.from_directory(compiled_dir),
+        )
+
+    def to_compiled(
+        self, compiled_dir: Union[Path, str], source_file: Optional[Union[Path, str]] = None
+    ):
+        """
+        writes the road graph arrays, link table and spatial index of this road network to a
+        directory that from_compiled can load
+
+        :param compiled_dir: the directory to write
+        :param source_file: the road network file this was built from, used to test freshness
+        """
+        self.road_graph.to_directory(compiled_dir)
+        self.link_helper.to_directory(compiled_dir)
+        manifest = CompiledRoadNetworkManifest.build(
+            self.sim_h3_resolution, self.default_speed_kmph, source_file
+        )
+        manifest.to_directory(compiled_dir)
 
     def to_file(self, file: Union[str, Path]):
+        """
+        writes this road network as node-link json, or as a road graph directory when the
+        path has no suffix
+
+        :param file: the file or directory to write
+        """
         path = Path(file)
 
-        with path.open("w") as f:
-            json.dump(nx.node_link_data(self.graph), f)
+        if path.suffix == "":
+            self.road_graph.to_directory(path)
+        else:
+            with path.open("w") as f:
+                json.dump(nx.node_link_data(self.graph), f)
 
     def route(self, origin: EntityPosition, destination: EntityPosition) -> Route:
         """
@@ -149,6 +297,8 @@ class OSMRoadNetwork(RoadNetwork):
         if origin == destination:
             return empty_route()
 
+        profiling.count("routes_computed")
+
         # start path search from the end of the origin link, terminate search at the start of the destination link
         extract_src_err, src_nodes = extract_node_ids(origin.link_id)
         extract_dst_err, dst_nodes = extract_node_ids(destination.link_id)
@@ -167,9 +317,7 @@ class OSMRoadNetwork(RoadNetwork):
             destination_node_id, _ = dst_nodes
 
             # node-oriented shortest path from the end of the origin link to the beginning of the destination link
-            nx_path = nx.shortest_path(
-                self.graph, origin_node_id, destination_node_id, weight="travel_time"
-            )
+            nx_path = self.routing_engine.node_path(origin_node_id, destination_node_id)
             link_path_error, inner_link_path = route_from_nx_path(nx_path, self.link_helper.links)
 
             if link_path_error:
@@ -213,6 +361,140 @@ class OSMRoadNetwork(RoadNetwork):
             distance = route_distance_km(self.route(o, d))
             return distance
 
+    def distance_pairs_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        Returns the road network distance from each origin to the destination at the same
+        index, snapping every geoid to the road network with one spatial index query.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids, the same length as origins
+        :return: distances in kilometers, shape (origins,)
+        """
+        n = len(origins)
+        positions = self.positions_from_geoids(list(origins) + list(destinations))
+        result = np.zeros(n, dtype=np.float64)
+        for i, (o, d) in enumerate(zip(positions[:n], positions[n:])):
+            if o is None or d is None:
+                log.error(
+                    f"failed finding nearest links to distance query between GeoIds {origins[i]}, {destinations[i]}"
+                )
+            else:
+                result[i] = route_distance_km(self.route(o, d))
+        return result
+
+    def route_matrix(self, origins: Sequence[GeoId], destinations: Sequence[GeoId]) -> np.ndarray:
+        """
+        Returns the travel time of the route between every origin and every destination,
+        running one shortest path tree search per distinct origin instead of one per pair.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: travel times in seconds, shape (origins, destinations); inf where no route exists
+        """
+        return self._link_cost_matrix(
+            origins, destinations, "travel_time_seconds", lambda l: l.travel_time_seconds
+        )
+
+    def distance_matrix_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        Returns the road network distance between every origin and every destination,
+        running one shortest path tree search per distinct origin instead of one per pair.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: distances in kilometers, shape (origins, destinations); inf where no route exists
+        """
+        return self._link_cost_matrix(origins, destinations, "distance_km", lambda l: l.distance_km)
+
+    def _edge_cost_matrix(self, name: str, link_cost: Callable[[Link], float]) -> csr_matrix:
+        """
+        a sparse matrix of a Link attribute aligned with the routing engine's travel time
+        matrix, built on first use
+
+        :param name: the name to cache this matrix by
+        :param link_cost: gets the cost from a Link
+        :return: the edge cost matrix
+        """
+        matrix = self._edge_costs.get(name)
+        if matrix is None:
+            road_graph = self.road_graph
+            costs = np.zeros(road_graph.edge_count, dtype=np.float64)
+            for i, (src, dst) in enumerate(zip(road_graph.edge_sources(), road_graph.indices)):
+                link_id = create_link_id(road_graph.node_id(src), road_graph.node_id(dst))
+                link = self.link_helper.links.get(link_id)
+                costs[i] = link_cost(link) if link is not None else np.inf
+            matrix = road_graph.edge_matrix(costs)
+            self._edge_costs[name] = matrix
+        return matrix
+
+    def _link_cost_matrix(
+        self,
+        origins: Sequence[GeoId],
+        destinations: Sequence[GeoId],
+        name: str,
+        link_cost: Callable[[Link], float],
+    ) -> np.ndarray:
+        """
+        sums a Link cost along the same routes that OSMRoadNetwork.route would produce: the
+        origin link, the fastest path from the end of the origin link to the start of the
+        destination link, and the destination link.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :param name: the name of the cost, used to cache edge costs
+        :param link_cost: gets the cost from a Link
+        :return: the cost matrix, shape (origins, destinations)
+        """
+        result = np.full((len(origins), len(destinations)), np.inf)
+        if len(origins) == 0 or len(destinations) == 0:
+            return result
+
+        def _endpoint(geoid: GeoId, is_origin: bool):
+            position = self.position_from_geoid(geoid)
+            link = self.link_from_link_id(position.link_id) if position else None
+            err, node_ids = extract_node_ids(link.link_id) if link else (None, None)
+            if position is None or link is None or err or node_ids is None:
+                log.error(f"failed finding nearest link to matrix query GeoId {geoid}")
+                return None
+            src_node, dst_node = node_ids
+            return position, dst_node if is_origin else src_node, link_cost(link)
+
+        o_endpoints = [_endpoint(o, True) for o in origins]
+        d_endpoints = [_endpoint(d, False) for d in destinations]
+        valid_o = [i for i, e in enumerate(o_endpoints) if e is not None]
+        valid_d = [j for j, e in enumerate(d_endpoints) if e is not None]
+        if not valid_o or not valid_d:
+            return result
+
+        # one shortest path tree per distinct origin node
+        origin_nodes = list(dict.fromkeys(o_endpoints[i][1] for i in valid_o))
+        sources, predecessors = self.routing_engine.shortest_path_trees(origin_nodes)
+        tree_costs = accumulate_along_tree(
+            sources, predecessors, self._edge_cost_matrix(name, link_cost)
+        )
+
+        tree_row = {node: row for row, node in enumerate(origin_nodes)}
+        o_rows = np.array([tree_row[o_endpoints[i][1]] for i in valid_o])
+        o_costs = np.array([o_endpoints[i][2] for i in valid_o])
+        d_cols = np.array([self.road_graph.node_index(d_endpoints[j][1]) for j in valid_d])
+        d_costs = np.array([d_endpoints[j][2] for j in valid_d])
+
+        inner = tree_costs[o_rows[:, None], d_cols[None, :]]
+        costs = o_costs[:, None] + inner + d_costs[None, :]
+
+        # a route between identical positions is empty
+        o_positions = [o_endpoints[i][0] for i in valid_o]
+        d_positions = [d_endpoints[j][0] for j in valid_d]
+        same = np.array([[o == d for d in d_positions] for o in o_positions])
+        costs = np.where(same, 0.0, costs)
+
+        result[np.ix_(valid_o, valid_d)] = costs
+        return result
+
     def link_from_geoid(self, geoid: GeoId) -> Optional[Link]:
         """
         Returns the closest link to a geoid.
@@ -228,6 +510,24 @@ class OSMRoadNetwork(RoadNetwork):
         else:
             return link
 
+    def positions_from_geoids(self, geoids: Sequence[GeoId]) -> List[Optional[EntityPosition]]:
+        """
+        Returns a position for each of a batch of geoids, snapping them all to their nearest
+        links with one spatial index query.
+
+        :param geoids: the geoids to snap to the road network
+        :return: the position on the link nearest to each geoid, or None where none was found
+        """
+        links = self.link_helper.links_by_geoids(geoids)
+        positions: List[Optional[EntityPosition]] = []
+        for geoid, link in zip(geoids, links):
+            if link is None:
+                log.warning(f"unable to find nearest link to geoid {geoid}")
+                positions.append(None)
+            else:
+                positions.append(position_on_link(link, geoid))
+        return positions
+
     def link_from_link_id(self, link_id: LinkId) -> Optional[Link]:
         """
         look up the provided LinkId in the LinkHelper table
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import functools as ft
-from typing import Union, TYPE_CHECKING
+from typing import Sequence, TYPE_CHECKING
 
 import immutables
 from networkx.classes.reportviews import NodeView
@@ -38,7 +38,7 @@ def safe_get_node_coordinates(
 
 
 def route_from_nx_path(
-    nx_path: Union[list, dict], link_lookup: immutables.Map[LinkId, Link]
+    nx_path: Sequence[NodeId], link_lookup: immutables.Map[LinkId, Link]
 ) -> Tuple[Optional[Exception], Optional[Route]]:
     """
     takes a networkx shortest path result (a list of node ids) and turns it into a Route (list of Links)
@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import heapq
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+from nrel.hive.model.roadnetwork.osm.csr_road_graph import CSRRoadGraph, NodeId
+
+log = logging.getLogger(__name__)
+
+NodePath = Tuple[NodeId, ...]
+
+
+def accumulate_along_tree(
+    sources: np.ndarray, predecessors: np.ndarray, edge_cost: csr_matrix
+) -> np.ndarray:
+    """
+    sums an edge cost along shortest path trees, from each tree root to every node.
+    uses pointer jumping so the work is vectorized and takes log(tree depth) passes.
+
+    :param sources: the root node index of each tree, shape (trees,)
+    :param predecessors: scipy shortest path predecessor arrays, shape (trees, nodes)
+    :param edge_cost: the cost of each edge, with the same sparsity as the routing graph
+    :return: the accumulated cost from each root to each node, inf where unreachable
+    """
+    trees, n = predecessors.shape
+    rows = np.arange(trees)[:, None]
+    nodes = np.broadcast_to(np.arange(n), (trees, n))
+    has_parent = predecessors >= 0
+
+    # nodes without a parent (the roots, and any unreachable nodes) are their own ancestor
+    ancestor = np.where(has_parent, predecessors, nodes)
+    cost = np.zeros((trees, n), dtype=np.float64)
+    if has_parent.any():
+        edge_values = edge_cost[ancestor[has_parent], nodes[has_parent]]
+        cost[has_parent] = np.asarray(edge_values).ravel()
+
+    # roots have zero cost, so jumping past them adds nothing
+    while True:
+        next_ancestor = ancestor[rows, ancestor]
+        if np.array_equal(next_ancestor, ancestor):
+            break
+        cost = cost + cost[rows, ancestor]
+        ancestor = next_ancestor
+
+    return np.where(ancestor == sources[:, None], cost, np.inf)
+
+
+class LandmarkIndex(NamedTuple):
+    """
+    precomputed travel times to and from a small set of landmark nodes. by the triangle
+    inequality, d(L, t) - d(L, v) and d(v, L) - d(t, L) bound the travel time from v to t
+    from below for every landmark L, which gives an A* search a goal-directed potential.
+
+    :param node_ids: the node ids of the road graph the index was built on
+    :param from_landmark: travel time from each landmark to each node, shape (landmarks, nodes)
+    :param to_landmark: travel time from each node to each landmark, shape (landmarks, nodes)
+    """
+
+    node_ids: np.ndarray
+    from_landmark: np.ndarray
+    to_landmark: np.ndarray
+
+    @property
+    def landmark_count(self) -> int:
+        return self.from_landmark.shape[0]
+
+    @classmethod
+    def build(cls, road_graph: CSRRoadGraph, landmarks: int) -> LandmarkIndex:
+        """
+        selects landmarks by farthest-point sampling and computes their travel time trees
+
+        :param road_graph: the road network graph
+        :param landmarks: the number of landmarks to select
+        :return: the landmark index
+        """
+        matrix = road_graph.travel_time_matrix()
+        n = road_graph.node_count
+        k = min(landmarks, n)
+
+        # each new landmark is the node farthest from all landmarks selected so far
+        selected: List[int] = []
+        from_rows: List[np.ndarray] = []
+        nearest = np.full(n, np.inf)
+        next_landmark = 0
+        for _ in range(k):
+            selected.append(next_landmark)
+            row = dijkstra(matrix, indices=next_landmark)
+            from_rows.append(row)
+            nearest = np.minimum(nearest, row)
+            next_landmark = int(np.argmax(np.where(np.isfinite(nearest), nearest, -1)))
+
+        from_landmark = np.array(from_rows).reshape(k, n)
+        to_landmark = dijkstra(matrix.T.tocsr(), indices=selected).reshape(k, n)
+        return LandmarkIndex(road_graph.node_ids, from_landmark, to_landmark)
+
+    @classmethod
+    def from_file(cls, file: Union[str, Path], road_graph: CSRRoadGraph) -> LandmarkIndex:
+        """
+        loads a landmark index written by to_file
+
+        :param file: the .npz file to read
+        :param road_graph: the road network graph the index was built on
+        :return: the landmark index
+        """
+        with np.load(file) as data:
+            node_ids = data["node_ids"]
+            from_landmark = data["from_landmark"]
+            to_landmark = data["to_landmark"]
+        if not np.array_equal(node_ids, road_graph.node_ids):
+            raise ValueError(f"landmark file {file} was built on a different road network")
+        return LandmarkIndex(road_graph.node_ids, from_landmark, to_landmark)
+
+    def to_file(self, file: Union[str, Path], **metadata):
+        """
+        writes this landmark index to a .npz file
+
+        :param file: the file to write
+        :param metadata: additional arrays to store, such as a fingerprint of the source network
+        """
+        np.savez(
+            file,
+            node_ids=self.node_ids,
+            from_landmark=self.from_landmark,
+            to_landmark=self.to_landmark,
+            **metadata,
+        )
+
+    def lower_bounds(self, destination: int) -> np.ndarray:
+        """
+        the landmark lower bound on the travel time from every node to a destination
+
+        :param destination: the destination node index
+        :return: a lower bound on the shortest travel time from each node, in seconds
+        """
+        from_target = self.from_landmark[:, destination, None]
+        to_target = self.to_landmark[:, destination, None]
+        with np.errstate(invalid="ignore"):
+            bounds = np.maximum(from_target - self.from_landmark, self.to_landmark - to_target)
+        # nodes unreachable from or to a landmark give nan bounds, which bound nothing
+        return np.fmax.reduce(bounds, axis=0, initial=0.0)
+
+
+def landmark_file_for(road_network_file: Union[str, Path]) -> Path:
+    """
+    the landmark index is persisted next to the road network file it was built from
+
+    :param road_network_file: the road network file
+    :return: the path to the landmark index file
+    """
+    path = Path(road_network_file)
+    return path.with_name(f"{path.stem}.landmarks.npz")
+
+
+def _file_fingerprint(file: Path) -> np.ndarray:
+    stat = file.stat()
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def load_or_build_landmarks(
+    road_graph: CSRRoadGraph, road_network_file: Union[str, Path], landmarks: int
+) -> LandmarkIndex:
+    """
+    loads the landmark index persisted next to the road network file when it is
+    fresh, otherwise builds it and attempts to persist it for later runs
+
+    :param road_graph: the road network graph
+    :param road_network_file: the file the graph was read from
+    :param landmarks: the number of landmarks
+    :return: the landmark index
+    """
+    source = Path(road_network_file)
+    file = landmark_file_for(source)
+    fingerprint = _file_fingerprint(source)
+    if file.is_file():
+        try:
+            with np.load(file) as data:
+                fresh = np.array_equal(data["source_fingerprint"], fingerprint)
+            if fresh:
+                index = LandmarkIndex.from_file(file, road_graph)
+                if index.landmark_count == landmarks:
+                    return index
+        except (OSError, KeyError, ValueError) as e:
+            log.warning(f"unable to read landmark index {file}, rebuilding: {e}")
+
+    index = LandmarkIndex.build(road_graph, landmarks)
+    try:
+        index.to_file(file, source_fingerprint=fingerprint)
+    except OSError as e:
+        log.warning(f"unable to write landmark index to {file}: {e}")
+    return index
+
+
+class OSMRoutingEngine:
+    """
+    computes shortest travel time node paths over a CSR road graph, memoizing recent results
+    in a bounded LRU cache keyed by (origin node, destination node). single paths are found by
+    an A* search that stops when it settles the destination, directed by the landmark lower
+    bounds when a landmark index is provided (ALT) and a plain Dijkstra search otherwise.
+    batches of origins are routed with scipy's whole-graph Dijkstra search instead.
+    """
+
+    def __init__(
+        self,
+        road_graph: CSRRoadGraph,
+        cache_size: int = 10000,
+        landmarks: Optional[LandmarkIndex] = None,
+    ):
+        self.road_graph = road_graph
+        self.cache_size = cache_size
+        self.landmarks = landmarks
+        self.cache: OrderedDict[Tuple[NodeId, NodeId], NodePath] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._travel_times: Optional[csr_matrix] = None
+        self._adjacency: Optional[Tuple[List[int], List[int], List[float]]] = None
+
+    @property
+    def travel_times(self) -> csr_matrix:
+        """
+        the sparse matrix of edge travel times searched by the routing engine
+        """
+        if self._travel_times is None:
+            self._travel_times = self.road_graph.travel_time_matrix()
+        return self._travel_times
+
+    @property
+    def adjacency(self) -> Tuple[List[int], List[int], List[float]]:
+        """
+        the CSR row pointers, edge heads and edge travel times as python lists, which the
+        A* search reads one edge at a time much faster than numpy arrays
+        """
+        if self._adjacency is None:
+            matrix = self.travel_times
+            self._adjacency = (
+                matrix.indptr.tolist(),
+                matrix.indices.tolist(),
+                matrix.data.tolist(),
+            )
+        return self._adjacency
+
+    def _node_index(self, node_id: NodeId) -> int:
+        index = self.road_graph.node_index(node_id)
+        if index is None:
+            raise KeyError(f"node {node_id} is not in the road network")
+        return index
+
+    def shortest_path_trees(self, origins: Sequence[NodeId]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        runs one single-source Dijkstra search per origin over the whole graph
+
+        :param origins: the origin nodes
+        :return: the origin node indices, and the predecessor arrays of each shortest path tree
+        """
+        sources = np.array([self._node_index(o) for o in origins], dtype=np.int64)
+        if len(sources) == 0:
+            return sources, np.zeros((0, self.road_graph.node_count), dtype=np.int32)
+        _, predecessors = dijkstra(self.travel_times, indices=sources, return_predecessors=True)
+        return sources, predecessors.reshape(len(sources), -1)
+
+    def node_path(self, origin: NodeId, destination: NodeId) -> NodePath:
+        """
+        the fastest path between two nodes
+
+        :param origin: the origin node
+        :param destination: the destination node
+        :return: the node ids along the path, including the origin and destination
+        """
+        key = (origin, destination)
+        path = self.cache.get(key)
+        if path is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return path
+
+        self.misses += 1
+        source = self._node_index(origin)
+        target = self._node_index(destination)
+        predecessors = self._search(source, target)
+        if target not in predecessors:
+            raise ValueError(f"no path from node {origin} to node {destination}")
+
+        indices = [target]
+        while indices[-1] != source:
+            indices.append(predecessors[indices[-1]])
+        path = tuple(self.road_graph.node_id(i) for i in reversed(indices))
+
+        if self.cache_size > 0:
+            self.cache[key] = path
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return path
+
+    def _search(self, source: int, target: int) -> Dict[int, int]:
+        """
+        A* search from source to target, settling nodes in order of travel time plus the
+        landmark lower bound on the remaining travel time. the landmark bounds are consistent,
+        so each node is settled once and the search stops as soon as the target is settled.
+
+        :param source: the origin node index
+        :param target: the destination node index
+        :return: the predecessor of each settled node, including the target when reachable
+        """
+        indptr, heads, travel_times = self.adjacency
+        potential = None if self.landmarks is None else self.landmarks.lower_bounds(target)
+
+        distance: Dict[int, float] = {source: 0.0}
+        predecessors: Dict[int, int] = {source: -1}
+        settled = set()
+        frontier = [(0.0, source)]
+        while frontier:
+            _, node = heapq.heappop(frontier)
+            if node in settled:
+                continue
+            if node == target:
+                return predecessors
+            settled.add(node)
+            node_distance = distance[node]
+            for edge in range(indptr[node], indptr[node + 1]):
+                head = heads[edge]
+                head_distance = node_distance + travel_times[edge]
+                if head in settled or head_distance >= distance.get(head, np.inf):
+                    continue
+                distance[head] = head_distance
+                predecessors[head] = node
+                priority = head_distance
+                if potential is not None:
+                    # an infinite bound means the target cannot be reached through this node
+                    priority += float(potential[head])
+                    if priority == np.inf:
+                        continue
+                heapq.heappush(frontier, (priority, head))
+
+        predecessors.pop(target, None)
+        return predecessors
+
+    def clear_cache(self):
+        self.cache.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,13 +1,14 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import List, Optional, Sequence
 
 import h3
+import numpy as np
 
 from nrel.hive.model.entity_position import EntityPosition
 from nrel.hive.model.roadnetwork.link import Link
-from nrel.hive.model.roadnetwork.route import Route
+from nrel.hive.model.roadnetwork.route import Route, route_travel_time_seconds
 from nrel.hive.model.sim_time import SimTime
 from nrel.hive.util.typealiases import GeoId, H3Resolution, LinkId
 from nrel.hive.util.units import Kilometers
@@ -43,6 +44,43 @@ class RoadNetwork(ABC):
         :return: the distance in kilometers.
         """
 
+    def route_matrix(self, origins: Sequence[GeoId], destinations: Sequence[GeoId]) -> np.ndarray:
+        """
+        Returns the travel time of the route between every origin and every destination.
+        this default implementation routes each pair; road networks should override it
+        with a batched implementation.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: travel times in seconds, shape (origins, destinations); inf where no route exists
+        """
+        result = np.full((len(origins), len(destinations)), np.inf)
+        for i, origin in enumerate(origins):
+            o = self.position_from_geoid(origin)
+            for j, destination in enumerate(destinations):
+                d = self.position_from_geoid(destination)
+                if o is not None and d is not None:
+                    result[i, j] = route_travel_time_seconds(self.route(o, d))
+        return result
+
+    def distance_matrix_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        Returns the road network distance between every origin and every destination.
+        this default implementation calls distance_by_geoid_km for each pair; road networks
+        should override it with a batched implementation.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids
+        :return: distances in kilometers, shape (origins, destinations)
+        """
+        result = np.zeros((len(origins), len(destinations)))
+        for i, origin in enumerate(origins):
+            for j, destination in enumerate(destinations):
+                result[i, j] = self.distance_by_geoid_km(origin, destination)
+        return result
+
     @abstractmethod
     def link_from_link_id(self, link_id: LinkId) -> Optional[Link]:
         """
@@ -74,15 +112,34 @@ class RoadNetwork(ABC):
         if not link:
             return None
         else:
-            hexes_on_link = h3.h3_line(link.start, link.end)
-            if geoid in hexes_on_link:
-                position = EntityPosition(link.link_id, geoid)
-                return position
-            else:
-                hexes_by_dist = sorted(hexes_on_link, key=lambda h: h3.h3_distance(geoid, h))
-                closest_hex_to_query = hexes_by_dist[0]
-                position = EntityPosition(link.link_id, closest_hex_to_query)
-                return position
+            return position_on_link(link, geoid)
+
+    def positions_from_geoids(self, geoids: Sequence[GeoId]) -> List[Optional[EntityPosition]]:
+        """
+        returns a position for each of a batch of GeoIds. this default implementation calls
+        position_from_geoid for each GeoId; road networks should override it with a batched
+        nearest link search.
+
+        :param geoids: the locations to position
+        :return: the position on the link nearest to each GeoId, or None where none was found
+        """
+        return [self.position_from_geoid(geoid) for geoid in geoids]
+
+    def distance_pairs_km(
+        self, origins: Sequence[GeoId], destinations: Sequence[GeoId]
+    ) -> np.ndarray:
+        """
+        Returns the road network distance from each origin to the destination at the same
+        index. this default implementation calls distance_by_geoid_km for each pair.
+
+        :param origins: the origin geoids
+        :param destinations: the destination geoids, the same length as origins
+        :return: distances in kilometers, shape (origins,)
+        """
+        return np.array(
+            [self.distance_by_geoid_km(o, d) for o, d in zip(origins, destinations)],
+            dtype=np.float64,
+        )
 
     @abstractmethod
     def geoid_within_geofence(self, geoid: GeoId) -> bool:
@@ -102,3 +159,20 @@ class RoadNetwork(ABC):
         :param sim_time:
         :return:
         """
+
+
+def position_on_link(link: Link, geoid: GeoId) -> EntityPosition:
+    """
+    places a GeoId on a Link. if the GeoId does not exist on the line of GeoIds coincident
+    with the Link, then the nearest one is selected
+
+    :param link: the link nearest to the GeoId
+    :param geoid: the location to place on the link
+    :return: the position on the link nearest to the GeoId
+    """
+    hexes_on_link = h3.h3_line(link.start, link.end)
+    if geoid in hexes_on_link:
+        return EntityPosition(link.link_id, geoid)
+    else:
+        hexes_by_dist = sorted(hexes_on_link, key=lambda h: h3.h3_distance(geoid, h))
+        return EntityPosition(link.link_id, hexes_by_dist[0])
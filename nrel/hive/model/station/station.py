@@ -4,7 +4,7 @@ import functools as ft
 import logging
 from dataclasses import dataclass, replace
 from distutils.util import strtobool
-from typing import Dict, Optional, Union
+from typing import Dict, NamedTuple, Optional, Union
 
 import h3
 import immutables
@@ -32,6 +32,21 @@ from nrel.hive.util.validation import validate_fields
 log = logging.getLogger(__name__)
 
 
+class StationAccess(NamedTuple):
+    """
+    the parts of a station that decide which vehicles can charge there. they change far less
+    often than the station, whose charger states change as vehicles come and go.
+
+    :param geoid: the location of the station
+    :param membership: the memberships with access to the station
+    :param charger_ids: the types of charger at the station
+    """
+
+    geoid: GeoId
+    membership: Membership
+    charger_ids: FrozenSet[ChargerId]
+
+
 @dataclass(frozen=True)
 class Station(Entity):
     """
@@ -66,6 +81,10 @@ class Station(Entity):
     def geoid(self) -> GeoId:
         return self.position.geoid
 
+    @property
+    def access(self) -> StationAccess:
+        return StationAccess(self.geoid, self.membership, frozenset(self.state.keys()))
+
     @classmethod
     def build(
         cls,
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import threading
+from queue import Queue
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from nrel.hive.reporting import profiling
+from nrel.hive.reporting.reporter import Report, Reporter
+
+if TYPE_CHECKING:
+    from nrel.hive.runner.runner_payload import RunnerPayload
+
+
+class AsyncReporter(Reporter):
+    """
+    a Reporter that runs its handlers on a background thread, so that writing the outputs of
+    one time step overlaps with simulating the next. the reports and the RunnerPayload of a
+    time step are immutable, so they are handed to the thread as they are.
+
+    at most queue_size time steps wait to be handled. when the queue is full, flush blocks the
+    simulation until the handlers catch up. an error raised by a handler is raised again by
+    the next call to flush, drain or close.
+
+    when profiling, the reports of a time step are counted as they are queued, while the time
+    spent in each handler is recorded in whichever time step is being simulated as it runs.
+    """
+
+    def __init__(self, queue_size: int = 8):
+        super().__init__()
+        self.queue: Queue[Optional[Tuple[List[Report], RunnerPayload]]] = Queue(
+            maxsize=max(1, queue_size)
+        )
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+
+    def flush(self, runner_payload: RunnerPayload):
+        """
+        queues the reports of this time step to be handled on the background thread
+
+        :param runner_payload: the runner payload at the end of this time step
+        """
+        self._raise_error()
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._handle_queue, daemon=True)
+            self.thread.start()
+        profiling.count("reports_filed", len(self.reports))
+        with profiling.profile("reporter.queue_wait"):
+            self.queue.put((self.reports, runner_payload))
+        self.reports = []
+
+    def drain(self):
+        """
+        waits until every queued time step has been handled
+        """
+        if self.thread is not None:
+            self.queue.join()
+        self._raise_error()
+
+    def close(self, runner_payload: RunnerPayload):
+        """
+        handles any queued time steps, stops the background thread and closes the handlers
+
+        :param runner_payload: the final runner payload
+        """
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        try:
+            self._raise_error()
+        finally:
+            super().close(runner_payload)
+
+    def _handle_queue(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                elif self.error is None:
+                    # after an error, queued time steps are dropped so the simulation never blocks
+                    reports, runner_payload = item
+                    with profiling.use_profiler(self.profiler):
+                        for handler in self.handlers:
+                            with profiling.profile(f"handler.{type(handler).__name__}"):
+                                handler.handle(reports, runner_payload)
+            except BaseException as e:
+                self.error = e
+            finally:
+                self.queue.task_done()
+
+    def _raise_error(self):
+        if self.error is not None:
+            error = self.error
+            self.error = None
+            raise error
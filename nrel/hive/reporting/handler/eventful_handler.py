@@ -1,12 +1,12 @@
 from __future__ import annotations
 
-import json
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, FrozenSet, List
 
 from nrel.hive.reporting import vehicle_event_ops
 from nrel.hive.reporting.handler.handler import Handler
+from nrel.hive.reporting.log_writer import build_log_writer
 from nrel.hive.reporting.report_type import ReportType
 
 if TYPE_CHECKING:
@@ -19,15 +19,26 @@ log = logging.getLogger(__name__)
 
 class EventfulHandler(Handler):
     """
-    handles events and appends them to the event.log output file based on global logging settings
+    handles events and appends them to the event log output based on global logging settings
     """
 
     def __init__(self, global_config: GlobalConfig, scenario_output_directory: Path):
-        log_path = scenario_output_directory / "event.log"
-        self.log_file = open(log_path, "a")
+        self.log_writer = build_log_writer(
+            scenario_output_directory,
+            "event",
+            global_config.log_format,
+            global_config.log_buffer_size,
+        )
 
         self.global_config = global_config
 
+    def report_types(self) -> FrozenSet[ReportType]:
+        logged = frozenset(self.global_config.log_sim_config) - {ReportType.INSTRUCTION}
+        if ReportType.STATION_LOAD_EVENT in logged:
+            # station load events are aggregated from vehicle charge events
+            return logged | {ReportType.VEHICLE_CHARGE_EVENT}
+        return logged
+
     def handle(self, reports: List[Report], runner_payload: RunnerPayload):
         sim_state = runner_payload.s
 
@@ -42,14 +53,11 @@ class EventfulHandler(Handler):
                 reports_not_instructions, sim_state
             )
             for report in station_load_reports:
-                entry = json.dumps(report.as_json(), default=str)
-                self.log_file.write(entry + "\n")
+                self.log_writer.write(report.as_json())
 
         for report in reports_not_instructions:
             if report.report_type in self.global_config.log_sim_config:
-                report_json = report.as_json()
-                entry = json.dumps(report_json, default=str)
-                self.log_file.write(entry + "\n")
+                self.log_writer.write(report.as_json())
 
     def close(self, runner_payload: RunnerPayload):
-        self.log_file.close()
+        self.log_writer.close()
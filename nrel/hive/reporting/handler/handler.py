@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Any, FrozenSet, List, Optional
 
 if TYPE_CHECKING:
+    from nrel.hive.reporting.report_type import ReportType
     from nrel.hive.reporting.reporter import Report
     from nrel.hive.runner.runner_payload import RunnerPayload
 
@@ -13,6 +14,32 @@ class Handler(ABC):
     A reporting.Handler handles simulation reports in varying ways.
     """
 
+    def report_types(self) -> Optional[FrozenSet[ReportType]]:
+        """
+        the types of reports this handler reads. the Reporter skips building and filing reports
+        that no handler reads.
+
+        :return: the report types, or None if this handler reads every report
+        """
+        return None
+
+    def checkpoint_state(self) -> Optional[Any]:
+        """
+        the results this handler has accumulated in memory, saved with a checkpoint so that a
+        run resumed from it reports on the whole run
+
+        :return: the picklable state of this handler, or None if it has nothing to save
+        """
+        return None
+
+    def restore_state(self, state: Any):
+        """
+        restores the results saved by checkpoint_state
+
+        :param state: the saved state
+        """
+        pass
+
     @abstractmethod
     def handle(self, reports: List[Report], runner_payload: RunnerPayload):
         """
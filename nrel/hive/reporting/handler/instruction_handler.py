@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import json
 import logging
 from pathlib import Path
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, FrozenSet, List
 
 from nrel.hive.reporting.handler.handler import Handler
+from nrel.hive.reporting.log_writer import build_log_writer
 from nrel.hive.reporting.report_type import ReportType
 
 if TYPE_CHECKING:
@@ -18,24 +18,29 @@ log = logging.getLogger(__name__)
 
 class InstructionHandler(Handler):
     """
-    handles events and appends them to the event.log output file based on global logging settings
+    handles instructions and appends them to the instruction log output based on global logging settings
     """
 
     def __init__(self, global_config: GlobalConfig, scenario_output_directory: Path):
-        log_path = scenario_output_directory / "instruction.log"
-        self.log_file = open(log_path, "a")
+        self.log_writer = build_log_writer(
+            scenario_output_directory,
+            "instruction",
+            global_config.log_format,
+            global_config.log_buffer_size,
+        )
 
         self.global_config = global_config
 
+    def report_types(self) -> FrozenSet[ReportType]:
+        return frozenset({ReportType.INSTRUCTION}) & frozenset(self.global_config.log_sim_config)
+
     def handle(self, reports: List[Report], runner_payload: RunnerPayload):
         for report in reports:
             if (
                 report.report_type == ReportType.INSTRUCTION
                 and ReportType.INSTRUCTION in self.global_config.log_sim_config
             ):
-                report_json = report.as_json()
-                entry = json.dumps(report_json, default=str)
-                self.log_file.write(entry + "\n")
+                self.log_writer.write(report.as_json())
 
     def close(self, runner_payload: RunnerPayload):
-        self.log_file.close()
+        self.log_writer.close()
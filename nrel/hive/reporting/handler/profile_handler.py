@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, FrozenSet, List, Optional
+
+from nrel.hive.reporting import profiling
+from nrel.hive.reporting.handler.handler import Handler
+from nrel.hive.reporting.log_writer import ParquetLogWriter
+
+if TYPE_CHECKING:
+    from nrel.hive.reporting.report_type import ReportType
+    from nrel.hive.reporting.reporter import Report
+    from nrel.hive.runner.runner_payload import RunnerPayload
+
+log = logging.getLogger(__name__)
+
+
+class ProfileHandler(Handler):
+    """
+    holds the StepProfiler of a simulation, which the Reporter hands to the runner, and writes
+    the recorded phase timings and counters to a time series file when the simulation closes. the time series is written
+    as parquet when that is the log format, and as csv otherwise.
+    """
+
+    def __init__(
+        self,
+        scenario_output_directory: Path,
+        file_name: str = "profile",
+        log_format: str = "json",
+        log_buffer_size: int = 10000,
+    ):
+        self.profiler = profiling.StepProfiler()
+        self.file_name = file_name
+        if log_format == "parquet":
+            # the writer keeps a file per report type, so the profile rows are written as
+            # reports of type file_name to {file_name}.parquet
+            self.parquet_writer: Optional[ParquetLogWriter] = ParquetLogWriter(
+                scenario_output_directory, log_buffer_size
+            )
+            self.profile_outpath = scenario_output_directory.joinpath(f"{file_name}.parquet")
+        else:
+            self.parquet_writer = None
+            self.profile_outpath = scenario_output_directory.joinpath(f"{file_name}.csv")
+
+    def report_types(self) -> FrozenSet[ReportType]:
+        # the reporter counts the reports that other handlers read
+        return frozenset()
+
+    def handle(self, reports: List[Report], runner_payload: RunnerPayload):
+        """
+        the reporter counts the reports of each time step as it flushes them, on the simulation
+        thread, so there is nothing to handle here
+
+        :param reports: the reports of this time step
+        :param runner_payload: the runner payload
+        """
+        pass
+
+    def close(self, runner_payload: RunnerPayload):
+        """
+        writes the profile
+
+        :param runner_payload: the final runner payload
+        """
+        profile = self.profiler.to_dataframe()
+        if self.parquet_writer is not None:
+            # every row has every column, so the columns are the same in each row group
+            for row in profile.to_dict("records"):
+                self.parquet_writer.write({"report_type": self.file_name, **row})
+            self.parquet_writer.close()
+            if len(profile) == 0:
+                # the parquet writer only creates a file once it has rows to write
+                log.info("no time steps were profiled, so no step profile was written")
+                return
+        else:
+            profile.to_csv(self.profile_outpath, index=False)
+        log.info(f"step profile written to {self.profile_outpath}")
@@ -1,12 +1,11 @@
-import json
-from dataclasses import asdict
 from pathlib import Path
-from typing import List
+from typing import FrozenSet, List
 
 from nrel.hive.config.global_config import GlobalConfig
 from nrel.hive.model.station.station import Station
 from nrel.hive.model.vehicle.vehicle import Vehicle
 from nrel.hive.reporting.handler.handler import Handler
+from nrel.hive.reporting.log_writer import build_log_writer
 from nrel.hive.reporting.report_type import ReportType
 from nrel.hive.reporting.reporter import Report
 from nrel.hive.runner import RunnerPayload
@@ -14,24 +13,40 @@ from nrel.hive.runner import RunnerPayload
 
 class StatefulHandler(Handler):
     """
-    prints the state of entities in the simulation to the state.log output file based on global logging settings
+    prints the state of entities in the simulation to the state log output based on global logging settings,
+    every log_state_interval time steps
     """
 
     def __init__(self, global_config: GlobalConfig, scenario_output_directory: Path):
-        log_path = scenario_output_directory / "state.log"
-        self.log_file = open(log_path, "a")
+        self.log_writer = build_log_writer(
+            scenario_output_directory,
+            "state",
+            global_config.log_format,
+            global_config.log_buffer_size,
+        )
 
         self.global_config = global_config
+        self.steps_handled = 0
+
+    def report_types(self) -> FrozenSet[ReportType]:
+        # entity states are read from the simulation state rather than from reports
+        return frozenset()
 
     def handle(self, reports: List[Report], runner_payload: RunnerPayload):
         """
         reports the driver, vehicle and station state at the current time for all
-        entities, written to state.log.
+        entities, written to the state log on the first time step and every
+        log_state_interval time steps after.
 
         :param reports: ignored
 
         :param runner_payload: provides the current simulation state
         """
+        step = self.steps_handled
+        self.steps_handled += 1
+        if step % max(1, self.global_config.log_state_interval) != 0:
+            return
+
         sim_state = runner_payload.s
         if ReportType.DRIVER_STATE in self.global_config.log_sim_config:
             self._report_entities(
@@ -58,7 +73,7 @@ class StatefulHandler(Handler):
             )
 
     def close(self, runner_payload: RunnerPayload):
-        self.log_file.close()
+        self.log_writer.close()
 
     @staticmethod
     def driver_asdict(vehicle: Vehicle) -> dict:
@@ -99,18 +114,18 @@ class StatefulHandler(Handler):
 
     @staticmethod
     def station_asdict(station: Station) -> dict:
-        out_dict = asdict(station)
-        del out_dict["id"]
-        del out_dict["state"]
-        del out_dict["energy_dispensed"]
-
-        out_dict["station_id"] = station.id
-        out_dict["memberships"] = str(station.membership)
+        # built field by field, as dataclasses.asdict deep copies the charger states
+        out_dict = {
+            "membership": station.membership,
+            "on_shift_access_chargers": station.on_shift_access_chargers,
+            "balance": station.balance,
+            "station_id": station.id,
+            "memberships": str(station.membership),
+        }
 
         # deconstruct origin_link
         out_dict["link_id"] = station.position.link_id
         out_dict["geoid"] = station.position.geoid
-        del out_dict["position"]
 
         # deconstruct charger states
         for key, cs in station.state.items():
@@ -125,5 +140,4 @@ class StatefulHandler(Handler):
             log_dict = asdict(e)
             log_dict["sim_time"] = str(sim_time)
             log_dict["report_type"] = report_type.name
-            entry = json.dumps(log_dict, default=str)
-            self.log_file.write(entry + "\n")
+            self.log_writer.write(log_dict)
@@ -4,7 +4,7 @@ import json
 import logging
 from collections import Counter
 from pathlib import Path
-from typing import TYPE_CHECKING, List, Dict
+from typing import TYPE_CHECKING, Dict, FrozenSet, List
 
 from nrel.hive.reporting.handler.handler import Handler
 from nrel.hive.reporting.handler.summary_stats import SummaryStats
@@ -25,6 +25,21 @@ class StatsHandler(Handler):
     def __init__(self):
         self.stats = SummaryStats()
 
+    def report_types(self) -> FrozenSet[ReportType]:
+        return frozenset(
+            {
+                ReportType.VEHICLE_MOVE_EVENT,
+                ReportType.ADD_REQUEST_EVENT,
+                ReportType.CANCEL_REQUEST_EVENT,
+            }
+        )
+
+    def checkpoint_state(self) -> SummaryStats:
+        return self.stats
+
+    def restore_state(self, state: SummaryStats):
+        self.stats = state
+
     def get_stats(self, rp: RunnerPayload) -> Dict:
         """
         special output specifically for the StatsHandler which produces the
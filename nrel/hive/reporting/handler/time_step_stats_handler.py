@@ -2,9 +2,8 @@ from __future__ import annotations
 
 import logging
 import os
-from collections import Counter
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -17,7 +16,6 @@ from nrel.hive.state.vehicle_state.vehicle_state_type import VehicleStateType
 
 if TYPE_CHECKING:
     from nrel.hive.config import HiveConfig
-    from nrel.hive.model.vehicle.vehicle import Vehicle
     from nrel.hive.runner.runner_payload import RunnerPayload
     from nrel.hive.reporting.reporter import Report
     from nrel.hive.util.typealiases import MembershipId
@@ -39,6 +37,9 @@ class TimeStepStatsHandler(Handler):
         self.timestep_duration_seconds = config.sim.timestep_duration_seconds
 
         self.vehicle_state_names = tuple(vs.name for vs in VehicleStateType)
+        self.vehicle_state_index = {vs: i for i, vs in enumerate(VehicleStateType)}
+        self.servicing_trip_index = self.vehicle_state_index[VehicleStateType.SERVICING_TRIP]
+        self.dispatch_trip_index = self.vehicle_state_index[VehicleStateType.DISPATCH_TRIP]
 
         if config.global_config.log_time_step_stats:
             self.log_time_step_stats = True
@@ -63,6 +64,32 @@ class TimeStepStatsHandler(Handler):
         else:
             self.log_fleet_time_step_stats = False
 
+        # the fleets with a stats row at each time step, after the row for all vehicles
+        self.fleet_row_ids = tuple(self.fleets_data) if self.log_fleet_time_step_stats else ()
+        self._rows_by_memberships: Dict[FrozenSet[MembershipId], Tuple[int, ...]] = {}
+
+    def report_types(self) -> FrozenSet[ReportType]:
+        return frozenset(
+            {
+                ReportType.CANCEL_REQUEST_EVENT,
+                ReportType.VEHICLE_MOVE_EVENT,
+                ReportType.VEHICLE_CHARGE_EVENT,
+            }
+        )
+
+    def checkpoint_state(self) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, List[Dict]]]:
+        data = self.data if self.log_time_step_stats else None
+        fleets_data = self.fleets_data if self.log_fleet_time_step_stats else {}
+        return data, fleets_data
+
+    def restore_state(self, state: Tuple[Optional[List[Dict[str, Any]]], Dict[str, List[Dict]]]):
+        data, fleets_data = state
+        if self.log_time_step_stats and data is not None:
+            self.data = list(data)
+        for fleet_id in self.fleet_row_ids:
+            if fleet_id in fleets_data:
+                self.fleets_data[fleet_id] = list(fleets_data[fleet_id])
+
     def get_time_step_stats(self) -> Optional[DataFrame]:
         """
         return a DataFrame of the time step level statistics.
@@ -94,6 +121,10 @@ class TimeStepStatsHandler(Handler):
         """
         called at each log step. aggregates various statistics to the time bin level
 
+        makes one pass over the vehicles and one over the reports, tagging each with the
+        rows it counts towards (all vehicles, then each fleet), and then sums them per row
+        with numpy.
+
         :param reports: reports for gathering statistics
 
         :param runner_payload
@@ -110,262 +141,154 @@ class TimeStepStatsHandler(Handler):
             / self.timestep_duration_seconds
         )
 
-        # sort reports by type
-        reports_by_type: Dict[ReportType, List[Report]] = {}
-        for report in reports:
-            if report.report_type not in reports_by_type.keys():
-                reports_by_type[report.report_type] = []
-            reports_by_type[report.report_type].append(report)
-
-        # get number of assigned requests in this time step
-        assigned_requests_count = len(
-            sim_state.get_requests(filter_function=lambda r: r.dispatched_vehicle is not None)
+        # get number of assigned and active (unassigned) requests in this time step
+        assigned_requests_count = sum(
+            1 for r in sim_state.requests.values() if r.dispatched_vehicle is not None
         )
-
-        # get number of active requests in this time step (unassigned)
-        active_requests_count = len(sim_state.get_requests()) - assigned_requests_count
-
-        # get number of canceled requests in this time step
-        if ReportType.CANCEL_REQUEST_EVENT in reports_by_type.keys():
-            canceled_requests_count = len(reports_by_type[ReportType.CANCEL_REQUEST_EVENT])
-        else:
-            canceled_requests_count = 0
-
-        if self.log_time_step_stats:
-            # grab all vehicles that are pooling
-            veh_pooling = sim_state.get_vehicles(
-                filter_function=lambda v: v.vehicle_state.vehicle_state_type
-                == VehicleStateType.SERVICING_POOLING_TRIP
+        active_requests_count = len(sim_state.requests) - assigned_requests_count
+
+        n_rows = 1 + len(self.fleet_row_ids)
+        n_states = len(self.vehicle_state_names)
+        chargers = {charger_id: i for i, charger_id in enumerate(env.chargers.keys())}
+
+        # one entry per (vehicle, row) pair, in vehicle order
+        vehicle_row = []
+        vehicle_state = []
+        vehicle_soc = []
+        vehicle_available = []
+        vehicle_boarded = []
+        vehicle_trip_plan = []
+        for v in sim_state.vehicles.values():
+            state_type = v.vehicle_state.vehicle_state_type
+            state = self.vehicle_state_index[state_type]
+            soc = env.mechatronics[v.mechatronics_id].fuel_source_soc(v)
+            available = v.driver_state.available
+            boarded = (
+                len(v.vehicle_state.boarded_requests)  # type: ignore
+                if state_type == VehicleStateType.SERVICING_POOLING_TRIP
+                else 0
             )
-
-            # count the number of vehicles in each vehicle state
-            veh_state_counts = Counter(
-                map(
-                    lambda v: v.vehicle_state.vehicle_state_type.name,
-                    sim_state.get_vehicles(),
-                )
+            trip_plan = (
+                len(v.vehicle_state.trip_plan)  # type: ignore
+                if state_type == VehicleStateType.DISPATCH_POOLING_TRIP
+                else 0
             )
+            for row in self._rows_of(v.membership.memberships, env.fleet_ids):
+                vehicle_row.append(row)
+                vehicle_state.append(state)
+                vehicle_soc.append(soc)
+                vehicle_available.append(available)
+                vehicle_boarded.append(boarded)
+                vehicle_trip_plan.append(trip_plan)
+
+        rows = np.array(vehicle_row, dtype=np.int64)
+        vehicles = np.bincount(rows, minlength=n_rows)
+        state_counts = np.bincount(
+            rows * n_states + np.array(vehicle_state, dtype=np.int64),
+            minlength=n_rows * n_states,
+        ).reshape(n_rows, n_states)
+        drivers_available = np.bincount(
+            rows[np.array(vehicle_available, dtype=bool)], minlength=n_rows
+        )
+        boarded_requests = np.bincount(
+            rows, weights=np.array(vehicle_boarded, dtype=np.int64), minlength=n_rows
+        ).astype(np.int64)
+        trip_plan_requests = np.bincount(
+            rows, weights=np.array(vehicle_trip_plan, dtype=np.int64), minlength=n_rows
+        ).astype(np.int64)
+        # group the SoC values by row, keeping vehicle order within each row
+        by_row = np.argsort(rows, kind="stable")
+        soc_by_row = np.split(
+            np.array(vehicle_soc, dtype=np.float64)[by_row], np.cumsum(vehicles)[:-1]
+        )
+
+        # one entry per (report, row) pair, in report order
+        move_row = []
+        move_distance = []
+        charge_row = []
+        canceled_requests_count = 0
+        for report in reports:
+            if report.report_type == ReportType.VEHICLE_MOVE_EVENT:
+                distance = float(report.report["distance_km"])
+                for row in self._rows_of(report.report["vehicle_memberships"], env.fleet_ids):
+                    move_row.append(row)
+                    move_distance.append(distance)
+            elif report.report_type == ReportType.VEHICLE_CHARGE_EVENT:
+                charger = chargers.get(report.report["charger_id"])
+                if charger is not None:
+                    for row in self._rows_of(report.report["vehicle_memberships"], env.fleet_ids):
+                        charge_row.append(row * len(chargers) + charger)
+            elif report.report_type == ReportType.CANCEL_REQUEST_EVENT:
+                canceled_requests_count += 1
+
+        # bincount sums the weights in order, as summing the distances in a loop would
+        moves = np.bincount(np.array(move_row, dtype=np.int64), minlength=n_rows)
+        vkt = np.bincount(
+            np.array(move_row, dtype=np.int64),
+            weights=np.array(move_distance, dtype=np.float64),
+            minlength=n_rows,
+        )
+        charger_counts = np.bincount(
+            np.array(charge_row, dtype=np.int64), minlength=n_rows * len(chargers)
+        ).reshape(n_rows, len(chargers))
 
-            stats_row = {
+        def _stats_row(row: int, assigned_requests: int) -> Dict[str, Any]:
+            stats_row: Dict[str, Any] = {
                 "time_step": time_step,
                 "sim_time": sim_time.as_iso_time(),
+                "avg_soc_percent": 100 * np.mean(soc_by_row[row]) if vehicles[row] > 0 else None,
+                "vkt": float(vkt[row]) if moves[row] > 0 else 0,
+                "assigned_requests": assigned_requests,
+                "active_requests": active_requests_count,
+                "canceled_requests": canceled_requests_count,
+                "servicing_requests": state_counts[row, self.servicing_trip_index]
+                + boarded_requests[row],
+                "vehicles": vehicles[row],
             }
+            for i, state in enumerate(self.vehicle_state_names):
+                stats_row[f"vehicles_{state.lower()}"] = state_counts[row, i]
+            stats_row["drivers_available"] = drivers_available[row]
+            stats_row["drivers_unavailable"] = vehicles[row] - drivers_available[row]
+            for charger_id, i in chargers.items():
+                stats_row[f"charger_{charger_id.lower()}"] = charger_counts[row, i]
+            return stats_row
 
-            # get average SOC of vehicles
-            if len(sim_state.get_vehicles()) > 0:
-                stats_row["avg_soc_percent"] = 100 * np.mean(
-                    [
-                        env.mechatronics[v.mechatronics_id].fuel_source_soc(v)
-                        for v in sim_state.get_vehicles()
-                    ]
-                )
-            else:
-                stats_row["avg_soc_percent"] = None
-
-            # get the total vkt
-            if ReportType.VEHICLE_MOVE_EVENT in reports_by_type.keys():
-                stats_row["vkt"] = sum(
-                    [
-                        float(me.report["distance_km"])
-                        for me in reports_by_type[ReportType.VEHICLE_MOVE_EVENT]
-                    ]
-                )
-            else:
-                stats_row["vkt"] = 0
-
-            # add assigned request count
-            stats_row["assigned_requests"] = assigned_requests_count
-
-            # get number of active requests in this time step (unassigned)
-            stats_row["active_requests"] = active_requests_count
-
-            # get number of canceled requests in this time step
-            stats_row["canceled_requests"] = canceled_requests_count
-
-            # get count of requests currently being serviced by a vehicle
-            pooling_request_count = sum(
-                [len(v.vehicle_state.boarded_requests) for v in veh_pooling]  # type: ignore
-            )
-            stats_row["servicing_requests"] = (
-                veh_state_counts[VehicleStateType.SERVICING_TRIP.name] + pooling_request_count
-            )
-
-            # add the number of vehicles in each vehicle state
-            stats_row["vehicles"] = len(sim_state.vehicles)
-            for state in self.vehicle_state_names:
-                stats_row[f"vehicles_{state.lower()}"] = veh_state_counts[state]
-
-            available_driver_counts = Counter(
-                map(
-                    lambda v: v.driver_state.available,
-                    sim_state.get_vehicles(),
-                )
-            )
-            stats_row["drivers_available"] = available_driver_counts[True]
-            stats_row["drivers_unavailable"] = available_driver_counts[False]
-
-            # count number of chargers in use by type
-            if ReportType.VEHICLE_CHARGE_EVENT in reports_by_type.keys():
-                charger_counts = Counter(
-                    map(
-                        lambda r: r.report["charger_id"],
-                        reports_by_type[ReportType.VEHICLE_CHARGE_EVENT],
-                    )
-                )
-                for charger in env.chargers.keys():
-                    stats_row[f"charger_{charger.lower()}"] = charger_counts[charger]
-            else:
-                for charger in env.chargers.keys():
-                    stats_row[f"charger_{charger.lower()}"] = 0
-
-            # append the statistics row to the data list
-            self.data.append(stats_row)
+        if self.log_time_step_stats:
+            self.data.append(_stats_row(0, assigned_requests_count))
 
         if self.log_fleet_time_step_stats:
-            for fleet_id in self.fleets_data.keys():
-
-                def _get_veh_filter_func(
-                    membership_id: MembershipId,
-                ) -> Callable[[Vehicle], bool]:
-                    if membership_id == "none":
-                        return lambda v: not any(set(env.fleet_ids) & set(v.membership.memberships))
-                    else:
-                        return lambda v: fleet_id in v.membership.memberships
-
-                def _get_report_filter_func(
-                    membership_id: MembershipId,
-                ) -> Callable[[Report], bool]:
-                    if membership_id == "none":
-                        return lambda r: not any(
-                            set(env.fleet_ids) & set(r.report["vehicle_memberships"])
-                        )
-                    else:
-                        return lambda r: fleet_id in r.report["vehicle_memberships"]
-
-                # get vehicles in this fleet
-                veh_in_fleet = sim_state.get_vehicles(
-                    filter_function=_get_veh_filter_func(fleet_id)
-                )
-
-                # get vehicle reports in this fleet
-                requests_in_fleet = {}
-                for report_type in reports_by_type:
-                    if report_type in (
-                        ReportType.VEHICLE_MOVE_EVENT,
-                        ReportType.VEHICLE_CHARGE_EVENT,
-                    ):
-                        requests_in_fleet[report_type] = list(
-                            filter(
-                                _get_report_filter_func(fleet_id),
-                                reports_by_type[report_type],
-                            )
-                        )
-
-                # get vehicles pooling in this fleet
-                veh_pooling_in_fleet = list(
-                    filter(
-                        lambda v: v.vehicle_state.vehicle_state_type
-                        == VehicleStateType.SERVICING_POOLING_TRIP,
-                        veh_in_fleet,
-                    )
-                )
-
-                # get vehicles dispatched to service pooling trips in this fleet
-                veh_dispatch_pooling_in_fleet = list(
-                    filter(
-                        lambda v: v.vehicle_state.vehicle_state_type
-                        == VehicleStateType.DISPATCH_POOLING_TRIP,
-                        veh_in_fleet,
-                    )
-                )
-
-                # count the number of vehicles in each vehicle state in this fleet
-                veh_state_counts_in_fleet = Counter(
-                    map(
-                        lambda v: v.vehicle_state.vehicle_state_type.name,
-                        veh_in_fleet,
-                    )
-                )
-
-                # create stats row with the time step
-                fleet_stats_row = {
-                    "time_step": time_step,
-                    "sim_time": sim_time.as_iso_time(),
-                }
-
-                # get average SOC of vehicles in this fleet
-                if len(veh_in_fleet) > 0:
-                    fleet_stats_row["avg_soc_percent"] = 100 * np.mean(
-                        [
-                            env.mechatronics[v.mechatronics_id].fuel_source_soc(v)
-                            for v in veh_in_fleet
-                        ]
-                    )
-                else:
-                    fleet_stats_row["avg_soc_percent"] = None
-
-                # get the total vkt of vehicles in this fleet
-                if ReportType.VEHICLE_MOVE_EVENT in requests_in_fleet.keys():
-                    fleet_stats_row["vkt"] = sum(
-                        [
-                            float(me.report["distance_km"])
-                            for me in requests_in_fleet[ReportType.VEHICLE_MOVE_EVENT]
-                        ]
-                    )
-                else:
-                    fleet_stats_row["vkt"] = 0
-
-                # get number of assigned requests in this fleet
-                assigned_requests = veh_state_counts_in_fleet[VehicleStateType.DISPATCH_TRIP.name]
-                assigned_pooling_requests = sum(
-                    [len(v.vehicle_state.trip_plan) for v in veh_dispatch_pooling_in_fleet]  # type: ignore
+            for row, fleet_id in enumerate(self.fleet_row_ids, start=1):
+                # requests assigned to vehicles of this fleet
+                assigned_requests = (
+                    state_counts[row, self.dispatch_trip_index] + trip_plan_requests[row]
                 )
-                fleet_stats_row["assigned_requests"] = assigned_requests + assigned_pooling_requests
-
-                # add number of active requests in this time step (unassigned)
-                fleet_stats_row["active_requests"] = active_requests_count
-
-                # add number of canceled requests in this time step
-                fleet_stats_row["canceled_requests"] = canceled_requests_count
-
-                # get count of requests currently being serviced by a vehicle
-                servicing_requests = veh_state_counts_in_fleet[VehicleStateType.SERVICING_TRIP.name]
-                servicing_pooling_requests = sum(
-                    [len(v.vehicle_state.boarded_requests) for v in veh_pooling_in_fleet]  # type: ignore
-                )
-                fleet_stats_row["servicing_requests"] = (
-                    servicing_requests + servicing_pooling_requests
-                )
-
-                # add the number of vehicles in each vehicle state in this fleet
-                fleet_stats_row["vehicles"] = len(veh_in_fleet)
-                for state in self.vehicle_state_names:
-                    fleet_stats_row[f"vehicles_{state.lower()}"] = veh_state_counts_in_fleet[state]
+                self.fleets_data[fleet_id].append(_stats_row(row, assigned_requests))
 
-                available_driver_counts_in_fleet = Counter(
-                    map(lambda v: v.driver_state.available, veh_in_fleet)
-                )
-                fleet_stats_row["drivers_available"] = available_driver_counts_in_fleet[True]
-                fleet_stats_row["drivers_unavailable"] = available_driver_counts_in_fleet[False]
-
-                # count number of chargers in use by type
-                if ReportType.VEHICLE_CHARGE_EVENT in requests_in_fleet.keys():
-                    charger_counts_in_fleet = Counter(
-                        map(
-                            lambda r: r.report["charger_id"],
-                            requests_in_fleet[ReportType.VEHICLE_CHARGE_EVENT],
-                        )
-                    )
-                    for charger in env.chargers.keys():
-                        fleet_stats_row[f"charger_{charger.lower()}"] = charger_counts_in_fleet[
-                            charger
-                        ]
-                else:
-                    for charger in env.chargers.keys():
-                        fleet_stats_row[f"charger_{charger.lower()}"] = 0
+    def _rows_of(
+        self,
+        memberships: Optional[Iterable[MembershipId]],
+        fleet_ids: FrozenSet[Optional[MembershipId]],
+    ) -> Tuple[int, ...]:
+        """
+        the stats rows a vehicle, or a report about a vehicle, counts towards: row 0 for all
+        vehicles, and a row per fleet it belongs to, where vehicles in none of the
+        simulation's fleets belong to the "none" fleet
 
-                # append the statistics row to the fleet's data list
-                self.fleets_data[fleet_id].append(fleet_stats_row)
+        :param memberships: the memberships of the vehicle
+        :param fleet_ids: the fleets of the simulation
+        :return: the row indices
+        """
+        key = frozenset(memberships) if memberships is not None else frozenset()
+        rows = self._rows_by_memberships.get(key)
+        if rows is None:
+            in_no_fleet = not (set(fleet_ids) & key)
+            rows = (0,) + tuple(
+                row
+                for row, fleet_id in enumerate(self.fleet_row_ids, start=1)
+                if (in_no_fleet if fleet_id == "none" else fleet_id in key)
+            )
+            self._rows_by_memberships[key] = rows
+        return rows
 
     def close(self, runner_payload: RunnerPayload):
         """
@@ -1,4 +1,4 @@
-from typing import List, Dict
+from typing import Dict, FrozenSet, List
 
 import pandas as pd
 
@@ -24,6 +24,9 @@ class VehicleChargeEventsHandler(Handler):
         }
         self.events = self.prototype.copy()
 
+    def report_types(self) -> FrozenSet[ReportType]:
+        return frozenset({ReportType.VEHICLE_CHARGE_EVENT})
+
     def handle(self, reports: List[Report], runner_payload: RunnerPayload):
         for report in reports:
             if report.report_type == ReportType.VEHICLE_CHARGE_EVENT:
@@ -0,0 +1,199 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from nrel.hive.model.sim_time import SimTime
+
+log = logging.getLogger(__name__)
+
+LOG_FORMATS = ("json", "json.gz", "parquet")
+
+
+class LogWriter(ABC):
+    """
+    writes the records of an output log. records are held in memory and written out in batches
+    of buffer_size records, instead of one write per record.
+    """
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = max(1, buffer_size)
+        self.buffered = 0
+
+    def write(self, record: Dict[str, Any]):
+        """
+        adds a record to the log, writing out the buffered records once the buffer is full
+
+        :param record: the record, with a "report_type" entry
+        """
+        self._buffer(record)
+        self.buffered += 1
+        if self.buffered >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """
+        writes out any buffered records
+        """
+        if self.buffered > 0:
+            self._write_buffer()
+            self.buffered = 0
+
+    @abstractmethod
+    def _buffer(self, record: Dict[str, Any]):
+        """
+        holds a record until the buffer is written out
+
+        :param record: the record
+        """
+
+    @abstractmethod
+    def _write_buffer(self):
+        """
+        writes out the held records
+        """
+
+    @abstractmethod
+    def close(self):
+        """
+        writes out any buffered records and closes the log
+        """
+
+
+class JsonLogWriter(LogWriter):
+    """
+    writes records as newline-delimited json, optionally gzip compressed
+    """
+
+    def __init__(self, path: Path, buffer_size: int, compress: bool = False):
+        super().__init__(buffer_size)
+        self.path = path
+        self.log_file = gzip.open(path, "at", encoding="utf-8") if compress else open(path, "a")
+        self.lines: List[str] = []
+
+    def _buffer(self, record: Dict[str, Any]):
+        self.lines.append(json.dumps(record, default=str))
+
+    def _write_buffer(self):
+        self.log_file.write("\n".join(self.lines) + "\n")
+        self.lines = []
+
+    def close(self):
+        self.flush()
+        self.log_file.close()
+
+
+class ParquetLogWriter(LogWriter):
+    """
+    writes the records of each report type to its own parquet file in a directory, buffering
+    them as columns and writing each full buffer as a row group. requires pyarrow.
+
+    the columns of a file are fixed by its first row group: columns first seen later are
+    dropped with a warning, and missing values are written as nulls.
+    """
+
+    def __init__(self, directory: Path, buffer_size: int):
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "writing parquet logs requires pyarrow, installed with the 'parquet' extra"
+            ) from e
+        super().__init__(buffer_size)
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.columns: Dict[str, Dict[str, List[Any]]] = {}
+        self.row_counts: Dict[str, int] = {}
+        self.writers: Dict[str, Any] = {}
+        self.dropped_columns: Set[Tuple[str, str]] = set()
+
+    def _buffer(self, record: Dict[str, Any]):
+        report_type = str(record["report_type"]).lower()
+        columns = self.columns.setdefault(report_type, {})
+        rows = self.row_counts.get(report_type, 0)
+        for key, value in record.items():
+            column = columns.get(key)
+            if column is None:
+                column = [None] * rows
+                columns[key] = column
+            column.append(_as_parquet_value(value))
+        for column in columns.values():
+            if len(column) == rows:
+                column.append(None)
+        self.row_counts[report_type] = rows + 1
+
+    def _write_buffer(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        for report_type, columns in self.columns.items():
+            rows = self.row_counts[report_type]
+            writer = self.writers.get(report_type)
+            if writer is None:
+                # a column with no values yet is assumed to hold text
+                inferred = pa.table(columns).schema
+                schema = pa.schema(
+                    pa.field(f.name, pa.string()) if pa.types.is_null(f.type) else f
+                    for f in inferred
+                )
+                writer = pq.ParquetWriter(self.directory / f"{report_type}.parquet", schema)
+                self.writers[report_type] = writer
+
+            for name in columns.keys() - set(writer.schema.names):
+                if (report_type, name) not in self.dropped_columns:
+                    log.warning(f"dropping column {name} first seen after {report_type} began")
+                    self.dropped_columns.add((report_type, name))
+            table = pa.Table.from_pydict(
+                {name: columns.get(name, [None] * rows) for name in writer.schema.names},
+                schema=writer.schema,
+            )
+            writer.write_table(table)
+
+        self.columns = {}
+        self.row_counts = {}
+
+    def close(self):
+        self.flush()
+        for writer in self.writers.values():
+            writer.close()
+
+
+def build_log_writer(
+    output_directory: Path, log_name: str, log_format: str, buffer_size: int
+) -> LogWriter:
+    """
+    builds the writer of an output log
+
+    :param output_directory: the scenario output directory
+    :param log_name: the name of the log, such as "event"
+    :param log_format: one of "json", "json.gz" or "parquet"
+    :param buffer_size: the number of records to hold before writing them out
+    :return: the log writer
+    :raises: ValueError if the log format is not supported
+    """
+    if log_format == "json":
+        return JsonLogWriter(output_directory / f"{log_name}.log", buffer_size)
+    elif log_format == "json.gz":
+        return JsonLogWriter(output_directory / f"{log_name}.log.gz", buffer_size, compress=True)
+    elif log_format == "parquet":
+        return ParquetLogWriter(output_directory / log_name, buffer_size)
+    else:
+        raise ValueError(f"log format {log_format} not supported, must be one of {LOG_FORMATS}")
+
+
+def _as_parquet_value(value: Any) -> Any:
+    """
+    keeps the types parquet stores directly, with integers stored as floats so that a column
+    does not change type between row groups, and writes anything else as text
+    """
+    if value is None or isinstance(value, (bool, float, str)):
+        return value
+    elif isinstance(value, int) and not isinstance(value, SimTime):
+        return float(value)
+    else:
+        return str(value)
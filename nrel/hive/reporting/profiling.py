@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, ContextManager, DefaultDict, Dict, Iterator, List, Optional
+
+from pandas import DataFrame
+
+if TYPE_CHECKING:
+    from nrel.hive.model.sim_time import SimTime
+
+# the instrumentation points of the simulation loop call these module-level functions, which
+# do nothing unless the running simulation has a StepProfiler, much like a logger with no
+# handlers. the runner sets the profiler of its simulation for the duration of each time step,
+# so simulations run side by side, in threads or in sequence, never record into one another.
+_active_profiler: ContextVar[Optional[StepProfiler]] = ContextVar("active_profiler", default=None)
+
+_DISABLED = nullcontext()
+
+
+class StepProfiler:
+    """
+    records the wall time spent in each instrumented phase of a simulation time step, along with
+    counters of the work done, as one row per time step.
+
+    phases and counters may be recorded from the background thread of an AsyncReporter, so the
+    current step is only read or changed while holding a lock.
+    """
+
+    def __init__(self):
+        self.rows: List[Dict[str, Any]] = []
+        self.timings: DefaultDict[str, float] = defaultdict(float)
+        self.counts: DefaultDict[str, int] = defaultdict(int)
+        self._step_start = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        adds the wall time spent in the context to a named phase of the current time step
+
+        :param name: the name of the phase
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.timings[name] += elapsed
+
+    def count(self, name: str, n: int = 1):
+        """
+        adds to a named counter of the current time step
+
+        :param name: the name of the counter
+        :param n: the amount to add
+        """
+        with self._lock:
+            self.counts[name] += n
+
+    def end_step(self, sim_time: SimTime):
+        """
+        closes out the current time step, storing its phase timings and counters as a row
+
+        :param sim_time: the simulation time at the end of the step
+        """
+        with self._lock:
+            now = time.perf_counter()
+            row: Dict[str, Any] = {
+                "sim_time": int(sim_time),
+                "step_seconds": now - self._step_start,
+            }
+            row.update({f"{name}_seconds": t for name, t in self.timings.items()})
+            row.update(self.counts)
+            self.rows.append(row)
+            self.timings.clear()
+            self.counts.clear()
+            self._step_start = now
+
+    def to_dataframe(self) -> DataFrame:
+        """
+        the recorded time steps, with a zero wherever a phase or counter did not occur in a step
+
+        :return: a DataFrame with one row per time step
+        """
+        with self._lock:
+            rows = list(self.rows)
+        return DataFrame(rows).fillna(0)
+
+
+@contextmanager
+def use_profiler(profiler: Optional[StepProfiler]) -> Iterator[None]:
+    """
+    records the instrumented phases run in this context, on this thread, with a profiler
+
+    :param profiler: the profiler of the running simulation, or None to not profile
+    """
+    token = _active_profiler.set(profiler)
+    try:
+        yield
+    finally:
+        _active_profiler.reset(token)
+
+
+def active_profiler() -> Optional[StepProfiler]:
+    return _active_profiler.get()
+
+
+def profile(name: str) -> ContextManager:
+    """
+    times a phase of the current time step, when profiling is enabled
+
+    :param name: the name of the phase
+    :return: a context manager around the phase
+    """
+    profiler = _active_profiler.get()
+    return _DISABLED if profiler is None else profiler.timer(name)
+
+
+def count(name: str, n: int = 1):
+    """
+    adds to a counter of the current time step, when profiling is enabled
+
+    :param name: the name of the counter
+    :param n: the amount to add
+    """
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def end_step(sim_time: SimTime):
+    """
+    closes out the current time step, when profiling is enabled
+
+    :param sim_time: the simulation time at the end of the step
+    """
+    profiler = _active_profiler.get()
+    if profiler is not None:
+        profiler.end_step(sim_time)
@@ -1,10 +1,23 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 from immutables import Map
 from pandas import DataFrame
 
+from nrel.hive.reporting import profiling
+from nrel.hive.reporting.handler.profile_handler import ProfileHandler
 from nrel.hive.reporting.handler.stats_handler import StatsHandler
 from nrel.hive.reporting.handler.time_step_stats_handler import TimeStepStatsHandler
 from nrel.hive.reporting.report_type import ReportType
@@ -15,9 +28,36 @@ if TYPE_CHECKING:
     from nrel.hive.reporting.handler.handler import Handler
 
 
+class ReportData(Mapping[str, Any]):
+    """
+    the fields of a report, where fields that are costly to compute are given as functions that
+    are called the first time the field is read. reports only read by handlers that don't use
+    those fields never compute them.
+    """
+
+    def __init__(self, fields: Dict[str, Any], lazy_fields: Dict[str, Callable[[], Any]]):
+        self._fields = fields
+        self._lazy_fields = lazy_fields
+        self._keys = (*fields, *(k for k in lazy_fields if k not in fields))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._fields:
+            self._fields[key] = self._lazy_fields[key]()
+        return self._fields[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"ReportData({dict(self)})"
+
+
 class Report(NamedTuple):
     report_type: ReportType
-    report: Dict[str, str]
+    report: Mapping[str, Any]
 
     def as_json(self) -> Dict[str, str]:
         out = {str(k): str(v) for k, v in self.report.items()}
@@ -28,14 +68,36 @@ class Report(NamedTuple):
 class Reporter:
     """
     A class that generates reports for the simulation.
+
+    the profiler of a ProfileHandler is held by the Reporter, where the runner finds it to
+    profile the time steps of this simulation.
     """
 
     def __init__(self):
         self.reports = []
         self.handlers = []
+        self.report_types: Optional[FrozenSet[ReportType]] = frozenset()
+        self.profiler: Optional[profiling.StepProfiler] = None
 
     def add_handler(self, handler: Handler):
         self.handlers.append(handler)
+        if isinstance(handler, ProfileHandler):
+            self.profiler = handler.profiler
+        handler_report_types = handler.report_types()
+        if self.report_types is None or handler_report_types is None:
+            self.report_types = None
+        else:
+            self.report_types = self.report_types | handler_report_types
+
+    def wants(self, report_type: ReportType) -> bool:
+        """
+        tests whether any handler reads a type of report. reports of other types are not
+        filed, and code that builds costly reports can skip building them.
+
+        :param report_type: the type of report
+        :return: True if a handler reads reports of this type
+        """
+        return self.report_types is None or report_type in self.report_types
 
     def flush(self, runner_payload: RunnerPayload):
         """
@@ -45,26 +107,63 @@ class Reporter:
         :param runner_payload: The runner payload.
         :return: Does not return a value.
         """
+        profiling.count("reports_filed", len(self.reports))
         for handler in self.handlers:
-            handler.handle(self.reports, runner_payload)
+            with profiling.profile(f"handler.{type(handler).__name__}"):
+                handler.handle(self.reports, runner_payload)
 
         self.reports = []
 
+    def drain(self):
+        """
+        waits until all flushed reports have been handled. reports are handled as they are
+        flushed, so there is nothing to wait for here; see AsyncReporter.
+        """
+        pass
+
+    def checkpoint_state(self) -> Dict[str, Any]:
+        """
+        collects the results that the handlers have accumulated, after any flushed reports
+        have been handled
+
+        :return: the state of each handler with something to save, by handler class name
+        """
+        self.drain()
+        states = {}
+        for handler in self.handlers:
+            state = handler.checkpoint_state()
+            if state is not None:
+                states[type(handler).__name__] = state
+        return states
+
+    def restore_state(self, states: Mapping[str, Any]):
+        """
+        restores the results saved by checkpoint_state to handlers of the same classes
+
+        :param states: the state of each handler, by handler class name
+        """
+        for handler in self.handlers:
+            state = states.get(type(handler).__name__)
+            if state is not None:
+                handler.restore_state(state)
+
     def file_report(self, report: Report):
         """
-        files a single report to be handled later.
+        files a single report to be handled later, if any handler reads reports of its type.
 
 
         :param report:
         :return:
         """
-        self.reports.append(report)
+        if self.wants(report.report_type):
+            self.reports.append(report)
 
     def get_summary_stats(self, rp: RunnerPayload) -> Optional[Dict]:
         """
         if a summary StatsHandler exists, return the final report from the collection of statistics
         :return: the stats Dictionary, or, None
         """
+        self.drain()
         final_report = None
         for handler in self.handlers:
             if isinstance(handler, StatsHandler):
@@ -78,6 +177,7 @@ class Reporter:
         if a TimeStepStatsHandler exists, return the time step stats DataFrame and the fleet time step stats DataFrames
         :return: the time step stats DataFrame and the fleet time step stats collection of DataFrames if they exist
         """
+        self.drain()
         time_step_stats, fleet_time_step_stats = None, None
         for handler in self.handlers:
             if isinstance(handler, TimeStepStatsHandler):
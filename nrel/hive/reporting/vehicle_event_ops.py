@@ -11,7 +11,7 @@ from nrel.hive.model.energy import Charger
 from nrel.hive.model.roadnetwork.routetraversal import RouteTraversal
 from nrel.hive.model.station.station import Station
 from nrel.hive.model.vehicle.vehicle import Vehicle
-from nrel.hive.reporting.reporter import Report, ReportType
+from nrel.hive.reporting.reporter import Report, ReportData, ReportType
 from nrel.hive.runner.environment import Environment
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.util import StationId, TupleOps
@@ -59,22 +59,25 @@ def vehicle_move_event(
     )
 
     geoid = next_vehicle.geoid
-    lat, lon = h3.h3_to_geo(geoid)
-    geom = route.to_linestring(route_traversal.experienced_route, env)
-    report_data = {
-        "sim_time_start": sim_time_start,
-        "sim_time_end": sim_time_end,
-        "vehicle_id": vehicle_id,
-        "vehicle_state": vehicle_state,
-        "vehicle_memberships": vehicle_memberships,
-        "distance_km": delta_distance,
-        "energy": delta_energy,
-        "energy_units": energy_units,
-        "geoid": geoid,
-        "lat": lat,
-        "lon": lon,
-        "route_wkt": geom,
-    }
+    experienced_route = route_traversal.experienced_route
+    report_data = ReportData(
+        {
+            "sim_time_start": sim_time_start,
+            "sim_time_end": sim_time_end,
+            "vehicle_id": vehicle_id,
+            "vehicle_state": vehicle_state,
+            "vehicle_memberships": vehicle_memberships,
+            "distance_km": delta_distance,
+            "energy": delta_energy,
+            "energy_units": energy_units,
+            "geoid": geoid,
+        },
+        lazy_fields={
+            "lat": lambda: h3.h3_to_geo(geoid)[0],
+            "lon": lambda: h3.h3_to_geo(geoid)[1],
+            "route_wkt": lambda: route.to_linestring(experienced_route, env),
+        },
+    )
     report = Report(ReportType.VEHICLE_MOVE_EVENT, report_data)
     return report
 
@@ -126,26 +129,29 @@ def vehicle_charge_event(
     charging_price = energy_transacted * charger_price if charger_price is not None else 0.0
 
     geoid = next_vehicle.geoid
-    lat, lon = h3.h3_to_geo(geoid)
 
-    report_data = {
-        "session_id": session_id,
-        "sim_time_start": sim_time_start,
-        "sim_time_end": sim_time_end,
-        "vehicle_id": vehicle_id,
-        "station_id": station_id,
-        "vehicle_state": vehicle_state,
-        "vehicle_memberships": vehicle_memberships,
-        "energy": energy_transacted,
-        "energy_units": charger.energy_type.units,
-        "vehicle_start_soc": start_soc,
-        "vehicle_end_soc": end_soc,
-        "price": charging_price,
-        "charger_id": charger.id,
-        "geoid": geoid,
-        "lat": lat,
-        "lon": lon,
-    }
+    report_data = ReportData(
+        {
+            "session_id": session_id,
+            "sim_time_start": sim_time_start,
+            "sim_time_end": sim_time_end,
+            "vehicle_id": vehicle_id,
+            "station_id": station_id,
+            "vehicle_state": vehicle_state,
+            "vehicle_memberships": vehicle_memberships,
+            "energy": energy_transacted,
+            "energy_units": charger.energy_type.units,
+            "vehicle_start_soc": start_soc,
+            "vehicle_end_soc": end_soc,
+            "price": charging_price,
+            "charger_id": charger.id,
+            "geoid": geoid,
+        },
+        lazy_fields={
+            "lat": lambda: h3.h3_to_geo(geoid)[0],
+            "lon": lambda: h3.h3_to_geo(geoid)[1],
+        },
+    )
 
     report = Report(ReportType.VEHICLE_CHARGE_EVENT, report_data)
     return report
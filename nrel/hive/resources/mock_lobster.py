@@ -14,6 +14,7 @@ from nrel.hive.dispatcher.instruction.instructions import *
 from nrel.hive.dispatcher.instruction_generator.charging_fleet_manager import ChargingFleetManager
 from nrel.hive.dispatcher.instruction_generator.dispatcher import Dispatcher
 from nrel.hive.dispatcher.instruction_generator.instruction_generator import InstructionGenerator
+from nrel.hive.initialization.load import load_config
 from nrel.hive.model.base import Base
 from nrel.hive.model.energy.charger import Charger
 from nrel.hive.model.energy.energytype import EnergyType
@@ -33,7 +34,7 @@ from nrel.hive.model.vehicle.mechatronics.powercurve.tabular_powercurve import T
 from nrel.hive.model.vehicle.mechatronics.powertrain.tabular_powertrain import TabularPowertrain
 from nrel.hive.model.vehicle.vehicle import Vehicle
 from nrel.hive.reporting.reporter import Reporter, Report
-from nrel.hive.runner.environment import Environment
+from nrel.hive.runner.environment import Environment, IndexCache
 from nrel.hive.runner.runner_payload import RunnerPayload
 from nrel.hive.state.driver_state.autonomous_driver_state.autonomous_available import (
     AutonomousAvailable,
@@ -531,6 +532,19 @@ def mock_config(
     return conf_without_temp_dir._replace(global_config=updated_global)
 
 
+def mock_denver_demo_config(scenario: str = "denver_demo.yaml", end_hour: int = 1) -> HiveConfig:
+    """
+    loads a denver_downtown scenario without logging, ending it early so that it runs quickly
+
+    :param scenario: the scenario file in the denver_downtown scenarios
+    :param end_hour: the hour of the day to end the scenario
+    :return: the scenario config
+    """
+    file = resource_filename("nrel.hive.resources.scenarios.denver_downtown", scenario)
+    config = load_config(file).suppress_logging()
+    return config._replace(sim=config.sim._replace(end_time=SimTime.build(end_hour * 3600)))
+
+
 def mock_env(
     config: HiveConfig = mock_config(),
     mechatronics: Optional[Dict[MechatronicsId, MechatronicsInterface]] = None,
@@ -568,6 +582,7 @@ def mock_env(
         chargers=env_chargers,
         schedules=immutables.Map(schedules),
         fleet_ids=fleet_ids,
+        index_cache=IndexCache(),
     )
 
     return initial_env
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import logging
+import pickle
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Union
+
+from nrel.hive.model.sim_time import SimTime
+
+if TYPE_CHECKING:
+    from nrel.hive.runner.runner_payload import RunnerPayload
+    from nrel.hive.state.simulation_state.simulation_state import SimulationState
+    from nrel.hive.state.simulation_state.update.simulation_update import (
+        SimulationUpdateFunction,
+    )
+    from nrel.hive.state.simulation_state.update.update import Update
+
+log = logging.getLogger(__name__)
+
+# bump when the contents of a checkpoint change, so that old checkpoints are rejected
+CHECKPOINT_FORMAT_VERSION = 3
+
+CHECKPOINT_DIRECTORY = "checkpoints"
+
+
+class Checkpoint(NamedTuple):
+    """
+    a RunnerPayload saved part way through a run. the environment and road network are static,
+    so they are not saved: a checkpoint is restored into a payload loaded from a scenario.
+    the road network of the saved simulation state is replaced by a default one.
+
+    :param format_version: the checkpoint format version
+    :param sim_name: the name of the scenario the checkpoint was taken from
+    :param sim: the simulation state, without its road network
+    :param update: the update functions, which hold the read positions of the input files
+    :param handler_states: the results the reporter's handlers accumulated up to the checkpoint
+    """
+
+    format_version: int
+    sim_name: str
+    sim: SimulationState
+    update: Update
+    handler_states: Dict[str, Any]
+
+    @property
+    def sim_time(self) -> SimTime:
+        return self.sim.sim_time
+
+
+def checkpoint_file(output_directory: Path, sim_time: SimTime) -> Path:
+    """
+    checkpoints written during a run are named by their sim time in the scenario output directory
+
+    :param output_directory: the scenario output directory
+    :param sim_time: the sim time of the checkpoint
+    :return: the checkpoint file path
+    """
+    return output_directory / CHECKPOINT_DIRECTORY / f"checkpoint_{int(sim_time)}.pickle"
+
+
+def write_checkpoint(runner_payload: RunnerPayload, file: Union[str, Path]) -> Path:
+    """
+    saves a RunnerPayload so that it can be restored by restore_checkpoint. waits for the
+    reporter to handle any flushed reports first.
+
+    :param runner_payload: the payload to save
+    :param file: the checkpoint file to write
+    :return: the checkpoint file path
+    """
+    # imported here, as the road network modules import the runner
+    from nrel.hive.model.roadnetwork.haversine_roadnetwork import HaversineRoadNetwork
+
+    path = Path(file)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = Checkpoint(
+        format_version=CHECKPOINT_FORMAT_VERSION,
+        sim_name=runner_payload.e.config.sim.sim_name,
+        sim=runner_payload.s._replace(road_network=HaversineRoadNetwork()),
+        update=runner_payload.u,
+        handler_states=runner_payload.e.reporter.checkpoint_state(),
+    )
+    # write to a temporary file first so that a crash never leaves a partial checkpoint
+    tmp = path.with_name(f"{path.name}.tmp")
+    with tmp.open("wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    return path
+
+
+def read_checkpoint(file: Union[str, Path]) -> Checkpoint:
+    """
+    reads a checkpoint written by write_checkpoint
+
+    :param file: the checkpoint file
+    :return: the checkpoint
+    :raises: ValueError if the checkpoint was written with another format version
+    """
+    with Path(file).open("rb") as f:
+        checkpoint = pickle.load(f)
+    if not isinstance(checkpoint, Checkpoint):
+        raise ValueError(f"{file} is not a hive checkpoint")
+    elif checkpoint.format_version != CHECKPOINT_FORMAT_VERSION:
+        raise ValueError(
+            f"checkpoint {file} has format version {checkpoint.format_version}, "
+            f"expected {CHECKPOINT_FORMAT_VERSION}"
+        )
+    return checkpoint
+
+
+def restore_checkpoint(
+    runner_payload: RunnerPayload, checkpoint: Union[Checkpoint, str, Path]
+) -> RunnerPayload:
+    """
+    resumes a run from a checkpoint. the payload of a loaded scenario provides the environment,
+    road network and instruction generators, while the simulation state, the read positions of
+    the input files and the handler results come from the checkpoint. the scenario may differ
+    from the one checkpointed, as when forking what-if variants from a shared warm up, but must
+    use the same time step and h3 resolution, and read its inputs from where the warm up left off.
+
+    :param runner_payload: the initial payload of the scenario to resume
+    :param checkpoint: the checkpoint, or the checkpoint file
+    :return: the payload at the time of the checkpoint, which runs on to the scenario end time
+    :raises: ValueError if the checkpoint does not fit the scenario
+    """
+    if not isinstance(checkpoint, Checkpoint):
+        checkpoint = read_checkpoint(checkpoint)
+    config = runner_payload.e.config
+    if checkpoint.sim.sim_timestep_duration_seconds != config.sim.timestep_duration_seconds:
+        raise ValueError(
+            f"checkpoint has a time step of {checkpoint.sim.sim_timestep_duration_seconds} "
+            f"seconds, but the scenario uses {config.sim.timestep_duration_seconds}"
+        )
+    elif checkpoint.sim.sim_h3_location_resolution != config.sim.sim_h3_resolution:
+        raise ValueError(
+            f"checkpoint has h3 resolution {checkpoint.sim.sim_h3_location_resolution}, "
+            f"but the scenario uses {config.sim.sim_h3_resolution}"
+        )
+    elif not config.sim.start_time <= checkpoint.sim_time <= config.sim.end_time:
+        raise ValueError(
+            f"checkpoint at {checkpoint.sim_time.as_iso_time()} is outside of the scenario "
+            f"time range {config.sim.start_time.as_iso_time()} to {config.sim.end_time.as_iso_time()}"
+        )
+    if checkpoint.sim_name != config.sim.sim_name:
+        log.info(f"resuming {config.sim.sim_name} from a checkpoint of {checkpoint.sim_name}")
+
+    update = _resume_update(runner_payload.u, checkpoint.update)
+    sim = checkpoint.sim._replace(road_network=runner_payload.s.road_network)
+    runner_payload.e.reporter.restore_state(checkpoint.handler_states)
+    return runner_payload._replace(s=sim, u=update)
+
+
+def _resume_update(update: Update, checkpointed: Update) -> Update:
+    """
+    keeps the update functions of the scenario, moving their input readers to the read
+    positions of the checkpointed update functions
+    """
+    fns = update.pre_step_update
+    checkpointed_fns = checkpointed.pre_step_update
+    if [type(fn) for fn in fns] != [type(fn) for fn in checkpointed_fns]:
+        raise ValueError(
+            f"checkpoint has update functions {[type(fn).__name__ for fn in checkpointed_fns]}, "
+            f"but the scenario uses {[type(fn).__name__ for fn in fns]}"
+        )
+    resumed = tuple(_resume_reader(fn, c) for fn, c in zip(fns, checkpointed_fns))
+    return update._replace(pre_step_update=resumed)
+
+
+def _resume_reader(
+    fn: SimulationUpdateFunction, checkpointed: SimulationUpdateFunction
+) -> SimulationUpdateFunction:
+    reader = getattr(fn, "reader", None)
+    checkpointed_reader = getattr(checkpointed, "reader", None)
+    if reader is None and checkpointed_reader is None:
+        return fn
+    elif reader is None or checkpointed_reader is None:
+        raise ValueError(
+            f"checkpoint reads the input of {type(fn).__name__} in another way than the scenario"
+        )
+    # the update functions that read an input are frozen dataclasses
+    return replace(fn, reader=reader.resume(checkpointed_reader))  # type: ignore
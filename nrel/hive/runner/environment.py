@@ -7,10 +7,17 @@ import immutables
 from nrel.hive.reporting.reporter import Reporter
 
 if TYPE_CHECKING:
+    from nrel.hive.dispatcher.instruction_generator.assignment_ops import AssignmentPool
+    from nrel.hive.dispatcher.instruction_generator.station_compatibility import (
+        StationCompatibilityIndex,
+    )
     from nrel.hive.model.energy.charger.charger import Charger
+    from nrel.hive.model.vehicle.mechatronics.powercurve.powercurve_ops import ChargeTimeTables
     from nrel.hive.model.vehicle.mechatronics.mechatronics_interface import MechatronicsInterface
     from nrel.hive.config import HiveConfig
     from nrel.hive.model.vehicle.schedules.schedule import ScheduleFunction
+    from nrel.hive.runner.runner_payload import RunnerPayload
+    from nrel.hive.state.driver_state.demand_density_index import DemandDensityIndex
     from nrel.hive.util.typealiases import (
         ChargerId,
         MechatronicsId,
@@ -19,6 +26,19 @@ if TYPE_CHECKING:
     )
 
 
+class IndexCache:
+    """
+    the indexes and lookup tables a simulation builds as it runs, which are reused while what
+    they were built from is unchanged. each Environment holds its own, so that simulations run
+    side by side do not replace each other's indexes.
+    """
+
+    def __init__(self):
+        self.demand_density_index: Optional[DemandDensityIndex] = None
+        self.station_compatibility_index: Optional[StationCompatibilityIndex] = None
+        self.charge_time_tables: ChargeTimeTables = {}
+
+
 class Environment(NamedTuple):
     """
     Environment of this Hive Simulation.
@@ -32,6 +52,8 @@ class Environment(NamedTuple):
     fleet_ids: FrozenSet[Optional[MembershipId]] = frozenset()
 
     reporter: Reporter = Reporter()
+    assignment_pool: Optional[AssignmentPool] = None
+    index_cache: Optional[IndexCache] = None
 
     def set_reporter(self, reporter: Reporter) -> Environment:
         """
@@ -42,3 +64,13 @@ class Environment(NamedTuple):
         :return: the updated environment
         """
         return self._replace(reporter=reporter)
+
+    def close(self, runner_payload: RunnerPayload):
+        """
+        closes the reporter and shuts down any assignment worker processes at the end of a run
+
+        :param runner_payload: the final runner payload
+        """
+        self.reporter.close(runner_payload)
+        if self.assignment_pool is not None:
+            self.assignment_pool.close()
@@ -6,6 +6,8 @@ from typing import NamedTuple, TYPE_CHECKING, Callable, Optional
 
 from tqdm import tqdm
 
+from nrel.hive.reporting import profiling
+from nrel.hive.runner.checkpoint import checkpoint_file, write_checkpoint
 from nrel.hive.runner.runner_payload import RunnerPayload
 
 log = logging.getLogger(__name__)
@@ -25,7 +27,8 @@ class LocalSimulationRunner(NamedTuple):
         runner_payload: RunnerPayload,
     ) -> RunnerPayload:
         """
-        steps through time, running a simulation, and producing a simulation result
+        steps through time, running a simulation, and producing a simulation result. a payload
+        restored from a checkpoint runs from the time of the checkpoint.
 
         :param runner_payload: the initial state of the simulation
         :return: the final simulation state and dispatcher state
@@ -33,7 +36,7 @@ class LocalSimulationRunner(NamedTuple):
 
         time_steps = tqdm(
             range(
-                int(runner_payload.e.config.sim.start_time),
+                int(runner_payload.s.sim_time),
                 int(runner_payload.e.config.sim.end_time),
                 runner_payload.e.config.sim.timestep_duration_seconds,
             )
@@ -61,10 +64,24 @@ class LocalSimulationRunner(NamedTuple):
 
 def _run_step_in_context(env: Environment) -> Callable:
     def _run_step(payload: RunnerPayload, t: int = -1) -> RunnerPayload:
-        # applies the most recent version of each update function
-        updated_payload = payload.u.apply_update(payload)
-
-        env.reporter.flush(updated_payload)
+        with profiling.use_profiler(env.reporter.profiler):
+            # applies the most recent version of each update function
+            updated_payload = payload.u.apply_update(payload)
+
+            env.reporter.flush(updated_payload)
+
+            interval = env.config.global_config.checkpoint_interval
+            if interval > 0:
+                sim_time = updated_payload.s.sim_time
+                step = (
+                    sim_time - env.config.sim.start_time
+                ) // env.config.sim.timestep_duration_seconds
+                if step % interval == 0:
+                    with profiling.profile("checkpoint"):
+                        file = checkpoint_file(env.config.scenario_output_directory, sim_time)
+                        write_checkpoint(updated_payload, file)
+
+            profiling.end_step(updated_payload.s.sim_time)
 
         return updated_payload
 
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, FrozenSet, Optional, Tuple
+
+import h3
+import immutables
+import numpy as np
+
+from nrel.hive.util.h3_ops import H3Ops
+from nrel.hive.util.typealiases import GeoId, RequestId
+from nrel.hive.util.units import Kilometers
+
+if TYPE_CHECKING:
+    from nrel.hive.model.entity_position import EntityPosition
+    from nrel.hive.model.roadnetwork.roadnetwork import RoadNetwork
+    from nrel.hive.runner.environment import Environment
+    from nrel.hive.state.simulation_state.simulation_state import SimulationState
+
+
+class DemandDensityIndex:
+    """
+    the request search hexes ranked by their number of requests, densest first. human drivers
+    reposition to the densest hex in search of requests, so one index is built per simulation
+    state and shared by all of its drivers (see demand_density_index). the road network position
+    of each hex is found when first asked for.
+    """
+
+    def __init__(
+        self,
+        r_search: immutables.Map[GeoId, FrozenSet[RequestId]],
+        road_network: RoadNetwork,
+        sim_h3_location_resolution: int,
+    ):
+        self.r_search = r_search
+        self.road_network = road_network
+        self.sim_h3_location_resolution = sim_h3_location_resolution
+        # a stable sort, so ties keep the order of r_search
+        ranked = sorted(r_search.items(), key=lambda t: len(t[1]), reverse=True)
+        self.hexes: Tuple[GeoId, ...] = tuple(search_hex for search_hex, _ in ranked)
+        self._centroids: Optional[np.ndarray] = None
+        self._destinations: Dict[GeoId, Optional[EntityPosition]] = {}
+
+    @classmethod
+    def build(cls, sim: SimulationState) -> DemandDensityIndex:
+        """
+        ranks the request search hexes of a simulation state
+
+        :param sim: the simulation state
+        :return: the demand density index of its requests
+        """
+        return DemandDensityIndex(sim.r_search, sim.road_network, sim.sim_h3_location_resolution)
+
+    def densest_hex(
+        self, geoid: Optional[GeoId] = None, radius_km: Kilometers = 0
+    ) -> Optional[GeoId]:
+        """
+        finds the search hex with the most requests, optionally within some distance of a location
+
+        :param geoid: the location to search around
+        :param radius_km: the max distance to the search hex centroid; 0 searches every hex
+        :return: the densest search hex, or None if there are no requests in range
+        """
+        if not self.hexes:
+            return None
+        elif geoid is None or radius_km <= 0:
+            return self.hexes[0]
+        else:
+            if self._centroids is None:
+                self._centroids = H3Ops.geoids_to_lat_lon_array(self.hexes)
+            origin = H3Ops.geoids_to_lat_lon_array((geoid,))
+            in_range = H3Ops.great_circle_distance_array(origin, self._centroids) <= radius_km
+            # hexes are ranked densest first, so the first one in range is the densest in range
+            i = int(np.argmax(in_range))
+            return self.hexes[i] if in_range[i] else None
+
+    def destination(self, search_hex: GeoId) -> Optional[EntityPosition]:
+        """
+        the road network position at the center of a search hex, where drivers reposition to
+
+        :param search_hex: the search hex
+        :return: the position of the search hex center
+        """
+        if search_hex not in self._destinations:
+            center = h3.h3_to_center_child(search_hex, self.sim_h3_location_resolution)
+            self._destinations[search_hex] = self.road_network.position_from_geoid(center)
+        return self._destinations[search_hex]
+
+
+def demand_density_index(sim: SimulationState, env: Environment) -> DemandDensityIndex:
+    """
+    the demand density index of a simulation state. the index cached on the environment is
+    reused while the requests and road network it was built from are unchanged, which holds for
+    every driver generating instructions in a time step.
+
+    :param sim: the simulation state
+    :param env: the simulation environment, which caches the index
+    :return: the demand density index of its requests
+    """
+    cache = env.index_cache
+    index = cache.demand_density_index if cache is not None else None
+    if (
+        index is None
+        or index.r_search is not sim.r_search
+        or index.road_network is not sim.road_network
+        or index.sim_h3_location_resolution != sim.sim_h3_location_resolution
+    ):
+        index = DemandDensityIndex.build(sim)
+        if cache is not None:
+            cache.demand_density_index = index
+    return index
@@ -3,8 +3,6 @@ from __future__ import annotations
 import logging
 from typing import Optional, TYPE_CHECKING, Tuple
 
-import h3
-
 from nrel.hive.dispatcher.instruction.instruction import Instruction
 from nrel.hive.dispatcher.instruction.instructions import (
     ChargeBaseInstruction,
@@ -17,6 +15,7 @@ from nrel.hive.dispatcher.instruction_generator.instruction_generator_ops import
 )
 from nrel.hive.model.energy.energytype import EnergyType
 from nrel.hive.model.entity import Entity
+from nrel.hive.state.driver_state.demand_density_index import demand_density_index
 from nrel.hive.state.vehicle_state.charging_base import ChargingBase
 from nrel.hive.state.vehicle_state.idle import Idle
 from nrel.hive.state.vehicle_state.reserve_base import ReserveBase
@@ -134,35 +133,26 @@ def human_go_home(
 def human_look_for_requests(
     veh: Vehicle,
     sim: SimulationState,
+    env: Environment,
 ) -> Optional[RepositionInstruction]:
     """
-    Human driver relocates in search of greener request pastures.
+    Human driver relocates in search of greener request pastures. takes the most dense request
+    search hex within config.dispatcher.human_driver_reposition_radius_km as a proxy for high
+    demand areas, or the most dense search hex overall when none are in range.
 
     :param veh:
     :param sim:
+    :param env:
     :return:
     """
+    index = demand_density_index(sim, env)
+    radius_km = env.config.dispatcher.human_driver_reposition_radius_km
+    best_search_hex = index.densest_hex(veh.geoid, radius_km) or index.densest_hex()
+    if best_search_hex is None:
+        # no requests in system, do nothing
+        return None
 
-    def _get_reposition_location() -> Optional[EntityPosition]:
-        """
-        takes the most dense request search hex as a proxy for high demand areas
-        :return:
-        """
-        if len(sim.r_search) == 0:
-            # no requests in system, do nothing
-            return None
-        else:
-            # find the most dense request search hex and sends vehicles to the center
-            best_search_hex = sorted(
-                [(k, len(v)) for k, v in sim.r_search.items()],
-                key=lambda t: t[1],
-                reverse=True,
-            )[0][0]
-        destination = h3.h3_to_center_child(best_search_hex, sim.sim_h3_location_resolution)
-        destination_link = sim.road_network.position_from_geoid(destination)
-        return destination_link
-
-    dest = _get_reposition_location()
+    dest = index.destination(best_search_hex)
     if dest:
         return RepositionInstruction(veh.id, dest.link_id)
     else:
@@ -271,7 +261,7 @@ def av_dispatch_base_instruction(
 
         best_base = H3Ops.nearest_entity_by_great_circle_distance(
             geoid=veh.geoid,
-            entities=sim.bases.values(),
+            entities=sim.bases,
             entity_search=sim.b_search,
             is_valid=valid_fn,
             sim_h3_search_resolution=sim.sim_h3_search_resolution,
@@ -94,7 +94,7 @@ class HumanAvailable(DriverState):
         # once the vehicle is available it should reposition to seek out requests.
         elif isinstance(state, ReserveBase) or isinstance(state, ChargingBase):
             # if the driver is sitting at home we try to seek out requests
-            return human_look_for_requests(my_vehicle, sim)
+            return human_look_for_requests(my_vehicle, sim, env)
         elif isinstance(my_vehicle.vehicle_state, ChargingStation):
             # if the driver is charging we unplug if we reach the soc limit
             return idle_if_at_soc_limit(my_vehicle, env)
@@ -102,7 +102,7 @@ class HumanAvailable(DriverState):
             # if the driver has been idle for longer than the idle_time_out_seconds limit, we move to seek out greener
             # pastures
             if state.idle_duration > env.config.dispatcher.idle_time_out_seconds:
-                return human_look_for_requests(my_vehicle, sim)
+                return human_look_for_requests(my_vehicle, sim, env)
 
         return None
 
@@ -29,9 +29,12 @@ if TYPE_CHECKING:
     from nrel.hive.util.units import Seconds
     from nrel.hive.model.base import Base
     from nrel.hive.model.request import Request
-    from nrel.hive.model.station.station import Station
+    from nrel.hive.model.station.station import Station, StationAccess
     from nrel.hive.model.vehicle.vehicle import Vehicle
     from nrel.hive.dispatcher.instruction.instruction import Instruction
+    from nrel.hive.state.simulation_state.simulation_state_mutation import (
+        SimulationStateMutation,
+    )
 
 
 class SimulationState(NamedTuple):
@@ -72,6 +75,38 @@ class SimulationState(NamedTuple):
     s_search: immutables.Map[GeoId, FrozenSet[StationId]] = immutables.Map()
     b_search: immutables.Map[GeoId, FrozenSet[BaseId]] = immutables.Map()
 
+    # station occupancy collections - the vehicles charging or queueing at each station
+    s_charging: immutables.Map[StationId, FrozenSet[VehicleId]] = immutables.Map()
+    s_queueing: immutables.Map[StationId, FrozenSet[VehicleId]] = immutables.Map()
+
+    # station access collection - the location, membership and charger types of each station,
+    # which only change when stations are added, removed or have their membership or chargers
+    # changed, so that indices built from them can be reused while the charger states change
+    s_access: immutables.Map[StationId, StationAccess] = immutables.Map()
+
+    # request expiry index - the open requests by departure time, so cancellation only visits
+    # the departure times that have expired
+    r_departures: immutables.Map[SimTime, FrozenSet[RequestId]] = immutables.Map()
+    # the keys of r_departures in ascending order, so the expired departure times are a prefix
+    r_departure_times: Tuple[SimTime, ...] = ()
+
+    # while True, vehicle changes skip v_locations and v_search, which are brought up to date
+    # in one pass by simulation_state_ops.restore_vehicle_index
+    vehicle_index_deferred: bool = False
+
+    def mutate(self) -> SimulationStateMutation:
+        """
+        starts a batch of entity additions and modifications that are applied together.
+        see SimulationStateMutation for details.
+
+        :return: a mutation of this simulation state
+        """
+        from nrel.hive.state.simulation_state.simulation_state_mutation import (
+            SimulationStateMutation,
+        )
+
+        return SimulationStateMutation(self)
+
     def get_stations(
         self,
         filter_function: Optional[Callable[[Station], bool]] = None,
@@ -174,6 +209,28 @@ class SimulationState(NamedTuple):
         else:
             return tuple(vehicles)
 
+    def get_charging_vehicles(self, station_id: StationId) -> Tuple[Vehicle, ...]:
+        """
+        returns the vehicles currently in a ChargingStation state at a station,
+        read from the station occupancy index instead of scanning the fleet
+
+        :param station_id: the station id
+        :return: tuple of vehicles charging at this station
+        """
+        vehicle_ids = self.s_charging.get(station_id, frozenset())
+        return tuple(self.vehicles[vid] for vid in vehicle_ids if vid in self.vehicles)
+
+    def get_queueing_vehicles(self, station_id: StationId) -> Tuple[Vehicle, ...]:
+        """
+        returns the vehicles currently in a ChargeQueueing state at a station,
+        read from the station occupancy index instead of scanning the fleet
+
+        :param station_id: the station id
+        :return: tuple of vehicles queueing at this station
+        """
+        vehicle_ids = self.s_queueing.get(station_id, frozenset())
+        return tuple(self.vehicles[vid] for vid in vehicle_ids if vid in self.vehicles)
+
     def get_requests(
         self,
         filter_function: Optional[Callable[[Request], bool]] = None,
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import h3
+from returns.result import Failure, ResultE, Success
+
+from nrel.hive.util.dict_ops import DictOps
+from nrel.hive.util.exception import SimulationStateError
+
+if TYPE_CHECKING:
+    from immutables import MapMutation
+
+    from nrel.hive.model.entity import Entity
+    from nrel.hive.model.vehicle.vehicle import Vehicle
+    from nrel.hive.state.simulation_state.simulation_state import SimulationState
+    from nrel.hive.util.typealiases import EntityId, GeoId
+
+# an entity leaving one index collection for another; None stands for no collection
+IndexMove = Tuple["EntityId", Optional["GeoId"], Optional["GeoId"]]
+
+
+class _EntityCollection(NamedTuple):
+    """
+    the SimulationState fields that hold one type of entity and its spatial indices
+    """
+
+    entities: str
+    locations: str
+    search: str
+    name: str
+
+
+_COLLECTIONS = {
+    "Vehicle": _EntityCollection("vehicles", "v_locations", "v_search", "vehicle"),
+    "Request": _EntityCollection("requests", "r_locations", "r_search", "request"),
+    "Station": _EntityCollection("stations", "s_locations", "s_search", "station"),
+    "Base": _EntityCollection("bases", "b_locations", "b_search", "base"),
+}
+
+
+class SimulationStateMutation:
+    """
+    collects entity additions and modifications to a SimulationState and applies them
+    together. entities are written through immutables.Map.mutate(), and the location, search
+    and departure indices are updated in a single pass each when the mutation finishes, instead
+    of building a new SimulationState and new index maps for every entity.
+
+    the resulting state is the same as adding or modifying the entities one at a time with the
+    simulation_state_ops functions, and the first failure fails the whole mutation. like
+    immutables.Map.mutate(), the changes are applied when the with block exits:
+
+        with sim.mutate() as mutation:
+            for vehicle in vehicles:
+                mutation.modify_entity(vehicle)
+        result = mutation.result
+
+    or, without a with block, by calling finish().
+    """
+
+    def __init__(self, sim: SimulationState):
+        self.sim = sim
+        self.error: Optional[Exception] = None
+        self._entities: Dict[str, MapMutation] = {}
+        self._location_moves: Dict[str, List[IndexMove]] = {}
+        self._departure_moves: List[IndexMove] = []
+        self._added_vehicles: List[Vehicle] = []
+        self._result: Optional[ResultE[SimulationState]] = None
+
+    def __enter__(self) -> SimulationStateMutation:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # nothing is applied when the block raised
+        if exc_type is None:
+            self.finish()
+        return False
+
+    @property
+    def result(self) -> ResultE[SimulationState]:
+        """
+        the updated simulation state, or the first error encountered, once the changes are applied
+        """
+        if self._result is None:
+            raise RuntimeError(
+                "the mutation has not been applied; exit its with block or finish it"
+            )
+        return self._result
+
+    def _entities_of(self, collection: _EntityCollection) -> MapMutation:
+        entities = self._entities.get(collection.entities)
+        if entities is None:
+            entities = getattr(self.sim, collection.entities).mutate()
+            self._entities[collection.entities] = entities
+        return entities
+
+    def _move(self, collection: _EntityCollection, move: IndexMove):
+        self._location_moves.setdefault(collection.entities, []).append(move)
+
+    def _fail(self, message: str):
+        self.error = SimulationStateError(message)
+
+    def add_entity(self, entity: Entity):
+        """
+        adds an entity, as simulation_state_ops.add_entity_safe would
+
+        :param entity: the entity to add
+        """
+        if self.error is not None:
+            return
+        kind = entity.__class__.__name__
+        collection = _COLLECTIONS.get(kind)
+        if collection is None:
+            return self._fail(f"cannot add entity {entity} to simulation")
+        elif not self.sim.road_network.geoid_within_geofence(entity.geoid):
+            if kind == "Request":
+                return self._fail(f"origin {entity.geoid} not within road network geofence")
+            return self._fail(
+                f"cannot add {collection.name} {entity.id} to sim: not within road network geofence"
+            )
+
+        self._entities_of(collection).set(entity.id, entity)
+        self._move(collection, (entity.id, None, entity.geoid))
+        if kind == "Request":
+            self._departure_moves.append((entity.id, None, entity.departure_time))  # type: ignore
+        elif kind == "Vehicle":
+            self._added_vehicles.append(entity)  # type: ignore
+
+    def modify_entity(self, entity: Entity):
+        """
+        modifies an entity, as simulation_state_ops.modify_entity_safe would
+
+        :param entity: the updated entity
+        """
+        if self.error is not None:
+            return
+        kind = entity.__class__.__name__
+        collection = _COLLECTIONS.get(kind)
+        if collection is None:
+            return self._fail(f"cannot modify entity {entity} to simulation")
+        entities = self._entities_of(collection)
+        previous = entities.get(entity.id)
+        within_geofence = self.sim.road_network.geoid_within_geofence
+        if previous is None:
+            return self._fail(
+                f"cannot update {collection.name} {entity.id}, it was not already in the sim"
+            )
+        elif kind == "Vehicle" and not within_geofence(entity.geoid):
+            return self._fail(f"cannot add vehicle {entity.id} to sim: not within road network")
+        elif kind == "Request" and not within_geofence(entity.origin):  # type: ignore
+            return self._fail(f"cannot modify request {entity.id}: origin not within road network")
+        elif kind == "Request" and not within_geofence(entity.destination):  # type: ignore
+            return self._fail(
+                f"cannot modify request {entity.id}: destination not within road network"
+            )
+        elif kind in ("Station", "Base") and previous.geoid != entity.geoid:
+            return self._fail(
+                f"{collection.name} {entity.id} attempting to move from {previous.geoid} to {entity.geoid}, which is not permitted"
+            )
+        elif kind in ("Station", "Base") and not within_geofence(entity.geoid):
+            return self._fail(
+                f"cannot add {collection.name} {entity.id} to sim: not within road network geofence"
+            )
+
+        entities.set(entity.id, entity)
+        self._move(collection, (entity.id, previous.geoid, entity.geoid))
+        if kind == "Request":
+            self._departure_moves.append(
+                (entity.id, previous.departure_time, entity.departure_time)  # type: ignore
+            )
+
+    def add_entities(self, entities: Iterable[Entity]):
+        for entity in entities:
+            self.add_entity(entity)
+
+    def modify_entities(self, entities: Iterable[Entity]):
+        for entity in entities:
+            self.modify_entity(entity)
+
+    def finish(self) -> ResultE[SimulationState]:
+        """
+        applies the collected changes
+
+        :return: the updated simulation state, or the first error encountered
+        """
+        if self._result is not None:
+            return self._result
+        if self.error is not None:
+            self._result = Failure(self.error)
+            return self._result
+
+        search_res = self.sim.sim_h3_search_resolution
+        # the collections updated, by SimulationState field name
+        updates: Dict[str, Any] = {}
+        for kind, collection in _COLLECTIONS.items():
+            entities = self._entities.get(collection.entities)
+            if entities is None:
+                continue
+            updates[collection.entities] = entities.finish()
+            if kind == "Vehicle" and self.sim.vehicle_index_deferred:
+                continue
+            moves = self._location_moves.get(collection.entities, [])
+            updates[collection.locations] = DictOps.move_in_collection_dict(
+                getattr(self.sim, collection.locations), moves
+            )
+            updates[collection.search] = DictOps.move_in_collection_dict(
+                getattr(self.sim, collection.search),
+                ((i, _parent(old, search_res), _parent(new, search_res)) for i, old, new in moves),
+            )
+        if self._departure_moves:
+            updates["r_departures"] = DictOps.move_in_collection_dict(
+                self.sim.r_departures, self._departure_moves
+            )
+            updates["r_departure_times"] = DictOps.update_sorted_keys(
+                self.sim.r_departure_times,
+                updates["r_departures"],
+                {t for _, old, new in self._departure_moves for t in (old, new)},
+            )
+        updated_sim = self.sim._replace(**updates)
+
+        # imported here as simulation_state_ops builds mutations
+        from nrel.hive.state.simulation_state.simulation_state_ops import (
+            _update_station_access,
+            _update_station_occupancy,
+        )
+
+        station_moves = self._location_moves.get("stations", ())
+        if station_moves:
+            s_access = updated_sim.s_access
+            for station_id, _, _ in station_moves:
+                s_access = _update_station_access(s_access, updated_sim.stations[station_id])
+            updated_sim = updated_sim._replace(s_access=s_access)
+
+        for vehicle in self._added_vehicles:
+            updated_sim = _update_station_occupancy(updated_sim, vehicle, add=True)
+
+        self._result = Success(updated_sim)
+        return self._result
+
+
+def _parent(geoid: Optional[GeoId], resolution: int) -> Optional[GeoId]:
+    return h3.h3_to_parent(geoid, resolution) if geoid is not None else None
@@ -3,20 +3,22 @@ from __future__ import annotations
 from typing import Iterable, Optional, TYPE_CHECKING, Tuple
 
 import h3
+import immutables
 from returns.result import Success, Failure, ResultE
 
 from nrel.hive.model.sim_time import SimTime
+from nrel.hive.state.vehicle_state.vehicle_state_type import VehicleStateType
 from nrel.hive.util.dict_ops import DictOps
 from nrel.hive.util.exception import SimulationStateError
 from nrel.hive.util.fp import apply_op_to_accumulator, throw_or_return
-from nrel.hive.util.typealiases import RequestId, StationId, VehicleId, BaseId
+from nrel.hive.util.typealiases import RequestId, StationId, VehicleId, BaseId, GeoId
 
 if TYPE_CHECKING:
     from nrel.hive.state.simulation_state.simulation_state import SimulationState
     from nrel.hive.model.entity import Entity
     from nrel.hive.model.base import Base
     from nrel.hive.model.request import Request
-    from nrel.hive.model.station.station import Station
+    from nrel.hive.model.station.station import Station, StationAccess
     from nrel.hive.model.vehicle.vehicle import Vehicle
 
 
@@ -122,13 +124,9 @@ def add_entities_safe(sim: SimulationState, entities: Iterable[Entity]) -> Resul
     :return: the updated simulation state or an error
     """
 
-    def _add(entity: Entity):
-        def _inner(sim: SimulationState) -> ResultE[SimulationState]:
-            return add_entity_safe(sim, entity)
-
-        return _inner
-
-    return apply_op_to_accumulator(_add, entities, sim)
+    with sim.mutate() as mutation:
+        mutation.add_entities(entities)
+    return mutation.result
 
 
 def modify_entity_safe(sim: SimulationState, entity: Entity) -> ResultE[SimulationState]:
@@ -165,13 +163,9 @@ def modify_entities_safe(
     :return: the updated simulation state or an error
     """
 
-    def _mod(entity: Entity):
-        def _inner(sim: SimulationState) -> ResultE[SimulationState]:
-            return modify_entity_safe(sim, entity)
-
-        return _inner
-
-    return apply_op_to_accumulator(_mod, entities, sim)
+    with sim.mutate() as mutation:
+        mutation.modify_entities(entities)
+    return mutation.result
 
 
 def add_request_safe(sim: SimulationState, request: Request) -> ResultE[SimulationState]:
@@ -190,15 +184,39 @@ def add_request_safe(sim: SimulationState, request: Request) -> ResultE[Simulati
         )
     else:
         search_geoid = h3.h3_to_parent(request.geoid, sim.sim_h3_search_resolution)
+        updated_r_departures = DictOps.add_to_collection_dict(
+            sim.r_departures, request.departure_time, request.id
+        )
 
         updated_sim = sim._replace(
             requests=DictOps.add_to_dict(sim.requests, request.id, request),
             r_locations=DictOps.add_to_collection_dict(sim.r_locations, request.geoid, request.id),
             r_search=DictOps.add_to_collection_dict(sim.r_search, search_geoid, request.id),
+            r_departures=updated_r_departures,
+            r_departure_times=DictOps.update_sorted_keys(
+                sim.r_departure_times, updated_r_departures, (request.departure_time,)
+            ),
         )
         return Success(updated_sim)
 
 
+def add_requests_safe(
+    sim: SimulationState, requests: Iterable[Request]
+) -> ResultE[SimulationState]:
+    """
+    adds a batch of requests to the SimulationState, updating each request collection in a
+    single Map.mutate() pass instead of copying it once per request
+
+    :param sim: the simulation state
+    :param requests: the requests to add
+
+    :return: the updated simulation state, or an error if any request is outside the geofence
+    """
+    with sim.mutate() as mutation:
+        mutation.add_entities(requests)
+    return mutation.result
+
+
 def remove_request_safe(sim: SimulationState, request_id: RequestId) -> ResultE[SimulationState]:
     """
     removes a request from this simulation.
@@ -226,11 +244,18 @@ def remove_request_safe(sim: SimulationState, request_id: RequestId) -> ResultE[
         updated_r_search = DictOps.remove_from_collection_dict(
             sim.r_search, search_geoid, request.id
         )
+        updated_r_departures = DictOps.remove_from_collection_dict(
+            sim.r_departures, request.departure_time, request.id
+        )
 
         updated_sim = sim._replace(
             requests=updated_requests,
             r_locations=updated_r_locations,
             r_search=updated_r_search,
+            r_departures=updated_r_departures,
+            r_departure_times=DictOps.update_sorted_keys(
+                sim.r_departure_times, updated_r_departures, (request.departure_time,)
+            ),
         )
 
         return Success(updated_sim)
@@ -280,10 +305,28 @@ def modify_request_safe(sim: SimulationState, updated_request: Request) -> Resul
             sim.sim_h3_search_resolution,
         )
 
+        updated_r_departures = (
+            sim.r_departures
+            if updated_request.departure_time == request.departure_time
+            else DictOps.add_to_collection_dict(
+                DictOps.remove_from_collection_dict(
+                    sim.r_departures, request.departure_time, request.id
+                ),
+                updated_request.departure_time,
+                updated_request.id,
+            )
+        )
+
         updated_sim = sim._replace(
             requests=result.entities if result.entities else sim.requests,  # type: ignore
             r_locations=result.locations if result.locations else sim.r_locations,
             r_search=result.search if result.search else sim.r_search,
+            r_departures=updated_r_departures,
+            r_departure_times=DictOps.update_sorted_keys(
+                sim.r_departure_times,
+                updated_r_departures,
+                (request.departure_time, updated_request.departure_time),
+            ),
         )
         return Success(updated_sim)
 
@@ -313,6 +356,9 @@ def add_vehicle_safe(sim: SimulationState, vehicle: Vehicle) -> ResultE[Simulati
             f"cannot add vehicle {vehicle.id} to sim: not within road network geofence"
         )
         return Failure(error)
+    elif sim.vehicle_index_deferred:
+        updated_sim = sim._replace(vehicles=DictOps.add_to_dict(sim.vehicles, vehicle.id, vehicle))
+        return Success(_update_station_occupancy(updated_sim, vehicle, add=True))
     else:
         search_geoid = h3.h3_to_parent(vehicle.geoid, sim.sim_h3_search_resolution)
         updated_v_locations = DictOps.add_to_collection_dict(
@@ -324,7 +370,7 @@ def add_vehicle_safe(sim: SimulationState, vehicle: Vehicle) -> ResultE[Simulati
             v_locations=updated_v_locations,
             v_search=updated_v_search,
         )
-        return Success(updated_sim)
+        return Success(_update_station_occupancy(updated_sim, vehicle, add=True))
 
 
 def modify_vehicle_safe(sim: SimulationState, updated_vehicle: Vehicle) -> ResultE[SimulationState]:
@@ -350,6 +396,9 @@ def modify_vehicle_safe(sim: SimulationState, updated_vehicle: Vehicle) -> Resul
             f"cannot add vehicle {updated_vehicle.id} to sim: not within road network"
         )
         return Failure(error)
+    elif sim.vehicle_index_deferred:
+        updated_vehicles = DictOps.add_to_dict(sim.vehicles, updated_vehicle.id, updated_vehicle)
+        return Success(sim._replace(vehicles=updated_vehicles))
     else:
         updated_dictionaries = DictOps.update_entity_dictionaries(
             updated_vehicle,
@@ -401,6 +450,10 @@ def remove_vehicle_safe(sim: SimulationState, vehicle_id: VehicleId) -> ResultE[
             f"attempting to remove vehicle {vehicle_id} which is not in simulation"
         )
         return Failure(error)
+    elif sim.vehicle_index_deferred:
+        vehicle = sim.vehicles[vehicle_id]
+        updated_sim = sim._replace(vehicles=DictOps.remove_from_dict(sim.vehicles, vehicle_id))
+        return Success(_update_station_occupancy(updated_sim, vehicle, add=False))
     else:
         vehicle = sim.vehicles[vehicle_id]
         search_geoid = h3.h3_to_parent(vehicle.geoid, sim.sim_h3_search_resolution)
@@ -412,7 +465,7 @@ def remove_vehicle_safe(sim: SimulationState, vehicle_id: VehicleId) -> ResultE[
             ),
             v_search=DictOps.remove_from_collection_dict(sim.v_search, search_geoid, vehicle_id),
         )
-        return Success(updated_sim)
+        return Success(_update_station_occupancy(updated_sim, vehicle, add=False))
 
 
 def remove_vehicle(
@@ -465,6 +518,151 @@ def pop_vehicle(
         return None, result.unwrap()
 
 
+def defer_vehicle_index(sim: SimulationState) -> SimulationState:
+    """
+    stops vehicle changes from updating the vehicle location and search indices, so that a
+    batch of vehicle updates can be followed by a single restore_vehicle_index pass. only
+    code that does not read v_locations or v_search should run while the index is deferred.
+
+    :param sim: the simulation state, with an up to date vehicle index
+    :return: the simulation state with its vehicle index deferred
+    """
+    return sim._replace(vehicle_index_deferred=True)
+
+
+def restore_vehicle_index(
+    sim: SimulationState, indexed_vehicles: immutables.Map[VehicleId, Vehicle]
+) -> SimulationState:
+    """
+    brings the vehicle location and search indices of a deferred simulation state up to date,
+    moving every vehicle added, removed or relocated since the index was deferred in a single
+    Map.mutate() pass per index. the result is the same as if each change had been indexed.
+
+    :param sim: a simulation state with a deferred vehicle index
+    :param indexed_vehicles: the vehicles when the index was deferred
+    :return: the simulation state with an up to date vehicle index
+    """
+    moves = []
+    for vehicle_id, vehicle in sim.vehicles.items():
+        indexed = indexed_vehicles.get(vehicle_id)
+        if indexed is None:
+            moves.append((vehicle_id, None, vehicle.geoid))
+        elif indexed.geoid != vehicle.geoid:
+            moves.append((vehicle_id, indexed.geoid, vehicle.geoid))
+    for vehicle_id, indexed in indexed_vehicles.items():
+        if vehicle_id not in sim.vehicles:
+            moves.append((vehicle_id, indexed.geoid, None))
+
+    def _parent(geoid: Optional[GeoId]) -> Optional[GeoId]:
+        return h3.h3_to_parent(geoid, sim.sim_h3_search_resolution) if geoid else None
+
+    return sim._replace(
+        v_locations=DictOps.move_in_collection_dict(sim.v_locations, moves),
+        v_search=DictOps.move_in_collection_dict(
+            sim.v_search, ((v_id, _parent(old), _parent(new)) for v_id, old, new in moves)
+        ),
+        vehicle_index_deferred=False,
+    )
+
+
+def add_charging_vehicle(
+    sim: SimulationState, station_id: StationId, vehicle_id: VehicleId
+) -> SimulationState:
+    """
+    records that a vehicle is charging at a station in the station occupancy index
+
+    :param sim: the simulation state
+    :param station_id: the station the vehicle is charging at
+    :param vehicle_id: the charging vehicle
+    :return: the updated simulation state
+    """
+    updated = DictOps.add_to_collection_dict(sim.s_charging, station_id, vehicle_id)
+    return sim._replace(s_charging=updated)
+
+
+def remove_charging_vehicle(
+    sim: SimulationState, station_id: StationId, vehicle_id: VehicleId
+) -> SimulationState:
+    """
+    removes a vehicle from the charging vehicles of a station in the station occupancy index
+
+    :param sim: the simulation state
+    :param station_id: the station the vehicle was charging at
+    :param vehicle_id: the vehicle to remove
+    :return: the updated simulation state
+    """
+    updated = DictOps.remove_from_collection_dict(sim.s_charging, station_id, vehicle_id)
+    return sim._replace(s_charging=updated)
+
+
+def add_queueing_vehicle(
+    sim: SimulationState, station_id: StationId, vehicle_id: VehicleId
+) -> SimulationState:
+    """
+    records that a vehicle is queueing at a station in the station occupancy index
+
+    :param sim: the simulation state
+    :param station_id: the station the vehicle is queueing at
+    :param vehicle_id: the queueing vehicle
+    :return: the updated simulation state
+    """
+    updated = DictOps.add_to_collection_dict(sim.s_queueing, station_id, vehicle_id)
+    return sim._replace(s_queueing=updated)
+
+
+def remove_queueing_vehicle(
+    sim: SimulationState, station_id: StationId, vehicle_id: VehicleId
+) -> SimulationState:
+    """
+    removes a vehicle from the queueing vehicles of a station in the station occupancy index
+
+    :param sim: the simulation state
+    :param station_id: the station the vehicle was queueing at
+    :param vehicle_id: the vehicle to remove
+    :return: the updated simulation state
+    """
+    updated = DictOps.remove_from_collection_dict(sim.s_queueing, station_id, vehicle_id)
+    return sim._replace(s_queueing=updated)
+
+
+def _update_station_occupancy(sim: SimulationState, vehicle: Vehicle, add: bool) -> SimulationState:
+    """
+    adds or removes a vehicle from the station occupancy index based on its current state.
+    used when vehicles are added to or removed from the simulation without a state transition.
+
+    :param sim: the simulation state
+    :param vehicle: the vehicle being added or removed
+    :param add: if True, add the vehicle to the index, otherwise remove it
+    :return: the updated simulation state
+    """
+    state = vehicle.vehicle_state
+    if state.vehicle_state_type == VehicleStateType.CHARGING_STATION:
+        op = add_charging_vehicle if add else remove_charging_vehicle
+    elif state.vehicle_state_type == VehicleStateType.CHARGE_QUEUEING:
+        op = add_queueing_vehicle if add else remove_queueing_vehicle
+    else:
+        return sim
+    return op(sim, state.station_id, vehicle.id)  # type: ignore
+
+
+def _update_station_access(
+    s_access: immutables.Map[StationId, StationAccess], station: Station
+) -> immutables.Map[StationId, StationAccess]:
+    """
+    records the access of an added or modified station. the collection is only replaced when the
+    access changed, so that indices built from it stay valid while charger states change.
+
+    :param s_access: the station access collection
+    :param station: the added or modified station
+    :return: the updated station access collection
+    """
+    access = station.access
+    if s_access.get(station.id) == access:
+        return s_access
+    else:
+        return s_access.set(station.id, access)
+
+
 def add_station_safe(sim: SimulationState, station: Station) -> ResultE[SimulationState]:
     """
     adds a station to the simulation
@@ -489,6 +687,7 @@ def add_station_safe(sim: SimulationState, station: Station) -> ResultE[Simulati
             stations=DictOps.add_to_dict(sim.stations, station.id, station),
             s_locations=updated_s_locations,
             s_search=updated_s_search,
+            s_access=_update_station_access(sim.s_access, station),
         )
         return Success(updated_sim)
 
@@ -519,6 +718,7 @@ def remove_station_safe(sim: SimulationState, station_id: StationId) -> ResultE[
             stations=DictOps.remove_from_dict(sim.stations, station_id),
             s_locations=updated_s_locations,
             s_search=updated_s_search,
+            s_access=DictOps.remove_from_dict(sim.s_access, station_id),
         )
         return Success(updated_sim)
 
@@ -560,7 +760,8 @@ def modify_station_safe(sim: SimulationState, updated_station: Station) -> Resul
         return Failure(error)
     else:
         updated_sim = sim._replace(
-            stations=DictOps.add_to_dict(sim.stations, updated_station.id, updated_station)
+            stations=DictOps.add_to_dict(sim.stations, updated_station.id, updated_station),
+            s_access=_update_station_access(sim.s_access, updated_station),
         )
         return Success(updated_sim)
 
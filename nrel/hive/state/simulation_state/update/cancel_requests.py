@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import functools as ft
 import logging
+from bisect import bisect_right
 from dataclasses import dataclass
 from typing import Tuple, Optional
 
@@ -21,47 +22,53 @@ class CancelRequests(SimulationUpdateFunction):
         self, simulation_state: SimulationState, env: Environment
     ) -> Tuple[SimulationState, Optional[CancelRequests]]:
         """
-        cancels requests whose cancel time has been exceeded
-
+        cancels requests whose cancel time has been exceeded. the requests are found through the
+        departure time index of the simulation state, whose departure times are kept in
+        ascending order, so only the departure times that have expired are visited, not every
+        open request.
 
         :param simulation_state: state to modify
         :param env: the scenario environment
         :return: state without cancelled requests, along with this update function
         """
+        latest_expired_departure = (
+            simulation_state.sim_time - env.config.sim.request_cancel_time_seconds
+        )
+        expired_departures = simulation_state.r_departure_times[
+            : bisect_right(simulation_state.r_departure_times, latest_expired_departure)
+        ]
+        expired_request_ids = [
+            request_id
+            for t in expired_departures
+            for request_id in sorted(simulation_state.r_departures[t])
+        ]
 
         def _remove_from_sim(sim: SimulationState, request_id: RequestId) -> SimulationState:
             """
             inner function that removes each canceled request from the sim
 
-            :param payload: the sim to update, along with errors we are storing
+            :param sim: the sim to update
             :param request_id: this request to remove
             :return: the sim without the request
             """
-            this_request_cancel_time = (
-                sim.requests[request_id].departure_time + env.config.sim.request_cancel_time_seconds
-            )
-            if sim.sim_time < this_request_cancel_time:
+            (
+                update_error,
+                updated_sim,
+            ) = simulation_state_ops.remove_request(sim, request_id)
+
+            # report either error or successful cancellation
+            if update_error:
+                log.error(update_error)
+                return sim
+            elif updated_sim is None:
                 return sim
             else:
-                # remove this request
-                (
-                    update_error,
-                    updated_sim,
-                ) = simulation_state_ops.remove_request(sim, request_id)
-
-                # report either error or successful cancellation
-                if update_error:
-                    log.error(update_error)
-                    return sim
-                elif updated_sim is None:
-                    return sim
-                else:
-                    env.reporter.file_report(_gen_report(request_id, sim))
-                    return updated_sim
+                env.reporter.file_report(_gen_report(request_id, sim))
+                return updated_sim
 
         updated = ft.reduce(
             _remove_from_sim,
-            simulation_state.requests.keys(),
+            expired_request_ids,
             simulation_state,
         )
 
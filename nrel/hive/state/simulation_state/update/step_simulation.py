@@ -16,6 +16,7 @@ from nrel.hive.dispatcher.instruction_generator.instruction_generator import (
 from nrel.hive.dispatcher.instruction_generator.instruction_generator_ops import (
     generate_instructions,
 )
+from nrel.hive.reporting import profiling
 from nrel.hive.state.simulation_state import simulation_state_ops
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.state.simulation_state.update.simulation_update import SimulationUpdateFunction
@@ -89,7 +90,8 @@ class StepSimulation(SimulationUpdateFunction):
         :param env: the sim environment
         :return: updated simulation state, with reports, along with the (optionally) updated StepSimulation
         """
-        sim_with_drivers_updated = perform_driver_state_updates(simulation_state, env)
+        with profiling.profile("step.driver_updates"):
+            sim_with_drivers_updated = perform_driver_state_updates(simulation_state, env)
 
         i_stack, updated_i_gens = generate_instructions(
             self.ordered_instruction_generators, sim_with_drivers_updated, env
@@ -107,12 +109,14 @@ class StepSimulation(SimulationUpdateFunction):
         log_instructions(final_instructions, env, simulation_state.sim_time)
 
         # update drivers, update vehicles
-        sim_with_instructions = apply_instructions(
-            sim_with_drivers_updated, env, final_instructions
-        )
-        sim_vehicles_updated = perform_vehicle_state_updates(
-            simulation_state=sim_with_instructions, env=env
-        )
+        with profiling.profile("step.apply_instructions"):
+            sim_with_instructions = apply_instructions(
+                sim_with_drivers_updated, env, final_instructions
+            )
+        with profiling.profile("step.vehicle_state_updates"):
+            sim_vehicles_updated = perform_vehicle_state_updates(
+                simulation_state=sim_with_instructions, env=env
+            )
 
         # advance the simulation one time step
         sim_next_time_step = simulation_state_ops.tick(sim_vehicles_updated)
@@ -12,6 +12,7 @@ from nrel.hive.model.vehicle.vehicle import Vehicle
 from nrel.hive.reporting.report_type import ReportType
 from nrel.hive.reporting.reporter import Report
 from nrel.hive.state.entity_state import entity_state_ops
+from nrel.hive.state.simulation_state import simulation_state_ops
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.state.vehicle_state.charge_queueing import ChargeQueueing
 from nrel.hive.util import TupleOps
@@ -115,10 +116,14 @@ def perform_vehicle_state_updates(
     # why sort here? see _sort_by_vehicle_state for an explanation
     vehicles = _sort_by_vehicle_state(tuple(simulation_state.vehicles.values()))
 
+    # vehicle state updates do not read the vehicle location index, so it is rebuilt once
+    # after all vehicles have moved instead of after every move
+    indexed_vehicles = simulation_state.vehicles
+    sim = simulation_state_ops.defer_vehicle_index(simulation_state)
     for veh in vehicles:
-        simulation_state = step_vehicle(simulation_state, env, veh)
+        sim = step_vehicle(sim, env, veh)
 
-    return simulation_state
+    return simulation_state_ops.restore_vehicle_index(sim, indexed_vehicles)
 
 
 InstructionApplicationResult = Tuple[Optional[Exception], Optional[InstructionResult]]
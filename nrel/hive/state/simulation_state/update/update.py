@@ -7,6 +7,7 @@ import immutables
 
 from nrel.hive.config import HiveConfig
 from nrel.hive.dispatcher.instruction_generator.instruction_generator import InstructionGenerator
+from nrel.hive.reporting import profiling
 from nrel.hive.state.simulation_state.update.cancel_requests import CancelRequests
 from nrel.hive.state.simulation_state.update.charging_price_update import ChargingPriceUpdate
 from nrel.hive.state.simulation_state.update.simulation_update import SimulationUpdateFunction
@@ -79,9 +80,10 @@ class Update(NamedTuple):
         pre_step_result = ft.reduce(_apply_fn, self.pre_step_update, UpdatePayload(init_rp))
 
         # apply the simulation step using the StepSimulation update, which includes the dispatcher
-        updated_sim, updated_step_fn = self.step_update.update(
-            pre_step_result.runner_payload.s, pre_step_result.runner_payload.e
-        )
+        with profiling.profile("update.StepSimulation"):
+            updated_sim, updated_step_fn = self.step_update.update(
+                pre_step_result.runner_payload.s, pre_step_result.runner_payload.e
+            )
 
         # resolve changes to Update
         next_update = Update(pre_step_result.updated_step_fns, updated_step_fn)
@@ -104,7 +106,8 @@ def _apply_fn(p: UpdatePayload, fn: SimulationUpdateFunction) -> UpdatePayload:
     :return: the updated payload, with update function applied to the simulation,
     and the update function possibly updated itself
     """
-    result, updated_fn = fn.update(p.runner_payload.s, p.runner_payload.e)
+    with profiling.profile(f"update.{type(fn).__name__}"):
+        result, updated_fn = fn.update(p.runner_payload.s, p.runner_payload.e)
 
     # if we received an updated version of this SimulationUpdateFunction, store it
     next_update_fns = (
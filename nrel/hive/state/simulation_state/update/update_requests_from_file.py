@@ -3,13 +3,16 @@ from __future__ import annotations
 import functools as ft
 import logging
 from csv import DictReader
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from pathlib import Path
-from typing import Tuple, Optional, Iterator, Dict
+from typing import Tuple, Optional, Iterator, Dict, Union, List
 
+import h3
+import numpy as np
 from returns.result import Failure
 
 from nrel.hive.model.request import Request, RequestRateStructure
+from nrel.hive.model.request.request_table import RequestTable, RequestTableStepper
 from nrel.hive.model.sim_time import SimTime
 from nrel.hive.reporting.reporter import Report, ReportType
 from nrel.hive.runner.environment import Environment
@@ -17,6 +20,7 @@ from nrel.hive.state.simulation_state import simulation_state_ops
 from nrel.hive.state.simulation_state.simulation_state import SimulationState
 from nrel.hive.state.simulation_state.update.simulation_update import SimulationUpdateFunction
 from nrel.hive.util.iterators import DictReaderStepper
+from nrel.hive.util.units import KM_TO_MILE
 
 log = logging.getLogger(__name__)
 
@@ -24,10 +28,11 @@ log = logging.getLogger(__name__)
 @dataclass(frozen=True)
 class UpdateRequestsFromFile(SimulationUpdateFunction):
     """
-    loads requests from a file, which is assumed to be sorted by Request
+    loads requests from a file, which is assumed to be sorted by Request. unless the file is
+    read lazily, it is loaded as columns and each time step's requests are added as a batch.
     """
 
-    reader: DictReaderStepper
+    reader: Union[DictReaderStepper, RequestTableStepper]
     rate_structure: RequestRateStructure
 
     @classmethod
@@ -41,9 +46,10 @@ class UpdateRequestsFromFile(SimulationUpdateFunction):
         reads a requests file and builds a UpdateRequestsFromFile SimulationUpdateFunction
 
 
-        :param request_file: file path for requests
+        :param request_file: file path for requests, or a RequestTable directory when not reading lazily
         :param rate_structure_file:
         :param lazy_file_reading: a flag to enable lazy file loading. if false, the update function loads all reqs in memory
+                                  as columns. csv and parquet files can be loaded in memory, only csv files lazily
         :return: a SimulationUpdate function pointing at the first line of a request file
         :raises: an exception if there were issues loading the file
         """
@@ -57,25 +63,21 @@ class UpdateRequestsFromFile(SimulationUpdateFunction):
                 rate_structure = RequestRateStructure.from_row(next(reader))
 
         req_path = Path(request_file)
-        if not req_path.is_file():
+        if not (req_path.is_file() or req_path.is_dir() and not lazy_file_reading):
             raise IOError(f"{request_file} is not a valid path to a request file")
 
+        stepper: Union[DictReaderStepper, RequestTableStepper]
         if lazy_file_reading:
-            error, stepper = DictReaderStepper.build(
+            error, file_stepper = DictReaderStepper.build(
                 request_file, "departure_time", parser=SimTime.build
             )
             if error:
                 raise error
-            if stepper is None:
+            if file_stepper is None:
                 raise ValueError("DictReaderStepper should have returned a non-null value")
+            stepper = file_stepper
         else:
-            with req_path.open() as f:
-                # converting to tuple then back to iterator should bring the whole file into memory
-                reader_iter = iter(tuple(DictReader(f)))
-
-            stepper = DictReaderStepper.from_iterator(
-                reader_iter, "departure_time", parser=SimTime.build
-            )
+            stepper = RequestTableStepper(RequestTable.from_file(req_path))
 
         return UpdateRequestsFromFile(reader=stepper, rate_structure=rate_structure)
 
@@ -93,6 +95,15 @@ class UpdateRequestsFromFile(SimulationUpdateFunction):
 
         current_sim_time = sim_state.sim_time
 
+        if isinstance(self.reader, RequestTableStepper):
+            result = update_requests_from_table(
+                self.reader.read_until(current_sim_time),
+                sim_state,
+                env=env,
+                rate_structure=self.rate_structure,
+            )
+            return result, None
+
         def stop_condition(value: int) -> bool:
             stop = value < current_sim_time
             return stop
@@ -199,3 +210,99 @@ def update_requests_from_iterator(
     )
 
     return updated_sim
+
+
+def update_requests_from_table(
+    table: RequestTable,
+    initial_sim_state: SimulationState,
+    env: Environment,
+    rate_structure: RequestRateStructure,
+) -> SimulationState:
+    """
+    adds the requests of a table to the simulation as a batch: all origins and destinations are
+    snapped to the road network together, values are computed together, and the requests are
+    inserted into the simulation state in one pass.
+
+    :param table: the requests to add, typically those departing in this time step
+    :param initial_sim_state: the current sim state
+    :param env: the simulation environment
+    :param rate_structure: the rate structure for requests in the simulation
+    :return: sim state plus new requests
+    """
+    sim = initial_sim_state
+    cancel_time_seconds = env.config.sim.request_cancel_time_seconds
+    has_fleets = len(env.fleet_ids) > 0
+
+    rows: List[int] = []
+    for i, (request_id, departure_time, fleet_id) in enumerate(
+        zip(table.request_id, table.departure_time, table.fleet_id)
+    ):
+        this_req_cancel_time = departure_time + cancel_time_seconds
+        if this_req_cancel_time <= sim.sim_time:
+            # cannot add request that should already be cancelled
+            warning = f"request {request_id} with cancel_time {this_req_cancel_time} cannot be added at time {sim.sim_time}"
+            log.warning(warning)
+        elif has_fleets and fleet_id is None:
+            warning = f"request {request_id} is missing membership and will not be be added"
+            log.warning(warning)
+        elif not has_fleets and fleet_id is not None:
+            warning = f"request {request_id} has membership but there is no fleets file. This request will not be added"
+            log.warning(warning)
+        else:
+            rows.append(i)
+    if len(rows) == 0:
+        return sim
+
+    res = env.config.sim.sim_h3_resolution
+    origins = [h3.geo_to_h3(table.o_lat[i], table.o_lon[i], res) for i in rows]
+    destinations = [h3.geo_to_h3(table.d_lat[i], table.d_lon[i], res) for i in rows]
+    positions = sim.road_network.positions_from_geoids(origins + destinations)
+
+    requests = []
+    for i, origin_position, destination_position in zip(
+        rows, positions[: len(rows)], positions[len(rows) :]
+    ):
+        request_id = table.request_id[i]
+        if origin_position is None or destination_position is None:
+            log.error(f"request {request_id} cannot be positioned on the road network")
+        elif not sim.road_network.geoid_within_geofence(origin_position.geoid):
+            log.error(f"request {request_id} origin not within road network geofence")
+        else:
+            request = Request.build_at_positions(
+                request_id=request_id,
+                origin_position=origin_position,
+                destination_position=destination_position,
+                departure_time=SimTime(table.departure_time[i]),
+                passengers=int(table.passengers[i]),
+                allows_pooling=bool(table.allows_pooling[i]),
+                fleet_id=table.fleet_id[i],
+            )
+            requests.append(request)
+
+    if len(requests) == 0:
+        return sim
+
+    # values are assigned as in Request.assign_value, with the distances computed as a batch
+    if rate_structure.price_per_mile > 0:
+        distance_km = sim.road_network.distance_pairs_km(
+            [r.origin for r in requests], [r.destination for r in requests]
+        )
+        distance_price = rate_structure.price_per_mile * distance_km * KM_TO_MILE
+    else:
+        distance_price = np.zeros(len(requests))
+    prices = np.maximum(rate_structure.minimum_price, rate_structure.base_price + distance_price)
+    requests = [replace(r, value=float(price)) for r, price in zip(requests, prices)]
+
+    sim_or_error = simulation_state_ops.add_requests_safe(sim, requests)
+    if isinstance(sim_or_error, Failure):
+        log.error(sim_or_error.failure())
+        return sim
+
+    for request in requests:
+        report_data = {
+            "request_id": request.id,
+            "departure_time": str(request.departure_time),
+            "fleet_id": str(request.membership),
+        }
+        env.reporter.file_report(Report(ReportType.ADD_REQUEST_EVENT, report_data))
+    return sim_or_error.unwrap()
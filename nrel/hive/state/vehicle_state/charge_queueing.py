@@ -110,7 +110,10 @@ class ChargeQueueing(VehicleState):
                 else:
                     if updated_sim is None:
                         return Exception("sim was none when error was not none"), None
-                    return VehicleState.apply_new_vehicle_state(updated_sim, self.vehicle_id, self)
+                    indexed_sim = simulation_state_ops.add_queueing_vehicle(
+                        updated_sim, self.station_id, self.vehicle_id
+                    )
+                    return VehicleState.apply_new_vehicle_state(indexed_sim, self.vehicle_id, self)
 
     def update(
         self, sim: SimulationState, env: "Environment"
@@ -124,7 +127,7 @@ class ChargeQueueing(VehicleState):
         env: "Environment",
     ) -> Tuple[Optional[Exception], Optional[SimulationState]]:
         """
-        remove agent from queue before exiting this state
+        remove agent from queue and from the station's queueing vehicles before exiting this state
 
         :param sim:
         :param env:
@@ -151,7 +154,12 @@ class ChargeQueueing(VehicleState):
                     )
                     response.__cause__ = error
                     return response, None
-                return None, updated_sim
+                elif updated_sim is None:
+                    return None, None
+                indexed_sim = simulation_state_ops.remove_queueing_vehicle(
+                    updated_sim, self.station_id, self.vehicle_id
+                )
+                return None, indexed_sim
 
     def _has_reached_terminal_state_condition(self, sim: SimulationState, env: Environment) -> bool:
         """
@@ -67,7 +67,8 @@ class ChargingStation(VehicleState):
         self, sim: "SimulationState", env: Environment
     ) -> Tuple[Optional[Exception], Optional["SimulationState"]]:
         """
-        entering a charge event requires attaining a charger_id from the station
+        entering a charge event requires attaining a charger_id from the station.
+        the vehicle is also added to the station's charging vehicles in the sim
 
         :param sim: the simulation state
         :param env: the simulation environment
@@ -129,7 +130,10 @@ class ChargingStation(VehicleState):
                 elif updated_sim is None:
                     return None, None
                 else:
-                    return VehicleState.apply_new_vehicle_state(updated_sim, self.vehicle_id, self)
+                    indexed_sim = simulation_state_ops.add_charging_vehicle(
+                        updated_sim, self.station_id, self.vehicle_id
+                    )
+                    return VehicleState.apply_new_vehicle_state(indexed_sim, self.vehicle_id, self)
 
     def update(
         self, sim: "SimulationState", env: Environment
@@ -144,6 +148,7 @@ class ChargingStation(VehicleState):
     ) -> Tuple[Optional[Exception], Optional["SimulationState"]]:
         """
         exiting a charge event requires returning the charger_id to the station
+        and removing the vehicle from the station's charging vehicles
 
         :param sim: the simulation state
         :param env: the simulation environment
@@ -173,7 +178,16 @@ class ChargingStation(VehicleState):
                 return response, None
             elif updated_station is None:
                 return None, None
-            return simulation_state_ops.modify_station(sim, updated_station)
+            error, updated_sim = simulation_state_ops.modify_station(sim, updated_station)
+            if error:
+                return error, None
+            elif updated_sim is None:
+                return None, None
+            else:
+                indexed_sim = simulation_state_ops.remove_charging_vehicle(
+                    updated_sim, self.station_id, self.vehicle_id
+                )
+                return None, indexed_sim
 
     def _has_reached_terminal_state_condition(
         self, sim: "SimulationState", env: Environment
@@ -6,6 +6,7 @@ from nrel.hive.model.entity_position import EntityPosition
 from nrel.hive.model.roadnetwork.route import empty_route
 from nrel.hive.model.roadnetwork.routetraversal import traverse, RouteTraversal
 from nrel.hive.model.vehicle.vehicle import Vehicle
+from nrel.hive.reporting.report_type import ReportType
 from nrel.hive.reporting.vehicle_event_ops import (
     vehicle_move_event,
     vehicle_charge_event,
@@ -109,15 +110,16 @@ def charge(
         elif sim_with_vehicle is None:
             return None, None
         else:
-            report = vehicle_charge_event(
-                vehicle,
-                updated_vehicle,
-                sim_with_vehicle,
-                updated_station,
-                charger,
-                mechatronics,
-            )
-            env.reporter.file_report(report)
+            if env.reporter.wants(ReportType.VEHICLE_CHARGE_EVENT):
+                report = vehicle_charge_event(
+                    vehicle,
+                    updated_vehicle,
+                    sim_with_vehicle,
+                    updated_station,
+                    charger,
+                    mechatronics,
+                )
+                env.reporter.file_report(report)
 
             return simulation_state_ops.modify_station(sim_with_vehicle, updated_station)
 
@@ -226,8 +228,9 @@ def move(
         new_route_state = new_position_vehicle.vehicle_state.update_route(route=remaining_route)  # type: ignore
         updated_vehicle = new_position_vehicle.modify_vehicle_state(new_route_state)
 
-        report = vehicle_move_event(sim, vehicle, updated_vehicle, traverse_result, env)
-        env.reporter.file_report(report)
+        if env.reporter.wants(ReportType.VEHICLE_MOVE_EVENT):
+            report = vehicle_move_event(sim, vehicle, updated_vehicle, traverse_result, env)
+            env.reporter.file_report(report)
 
     error, moved_sim = simulation_state_ops.modify_vehicle(sim, updated_vehicle)
     if error:
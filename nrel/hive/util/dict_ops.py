@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import NamedTuple, Tuple, Optional, TypeVar, FrozenSet, TYPE_CHECKING
+from bisect import bisect_left
+from typing import Any, Iterable, NamedTuple, Tuple, Optional, TypeVar, FrozenSet, TYPE_CHECKING
 
 import h3
 import immutables
@@ -67,10 +68,10 @@ class DictOps:
     @classmethod
     def add_to_collection_dict(
         cls,
-        xs: immutables.Map[str, FrozenSet[V]],
-        collection_id: str,
+        xs: immutables.Map[K, FrozenSet[V]],
+        collection_id: K,
         obj_id: V,
-    ) -> immutables.Map[str, FrozenSet[V]]:
+    ) -> immutables.Map[K, FrozenSet[V]]:
         """
         updates Dicts that track collections of entities
         performs a shallow copy and update, treating Dict as an immutable hash table
@@ -85,6 +86,40 @@ class DictOps:
         updated_ids = ids_at_location.union([obj_id])
         return xs.set(collection_id, updated_ids)
 
+    @classmethod
+    def move_in_collection_dict(
+        cls,
+        xs: immutables.Map[K, FrozenSet[V]],
+        moves: Iterable[Tuple[V, Optional[K], Optional[K]]],
+    ) -> immutables.Map[K, FrozenSet[V]]:
+        """
+        updates Dicts that track collections of entities for many entities at once
+        each move removes an entity from its old collection and adds it to its new one, all in
+        a single Map.mutate() pass instead of copying the Dict once per change.
+        like remove_from_collection_dict, it deletes collections left with no ids
+
+
+        :param xs: the collection dict
+        :param moves: (obj_id, old collection_id, new collection_id) triples. the old
+                      collection_id is None for new entities, the new one None for removed entities
+        :return: the updated collection dict
+        """
+        with xs.mutate() as mutable:
+            for obj_id, old_collection_id, new_collection_id in moves:
+                if old_collection_id == new_collection_id:
+                    continue
+                if old_collection_id is not None:
+                    ids_at_loc = mutable.get(old_collection_id, frozenset()).difference([obj_id])
+                    if len(ids_at_loc) > 0:
+                        mutable.set(old_collection_id, ids_at_loc)
+                    elif old_collection_id in mutable:
+                        del mutable[old_collection_id]
+                if new_collection_id is not None:
+                    ids_at_location = mutable.get(new_collection_id, frozenset())
+                    mutable.set(new_collection_id, ids_at_location.union([obj_id]))
+            tmp = mutable.finish()
+        return tmp
+
     @classmethod
     def add_to_stack_dict(
         cls, xs: immutables.Map[str, Tuple[V, ...]], collection_id: str, obj: V
@@ -128,13 +163,43 @@ class DictOps:
             obj, updated_stack = None, ()
         return obj, xs.set(collection_id, updated_stack)
 
+    @classmethod
+    def update_sorted_keys(
+        cls,
+        keys: Tuple[K, ...],
+        xs: immutables.Map[K, Any],
+        changed: Iterable[Optional[K]],
+    ) -> Tuple[K, ...]:
+        """
+        keeps a sorted tuple of the keys of a Dict in step with the Dict, after the given keys
+        may have been added to or removed from it. each key is found by binary search, so the
+        tuple is only copied when a key was actually added or removed.
+
+
+        :param keys: the sorted keys of the Dict before the change
+        :param xs: the Dict after the change
+        :param changed: the keys that may have been added or removed; None is ignored
+        :return: the sorted keys of the Dict after the change
+        """
+        updated = keys
+        for key in changed:
+            if key is None:
+                continue
+            i = bisect_left(updated, key)  # type: ignore
+            present = i < len(updated) and updated[i] == key
+            if key in xs and not present:
+                updated = (*updated[:i], key, *updated[i:])
+            elif key not in xs and present:
+                updated = (*updated[:i], *updated[i + 1 :])
+        return updated
+
     @classmethod
     def remove_from_collection_dict(
         cls,
-        xs: immutables.Map[str, FrozenSet[V]],
-        collection_id: str,
-        obj_id: str,
-    ) -> immutables.Map[str, FrozenSet[V]]:
+        xs: immutables.Map[K, FrozenSet[V]],
+        collection_id: K,
+        obj_id: V,
+    ) -> immutables.Map[K, FrozenSet[V]]:
         """
         updates Dicts that track collections of entities
         performs a shallow copy and update, treating Dict as an immutable hash table
@@ -1,9 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional, TYPE_CHECKING, FrozenSet, Iterable, Callable, Tuple
+import heapq
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+)
 
 import h3
 import immutables
+import numpy as np
 from math import radians, cos, sin, asin, sqrt, ceil
 
 from nrel.hive.util.exception import H3Error
@@ -20,7 +34,7 @@ class H3Ops:
     def nearest_entity_by_great_circle_distance(
         cls,
         geoid: GeoId,
-        entities: Iterable[Entity],
+        entities: Union[Mapping[EntityId, Entity], Iterable[Entity]],
         entity_search: immutables.Map[GeoId, FrozenSet[EntityId]],
         sim_h3_search_resolution: int,
         is_valid: Callable[[Any], bool] = lambda x: True,
@@ -32,11 +46,11 @@ class H3Ops:
 
 
         :param geoid: the search origin
-        :param entities: a collection of a certain type of entity, by Id type
+        :param entities: the entities of a certain type by id, such as SimulationState.bases. an iterable of
+                         entities is also accepted, but is indexed by id on each call
         :param entity_search: the location of objects of this entity type, registered at a high-level grid resolution
         :param sim_h3_search_resolution: the h3 resolution of the entity_search collection
         :param is_valid: a function used to filter valid search results, such as checking stations for charger_id availability
-        :param k: the number of concentric rings to check in the high-level search
         :param max_search_distance_km: the maximum distance a result can be from the search origin
         :return: the nearest entity, or, None if not found within the constraints
         """
@@ -54,7 +68,7 @@ class H3Ops:
     def nearest_entity(
         cls,
         geoid: GeoId,
-        entities: Iterable[Entity],
+        entities: Union[Mapping[EntityId, Entity], Iterable[Entity]],
         entity_search: immutables.Map[GeoId, FrozenSet[EntityId]],
         sim_h3_search_resolution: int,
         distance_function: Callable[[Any], float],
@@ -67,65 +81,88 @@ class H3Ops:
 
 
         :param geoid: the search origin
-        :param entities: a collection of a certain type of entity, by Id type
+        :param entities: the entities of a certain type by id, such as SimulationState.stations. an iterable of
+                         entities is also accepted, but is indexed by id on each call
         :param entity_search: the location of objects of this entity type, registered at a high-level grid resolution
         :param sim_h3_search_resolution: the h3 resolution of the entity_search collection
         :param is_valid: a function used to filter valid search results, such as checking stations for charger_id availability
         :param distance_function: a function used to evaluate the distance metric for selection
-        :param k: the number of concentric rings to check in the high-level search
         :param max_search_distance_km: the maximum distance a result can be from the search origin
         :return: the nearest entity, or, None if not found within the constraints
         """
-        if not entities:
-            return None
+        nearest = cls.nearest_entities(
+            geoid=geoid,
+            entities=entities,
+            entity_search=entity_search,
+            sim_h3_search_resolution=sim_h3_search_resolution,
+            distance_function=distance_function,
+            n=1,
+            is_valid=is_valid,
+            max_search_distance_km=max_search_distance_km,
+        )
+        return nearest[0] if nearest else None
+
+    @classmethod
+    def nearest_entities(
+        cls,
+        geoid: GeoId,
+        entities: Union[Mapping[EntityId, Entity], Iterable[Entity]],
+        entity_search: immutables.Map[GeoId, FrozenSet[EntityId]],
+        sim_h3_search_resolution: int,
+        distance_function: Callable[[Any], float],
+        n: int,
+        is_valid: Callable[[Any], bool] = lambda x: True,
+        max_search_distance_km: Kilometers = 10,  # kilometers
+    ) -> Tuple[Entity, ...]:
+        """
+        returns up to n of the closest entities to the given geoid, nearest first. rings of search cells
+        are visited outwards from the geoid until n valid entities are found, and the entities found are
+        ranked by the distance function. In the case of a tie, the first entity encountered is ranked first.
+        invariant: the Entity has a geoid field (Entity.geoid)
+
+
+        :param geoid: the search origin
+        :param entities: the entities of a certain type by id, such as SimulationState.stations. an iterable of
+                         entities is also accepted, but is indexed by id on each call
+        :param entity_search: the location of objects of this entity type, registered at a high-level grid resolution
+        :param sim_h3_search_resolution: the h3 resolution of the entity_search collection
+        :param distance_function: a function used to evaluate the distance metric for selection
+        :param n: the number of entities to return
+        :param is_valid: a function used to filter valid search results, such as checking stations for charger_id availability
+        :param max_search_distance_km: the maximum distance a result can be from the search origin
+        :return: the nearest entities, nearest first, or an empty tuple if none are found within the constraints
+        """
+        if not entities or n < 1:
+            return ()
         geoid_res = h3.h3_get_resolution(geoid)
         if geoid_res < sim_h3_search_resolution:
             raise H3Error("search resolution must be less than geoid resolution")
+        if not isinstance(entities, Mapping):
+            entities = {e.id: e for e in entities}
 
         k_dist_km = h3.edge_length(sim_h3_search_resolution, unit="km") * 2  # kilometers
         max_k = ceil(max_search_distance_km / k_dist_km)
         search_geoid = h3.h3_to_parent(geoid, sim_h3_search_resolution)
 
-        def _search(current_k: int = 0) -> Optional[Entity]:
-            if current_k > max_k:
-                # There are no entities in any of the rings.
-                return None
-            else:
-                # get the kth ring
-                ring = h3.k_ring(search_geoid, current_k)
-
-                # get all entities in this ring
-                found = (
-                    entity
-                    for cell in ring
-                    for entity in cls.get_entities_at_cell(cell, entity_search, entities)
-                )
-
-                best_dist_km = 1000000.0
-                best_entity = None
-
-                count = 0
-                for entity in found:
-                    dist_km = distance_function(entity)
-                    if is_valid(entity) and dist_km < best_dist_km:
-                        best_dist_km = dist_km
-                        best_entity = entity
-                    count += 1
-
-                if best_entity is not None:
-                    # print(f"ring search depth {current_k} found {count} agents, best agent at dist {best_dist} km")
-                    return best_entity
-                else:
-                    return _search(current_k + 1)
-
-        return _search()
+        # (distance, order found, entity), where the order found breaks ties between equal distances
+        found: List[Tuple[float, int, Entity]] = []
+        for k in range(max_k + 1):
+            # only the cells at distance k, as the cells of the inner rings were already searched
+            for cell in h3.hex_ring(search_geoid, k):
+                for entity in cls.get_entities_at_cell(cell, entity_search, entities):
+                    if is_valid(entity):
+                        found.append((distance_function(entity), len(found), entity))
+            if len(found) >= n:
+                break
+
+        return tuple(entity for _, _, entity in heapq.nsmallest(n, found))
 
     @classmethod
     def get_entities_at_cell(
         cls,
         search_cell: GeoId,
         entity_search: immutables.Map[GeoId, FrozenSet[EntityId]],
-        entities: Iterable[Entity],
+        entities: Union[Mapping[EntityId, Entity], Iterable[Entity]],
     ) -> Tuple[Entity, ...]:
         """
         gives us entities within a high-level search cell
@@ -133,12 +170,15 @@ class H3Ops:
 
         :param search_cell: the search-level h3 position we are looking at
         :param entity_search: the upper-level search collection for this entity type
-        :param entities: the actual entities
+        :param entities: the actual entities by id. an iterable of entities is scanned instead
         :return: any entities which are located at this search-level cell
         """
         locations_at_cell = entity_search.get(search_cell)
         if locations_at_cell is None:
             return ()
+        elif isinstance(entities, Mapping):
+            # ids missing from entities were filtered out by the caller
+            return tuple(entities[e_id] for e_id in locations_at_cell if e_id in entities)
         else:
             found = tuple(e for e in entities if e.id in locations_at_cell)
             return found
@@ -201,6 +241,44 @@ class H3Ops:
 
         return 2 * avg_earth_radius_km * asin(sqrt(d))
 
+    @classmethod
+    def geoids_to_lat_lon_array(cls, geoids: Iterable[GeoId]) -> np.ndarray:
+        """
+        converts a collection of geoids into an array of their centroids, so that batch distance
+        computations only pay for the h3 lookup once per geoid
+
+
+        :param geoids: the geoids to convert
+        :return: an array of shape (n, 2) with lat/lon pairs in decimal degrees
+        """
+        coords = [h3.h3_to_geo(geoid) for geoid in geoids]
+        return np.array(coords, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def great_circle_distance_array(cls, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        vectorized version of great_circle_distance over arrays of lat/lon pairs. the inputs follow
+        numpy broadcasting rules, so passing a[:, None] and b[None, :] produces a distance matrix,
+        while two arrays of equal shape produce the element-wise distances.
+
+
+        :param a: array of lat/lon pairs in decimal degrees, with shape (..., 2)
+        :param b: array of lat/lon pairs in decimal degrees, with shape (..., 2)
+        :return: the haversine distances in kilometers
+        """
+        avg_earth_radius_km = 6371
+
+        a_rad = np.radians(a)
+        b_rad = np.radians(b)
+        lat1, lon1 = a_rad[..., 0], a_rad[..., 1]
+        lat2, lon2 = b_rad[..., 0], b_rad[..., 1]
+
+        lat = lat2 - lat1
+        lon = lon2 - lon1
+        d = np.sin(lat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(lon * 0.5) ** 2
+
+        return 2 * avg_earth_radius_km * np.arcsin(np.sqrt(np.clip(d, 0.0, 1.0)))
+
     @classmethod
     def point_along_link(cls, link: LinkTraversal, available_time_seconds: Seconds) -> GeoId:
         """
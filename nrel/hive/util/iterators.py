@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import copy
 import csv
 import logging
 from itertools import islice, tee
@@ -20,6 +21,14 @@ from typing import (
 log = logging.getLogger(__name__)
 
 
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _read_nothing(value: Any) -> bool:
+    return False
+
+
 class ObjectIterator:
     """
     iterator that deals with a set of named tuples
@@ -87,6 +96,13 @@ class DictReaderIterator:
     def update_stop_condition(self, stop_condition: Callable):
         self.stop_condition = stop_condition
 
+    def __getstate__(self):
+        # the stop condition is replaced before each read and is often a closure, so it is
+        # not saved; a restored iterator reads nothing until it is given a new one
+        state = self.__dict__.copy()
+        state["stop_condition"] = _read_nothing
+        return state
+
     def __iter__(self):
         return self
 
@@ -127,6 +143,9 @@ class DictReaderStepper:
     read_until_value consumes the next set of rows that fall within the next upper-value for the next window.
 
     destruction: should be explicitly closed via DictReaderStepper.close()
+
+    a stepper can be pickled, as it is when a simulation is checkpointed. a stepper reading a
+    file saves the file name and read position, and reopens the file there when it is loaded.
     """
 
     def __init__(
@@ -135,7 +154,7 @@ class DictReaderStepper:
         file_reference: Optional[TextIO],
         step_column_name: str,
         initial_stop_condition: Callable = lambda x: x < 0,
-        parser: Callable = lambda x: x,
+        parser: Callable = _identity,
     ):
         """
         creates a DictReaderStepper with an internal DictReaderIterator
@@ -156,7 +175,7 @@ class DictReaderStepper:
         file: Union[str, Path],
         step_column_name: str,
         initial_stop_condition: Callable = lambda x: x < 0,
-        parser: Callable = lambda x: x,
+        parser: Callable = _identity,
     ) -> Tuple[Optional[Exception], Optional[DictReaderStepper]]:
         """
         alternative constructor that takes a file path and returns a DictReaderStepper, or, a failure
@@ -174,7 +193,8 @@ class DictReaderStepper:
             return (
                 None,
                 cls(
-                    csv.DictReader(f),
+                    # rows are read with readline so that the read position can be saved
+                    csv.DictReader(iter(f.readline, "")),
                     f,
                     step_column_name,
                     initial_stop_condition,
@@ -190,7 +210,7 @@ class DictReaderStepper:
         data: Iterator[Dict[str, str]],
         step_column_name: str,
         initial_stop_condition: Callable = lambda x: x < 0,
-        parser: Callable = lambda x: x,
+        parser: Callable = _identity,
     ) -> DictReaderStepper:
         """
         allows for substituting a simple Dict Iterator in place of loading from
@@ -218,10 +238,58 @@ class DictReaderStepper:
         self._iterator.update_stop_condition(stop_condition)
         return self._iterator
 
+    @property
+    def file_name(self) -> Optional[str]:
+        """
+        the name of the file this stepper reads, or None if it reads an iterator
+        """
+        return self._file.name if self._file is not None else None
+
+    def resume(self, checkpointed: Any) -> DictReaderStepper:
+        """
+        continues reading from where a checkpointed stepper over the same file stopped.
+        this stepper is closed, as the checkpointed stepper reads in its place.
+
+        :param checkpointed: the stepper restored from a checkpoint
+        :return: the stepper to read with
+        :raises: ValueError if the checkpointed stepper reads something else
+        """
+        if not isinstance(checkpointed, DictReaderStepper):
+            raise ValueError(f"cannot resume a file reader from a {type(checkpointed).__name__}")
+        elif checkpointed.file_name != self.file_name:
+            raise ValueError(
+                f"checkpoint reads {checkpointed.file_name}, but the scenario reads {self.file_name}"
+            )
+        self.close()
+        return checkpointed
+
     def close(self):
         if self._file:
             self._file.close()
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._file is not None:
+            # an open file cannot be pickled, so its name and read position are saved instead
+            iterator = copy.copy(self._iterator)
+            fieldnames = iterator.reader.fieldnames
+            iterator.reader = None
+            state["_iterator"] = iterator
+            state["_file"] = None
+            state["_file_position"] = (self._file.name, fieldnames, self._file.tell())
+        return state
+
+    def __setstate__(self, state):
+        file_position = state.pop("_file_position", None)
+        self.__dict__.update(state)
+        if file_position is not None:
+            name, fieldnames, position = file_position
+            self._file = open(name, "r")
+            self._file.seek(position)
+            self._iterator.reader = csv.DictReader(
+                iter(self._file.readline, ""), fieldnames=fieldnames
+            )
+
 
 def sliding(iterable: Iterable, size: int) -> Generator:
     """
@@ -0,0 +1,213 @@
+import random
+from concurrent.futures import ProcessPoolExecutor
+from unittest import TestCase
+
+import numpy as np
+
+from nrel.hive.dispatcher.instruction_generator import assignment_ops
+from nrel.hive.resources.mock_lobster import *
+
+
+class TestAssignmentOps(TestCase):
+    def test_find_sparse_assignment_matches_dense_solution(self):
+        random.seed(0)
+        vehicles = tuple(
+            mock_vehicle_from_geoid(
+                vehicle_id=f"v{i}",
+                geoid=h3.geo_to_h3(
+                    39.75 + random.uniform(-0.05, 0.05), -104.98 + random.uniform(-0.05, 0.05), 15
+                ),
+            )
+            for i in range(15)
+        )
+        requests = tuple(
+            mock_request_from_geoids(
+                request_id=f"r{i}",
+                origin=h3.geo_to_h3(
+                    39.75 + random.uniform(-0.05, 0.05), -104.98 + random.uniform(-0.05, 0.05), 15
+                ),
+            )
+            for i in range(10)
+        )
+        sim = mock_sim(h3_search_res=7, vehicles=vehicles)
+        sim = simulation_state_ops.add_entities(sim, requests)
+
+        dense = assignment_ops.find_assignment(
+            vehicles, requests, assignment_ops.great_circle_distance_cost
+        )
+        sparse = assignment_ops.find_sparse_assignment(
+            vehicles,
+            requests,
+            sim.v_search,
+            sim.r_search,
+            sim.sim_h3_search_resolution,
+            max_distance_km=100,
+        )
+
+        self.assertEqual(len(sparse.solution), len(requests), "all requests should be assigned")
+        self.assertAlmostEqual(sparse.solution_cost, dense.solution_cost, places=4)
+
+    def test_find_sparse_assignment_prunes_distant_pairs(self):
+        somewhere = h3.geo_to_h3(39.7539, -104.974, 15)
+        near_to_somewhere = h3.geo_to_h3(39.754, -104.975, 15)
+        far_from_somewhere = h3.geo_to_h3(39.9, -104.6, 15)
+
+        close_veh = mock_vehicle_from_geoid(vehicle_id="close_veh", geoid=near_to_somewhere)
+        near_req = mock_request_from_geoids(request_id="near_req", origin=somewhere)
+        far_req = mock_request_from_geoids(request_id="far_req", origin=far_from_somewhere)
+
+        sim = mock_sim(h3_search_res=7, vehicles=(close_veh,))
+        sim = simulation_state_ops.add_entities(sim, (near_req, far_req))
+
+        solution = assignment_ops.find_sparse_assignment(
+            (close_veh,),
+            (far_req, near_req),
+            sim.v_search,
+            sim.r_search,
+            sim.sim_h3_search_resolution,
+            max_distance_km=5,
+        )
+
+        self.assertEqual(solution.solution, (("close_veh", "near_req"),))
+        self.assertEqual(solution.pairs, 1, "only the near pair should be given a cost")
+        self.assertEqual(solution.partitions, 1)
+
+    def test_find_sparse_assignment_nothing_in_range(self):
+        somewhere = h3.geo_to_h3(39.7539, -104.974, 15)
+        far_from_somewhere = h3.geo_to_h3(39.9, -104.6, 15)
+
+        veh = mock_vehicle_from_geoid(geoid=somewhere)
+        req = mock_request_from_geoids(origin=far_from_somewhere)
+
+        sim = mock_sim(h3_search_res=7, vehicles=(veh,))
+        sim = simulation_state_ops.add_request_safe(sim, req).unwrap()
+
+        solution = assignment_ops.find_sparse_assignment(
+            (veh,),
+            (req,),
+            sim.v_search,
+            sim.r_search,
+            sim.sim_h3_search_resolution,
+            max_distance_km=5,
+        )
+
+        self.assertEqual(solution.solution, (), "no vehicle is within range of the request")
+
+    def test_partitioned_assignment_matches_global_solution(self):
+        random.seed(1)
+
+        def _cluster(lat: float, lon: float) -> GeoId:
+            return h3.geo_to_h3(
+                lat + random.uniform(-0.01, 0.01), lon + random.uniform(-0.01, 0.01), 15
+            )
+
+        # two clusters of vehicles and requests far enough apart to share no pair within range
+        vehicles = tuple(
+            mock_vehicle_from_geoid(vehicle_id=f"v{i}", geoid=_cluster(39.75, -104.98 + i % 2))
+            for i in range(12)
+        )
+        requests = tuple(
+            mock_request_from_geoids(request_id=f"r{i}", origin=_cluster(39.75, -104.98 + i % 2))
+            for i in range(8)
+        )
+        sim = mock_sim(h3_search_res=7, vehicles=vehicles)
+        sim = simulation_state_ops.add_entities(sim, requests)
+
+        table = assignment_ops.sparse_distance_cost_matrix(
+            vehicles, requests, sim.v_search, sim.r_search, sim.sim_h3_search_resolution, 10
+        )
+        partitions = assignment_ops.partition_sparse_table(table)
+        self.assertEqual(len(partitions), 2, "should find the two clusters")
+
+        global_rows, global_cols = assignment_ops.solve_sparse_assignment(table)
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            rows, cols = assignment_ops.solve_partitioned_assignment(partitions, executor)
+
+        self.assertEqual(
+            set(zip(rows.tolist(), cols.tolist())),
+            set(zip(global_rows.tolist(), global_cols.tolist())),
+        )
+
+    def test_nearest_sparse_cost_matrix_keeps_nearest_vehicles_in_range(self):
+        random.seed(2)
+        vehicles = tuple(
+            mock_vehicle_from_geoid(
+                vehicle_id=f"v{i}",
+                geoid=h3.geo_to_h3(
+                    39.75 + random.uniform(-0.1, 0.1), -104.98 + random.uniform(-0.1, 0.1), 15
+                ),
+            )
+            for i in range(30)
+        )
+        requests = tuple(
+            mock_request_from_geoids(
+                request_id=f"r{i}",
+                origin=h3.geo_to_h3(
+                    39.75 + random.uniform(-0.1, 0.1), -104.98 + random.uniform(-0.1, 0.1), 15
+                ),
+            )
+            for i in range(10)
+        )
+        sim = mock_sim(h3_search_res=7, vehicles=vehicles)
+        sim = simulation_state_ops.add_entities(sim, requests)
+
+        in_range = assignment_ops.sparse_distance_cost_matrix(
+            vehicles, requests, sim.v_search, sim.r_search, sim.sim_h3_search_resolution, 8
+        ).toarray()
+        all_nearest = assignment_ops.nearest_sparse_cost_matrix(
+            vehicles, requests, 8, len(vehicles)
+        ).toarray()
+        self.assertTrue(
+            np.allclose(all_nearest, in_range),
+            "with a candidate per vehicle, should store every pair in range",
+        )
+
+        k_nearest = assignment_ops.nearest_sparse_cost_matrix(vehicles, requests, 8, 3)
+        for j in range(len(requests)):
+            column = in_range[:, j]
+            expected = np.sort(column[column > 0])[:3]
+            found = np.sort(k_nearest.getcol(j).data)
+            self.assertTrue(np.allclose(found, expected), "should keep the 3 nearest in range")
+
+    def test_find_sparse_assignment_with_candidates(self):
+        somewhere = h3.geo_to_h3(39.7539, -104.974, 15)
+        near_to_somewhere = h3.geo_to_h3(39.754, -104.975, 15)
+        far_from_somewhere = h3.geo_to_h3(39.76, -104.99, 15)
+
+        close_veh = mock_vehicle_from_geoid(vehicle_id="close_veh", geoid=near_to_somewhere)
+        far_veh = mock_vehicle_from_geoid(vehicle_id="far_veh", geoid=far_from_somewhere)
+        req_a = mock_request_from_geoids(request_id="req_a", origin=somewhere)
+        req_b = mock_request_from_geoids(request_id="req_b", origin=somewhere)
+
+        sim = mock_sim(h3_search_res=7, vehicles=(close_veh, far_veh))
+        sim = simulation_state_ops.add_entities(sim, (req_a, req_b))
+
+        def _solve(max_candidates: int):
+            return assignment_ops.find_sparse_assignment(
+                (close_veh, far_veh),
+                (req_a, req_b),
+                sim.v_search,
+                sim.r_search,
+                sim.sim_h3_search_resolution,
+                max_distance_km=5,
+                max_candidates=max_candidates,
+            )
+
+        self.assertEqual(len(_solve(0).solution), 2, "both vehicles are in range")
+        self.assertEqual(_solve(0).pairs, 4, "every pair is in range")
+        self.assertEqual(_solve(1).pairs, 2, "one candidate is costed per request")
+        self.assertEqual(
+            _solve(1).solution,
+            (("close_veh", "req_a"),),
+            "only the nearest vehicle is a candidate for either request",
+        )
+
+    def test_assignment_pool_is_shut_down_when_the_environment_closes(self):
+        pool = assignment_ops.AssignmentPool()
+        executor = pool.executor(2)
+        self.assertIs(pool.executor(2), executor, "workers should be kept between time steps")
+
+        env = mock_env()._replace(assignment_pool=pool)
+        env.close(RunnerPayload(mock_sim(), env, mock_update()))
+        with self.assertRaises(RuntimeError):
+            executor.submit(abs, -1)
@@ -1,3 +1,4 @@
+from dataclasses import replace
 from unittest import TestCase
 
 from returns.result import Success
@@ -36,3 +37,39 @@ class TestCancelRequests(TestCase):
             result.r_locations,
             "request location should not have been removed",
         )
+
+    def test_update_only_cancels_expired_departures(self):
+        sim = mock_sim(sim_time=900)
+        for request_id, departure_time in (("d", 301), ("a", 0), ("c", 300), ("b", 0)):
+            req = mock_request(request_id=request_id, departure_time=departure_time)
+            sim = simulation_state_ops.add_request_safe(sim, req).unwrap()
+        self.assertEqual(set(sim.r_departures.keys()), {0, 300, 301})
+        self.assertEqual(sim.r_departure_times, (0, 300, 301), "should be kept in order")
+
+        result, _ = CancelRequests().update(sim, mock_env())
+        self.assertEqual(set(result.requests.keys()), {"d"}, "requests before 300 should expire")
+        self.assertEqual(dict(result.r_departures), {301: frozenset({"d"})})
+        self.assertEqual(result.r_departure_times, (301,))
+
+    def test_mutation_keeps_departure_times_in_order(self):
+        requests = [
+            mock_request(request_id=request_id, departure_time=departure_time)
+            for request_id, departure_time in (("a", 200), ("b", 100), ("c", 200))
+        ]
+        sim = simulation_state_ops.add_requests_safe(mock_sim(), requests).unwrap()
+        self.assertEqual(sim.r_departure_times, (100, 200))
+
+        with sim.mutate() as mutation:
+            mutation.modify_entity(replace(requests[1], departure_time=SimTime.build(300)))
+        modified = mutation.result.unwrap()
+        self.assertEqual(modified.r_departure_times, (200, 300))
+
+    def test_remove_request_updates_departure_index(self):
+        req = mock_request(departure_time=100)
+        sim = simulation_state_ops.add_request_safe(mock_sim(), req).unwrap()
+        self.assertEqual(sim.r_departures.get(100), frozenset({req.id}))
+
+        error, removed = simulation_state_ops.remove_request(sim, req.id)
+        self.assertIsNone(error)
+        self.assertNotIn(100, removed.r_departures, "empty departure times should be dropped")
+        self.assertEqual(removed.r_departure_times, ())
@@ -0,0 +1,112 @@
+import tempfile
+from unittest import TestCase
+
+from nrel.hive.dispatcher.instruction_generator.dispatcher import Dispatcher
+from nrel.hive.initialization.load import load_simulation
+from nrel.hive.reporting.handler.stats_handler import StatsHandler
+from nrel.hive.runner import LocalSimulationRunner, RunnerPayload
+from nrel.hive.runner.checkpoint import (
+    read_checkpoint,
+    restore_checkpoint,
+    write_checkpoint,
+)
+from nrel.hive.resources.mock_lobster import *
+
+
+def _denver_demo_config(end_hour: int, lazy_file_reading: bool = False):
+    config = mock_denver_demo_config(end_hour=end_hour)
+    return config._replace(
+        global_config=config.global_config._replace(lazy_file_reading=lazy_file_reading)
+    )
+
+
+def _load_with_stats(config):
+    runner_payload = load_simulation(config)
+    reporter = Reporter()
+    reporter.add_handler(StatsHandler())
+    return runner_payload._replace(e=runner_payload.e.set_reporter(reporter))
+
+
+def _denver_demo(end_hour: int, lazy_file_reading: bool):
+    return _load_with_stats(_denver_demo_config(end_hour, lazy_file_reading))
+
+
+def _vehicles(runner_payload):
+    # vehicle states hold a random instance id, so they are compared by type
+    return {
+        v.id: (v.geoid, type(v.vehicle_state).__name__, v.energy, v.distance_traveled_km)
+        for v in runner_payload.s.get_vehicles()
+    }
+
+
+class TestCheckpoint(TestCase):
+    def test_resumed_run_matches_uninterrupted_run(self):
+        for lazy_file_reading in (False, True):
+            expected = LocalSimulationRunner.run(_denver_demo(4, lazy_file_reading))
+            warm_up = LocalSimulationRunner.run(_denver_demo(2, lazy_file_reading))
+
+            with tempfile.TemporaryDirectory() as tmp:
+                file = write_checkpoint(warm_up, Path(tmp) / "checkpoint.pickle")
+                resumed = restore_checkpoint(_denver_demo(4, lazy_file_reading), file)
+            self.assertEqual(resumed.s.sim_time, SimTime.build(2 * 3600))
+            result = LocalSimulationRunner.run(resumed)
+
+            self.assertEqual(result.s.sim_time, expected.s.sim_time)
+            self.assertEqual(_vehicles(result), _vehicles(expected))
+            self.assertEqual(dict(result.s.requests), dict(expected.s.requests))
+            self.assertEqual(
+                result.e.reporter.get_summary_stats(result),
+                expected.e.reporter.get_summary_stats(expected),
+                "summary stats should cover the whole run",
+            )
+
+    def test_forked_run_uses_its_own_dispatcher(self):
+        warm_up = LocalSimulationRunner.run(_denver_demo(2, False))
+        expected = LocalSimulationRunner.run(_denver_demo(4, False))
+
+        config = _denver_demo_config(4)
+        config = config._replace(
+            dispatcher=config.dispatcher._replace(max_assignment_radius_km=0.0)
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            file = write_checkpoint(warm_up, Path(tmp) / "checkpoint.pickle")
+            forked = restore_checkpoint(_load_with_stats(config), file)
+        dispatchers = [
+            i
+            for i in forked.u.step_update.ordered_instruction_generators
+            if isinstance(i, Dispatcher)
+        ]
+        self.assertEqual([d.config.max_assignment_radius_km for d in dispatchers], [0.0])
+
+        result = LocalSimulationRunner.run(forked)
+        served = result.e.reporter.get_summary_stats(result)["requests_served_percent"]
+        expected_served = expected.e.reporter.get_summary_stats(expected)["requests_served_percent"]
+        self.assertLess(
+            served, expected_served, "the forked dispatcher should not assign any requests"
+        )
+
+    def test_runner_writes_checkpoints_at_interval(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = mock_config(end_time=300, timestep_duration_seconds=60)
+            config = config._replace(
+                global_config=config.global_config._replace(checkpoint_interval=2),
+                scenario_output_directory=Path(tmp),
+            )
+            sim = mock_sim(vehicles=(mock_vehicle(),), stations=(mock_station(),))
+            LocalSimulationRunner.run(RunnerPayload(sim, mock_env(config), mock_update(config)))
+
+            files = sorted(p.name for p in (Path(tmp) / "checkpoints").iterdir())
+            checkpoint = read_checkpoint(Path(tmp) / "checkpoints" / "checkpoint_120.pickle")
+
+        self.assertEqual(files, ["checkpoint_120.pickle", "checkpoint_240.pickle"])
+        self.assertEqual(checkpoint.sim_time, SimTime.build(120))
+        self.assertIn(DefaultIds.mock_vehicle_id(), checkpoint.sim.vehicles)
+
+    def test_restore_rejects_another_time_step(self):
+        sim = mock_sim(sim_timestep_duration_seconds=30)
+        runner_payload = RunnerPayload(sim, mock_env(), mock_update())
+        with tempfile.TemporaryDirectory() as tmp:
+            file = write_checkpoint(runner_payload, Path(tmp) / "checkpoint.pickle")
+            env = mock_env(mock_config(timestep_duration_seconds=60))
+            with self.assertRaises(ValueError):
+                restore_checkpoint(RunnerPayload(mock_sim(), env, mock_update()), file)
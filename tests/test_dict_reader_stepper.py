@@ -1,3 +1,4 @@
+import pickle
 from unittest import TestCase
 
 from pkg_resources import resource_filename
@@ -156,3 +157,22 @@ class TestDictReaderStepper(TestCase):
                 stop2,
                 f"should be less than {stop2}",
             )
+
+    def test_pickled_stepper_resumes_from_its_read_position(self):
+        test_filename = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.requests",
+            "denver_demo_requests.csv",
+        )
+        _, stepper = DictReaderStepper.build(test_filename, "departure_time", parser=SimTime.build)
+        stop1 = SimTime.build("1970-01-01T00:12:00")
+        stop2 = SimTime.build("1970-01-01T00:14:00")
+        _ = tuple(stepper.read_until_stop_condition(self._generate_stop_condition(stop1)))
+
+        restored = pickle.loads(pickle.dumps(stepper))
+        expected = tuple(stepper.read_until_stop_condition(self._generate_stop_condition(stop2)))
+        result = tuple(restored.read_until_stop_condition(self._generate_stop_condition(stop2)))
+        stepper.close()
+        restored.close()
+
+        self.assertEqual(len(result), 5, f"should have found 5 rows in [{stop1}, {stop2})")
+        self.assertEqual(result, expected)
@@ -1,7 +1,12 @@
 from unittest import TestCase
 
-from nrel.hive.state.driver_state.driver_instruction_ops import human_go_home
+from nrel.hive.state.driver_state.demand_density_index import demand_density_index
+from nrel.hive.state.driver_state.driver_instruction_ops import (
+    human_go_home,
+    human_look_for_requests,
+)
 from nrel.hive.resources.mock_lobster import *
+from nrel.hive.util.fp import throw_or_return
 
 
 class TestDriverInstructionOps(TestCase):
@@ -38,3 +43,33 @@ class TestDriverInstructionOps(TestCase):
         self.assertIsInstance(result, DispatchStationInstruction)
         self.assertEqual(result.station_id, station.id)
         self.assertEqual(result.vehicle_id, veh.id)
+
+    def test_human_look_for_requests(self):
+        # three requests downtown and one about 11km north, near the vehicle
+        dense = [mock_request(f"dense_{i}", o_lat=39.7539, o_lon=-104.974) for i in range(3)]
+        sparse = mock_request("sparse", o_lat=39.8539, o_lon=-104.974)
+        veh = mock_vehicle(lat=39.86, lon=-104.974)
+        sim = mock_sim(vehicles=(veh,), h3_search_res=7)
+        for req in dense + [sparse]:
+            sim = throw_or_return(simulation_state_ops.add_request_safe(sim, req))
+
+        def _link_to(req):
+            search_hex = h3.h3_to_parent(req.origin, sim.sim_h3_search_resolution)
+            center = h3.h3_to_center_child(search_hex, sim.sim_h3_location_resolution)
+            return sim.road_network.position_from_geoid(center).link_id
+
+        anywhere = mock_env()
+        nearby = mock_env(
+            mock_config()._replace(
+                dispatcher=mock_config().dispatcher._replace(human_driver_reposition_radius_km=5)
+            )
+        )
+        self.assertEqual(
+            human_look_for_requests(veh, sim, anywhere).destination, _link_to(dense[0])
+        )
+        self.assertEqual(human_look_for_requests(veh, sim, nearby).destination, _link_to(sparse))
+        index = demand_density_index(sim, anywhere)
+        self.assertIs(demand_density_index(sim, anywhere), index, "reused within a time step")
+        self.assertIsNot(demand_density_index(sim, nearby), index, "cached per environment")
+        self.assertIs(demand_density_index(sim, anywhere), index)
+        self.assertIsNone(human_look_for_requests(veh, mock_sim(vehicles=(veh,)), anywhere))
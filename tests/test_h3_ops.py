@@ -69,6 +69,53 @@ class TestH3Ops(TestCase):
 
         self.assertEqual(nearest.geoid, req_near.geoid)
 
+    def test_nearest_entities(self):
+        h3_resolution = 15
+        somewhere = h3.geo_to_h3(39.7539, -104.974, h3_resolution)
+        reqs = (
+            mock_request_from_geoids("far", h3.geo_to_h3(39.775, -104.99, h3_resolution)),
+            mock_request_from_geoids("near", h3.geo_to_h3(39.754, -104.975, h3_resolution)),
+            mock_request_from_geoids("mid", h3.geo_to_h3(39.757, -104.978, h3_resolution)),
+        )
+        sim = mock_sim(h3_location_res=h3_resolution, h3_search_res=9)
+        for req in reqs:
+            sim = throw_or_return(simulation_state_ops.add_request_safe(sim, req))
+
+        def _nearest(n, is_valid=lambda r: True):
+            found = H3Ops.nearest_entities(
+                geoid=somewhere,
+                entities=sim.requests,
+                entity_search=sim.r_search,
+                sim_h3_search_resolution=sim.sim_h3_search_resolution,
+                distance_function=lambda r: H3Ops.great_circle_distance(somewhere, r.geoid),
+                n=n,
+                is_valid=is_valid,
+            )
+            return tuple(r.id for r in found)
+
+        self.assertEqual(_nearest(1), ("near",))
+        self.assertEqual(_nearest(3), ("near", "mid", "far"), "should search outer rings for n")
+        self.assertEqual(_nearest(5), ("near", "mid", "far"))
+        self.assertEqual(_nearest(2, lambda r: r.id != "near"), ("mid", "far"))
+
+    def test_nearest_entity_skips_ids_missing_from_entities(self):
+        h3_resolution = 15
+        somewhere = h3.geo_to_h3(39.7539, -104.974, h3_resolution)
+        req_near = mock_request_from_geoids("near", h3.geo_to_h3(39.754, -104.975, h3_resolution))
+        req_far = mock_request_from_geoids("far", h3.geo_to_h3(39.755, -104.976, h3_resolution))
+        sim = mock_sim(h3_location_res=h3_resolution, h3_search_res=7)
+        for req in (req_near, req_far):
+            sim = throw_or_return(simulation_state_ops.add_request_safe(sim, req))
+
+        nearest = H3Ops.nearest_entity_by_great_circle_distance(
+            geoid=somewhere,
+            entities=sim.requests.delete("near"),
+            entity_search=sim.r_search,
+            sim_h3_search_resolution=sim.sim_h3_search_resolution,
+        )
+
+        self.assertEqual(nearest.id, "far")
+
     def test_great_circle_distance(self):
         london = h3.geo_to_h3(51.5007, 0.1246, 10)
         new_york = h3.geo_to_h3(40.6892, 74.0445, 10)
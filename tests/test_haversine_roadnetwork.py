@@ -1,5 +1,6 @@
 from unittest import TestCase, skip
 
+from nrel.hive.model.roadnetwork.route import route_distance_km, route_travel_time_seconds
 from nrel.hive.resources.mock_lobster import *
 
 
@@ -39,3 +40,27 @@ class TestHaversineRoadNetwork(TestCase):
             places=1,
             msg="Route should be approx. 1.1km",
         )
+
+    def test_distance_and_route_matrix(self):
+        network = mock_network()
+        origins = (h3.geo_to_h3(37, 122, 15), h3.geo_to_h3(37.01, 122, 15))
+        destinations = (
+            h3.geo_to_h3(37.02, 122.01, 15),
+            h3.geo_to_h3(37, 122, 15),
+            h3.geo_to_h3(36.99, 121.98, 15),
+        )
+
+        distances = network.distance_matrix_km(origins, destinations)
+        travel_times = network.route_matrix(origins, destinations)
+
+        self.assertEqual(distances.shape, (2, 3))
+        for i, o in enumerate(origins):
+            for j, d in enumerate(destinations):
+                expected = network.distance_by_geoid_km(o, d)
+                self.assertAlmostEqual(distances[i, j], expected, places=9)
+                route = network.route(
+                    network.position_from_geoid(o), network.position_from_geoid(d)
+                )
+                self.assertAlmostEqual(
+                    travel_times[i, j], route_travel_time_seconds(route), delta=1
+                )
@@ -2,8 +2,16 @@ from unittest import TestCase
 
 from nrel.hive.dispatcher.instruction_generator.instruction_generator_ops import (
     instruct_vehicles_to_dispatch_to_station,
+    ChargingCandidate,
+    assign_vehicles_to_chargers,
+    rank_charging_candidates,
+    valid_station_for_vehicle,
 )
+from nrel.hive.dispatcher.instruction_generator import assignment_ops
 from nrel.hive.dispatcher.instruction_generator.charging_search_type import ChargingSearchType
+from nrel.hive.dispatcher.instruction_generator.station_compatibility import (
+    station_compatibility_index,
+)
 from nrel.hive.resources.mock_lobster import *
 
 
@@ -73,3 +81,104 @@ class TestInstructionGenerators(TestCase):
         )
 
         self.assertEqual(len(instructions), 0, "should not have generated any instructions")
+
+    def test_station_compatibility_index(self):
+        fleet = Membership.single_membership(DefaultIds.mock_membership_id())
+        public_station = mock_station("public", chargers={mock_l2_charger_id(): 1})
+        fleet_station = mock_station("fleet", lat=39.76, membership=fleet)
+        bev, ice = mock_bev(), mock_ice()
+        env = mock_env(mechatronics={bev.mechatronics_id: bev, ice.mechatronics_id: ice})
+        sim = mock_sim(stations=(public_station, fleet_station))
+
+        index = station_compatibility_index(sim, env)
+        public_candidates = index.candidates(Membership(), bev.mechatronics_id)
+        fleet_candidates = index.candidates(fleet, bev.mechatronics_id)
+        self.assertEqual(dict(public_candidates.chargers), {"public": {mock_l2_charger_id()}})
+        self.assertEqual(set(fleet_candidates.chargers), {"public", "fleet"})
+        self.assertEqual(frozenset().union(*fleet_candidates.search.values()), {"public", "fleet"})
+        self.assertEqual(len(index.candidates(fleet, ice.mechatronics_id).chargers), 0)
+
+        # charger states change every step without invalidating the index
+        busy_station = public_station.checkout_charger(mock_l2_charger_id())[1]
+        sim = simulation_state_ops.modify_station(sim, busy_station)[1]
+        self.assertIs(station_compatibility_index(sim, env), index)
+
+        # nor does building the index of another simulation's environment
+        other_env = mock_env(mechatronics={bev.mechatronics_id: bev})
+        self.assertIsNot(station_compatibility_index(sim, other_env), index)
+        self.assertIs(station_compatibility_index(sim, env), index)
+
+        # a change of membership does
+        private_station = busy_station.set_membership((DefaultIds.mock_membership_id(),))
+        sim = simulation_state_ops.modify_station(sim, private_station)[1]
+        updated_index = station_compatibility_index(sim, env)
+        self.assertIsNot(updated_index, index)
+        self.assertEqual(
+            len(updated_index.candidates(Membership(), bev.mechatronics_id).chargers), 0
+        )
+
+    def test_rank_charging_candidates(self):
+        vehicle = mock_vehicle(soc=0.1)
+        near = mock_station("near", lat=39.7549, chargers={mock_dcfc_charger_id(): 1})
+        far = mock_station("far", lat=39.7639)
+        sim = mock_sim(vehicles=(vehicle,), stations=(far, near), h3_search_res=7)
+
+        ranked = rank_charging_candidates(
+            n=2,
+            max_search_radius_km=10,
+            vehicle=vehicle,
+            simulation_state=sim,
+            environment=mock_env(),
+            target_soc=0.8,
+            charging_search_type=ChargingSearchType.NEAREST_SHORTEST_QUEUE,
+        )
+
+        self.assertEqual([c.station_id for c in ranked], ["near", "far"])
+        self.assertEqual(ranked[0].charger_id, mock_dcfc_charger_id())
+        self.assertLess(ranked[0].rank, ranked[1].rank)
+
+    def test_station_search_helpers_match_rankings(self):
+        vehicle = mock_vehicle(soc=0.1)
+        near = mock_station("near", lat=39.7549, chargers={mock_dcfc_charger_id(): 1})
+        far = mock_station("far", lat=39.7639)
+        sim = mock_sim(vehicles=(vehicle,), stations=(far, near), h3_search_res=7)
+        env = mock_env()
+
+        candidates = station_compatibility_index(sim, env).candidates_for_vehicle(vehicle)
+        is_valid = valid_station_for_vehicle(vehicle, env)
+        for station in (near, far):
+            self.assertEqual(is_valid(station), station.id in candidates.chargers)
+
+        queue_distance = assignment_ops.nearest_shortest_queue_distance(vehicle, env)
+        time_to_charge = assignment_ops.shortest_time_to_charge_distance(vehicle, sim, env, 0.8)
+        for station in (near, far):
+            _, queue_rank = assignment_ops.nearest_shortest_queue_ranking(
+                vehicle, station, env, assignment_ops.MAX_DIST
+            )
+            _, charge_rank = assignment_ops.shortest_time_to_charge_ranking(
+                sim, env, vehicle, station, 0.8
+            )
+            self.assertEqual(queue_distance(station), queue_rank)
+            self.assertEqual(time_to_charge(station), charge_rank)
+
+    def test_assign_vehicles_to_chargers_caps_queue_slots(self):
+        charger_id = mock_dcfc_charger_id()
+        stations = (
+            mock_station("s1", chargers={charger_id: 1}),
+            mock_station("s2", lat=39.76, chargers={charger_id: 1}),
+        )
+        sim = mock_sim(stations=stations)
+        candidates = {
+            f"v{i}": (
+                ChargingCandidate("s1", charger_id, 1.0),
+                ChargingCandidate("s2", charger_id, 2.0),
+            )
+            for i in range(8)
+        }
+
+        instructions = assign_vehicles_to_chargers(candidates, sim, queue_cap=1)
+
+        self.assertEqual({i.vehicle_id for i in instructions}, set(candidates))
+        station_ids = [i.station_id for i in instructions]
+        self.assertEqual(station_ids.count("s2"), 2, "s2 offers a free charger and one queue slot")
+        self.assertEqual(station_ids.count("s1"), 6, "the rest queue at their best station")
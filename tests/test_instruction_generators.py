@@ -157,3 +157,73 @@ class TestInstructionGenerators(TestCase):
             s2.id,
             "should have instructed vehicle to go to s2",
         )
+
+    def test_charging_fleet_manager_spreads_vehicles_over_stations(self):
+        # two low battery vehicles, a station with one free charger and another a bit further away
+        vehicles = tuple(
+            mock_vehicle_from_geoid(f"v{i}", h3.geo_to_h3(39.0, -104.0 + i * 0.0001, 15), soc=0.01)
+            for i in range(2)
+        )
+        stations = (
+            mock_station_from_geoid(
+                "s1", h3.geo_to_h3(39.01, -104.0, 15), chargers={mock_dcfc_charger_id(): 1}
+            ),
+            mock_station_from_geoid(
+                "s2", h3.geo_to_h3(39.015, -104.0, 15), chargers={mock_dcfc_charger_id(): 1}
+            ),
+        )
+        sim = mock_sim(h3_location_res=15, h3_search_res=5, vehicles=vehicles, stations=stations)
+
+        def _stations(charging_search_candidates: int):
+            config = mock_config().dispatcher._replace(
+                charging_search_candidates=charging_search_candidates
+            )
+            _, instructions = ChargingFleetManager(config).generate_instructions(sim, mock_env())
+            station_ids = []
+            for i in instructions:
+                assert isinstance(i, DispatchStationInstruction), "should dispatch to a station"
+                station_ids.append(i.station_id)
+            return sorted(station_ids)
+
+        self.assertEqual(_stations(1), ["s1", "s1"], "each vehicle takes its best station")
+        self.assertEqual(_stations(2), ["s1", "s2"], "the second vehicle should not queue at s1")
+
+    def test_dispatcher_partitioned_assignment(self):
+        config = mock_config().dispatcher._replace(partition_assignment=True)
+        dispatcher = Dispatcher(config)
+
+        somewhere = h3.geo_to_h3(39.7539, -104.974, 15)
+        near_to_somewhere = h3.geo_to_h3(39.754, -104.975, 15)
+
+        req = mock_request_from_geoids(origin=somewhere, fleet_id=DefaultIds.mock_membership_id())
+        veh = mock_vehicle_from_geoid(geoid=near_to_somewhere, membership=mock_membership())
+        sim = mock_sim(h3_location_res=9, h3_search_res=9, vehicles=(veh,))
+        sim = simulation_state_ops.add_request_safe(sim, req).unwrap()
+
+        dispatcher, instructions = dispatcher.generate_instructions(sim, mock_env())
+
+        self.assertEqual(len(instructions), 1, "should have dispatched the vehicle")
+        self.assertEqual(len(dispatcher.step_stats), 1, "should report stats for the one fleet")
+        stats = dispatcher.step_stats[0]
+        self.assertEqual(stats.partitions, 1)
+        self.assertEqual(stats.assignments, 1)
+
+    def test_dispatcher_nearest_candidates(self):
+        config = mock_config().dispatcher._replace(max_assignment_candidates=1)
+        dispatcher = Dispatcher(config)
+
+        somewhere = h3.geo_to_h3(39.7539, -104.974, 15)
+        near_to_somewhere = h3.geo_to_h3(39.754, -104.975, 15)
+        further_from_somewhere = h3.geo_to_h3(39.76, -104.99, 15)
+
+        req = mock_request_from_geoids(origin=somewhere)
+        close_veh = mock_vehicle_from_geoid(vehicle_id="close_veh", geoid=near_to_somewhere)
+        far_veh = mock_vehicle_from_geoid(vehicle_id="far_veh", geoid=further_from_somewhere)
+        sim = mock_sim(h3_location_res=9, h3_search_res=9, vehicles=(close_veh, far_veh))
+        sim = simulation_state_ops.add_request_safe(sim, req).unwrap()
+
+        dispatcher, instructions = dispatcher.generate_instructions(sim, mock_env())
+
+        self.assertEqual(len(instructions), 1, "should have dispatched a vehicle")
+        self.assertEqual(instructions[0].vehicle_id, "close_veh")
+        self.assertEqual(dispatcher.step_stats[0].pairs, 1, "only the nearest vehicle is paired")
@@ -1,5 +1,16 @@
-from unittest import TestCase
+import tempfile
+from unittest import TestCase, skipIf
 
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from nrel.hive.reporting import profiling
+from nrel.hive.reporting.handler.profile_handler import ProfileHandler
+from nrel.hive.reporting.handler.stats_handler import StatsHandler
 from nrel.hive.runner import LocalSimulationRunner
 from nrel.hive.runner import RunnerPayload
 from nrel.hive.state.simulation_state.update.cancel_requests import CancelRequests
@@ -76,3 +87,70 @@ class TestLocalSimulationRunner(TestCase):
             None,
             "we should not be able to step a simulation that has exceeded end_time",
         )
+
+    def test_run_with_profiling(self):
+        config = mock_config(end_time=600, timestep_duration_seconds=60)
+        req = mock_request(request_id="1", departure_time=SimTime.build(0), passengers=2)
+        initial_sim = mock_sim(vehicles=(mock_vehicle(),), stations=(mock_station(),))
+        initial_sim = simulation_state_ops.add_request_safe(initial_sim, req).unwrap()
+
+        with tempfile.TemporaryDirectory() as tmp:
+            # the StatsHandler reads move and request reports, so those are filed and counted
+            reporter = Reporter()
+            reporter.add_handler(StatsHandler())
+            reporter.add_handler(ProfileHandler(Path(tmp)))
+            env = mock_env(config.set_scenario_output_directory(Path(tmp))).set_reporter(reporter)
+            runner_payload = RunnerPayload(initial_sim, env, mock_update())
+
+            result = LocalSimulationRunner.run(runner_payload)
+            env.reporter.close(result)
+            profile = pd.read_csv(Path(tmp) / "profile.csv")
+
+        self.assertIsNone(profiling.active_profiler(), "only the steps of the run are profiled")
+        self.assertEqual(len(profile), 10, "should have one row per time step")
+        self.assertEqual(profile["sim_time"].iloc[-1], 600)
+        for phase in (
+            "update.StepSimulation",
+            "step.driver_updates",
+            "step.apply_instructions",
+            "step.vehicle_state_updates",
+            "handler.ProfileHandler",
+        ):
+            self.assertIn(f"{phase}_seconds", profile.columns)
+        self.assertGreater(profile["routes_computed"].sum(), 0)
+        self.assertGreater(profile["assignments_solved"].sum(), 0)
+        self.assertGreater(profile["reports_filed"].sum(), 0)
+
+    def test_profiling_is_scoped_to_its_simulation(self):
+        config = mock_config(end_time=300, timestep_duration_seconds=60)
+        initial_sim = mock_sim(vehicles=(mock_vehicle(),))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            reporter = Reporter()
+            handler = ProfileHandler(Path(tmp))
+            reporter.add_handler(handler)
+            profiled = mock_env(config.set_scenario_output_directory(Path(tmp))).set_reporter(
+                reporter
+            )
+            LocalSimulationRunner.run(RunnerPayload(initial_sim, mock_env(config), mock_update()))
+            self.assertEqual(handler.profiler.rows, [], "another simulation should not profile")
+
+            LocalSimulationRunner.run(RunnerPayload(initial_sim, profiled, mock_update()))
+            self.assertEqual(len(handler.profiler.rows), 5)
+
+    @skipIf(pyarrow is None, "writing parquet requires pyarrow")
+    def test_run_with_profiling_to_parquet(self):
+        config = mock_config(end_time=300, timestep_duration_seconds=60)
+        initial_sim = mock_sim(vehicles=(mock_vehicle(),))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            reporter = Reporter()
+            reporter.add_handler(ProfileHandler(Path(tmp), log_format="parquet"))
+            env = mock_env(config.set_scenario_output_directory(Path(tmp))).set_reporter(reporter)
+
+            result = LocalSimulationRunner.run(RunnerPayload(initial_sim, env, mock_update()))
+            env.reporter.close(result)
+            profile = pd.read_parquet(Path(tmp) / "profile.parquet")
+
+        self.assertEqual(len(profile), 5, "should have one row per time step")
+        self.assertIn("step.vehicle_state_updates_seconds", profile.columns)
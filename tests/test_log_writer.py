@@ -0,0 +1,91 @@
+import gzip
+import json
+import tempfile
+from unittest import TestCase, skipIf
+
+import pandas as pd
+
+from nrel.hive.reporting.handler.stateful_handler import StatefulHandler
+from nrel.hive.reporting.log_writer import build_log_writer
+from nrel.hive.runner import RunnerPayload
+from nrel.hive.resources.mock_lobster import *
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def _records(n: int):
+    return [{"report_type": "vehicle_move_event", "vehicle_id": f"v{i}"} for i in range(n)]
+
+
+class TestLogWriter(TestCase):
+    def test_json_writes_once_buffer_is_full(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = build_log_writer(Path(tmp), "event", "json", buffer_size=2)
+            path = Path(tmp) / "event.log"
+            records = _records(3)
+
+            writer.write(records[0])
+            writer.log_file.flush()
+            self.assertEqual(path.read_text(), "", "one record should stay buffered")
+
+            writer.write(records[1])
+            writer.write(records[2])
+            writer.log_file.flush()
+            self.assertEqual(len(path.read_text().splitlines()), 2)
+
+            writer.close()
+            lines = path.read_text().splitlines()
+
+        self.assertEqual([json.loads(line) for line in lines], records)
+
+    def test_json_gz(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = build_log_writer(Path(tmp), "event", "json.gz", buffer_size=2)
+            for record in _records(5):
+                writer.write(record)
+            writer.close()
+            with gzip.open(Path(tmp) / "event.log.gz", "rt") as f:
+                records = [json.loads(line) for line in f]
+
+        self.assertEqual(records, _records(5))
+
+    @skipIf(pyarrow is None, "writing parquet requires pyarrow")
+    def test_parquet_writes_a_file_per_report_type(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = build_log_writer(Path(tmp), "state", "parquet", buffer_size=2)
+            writer.write({"report_type": "VEHICLE_STATE", "vehicle_id": "v0", "balance": 0})
+            writer.write({"report_type": "STATION_STATE", "station_id": "s0"})
+            writer.write({"report_type": "VEHICLE_STATE", "vehicle_id": "v1", "balance": 1.5})
+            writer.write({"report_type": "VEHICLE_STATE", "vehicle_id": "v2"})
+            writer.close()
+            vehicles = pd.read_parquet(Path(tmp) / "state" / "vehicle_state.parquet")
+            stations = pd.read_parquet(Path(tmp) / "state" / "station_state.parquet")
+
+        self.assertEqual(list(vehicles["vehicle_id"]), ["v0", "v1", "v2"])
+        self.assertEqual(list(vehicles["balance"].fillna(-1)), [0.0, 1.5, -1])
+        self.assertEqual(list(stations["station_id"]), ["s0"])
+
+    def test_unsupported_format(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                build_log_writer(Path(tmp), "event", "csv", buffer_size=2)
+
+    def test_state_log_interval(self):
+        config = mock_config()
+        global_config = config.global_config._replace(log_state_interval=3, log_buffer_size=1)
+        sim = mock_sim(vehicles=(mock_vehicle(),), stations=(mock_station(),))
+        runner_payload = RunnerPayload(sim, mock_env(config), mock_update())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            handler = StatefulHandler(global_config, Path(tmp))
+            for _ in range(7):
+                handler.handle([], runner_payload)
+            handler.close(runner_payload)
+            with (Path(tmp) / "state.log").open() as f:
+                records = [json.loads(line) for line in f]
+
+        vehicle_states = [r for r in records if r["report_type"] == "VEHICLE_STATE"]
+        self.assertEqual(len(vehicle_states), 3, "should log states on steps 0, 3 and 6")
@@ -1,5 +1,26 @@
+import json
+import os
+import shutil
+import tempfile
 from unittest import TestCase, skip
+from unittest.mock import patch
 
+import networkx as nx
+import numpy as np
+from scipy.sparse.csgraph import dijkstra
+
+from nrel.hive.app.compile_road_network import compile_road_network
+from nrel.hive.model.roadnetwork.link_id import create_link_id
+from nrel.hive.model.roadnetwork.osm.compiled_road_network import compiled_road_network_dir
+from nrel.hive.model.roadnetwork.osm.osm_road_network_link_helper import OSMRoadNetworkLinkHelper
+from nrel.hive.model.roadnetwork.osm.csr_road_graph import CSRRoadGraph
+from nrel.hive.model.roadnetwork.osm.osm_routing import (
+    LandmarkIndex,
+    OSMRoutingEngine,
+    landmark_file_for,
+    load_or_build_landmarks,
+)
+from nrel.hive.model.roadnetwork.route import route_distance_km, route_travel_time_seconds
 from nrel.hive.resources.mock_lobster import *
 
 
@@ -51,3 +72,235 @@ class TestOSMRoadNetwork(TestCase):
             route[-1].end,
             "route should end at destination GeoId (stationary road network location)",
         )
+
+    def test_route_cache(self):
+        network = mock_osm_network()
+        origin = network.position_from_geoid(h3.geo_to_h3(39.7481388, -104.9935966, 15))
+        destination = network.position_from_geoid(h3.geo_to_h3(39.7613596, -104.981728, 15))
+
+        first = network.route(origin, destination)
+        second = network.route(origin, destination)
+
+        self.assertEqual(first, second, "cached route should match the computed route")
+        self.assertEqual(network.routing_engine.misses, 1)
+        self.assertEqual(network.routing_engine.hits, 1)
+
+    def test_route_cache_is_bounded(self):
+        network = mock_osm_network()
+        engine = OSMRoutingEngine(network.road_graph, cache_size=2)
+        nodes = network.road_graph.node_ids
+
+        for destination in nodes[1:5]:
+            engine.node_path(nodes[0], destination)
+
+        self.assertEqual(len(engine.cache), 2, "should evict the least recently used paths")
+
+    def test_landmark_routing_matches_dijkstra(self):
+        network = mock_osm_network()
+        graph = network.graph
+        landmarks = LandmarkIndex.build(network.road_graph, 4)
+        engine = OSMRoutingEngine(network.road_graph, cache_size=0, landmarks=landmarks)
+        nodes = list(graph.nodes())
+
+        for origin, destination in zip(nodes[::17], reversed(nodes[::17])):
+            expected = nx.shortest_path_length(graph, origin, destination, weight="travel_time")
+            path = engine.node_path(origin, destination)
+            result = nx.path_weight(graph, path, weight="travel_time")
+            self.assertAlmostEqual(result, expected, places=6)
+
+    def test_routing_without_landmarks_matches_dijkstra(self):
+        network = mock_osm_network()
+        graph = network.graph
+        engine = OSMRoutingEngine(network.road_graph, cache_size=0)
+        nodes = list(graph.nodes())
+
+        for origin, destination in zip(nodes[::17], reversed(nodes[::17])):
+            expected = nx.shortest_path_length(graph, origin, destination, weight="travel_time")
+            path = engine.node_path(origin, destination)
+            result = nx.path_weight(graph, path, weight="travel_time")
+            self.assertAlmostEqual(result, expected, places=6)
+
+    def test_landmark_lower_bounds_are_admissible(self):
+        network = mock_osm_network()
+        landmarks = LandmarkIndex.build(network.road_graph, 4)
+        travel_times = dijkstra(network.road_graph.travel_time_matrix())
+
+        for destination in range(0, network.road_graph.node_count, 13):
+            bounds = landmarks.lower_bounds(destination)
+            reachable = np.isfinite(travel_times[:, destination])
+            self.assertTrue(
+                np.all(bounds[reachable] <= travel_times[reachable, destination] + 1e-6),
+                "landmark bounds should never exceed the shortest travel time",
+            )
+
+    def test_landmarks_persisted_next_to_road_network(self):
+        source = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.road_network",
+            "downtown_denver_network.json",
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            road_network_file = Path(tmp) / "network.json"
+            shutil.copy(source, road_network_file)
+
+            network = OSMRoadNetwork.from_file(road_network_file, routing_landmarks=3)
+            landmark_file = landmark_file_for(road_network_file)
+            self.assertTrue(landmark_file.is_file(), "landmark index should be written")
+
+            written_at = landmark_file.stat().st_mtime_ns
+            reloaded = load_or_build_landmarks(network.road_graph, road_network_file, 3)
+
+            self.assertEqual(landmark_file.stat().st_mtime_ns, written_at, "should not rebuild")
+            np.testing.assert_array_equal(
+                reloaded.from_landmark, network.routing_engine.landmarks.from_landmark
+            )
+
+    def test_distance_and_route_matrix_match_route(self):
+        network = mock_osm_network()
+        origins = (
+            h3.geo_to_h3(39.7481388, -104.9935966, 15),
+            h3.geo_to_h3(39.7539, -104.974, 15),
+        )
+        destinations = (
+            h3.geo_to_h3(39.7613596, -104.981728, 15),
+            h3.geo_to_h3(39.7539, -104.974, 15),
+            h3.geo_to_h3(39.752, -104.99, 15),
+        )
+
+        distances = network.distance_matrix_km(origins, destinations)
+        travel_times = network.route_matrix(origins, destinations)
+
+        self.assertEqual(distances.shape, (2, 3))
+        for i, o in enumerate(origins):
+            for j, d in enumerate(destinations):
+                route = network.route(
+                    network.position_from_geoid(o), network.position_from_geoid(d)
+                )
+                self.assertAlmostEqual(distances[i, j], route_distance_km(route), places=6)
+                self.assertAlmostEqual(travel_times[i, j], route_travel_time_seconds(route))
+        self.assertEqual(distances[1, 1], 0, "same origin and destination should have no cost")
+
+    def test_csr_road_graph_matches_networkx(self):
+        network = mock_osm_network()
+        source = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.road_network",
+            "downtown_denver_network.json",
+        )
+        with open(source) as f:
+            graph = nx.node_link_graph(json.load(f))
+        road_graph = network.road_graph
+
+        self.assertEqual(road_graph.node_count, graph.number_of_nodes())
+        self.assertEqual(road_graph.edge_count, graph.number_of_edges())
+        for i, (src, dst) in enumerate(zip(road_graph.edge_sources(), road_graph.indices)):
+            u, v = road_graph.node_id(src), road_graph.node_id(dst)
+            self.assertEqual(road_graph.length[i], graph[u][v][0]["length"])
+            link = network.link_from_link_id(create_link_id(u, v))
+            self.assertIsNotNone(link, "every csr edge should be a link")
+            self.assertEqual(road_graph.node_index(u), src)
+        self.assertIsNone(road_graph.node_index(-1), "unknown nodes have no index")
+
+    def test_road_graph_directory_is_memory_mapped(self):
+        network = mock_osm_network()
+        origin = h3.geo_to_h3(39.7481388, -104.9935966, 15)
+        destination = h3.geo_to_h3(39.7613596, -104.981728, 15)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = Path(tmp) / "road_graph"
+            network.to_file(directory)
+            loaded = OSMRoadNetwork.from_file(directory)
+
+            self.assertIsInstance(loaded.road_graph.travel_time, np.memmap)
+            for expected, result in zip(network.road_graph, loaded.road_graph):
+                np.testing.assert_array_equal(result, expected)
+            self.assertEqual(
+                loaded.route(
+                    loaded.position_from_geoid(origin), loaded.position_from_geoid(destination)
+                ),
+                network.route(
+                    network.position_from_geoid(origin), network.position_from_geoid(destination)
+                ),
+            )
+            del loaded
+
+    def test_csr_road_graph_tuple_node_ids(self):
+        graph = nx.MultiDiGraph()
+        graph.add_node((2, 1), y=39.75, x=-104.98)
+        graph.add_node((1, 7), y=39.76, x=-104.99)
+        graph.add_edge((2, 1), (1, 7), length=100.0, speed_kmph=40.0)
+        graph.add_edge((1, 7), (2, 1), length=100.0, speed_kmph=40.0)
+
+        road_graph = CSRRoadGraph.from_networkx(graph)
+
+        self.assertEqual(road_graph.node_id(0), (1, 7), "node ids should be sorted")
+        self.assertEqual(road_graph.node_index((2, 1)), 1)
+        self.assertIsNone(road_graph.node_index((2, 2)))
+        self.assertEqual(OSMRoutingEngine(road_graph).node_path((1, 7), (2, 1)), ((1, 7), (2, 1)))
+
+    def test_compiled_road_network_used_when_fresh(self):
+        source = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.road_network",
+            "downtown_denver_network.json",
+        )
+        origin = h3.geo_to_h3(39.7481388, -104.9935966, 15)
+        destination = h3.geo_to_h3(39.7613596, -104.981728, 15)
+        with tempfile.TemporaryDirectory() as tmp:
+            road_network_file = Path(tmp) / "network.json"
+            shutil.copy(source, road_network_file)
+            expected = OSMRoadNetwork.from_file(road_network_file)
+            build_link_helper = OSMRoadNetworkLinkHelper.build
+
+            compiled_dir = compile_road_network(road_network_file)
+            self.assertEqual(compiled_dir, compiled_road_network_dir(road_network_file))
+            self.assertEqual(
+                list(compiled_dir.rglob("*.pickle")), [], "compiled networks hold no pickles"
+            )
+
+            with patch.object(OSMRoadNetworkLinkHelper, "build") as build:
+                network = OSMRoadNetwork.from_file(road_network_file)
+                build.assert_not_called()
+            self.assertEqual(network.link_helper.links, expected.link_helper.links)
+            self.assertEqual(network.link_from_geoid(origin), expected.link_from_geoid(origin))
+            self.assertEqual(
+                network.route(
+                    network.position_from_geoid(origin), network.position_from_geoid(destination)
+                ),
+                expected.route(
+                    expected.position_from_geoid(origin),
+                    expected.position_from_geoid(destination),
+                ),
+            )
+
+            # a compiled network is stale for other settings, or once the source file changes
+            with patch.object(OSMRoadNetworkLinkHelper, "build", wraps=build_link_helper) as build:
+                OSMRoadNetwork.from_file(road_network_file, sim_h3_resolution=14)
+                build.assert_called_once()
+
+            os.utime(road_network_file, ns=(0, 0))
+            with patch.object(OSMRoadNetworkLinkHelper, "build", wraps=build_link_helper) as build:
+                OSMRoadNetwork.from_file(road_network_file)
+                build.assert_called_once()
+            del network
+
+    def test_link_helper_from_road_graph_matches_build(self):
+        network = mock_osm_network()
+        error, link_helper = OSMRoadNetworkLinkHelper.from_road_graph(network.road_graph, 15)
+
+        self.assertIsNone(error)
+        self.assertEqual(link_helper.links, network.link_helper.links)
+
+    def test_link_helper_centroids_separate_directions(self):
+        graph = nx.MultiDiGraph()
+        graph.add_node(1, y=39.75, x=-104.98)
+        graph.add_node(2, y=39.752, x=-104.98)
+        graph.add_edge(1, 2, length=222.0, speed_kmph=40.0)
+        graph.add_edge(2, 1, length=222.0, speed_kmph=40.0)
+
+        error, link_helper = OSMRoadNetworkLinkHelper.build(graph, 15)
+
+        self.assertIsNone(error)
+        for link_id in ("1-2", "2-1"):
+            lat, lon = link_helper.links_spatial_lookup.data[
+                link_helper.links_linkid_lookup.index(link_id)
+            ]
+            _, nearest = link_helper.link_by_geoid(h3.geo_to_h3(lat, lon, 15))
+            self.assertEqual(nearest.link_id, link_id, "each direction has its own centroid")
@@ -1,7 +1,20 @@
 from unittest import TestCase
 
-from nrel.hive.resources.mock_lobster import mock_bev, mock_vehicle, mock_dcfc_charger
-from nrel.hive.model.vehicle.mechatronics.powercurve.powercurve_ops import time_to_full
+from nrel.hive.model.energy.charger import Charger
+from nrel.hive.model.energy.energytype import EnergyType
+from nrel.hive.resources.mock_lobster import (
+    mock_bev,
+    mock_ice,
+    mock_vehicle,
+    mock_dcfc_charger,
+    mock_l2_charger,
+)
+from nrel.hive.model.vehicle.mechatronics.powercurve.powercurve_ops import (
+    time_to_full,
+    time_to_full_lookup,
+    charge_time_table,
+    ChargeTimeTables,
+)
 
 
 class TestPowercurveOps(TestCase):
@@ -32,3 +45,63 @@ class TestPowercurveOps(TestCase):
             sim_timestep_duration_seconds=60,
             min_delta_energy_change=0.0001,
         )
+
+    def test_time_to_full_lookup_matches_iterative(self):
+        bev = mock_bev(battery_capacity_kwh=50)
+        ice = mock_ice()
+        gas_pump = Charger("gas_pump", EnergyType.GASOLINE, 0.1, "gal/s")
+        cases = (
+            (bev, mock_dcfc_charger()),
+            (bev, mock_l2_charger()),
+            (ice, gas_pump),
+        )
+        for mechatronics, charger in cases:
+            for soc in (0.0, 0.13, 0.5, 0.79, 0.99):
+                for target_soc in (0.8, 1.0):
+                    vehicle = mock_vehicle(mechatronics=mechatronics, soc=soc)
+                    iterative = time_to_full(vehicle, mechatronics, charger, target_soc, 60, 0.0001)
+                    lookup = time_to_full_lookup(
+                        vehicle, mechatronics, charger, target_soc, 60, 0.0001
+                    )
+                    self.assertLessEqual(
+                        abs(iterative - lookup),
+                        60,
+                        f"{charger.id} from {soc} to {target_soc} should agree within a time step",
+                    )
+
+    def test_time_to_full_lookup_already_charged(self):
+        bev = mock_bev(battery_capacity_kwh=50)
+        vehicle = mock_vehicle(soc=0.9)
+
+        lookup = time_to_full_lookup(vehicle, bev, mock_dcfc_charger(), 0.8, 60, 0.0001)
+
+        self.assertEqual(lookup, 0, "vehicle is already above the target soc")
+
+    def test_charge_time_table_rebuilt_for_new_mechatronics(self):
+        small_bev = mock_bev(battery_capacity_kwh=50)
+        large_bev = mock_bev(battery_capacity_kwh=100)
+        charger = mock_dcfc_charger()
+        tables: ChargeTimeTables = {}
+
+        small = charge_time_table(mock_vehicle(), small_bev, charger, 60, 0.0001, tables)
+        large = charge_time_table(mock_vehicle(), large_bev, charger, 60, 0.0001, tables)
+
+        self.assertGreater(
+            large.seconds[-1], small.seconds[-1], "larger battery should take longer to fill"
+        )
+
+    def test_charge_time_tables_kept_per_simulation(self):
+        small_bev = mock_bev(battery_capacity_kwh=50)
+        large_bev = mock_bev(battery_capacity_kwh=100)
+        charger = mock_dcfc_charger()
+        small_tables: ChargeTimeTables = {}
+        large_tables: ChargeTimeTables = {}
+
+        small = charge_time_table(mock_vehicle(), small_bev, charger, 60, 0.0001, small_tables)
+        charge_time_table(mock_vehicle(), large_bev, charger, 60, 0.0001, large_tables)
+
+        self.assertIs(
+            charge_time_table(mock_vehicle(), small_bev, charger, 60, 0.0001, small_tables),
+            small,
+            "a table with the same ids in another simulation should not replace this one",
+        )
@@ -0,0 +1,165 @@
+import time
+from typing import List, Tuple
+from unittest import TestCase
+from unittest.mock import patch
+
+from nrel.hive.reporting import profiling
+from nrel.hive.reporting.async_reporter import AsyncReporter
+from nrel.hive.reporting.handler.handler import Handler
+from nrel.hive.reporting.handler.stats_handler import StatsHandler
+from nrel.hive.reporting.report_type import ReportType
+from nrel.hive.reporting.reporter import ReportData
+from nrel.hive.state.vehicle_state import vehicle_state_ops
+from nrel.hive.resources.mock_lobster import *
+
+
+class _EveryReportHandler(Handler):
+    def handle(self, reports, runner_payload):
+        pass
+
+    def close(self, runner_payload):
+        pass
+
+
+class _RecordingHandler(Handler):
+    def __init__(self, delay_seconds: float = 0.0, fail_at=None):
+        self.delay_seconds = delay_seconds
+        self.fail_at = fail_at
+        self.handled: List[Tuple[SimTime, int]] = []
+        self.closed_after = None
+
+    def handle(self, reports, runner_payload):
+        time.sleep(self.delay_seconds)
+        if runner_payload.s.sim_time == self.fail_at:
+            raise ValueError("failed to handle reports")
+        self.handled.append((runner_payload.s.sim_time, len(reports)))
+
+    def close(self, runner_payload):
+        self.closed_after = len(self.handled)
+
+
+def _moving_sim():
+    vehicle = mock_vehicle()
+    sim = mock_sim(vehicles=(vehicle,))
+    route = mock_route_from_geoids(vehicle.geoid, h3.geo_to_h3(39.76, -104.98, 15), speed_kmph=10)
+    _, sim = Repositioning.build(vehicle.id, route).enter(sim, mock_env())
+    return sim, vehicle.id
+
+
+class TestReporter(TestCase):
+    def test_report_data_computes_lazy_fields_once_when_read(self):
+        calls = []
+
+        def wkt():
+            calls.append(1)
+            return "LINESTRING (0 0, 1 1)"
+
+        data = ReportData({"vehicle_id": "v0"}, lazy_fields={"route_wkt": wkt})
+        report = Report(ReportType.VEHICLE_MOVE_EVENT, data)
+
+        self.assertEqual(report.report["vehicle_id"], "v0")
+        self.assertEqual(len(calls), 0, "lazy field should not be computed until it is read")
+        self.assertEqual(tuple(data), ("vehicle_id", "route_wkt"))
+        self.assertEqual(
+            report.as_json(),
+            {
+                "vehicle_id": "v0",
+                "route_wkt": "LINESTRING (0 0, 1 1)",
+                "report_type": "vehicle_move_event",
+            },
+        )
+        self.assertEqual(data["route_wkt"], "LINESTRING (0 0, 1 1)")
+        self.assertEqual(len(calls), 1, "lazy field should be computed once")
+
+    def test_reporter_only_files_reports_handlers_read(self):
+        reporter = Reporter()
+        self.assertFalse(reporter.wants(ReportType.VEHICLE_MOVE_EVENT))
+
+        reporter.add_handler(StatsHandler())
+        reporter.file_report(Report(ReportType.VEHICLE_MOVE_EVENT, {}))
+        reporter.file_report(Report(ReportType.VEHICLE_CHARGE_EVENT, {}))
+        self.assertEqual([r.report_type for r in reporter.reports], [ReportType.VEHICLE_MOVE_EVENT])
+
+        reporter.add_handler(_EveryReportHandler())
+        self.assertTrue(reporter.wants(ReportType.VEHICLE_CHARGE_EVENT))
+
+    def test_move_skips_report_when_no_handler_reads_it(self):
+        sim, vehicle_id = _moving_sim()
+        env = mock_env().set_reporter(Reporter())
+
+        with patch.object(vehicle_state_ops, "vehicle_move_event") as vehicle_move_event:
+            error, moved_sim = vehicle_state_ops.move(sim, env, vehicle_id)
+
+        self.assertIsNone(error)
+        self.assertNotEqual(moved_sim.vehicles[vehicle_id].geoid, sim.vehicles[vehicle_id].geoid)
+        vehicle_move_event.assert_not_called()
+
+    def test_move_report_defers_geometry(self):
+        sim, vehicle_id = _moving_sim()
+        reporter = Reporter()
+        reporter.add_handler(StatsHandler())
+        env = mock_env().set_reporter(reporter)
+
+        with patch("nrel.hive.model.roadnetwork.route.to_linestring") as to_linestring:
+            to_linestring.return_value = "LINESTRING EMPTY"
+            vehicle_state_ops.move(sim, env, vehicle_id)
+            (report,) = reporter.reports
+            self.assertGreater(report.report["distance_km"], 0)
+            to_linestring.assert_not_called()
+
+            self.assertEqual(report.as_json()["route_wkt"], "LINESTRING EMPTY")
+            to_linestring.assert_called_once()
+
+    def test_async_reporter_handles_every_step_in_order(self):
+        handler = _RecordingHandler(delay_seconds=0.005)
+        reporter = AsyncReporter(queue_size=2)
+        reporter.add_handler(handler)
+        env = mock_env().set_reporter(reporter)
+
+        for t in range(10):
+            reporter.file_report(Report(ReportType.ADD_REQUEST_EVENT, {}))
+            reporter.flush(RunnerPayload(mock_sim(sim_time=t), env, mock_update()))
+        reporter.close(RunnerPayload(mock_sim(sim_time=10), env, mock_update()))
+
+        self.assertEqual(handler.handled, [(t, 1) for t in range(10)])
+        self.assertEqual(handler.closed_after, 10, "close should wait for queued steps")
+        self.assertIsNone(reporter.thread)
+
+    def test_async_reporter_raises_handler_errors(self):
+        handler = _RecordingHandler(fail_at=2)
+        reporter = AsyncReporter()
+        reporter.add_handler(handler)
+        env = mock_env().set_reporter(reporter)
+
+        # the error is raised by whichever call follows it on the simulation thread
+        with self.assertRaises(ValueError):
+            for t in range(4):
+                reporter.flush(RunnerPayload(mock_sim(sim_time=t), env, mock_update()))
+            reporter.drain()
+        reporter.close(RunnerPayload(mock_sim(sim_time=4), env, mock_update()))
+
+        self.assertEqual([t for t, _ in handler.handled], [0, 1])
+        self.assertEqual(handler.closed_after, 2, "handlers should be closed after an error")
+
+    def test_async_reporter_profiles_each_step(self):
+        profiler = profiling.StepProfiler()
+        reporter = AsyncReporter()
+        reporter.profiler = profiler
+        reporter.add_handler(_RecordingHandler())
+        env = mock_env().set_reporter(reporter)
+        for t in range(5):
+            with profiling.use_profiler(profiler):
+                for _ in range(t):
+                    reporter.file_report(Report(ReportType.ADD_REQUEST_EVENT, {}))
+                reporter.flush(RunnerPayload(mock_sim(sim_time=t), env, mock_update()))
+                # wait for the handler so that its time is recorded in this step
+                reporter.drain()
+                profiling.end_step(SimTime.build(t))
+        reporter.close(RunnerPayload(mock_sim(sim_time=5), env, mock_update()))
+
+        profile = profiler.to_dataframe()
+        self.assertEqual(profile["reports_filed"].tolist(), [0, 1, 2, 3, 4])
+        self.assertTrue(
+            (profile["handler._RecordingHandler_seconds"] > 0).all(),
+            "handlers run on the background thread should be timed",
+        )
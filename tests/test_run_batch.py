@@ -0,0 +1,86 @@
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from nrel.hive.app.run_batch import (
+    COMPLETED,
+    FAILED,
+    TIMEOUT,
+    BatchManifest,
+    ScenarioResult,
+    SimArgs,
+    run_scenarios,
+    warn_on_previous_defaults,
+)
+from nrel.hive.resources.mock_lobster import *
+
+
+def _fake_scenario(sim_args, sender):
+    """
+    stands in for running a scenario: "sleep_N" sleeps N seconds, "fail" fails
+    """
+    name = sim_args.scenario_file.name
+    try:
+        if name.startswith("sleep_"):
+            time.sleep(float(name[len("sleep_") :]))
+        if name != "fail":
+            sender.send((str(sim_args.scenario_file.parent), 10))
+    finally:
+        sender.close()
+
+
+class TestRunBatch(TestCase):
+    def test_runs_scenarios_in_order_as_workers_free_up(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = BatchManifest(Path(tmp) / "batch.manifest.json")
+            sim_args = [SimArgs(Path(tmp) / n) for n in ("sleep_0.5", "a", "fail", "b")]
+            results = run_scenarios(sim_args, 2, manifest, target=_fake_scenario)
+            reloaded = BatchManifest(Path(tmp) / "batch.manifest.json")
+
+        names = [Path(r.scenario_file).name for r in results]
+        self.assertEqual(names[-1], "sleep_0.5", "the other worker should run the rest")
+        self.assertEqual(
+            {Path(r.scenario_file).name: r.status for r in results},
+            {"sleep_0.5": COMPLETED, "a": COMPLETED, "fail": FAILED, "b": COMPLETED},
+        )
+        self.assertEqual(sum(r.sim_steps for r in results), 30)
+        self.assertEqual(reloaded.results, manifest.results)
+
+    def test_stops_scenarios_that_time_out(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = BatchManifest(Path(tmp) / "batch.manifest.json")
+            sim_args = [SimArgs(Path(tmp) / n) for n in ("sleep_30", "a")]
+            start = time.perf_counter()
+            results = run_scenarios(sim_args, 1, manifest, timeout_sec=0.5, target=_fake_scenario)
+
+        self.assertLess(time.perf_counter() - start, 10)
+        self.assertEqual([r.status for r in results], [TIMEOUT, COMPLETED])
+
+    def test_warns_on_batch_settings_shipped_before_they_were_used(self):
+        global_config = mock_config().global_config
+        with self.assertLogs("hive", level="WARNING") as logs:
+            warn_on_previous_defaults(
+                global_config._replace(local_parallelism=1, local_parallelism_timeout_sec=60)
+            )
+        self.assertEqual(len(logs.output), 2)
+
+        with patch("nrel.hive.app.run_batch.log") as log:
+            warn_on_previous_defaults(
+                global_config._replace(local_parallelism=0, local_parallelism_timeout_sec=0)
+            )
+        log.warning.assert_not_called()
+
+    def test_manifest_lists_completed_scenarios_with_outputs(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manifest = BatchManifest(Path(tmp) / "batch.manifest.json")
+            manifest.record(ScenarioResult("done.yaml", COMPLETED, tmp, 10, 1.0))
+            manifest.record(ScenarioResult("moved.yaml", COMPLETED, f"{tmp}/missing", 10, 1.0))
+            manifest.record(ScenarioResult("failed.yaml", FAILED, elapsed_sec=1.0))
+            reloaded = BatchManifest(Path(tmp) / "batch.manifest.json")
+
+            self.assertTrue(reloaded.is_completed("done.yaml"))
+            self.assertFalse(reloaded.is_completed("moved.yaml"))
+            self.assertFalse(reloaded.is_completed("failed.yaml"))
+            self.assertFalse(reloaded.is_completed("new.yaml"))
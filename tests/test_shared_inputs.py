@@ -0,0 +1,54 @@
+import tempfile
+from unittest import TestCase
+
+from nrel.hive.initialization.load import load_simulation
+from nrel.hive.initialization.shared_inputs import prepare_shared_inputs
+from nrel.hive.model.roadnetwork.osm.compiled_road_network import is_compiled_road_network
+from nrel.hive.runner import LocalSimulationRunner
+from nrel.hive.resources.mock_lobster import *
+
+
+class TestSharedInputs(TestCase):
+    def test_scenarios_share_prepared_inputs(self):
+        config = mock_denver_demo_config()
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = prepare_shared_inputs(
+                [config, config], ("road_network", "requests"), Path(tmp)
+            )
+            self.assertEqual(overrides[0], overrides[1], "inputs should be prepared once")
+            self.assertTrue(is_compiled_road_network(overrides[0]["road_network_file"]))
+
+            shared_config = config._replace(
+                input_config=config.input_config._replace(**overrides[0])
+            )
+            shared = LocalSimulationRunner.run(load_simulation(shared_config))
+        expected = LocalSimulationRunner.run(load_simulation(config))
+
+        self.assertEqual(
+            len(shared.s.road_network.link_helper.links),
+            len(expected.s.road_network.link_helper.links),
+        )
+        self.assertEqual(
+            sorted(r.id for r in shared.s.get_requests()),
+            sorted(r.id for r in expected.s.get_requests()),
+        )
+
+    def test_prepared_inputs_are_reused(self):
+        config = mock_denver_demo_config()
+        with tempfile.TemporaryDirectory() as tmp:
+            overrides = prepare_shared_inputs([config], ("road_network", "requests"), Path(tmp))
+            arrays = sorted(Path(overrides[0]["requests_file"]).glob("*.npy"))
+            written = [a.stat().st_mtime_ns for a in arrays]
+
+            reused = prepare_shared_inputs([config], ("road_network", "requests"), Path(tmp))
+            self.assertEqual(overrides, reused)
+            self.assertEqual(
+                [a.stat().st_mtime_ns for a in arrays],
+                written,
+                "a fresh shared RequestTable should not be written again",
+            )
+
+    def test_unsupported_shared_input(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                prepare_shared_inputs([mock_denver_demo_config()], ("vehicles",), Path(tmp))
@@ -0,0 +1,126 @@
+import functools as ft
+from dataclasses import replace
+from unittest import TestCase
+
+from returns.result import Failure
+
+from nrel.hive.state.simulation_state.update.step_simulation_ops import (
+    perform_vehicle_state_updates,
+)
+from nrel.hive.resources.mock_lobster import *
+
+
+def _geoid(i: int) -> GeoId:
+    return h3.geo_to_h3(39.7539 + i * 0.002, -104.974 - i * 0.003, 15)
+
+
+def _move(vehicle: Vehicle, geoid: GeoId) -> Vehicle:
+    position = mock_network().position_from_geoid(geoid)
+    assert position is not None
+    return replace(vehicle, position=position)
+
+
+def _one_at_a_time(sim: SimulationState, op, entities) -> SimulationState:
+    return ft.reduce(lambda s, e: op(s, e).unwrap(), entities, sim)
+
+
+class TestSimulationStateMutation(TestCase):
+    def test_add_entities_matches_sequential(self):
+        entities = (
+            *(mock_vehicle_from_geoid(vehicle_id=f"v{i}", geoid=_geoid(i % 3)) for i in range(6)),
+            mock_station_from_geoid(station_id="s0", geoid=_geoid(0)),
+            mock_base_from_geoid(base_id="b0", geoid=_geoid(1)),
+            *(mock_request_from_geoids(request_id=f"r{i}", origin=_geoid(i)) for i in range(3)),
+        )
+        sim = mock_sim()
+
+        expected = _one_at_a_time(sim, simulation_state_ops.add_entity_safe, entities)
+        with sim.mutate() as mutation:
+            mutation.add_entities(entities)
+        result = mutation.result.unwrap()
+
+        self.assertEqual(result, expected)
+        self.assertEqual(len(result.vehicles), 6)
+
+    def test_changes_applied_when_with_block_exits(self):
+        vehicle = mock_vehicle_from_geoid(vehicle_id="v0", geoid=_geoid(0))
+        sim = mock_sim()
+
+        with sim.mutate() as mutation:
+            mutation.add_entity(vehicle)
+            with self.assertRaises(RuntimeError, msg="nothing is applied inside the block"):
+                mutation.result
+        self.assertIn("v0", mutation.result.unwrap().vehicles)
+
+        with self.assertRaises(ValueError):
+            with sim.mutate() as failed:
+                failed.add_entity(vehicle)
+                raise ValueError("the block failed")
+        with self.assertRaises(RuntimeError, msg="a failed block should not apply its changes"):
+            failed.result
+
+    def test_modify_entities_matches_sequential(self):
+        vehicles = tuple(
+            mock_vehicle_from_geoid(vehicle_id=f"v{i}", geoid=_geoid(i)) for i in range(5)
+        )
+        sim = mock_sim(vehicles=vehicles)
+
+        # swap vehicles between locations, move one vehicle twice, and leave one in place
+        moved = (
+            _move(vehicles[0], _geoid(1)),
+            _move(vehicles[1], _geoid(0)),
+            _move(vehicles[2], _geoid(7)),
+            _move(vehicles[2], _geoid(8)),
+            vehicles[3],
+        )
+        expected = _one_at_a_time(sim, simulation_state_ops.modify_entity_safe, moved)
+        result = simulation_state_ops.modify_entities_safe(sim, moved).unwrap()
+
+        self.assertEqual(result, expected)
+        self.assertEqual(result.v_locations[_geoid(8)], frozenset({"v2"}))
+        self.assertNotIn(_geoid(7), result.v_locations, "empty locations should be removed")
+
+    def test_modify_missing_entity_fails(self):
+        vehicle = mock_vehicle_from_geoid(vehicle_id="v0", geoid=_geoid(0))
+        missing = mock_vehicle_from_geoid(vehicle_id="missing", geoid=_geoid(1))
+        sim = mock_sim(vehicles=(vehicle,))
+
+        result = simulation_state_ops.modify_entities_safe(
+            sim, (_move(vehicle, _geoid(2)), missing)
+        )
+        self.assertIsInstance(result, Failure)
+
+    def test_deferred_vehicle_index_matches_sequential(self):
+        vehicles = tuple(
+            mock_vehicle_from_geoid(vehicle_id=f"v{i}", geoid=_geoid(i)) for i in range(4)
+        )
+        sim = mock_sim(vehicles=vehicles[:3])
+        added = vehicles[3]
+        moved = (_move(vehicles[0], _geoid(5)), _move(vehicles[1], _geoid(5)))
+
+        expected = simulation_state_ops.add_vehicle_safe(sim, added).unwrap()
+        expected = _one_at_a_time(expected, simulation_state_ops.modify_vehicle_safe, moved)
+        _, expected = simulation_state_ops.remove_vehicle(expected, "v2")
+
+        deferred = simulation_state_ops.defer_vehicle_index(sim)
+        deferred = simulation_state_ops.add_vehicle_safe(deferred, added).unwrap()
+        deferred = _one_at_a_time(deferred, simulation_state_ops.modify_vehicle_safe, moved)
+        _, deferred = simulation_state_ops.remove_vehicle(deferred, "v2")
+        self.assertEqual(deferred.v_locations, sim.v_locations, "index should not change yet")
+
+        result = simulation_state_ops.restore_vehicle_index(deferred, sim.vehicles)
+        self.assertEqual(result, expected)
+
+    def test_perform_vehicle_state_updates_indexes_moved_vehicles(self):
+        vehicle = mock_vehicle()
+        sim = mock_sim(vehicles=(vehicle,))
+        env = mock_env()
+        route = mock_route_from_geoids(vehicle.geoid, _geoid(3), speed_kmph=10)
+        _, sim = Repositioning.build(vehicle.id, route).enter(sim, env)
+
+        result = perform_vehicle_state_updates(sim, env)
+        moved = result.vehicles[vehicle.id]
+
+        self.assertNotEqual(moved.geoid, vehicle.geoid, "the vehicle should have moved")
+        self.assertFalse(result.vehicle_index_deferred)
+        self.assertEqual(result.v_locations, immutables.Map({moved.geoid: frozenset({vehicle.id})}))
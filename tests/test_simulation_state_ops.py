@@ -242,6 +242,21 @@ class TestSimulationStateOps(TestCase):
             "there should be no key for this geoid",
         )
 
+    def test_add_remove_vehicle_maintains_station_index(self):
+        station = mock_station()
+        veh = mock_vehicle(
+            vehicle_state=ChargingStation.build(
+                DefaultIds.mock_vehicle_id(), station.id, mock_dcfc_charger_id()
+            )
+        )
+        sim_with_veh = simulation_state_ops.add_vehicle_safe(mock_sim(), veh).unwrap()
+
+        self.assertEqual(sim_with_veh.s_charging.get(station.id), frozenset([veh.id]))
+
+        sim_after_remove = simulation_state_ops.remove_vehicle_safe(sim_with_veh, veh.id).unwrap()
+
+        self.assertNotIn(station.id, sim_after_remove.s_charging, "index should be cleared")
+
     def test_pop_vehicle(self):
         veh = mock_vehicle()
         sim = mock_sim()
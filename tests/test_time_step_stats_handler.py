@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from nrel.hive.initialization.load import load_simulation
+from nrel.hive.reporting.handler.time_step_stats_handler import TimeStepStatsHandler
+from nrel.hive.runner import LocalSimulationRunner
+from nrel.hive.resources.mock_lobster import *
+
+test_dir = Path(__file__).parent
+
+# written by TimeStepStatsHandler as it was before it made a single pass over the vehicles and
+# reports, running write_denver_demo_fleets_stats with PYTHONHASHSEED=0. the simulation orders
+# some of its choices by hash, so the stats are only reproducible with a fixed hash seed.
+golden_dir = test_dir / "test_assets" / "denver_demo_fleets_time_step_stats"
+
+
+def write_denver_demo_fleets_stats(output_directory: str):
+    """
+    runs four hours of denver_demo_fleets and writes its time step stats csv files
+    """
+    config = mock_denver_demo_config("denver_demo_fleets.yaml", end_hour=4)
+    stats_config = config._replace(
+        global_config=config.global_config._replace(
+            log_time_step_stats=True, log_fleet_time_step_stats=True
+        )
+    )
+    runner_payload = load_simulation(config)
+    env = runner_payload.e
+
+    handler = TimeStepStatsHandler(stats_config, Path(output_directory), env.fleet_ids)
+    reporter = Reporter()
+    reporter.add_handler(handler)
+    result = LocalSimulationRunner.run(runner_payload._replace(e=env.set_reporter(reporter)))
+    handler.close(result)
+
+
+class TestTimeStepStatsHandler(TestCase):
+    def test_matches_golden_stats_on_denver_downtown(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            # run in a new interpreter, as the hash seed is fixed when python starts
+            subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import sys; from tests.test_time_step_stats_handler import "
+                    "write_denver_demo_fleets_stats; write_denver_demo_fleets_stats(sys.argv[1])",
+                    tmp,
+                ],
+                cwd=test_dir.parent,
+                env={**os.environ, "PYTHONHASHSEED": "0"},
+                check=True,
+                capture_output=True,
+            )
+            files = sorted(p.relative_to(tmp) for p in Path(tmp).rglob("*.csv"))
+            expected_files = sorted(p.relative_to(golden_dir) for p in golden_dir.rglob("*.csv"))
+            self.assertEqual(files, expected_files, "should write the all and per-fleet stats")
+            for file in files:
+                pd.testing.assert_frame_equal(
+                    pd.read_csv(Path(tmp) / file),
+                    pd.read_csv(golden_dir / file),
+                    check_exact=True,
+                    obj=str(file),
+                )
@@ -1,5 +1,7 @@
+import tempfile
 from unittest import TestCase
 
+from nrel.hive.model.request.request_table import RequestTable
 from nrel.hive.state.simulation_state.update.update_requests_from_file import UpdateRequestsFromFile
 from nrel.hive.resources.mock_lobster import *
 
@@ -119,3 +121,75 @@ class TestUpdateRequests(TestCase):
         self.assertEqual(len(result.requests), 2, "should have added the reqs")
         for req in result.requests.values():
             self.assertLess(req.departure_time, sim_time, f"should be less than {sim_time}")
+
+    def test_update_columnar_matches_lazy_file_reading(self):
+        """
+        the columnar path should add the same requests, with the same values, as the row path
+        """
+        sim_time = SimTime.build(720)
+        config = mock_config(
+            start_time="2019-01-09T00:00:00",
+            end_time="2019-01-10T00:00:00",
+        )
+        env = mock_env(config, fleet_ids=frozenset())
+        req_file = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.requests",
+            "denver_demo_requests.csv",
+        )
+        rate_structure_file = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.service_prices",
+            "rate_structure.csv",
+        )
+        for road_network in (mock_network(), mock_osm_network()):
+            sim = mock_sim(sim_time=sim_time, road_network=road_network)
+            columnar = UpdateRequestsFromFile.build(req_file, rate_structure_file)
+            lazy = UpdateRequestsFromFile.build(
+                req_file, rate_structure_file, lazy_file_reading=True
+            )
+            columnar_result, _ = columnar.update(sim, env)
+            lazy_result, _ = lazy.update(sim, env)
+            self.assertGreater(len(columnar_result.requests), 0, "should have added the reqs")
+            self.assertEqual(dict(columnar_result.requests), dict(lazy_result.requests))
+            self.assertEqual(dict(columnar_result.r_locations), dict(lazy_result.r_locations))
+            self.assertEqual(dict(columnar_result.r_search), dict(lazy_result.r_search))
+            self.assertEqual(dict(columnar_result.r_departures), dict(lazy_result.r_departures))
+
+    def test_update_columnar_with_fleets(self):
+        sim = mock_sim(sim_time=SimTime.build(180))
+        config = mock_config(
+            start_time="2019-01-09T00:00:00",
+            end_time="2019-01-10T00:00:00",
+        )
+        env = mock_env(config, fleet_ids=frozenset(["tnc_1", "tnc_2"]))
+        req_file = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.requests",
+            "denver_demo_fleets_requests.csv",
+        )
+        fn = UpdateRequestsFromFile.build(req_file)
+        result, _ = fn.update(sim, env)
+        self.assertEqual(len(result.requests), 2, "should have added the reqs")
+        for req in result.requests.values():
+            self.assertEqual(req.membership, Membership.single_membership("tnc_2"))
+
+        # requests are only read once
+        result_again, _ = fn.update(result, env)
+        self.assertEqual(result_again.requests, result.requests)
+
+    def test_update_from_table_directory(self):
+        sim = mock_sim(sim_time=SimTime.build(180))
+        config = mock_config(
+            start_time="2019-01-09T00:00:00",
+            end_time="2019-01-10T00:00:00",
+        )
+        env = mock_env(config, fleet_ids=frozenset(["tnc_1", "tnc_2"]))
+        req_file = resource_filename(
+            "nrel.hive.resources.scenarios.denver_downtown.requests",
+            "denver_demo_fleets_requests.csv",
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            RequestTable.from_file(req_file).to_directory(tmp)
+            from_directory, _ = UpdateRequestsFromFile.build(tmp).update(sim, env)
+        from_file, _ = UpdateRequestsFromFile.build(req_file).update(sim, env)
+
+        self.assertEqual(len(from_directory.requests), 2, "should have added the reqs")
+        self.assertEqual(dict(from_directory.requests), dict(from_file.requests))
@@ -82,6 +82,25 @@ class TestVehicleState(TestCase):
             "should have returned the only DCFC charger_id",
         )
 
+    def test_charging_station_enter_exit_updates_station_index(self):
+        vehicle = mock_vehicle()
+        station = mock_station()
+        sim = mock_sim(vehicles=(vehicle,), stations=(station,))
+        env = mock_env()
+
+        state = ChargingStation.build(vehicle.id, station.id, mock_dcfc_charger_id())
+        _, entered_sim = state.enter(sim, env)
+
+        self.assertEqual(entered_sim.s_charging.get(station.id), frozenset([vehicle.id]))
+        self.assertEqual(
+            tuple(v.id for v in entered_sim.get_charging_vehicles(station.id)), (vehicle.id,)
+        )
+
+        _, exited_sim = state.exit(Idle.build(vehicle.id), entered_sim, env)
+
+        self.assertNotIn(station.id, exited_sim.s_charging, "vehicle should be removed")
+        self.assertEqual(exited_sim.get_charging_vehicles(station.id), ())
+
     def test_charging_station_update(self):
         vehicle = mock_vehicle(soc=0.5)
         station = mock_station()
@@ -1822,6 +1841,22 @@ class TestVehicleState(TestCase):
             "the station should also know the vehicle was dequeued",
         )
 
+    def test_charge_queueing_enter_exit_updates_station_index(self):
+        vehicle = mock_vehicle()
+        _, station = mock_station().checkout_charger(mock_dcfc_charger_id())
+        sim = mock_sim(vehicles=(vehicle,), stations=(station,))
+        env = mock_env()
+
+        state = ChargeQueueing.build(vehicle.id, station.id, mock_dcfc_charger_id(), 0)
+        _, entered_sim = state.enter(sim, env)
+
+        self.assertEqual(entered_sim.s_queueing.get(station.id), frozenset([vehicle.id]))
+        self.assertNotIn(station.id, entered_sim.s_charging, "vehicle is not charging")
+
+        _, exited_sim = state.exit(Idle.build(vehicle.id), entered_sim, env)
+
+        self.assertNotIn(station.id, exited_sim.s_queueing, "vehicle should be removed")
+
     def test_charge_queueing_update(self):
         vehicle_charging = mock_vehicle_from_geoid(vehicle_id="charging")
         vehicle_queueing = mock_vehicle_from_geoid(vehicle_id="queueing")